@@ -1,31 +1,36 @@
 """
 Reusable UI components for streamlit_app_v2.
+
+Exports are imported on first use, so importing one component module
+(e.g. ape.components.ui.workflow_indicator) does not load the simulation
+import/export stack.
 """
 
-# Export main functions for easy imports
-from .simulation_io import create_export_package, handle_import, render_manage_section
-from .simulation_ui import (
-    render_preset_buttons, 
-    render_parameter_inputs, 
-    render_runtime_estimate,
-    render_control_buttons, 
-    render_recent_simulations, 
-    render_simulation_card,
-    clear_preset_values
-)
+import importlib
 
-__all__ = [
+# Exported name -> submodule defining it
+_EXPORTS = {
     # simulation_io exports
-    'create_export_package',
-    'handle_import',
-    'render_manage_section',
-    
+    'create_export_package': 'simulation_io',
+    'handle_import': 'simulation_io',
+    'render_manage_section': 'simulation_io',
+
     # simulation_ui exports
-    'render_preset_buttons',
-    'render_parameter_inputs',
-    'render_runtime_estimate',
-    'render_control_buttons',
-    'render_recent_simulations',
-    'render_simulation_card',
-    'clear_preset_values',
-]
\ No newline at end of file
+    'render_preset_buttons': 'simulation_ui',
+    'render_parameter_inputs': 'simulation_ui',
+    'render_runtime_estimate': 'simulation_ui',
+    'render_control_buttons': 'simulation_ui',
+    'render_recent_simulations': 'simulation_ui',
+    'render_simulation_card': 'simulation_ui',
+    'clear_preset_values': 'simulation_ui',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,178 @@
+"""
+Columnar data layer for the Simulation Comparison page.
+
+A simulation is loaded once into patient-sorted arrays: one row per patient
+and one row per visit, with visits for patient i stored contiguously in
+visits[offsets[i]:offsets[i + 1]]. Per-patient lookups are then
+np.searchsorted / np.bincount calls over those arrays instead of
+filtering DataFrames patient by patient.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ape.core.results.outcome_metrics import DAYS_PER_MONTH
+from ape.core.results.parquet import ParquetResults
+from ape.core.storage import ParquetReader
+
+
+@dataclass
+class ComparisonData:
+    """
+    One simulation as patient-sorted columnar tables.
+
+    Attributes:
+        patients: One row per patient (patient_id, baseline_vision,
+            final_vision, discontinued, discontinuation_reason, ...)
+        visits: One row per visit ordered by patient then time, with
+            patient_id, patient_idx (row in patients), month (since the
+            patient's first visit), vision, injected and date
+        offsets: Visit rows of patient i are offsets[i]:offsets[i + 1]
+        summary_stats: Contents of summary_stats.json, if present
+        sim_path: Simulation directory the tables were loaded from
+    """
+    patients: pd.DataFrame
+    visits: pd.DataFrame
+    offsets: np.ndarray
+    summary_stats: Dict[str, Any] = field(default_factory=dict)
+    sim_path: Optional[Path] = None
+
+    @property
+    def n_patients(self) -> int:
+        return len(self.patients)
+
+    @property
+    def visit_counts(self) -> np.ndarray:
+        """Number of visits per patient."""
+        return np.diff(self.offsets)
+
+    @property
+    def has_visits(self) -> np.ndarray:
+        """Mask of patients with at least one visit."""
+        return self.visit_counts > 0
+
+
+def load_comparison_data(sim_path: Union[str, Path]) -> ComparisonData:
+    """
+    Load a saved simulation into patient-sorted arrays.
+
+    Args:
+        sim_path: Simulation directory containing patients.parquet and visits
+
+    Returns:
+        ComparisonData for the simulation
+    """
+    sim_path = Path(sim_path)
+    patients_df = pd.read_parquet(sim_path / 'patients.parquet')
+    visits_df = ParquetReader(sim_path).read_visits(
+        columns=['patient_id', 'date', 'time_days', 'vision', 'injected']
+    )
+
+    summary_stats = {}
+    summary_path = sim_path / 'summary_stats.json'
+    if summary_path.exists():
+        with open(summary_path) as f:
+            summary_stats = json.load(f)
+
+    # 1. Map every visit to its patient's row; visits of unknown patients are dropped
+    patient_index = pd.Index(patients_df['patient_id'])
+    patient_idx = patient_index.get_indexer(visits_df['patient_id'])
+    known = patient_idx >= 0
+    visits_df = visits_df[known]
+    patient_idx = patient_idx[known]
+
+    # 2. One sort groups each patient's visits in time order
+    time_days = visits_df['time_days'].to_numpy(dtype=float)
+    order = np.lexsort((time_days, patient_idx))
+    patient_idx = patient_idx[order]
+    time_days = time_days[order]
+    offsets = np.searchsorted(patient_idx, np.arange(len(patients_df) + 1), side='left')
+
+    # 3. Months since each patient's first visit
+    month = (time_days - time_days[offsets[patient_idx]]) / DAYS_PER_MONTH
+
+    visits = pd.DataFrame({
+        'patient_id': visits_df['patient_id'].array.take(order),
+        'patient_idx': patient_idx,
+        'month': month,
+        'vision': visits_df['vision'].to_numpy()[order],
+        'injected': visits_df['injected'].to_numpy(dtype=bool)[order],
+        'date': visits_df['date'].to_numpy()[order]
+    })
+
+    return ComparisonData(
+        patients=patients_df.reset_index(drop=True),
+        visits=visits,
+        offsets=offsets,
+        summary_stats=summary_stats,
+        sim_path=sim_path
+    )
+
+
+def patient_outcomes(data: ComparisonData) -> pd.DataFrame:
+    """
+    Every registered outcome metric per patient, in patients order.
+
+    Read from ParquetResults.patient_outcomes, which computes the metrics
+    once per simulation and keeps them across page reruns.
+    """
+    return ParquetResults.load(data.sim_path).patient_outcomes().reindex(data.patients['patient_id'])
+
+
+def vision_at_timepoints(data: ComparisonData) -> Dict[str, np.ndarray]:
+    """
+    Per-patient vision at baseline, year 1, year 2 and the final visit.
+
+    Baseline and final are the first and last visits of every patient with
+    visits. Year 1 and year 2 are the first visit inside YEAR1_WINDOW and
+    YEAR2_WINDOW months; patients with no visit in a window are omitted.
+
+    Returns:
+        Dict of vision arrays keyed by 'baseline', 'year1', 'year2', 'final'
+    """
+    outcomes = patient_outcomes(data)
+    columns = {'baseline': 'baseline_vision', 'year1': 'vision_year1',
+               'year2': 'vision_year2', 'final': 'final_vision'}
+    return {
+        name: outcomes[column].dropna().to_numpy()
+        for name, column in columns.items()
+    }
+
+
+def treatment_burden(data: ComparisonData) -> Dict[str, np.ndarray]:
+    """
+    Injections and visits per patient, including patients with no visits.
+
+    Returns:
+        Dict with 'injections' and 'visits' arrays, one entry per patient
+    """
+    outcomes = patient_outcomes(data)
+    return {
+        'injections': outcomes['injections'].to_numpy().astype(np.int64),
+        'visits': outcomes['visits'].to_numpy().astype(np.int64)
+    }
+
+
+def discontinuation_summary(data: ComparisonData) -> Dict[str, Any]:
+    """
+    Discontinued patient counts overall and by recorded reason.
+
+    Returns:
+        Dict with 'total' and 'by_reason' (reason -> count, reasons missing
+        in the data are not counted)
+    """
+    patients = data.patients
+    discontinued = patients['discontinued'].to_numpy(dtype=bool)
+    by_reason = {}
+    if 'discontinuation_reason' in patients.columns and discontinued.any():
+        by_reason = patients.loc[discontinued, 'discontinuation_reason'].value_counts().to_dict()
+    return {
+        'by_reason': by_reason,
+        'total': int(discontinued.sum())
+    }
+
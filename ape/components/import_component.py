@@ -5,7 +5,6 @@ Provides simulation package import capabilities for analyzing previously exporte
 """
 
 import streamlit as st
-from pathlib import Path
 from ape.utils.simulation_package import SimulationPackageManager, SecurityError, PackageValidationError
 from ape.core.results.factory import ResultsFactory
 from ape.core.storage.registry import SimulationRegistry
@@ -58,9 +57,8 @@ def import_simulation_package(uploaded_file):
                 status_text.text(f"📥 {message}")
             
             try:
-                # Read package data
+                # The upload is read in place - no second copy of the package
                 update_progress(10, "Reading package...")
-                package_data = uploaded_file.read()
                 
                 # Validate package
                 update_progress(20, "Validating package...")
@@ -72,7 +70,7 @@ def import_simulation_package(uploaded_file):
                 # Import the package
                 update_progress(40, "Extracting data...")
                 update_progress(60, "Loading simulation...")
-                imported_results = manager.import_package(package_data)
+                imported_results = manager.import_package(uploaded_file)
                 
                 # The import_package method already saves the results to disk
                 # Get the sim_id from the imported results
@@ -269,43 +267,29 @@ def validate_package_only(uploaded_file, show_details=True):
     """Validate a package without importing it"""
     try:
         with st.spinner("Validating package..."):
-            # Read package
-            package_data = uploaded_file.read()
-            
-            # Create manager and validate
+            # Create manager and validate the upload in place (no temp copy)
             manager = SimulationPackageManager()
             
-            # Write to temp file for validation
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as tmp:
-                tmp.write(package_data)
-                tmp_path = Path(tmp.name)
+            # Validate structure
+            validation_result = manager.validate_package(uploaded_file)
             
-            try:
-                # Validate structure
-                validation_result = manager.validate_package(tmp_path)
+            if validation_result['valid']:
+                st.success("✅ Package validation passed!")
                 
-                if validation_result['valid']:
-                    st.success("✅ Package validation passed!")
-                    
-                    if show_details:
-                        with st.expander("📋 Validation Details", expanded=True):
-                            st.write("**Files found**:")
-                            for file in validation_result['files_found']:
-                                st.write(f"- `{file}`")
-                else:
-                    st.error("❌ Package validation failed!")
-                    for error in validation_result['errors']:
-                        st.write(f"- {error}")
-                    
-                    if validation_result['missing_files']:
-                        st.warning("Missing required files:")
-                        for file in validation_result['missing_files']:
+                if show_details:
+                    with st.expander("📋 Validation Details", expanded=True):
+                        st.write("**Files found**:")
+                        for file in validation_result['files_found']:
                             st.write(f"- `{file}`")
-                            
-            finally:
-                # Clean up temp file
-                tmp_path.unlink()
+            else:
+                st.error("❌ Package validation failed!")
+                for error in validation_result['errors']:
+                    st.write(f"- {error}")
+                
+                if validation_result['missing_files']:
+                    st.warning("Missing required files:")
+                    for file in validation_result['missing_files']:
+                        st.write(f"- `{file}`")
                 
     except Exception as e:
         st.error(f"❌ Validation error: {str(e)}")
@@ -40,12 +40,9 @@ def handle_import(uploaded_file) -> bool:
     """
     try:
         with st.spinner("Importing simulation..."):
-            # Read package data
-            package_data = uploaded_file.read()
-            
-            # Import the package
+            # Import the package straight from the upload (read in place)
             manager = SimulationPackageManager()
-            imported_results = manager.import_package(package_data)
+            imported_results = manager.import_package(uploaded_file)
             
             # Get the sim_id from imported results
             sim_id = imported_results.metadata.sim_id
@@ -3,6 +3,9 @@
 from .pattern_analyzer import (
     extract_treatment_patterns_vectorized,
     determine_treatment_state_vectorized,
+    stream_treatment_patterns,
+    aggregate_transition_counts,
+    TreatmentPatternSummary,
     TREATMENT_STATE_COLORS
 )
 from .sankey_builder import (
@@ -19,6 +22,9 @@ from .interval_analyzer import (
 __all__ = [
     'extract_treatment_patterns_vectorized',
     'determine_treatment_state_vectorized',
+    'stream_treatment_patterns',
+    'aggregate_transition_counts',
+    'TreatmentPatternSummary',
     'TREATMENT_STATE_COLORS',
     'create_treatment_pattern_sankey',
     'create_enhanced_sankey_with_colored_streams',
@@ -30,13 +36,17 @@ __all__ = [
 
 # Try to import enhanced features
 try:
-    from .pattern_analyzer_enhanced import extract_treatment_patterns_with_terminals
+    from .pattern_analyzer_enhanced import (
+        extract_treatment_patterns_with_terminals,
+        stream_treatment_patterns_with_terminals
+    )
     from .sankey_builder_enhanced import (
         create_enhanced_sankey_with_terminals,
         create_enhanced_sankey_with_terminals_destination_colored
     )
     __all__.extend([
         'extract_treatment_patterns_with_terminals', 
+        'stream_treatment_patterns_with_terminals',
         'create_enhanced_sankey_with_terminals',
         'create_enhanced_sankey_with_terminals_destination_colored'
     ])
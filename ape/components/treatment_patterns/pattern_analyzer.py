@@ -1,5 +1,9 @@
 """Pattern analysis functions for treatment data."""
 
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -36,6 +40,30 @@ def get_treatment_state_colors():
 # For backward compatibility, create a property-like access
 TREATMENT_STATE_COLORS = get_treatment_state_colors()
 
+DAYS_PER_MONTH = 365.25 / 12
+
+# Visits per batch when streaming treatment patterns from storage
+PATTERN_BATCH_SIZE = 100_000
+
+
+
+@dataclass
+class TreatmentPatternSummary:
+    """
+    Aggregated treatment pattern transitions.
+
+    Attributes:
+        transitions_df: One row per state change, same columns as
+            extract_treatment_patterns_vectorized
+        transition_counts: Aggregated (from_state, to_state, count) flows
+        last_visits: Final visit per patient (patient_id, time_days, treatment_state)
+        sim_end_days: Time of the latest visit in the simulation
+    """
+    transitions_df: pd.DataFrame
+    transition_counts: pd.DataFrame
+    last_visits: pd.DataFrame
+    sim_end_days: float
+
 
 def extract_treatment_patterns_vectorized(results):
     """
@@ -48,8 +76,6 @@ def extract_treatment_patterns_vectorized(results):
     
     Returns: (transitions_df, visits_df_with_intervals)
     """
-    DAYS_PER_MONTH = 365.25 / 12
-    
     if hasattr(results, 'get_visits_df'):
         
         # Get all visits as DataFrame
@@ -77,48 +103,14 @@ def extract_treatment_patterns_vectorized(results):
         visits_df.loc[first_visits, 'prev_time_days'] = 0
         
         # Filter to only state changes
-        state_changes = visits_df[visits_df['treatment_state'] != visits_df['prev_treatment_state']].copy()
-        
-        # Create transitions DataFrame
-        transitions_df = pd.DataFrame({
-            'patient_id': state_changes['patient_id'],
-            'from_state': state_changes['prev_treatment_state'],
-            'to_state': state_changes['treatment_state'],
-            'from_time_days': state_changes['prev_time_days'],
-            'to_time_days': state_changes['time_days'],
-            'from_time': state_changes['prev_time_days'] / DAYS_PER_MONTH,
-            'to_time': state_changes['time_days'] / DAYS_PER_MONTH,
-            'duration_days': state_changes['time_days'] - state_changes['prev_time_days'],
-            'duration': (state_changes['time_days'] - state_changes['prev_time_days']) / DAYS_PER_MONTH,
-            'interval_days': state_changes['interval_days']
-        })
+        state_changes = visits_df[visits_df['treatment_state'] != visits_df['prev_treatment_state']]
+        transitions_df = _state_change_transitions(state_changes)
         
         # Add final state transitions
         last_visits = visits_df.groupby('patient_id').last().reset_index()
-        
-        # Determine if patients have stopped treatment (no further visits)
-        # In real data, we'd define this as no visit for > 6 months from simulation end
         sim_end_days = visits_df['time_days'].max()
-        last_visits['time_since_last'] = sim_end_days - last_visits['time_days']
-        
-        # Create final transitions for patients who appear to have stopped
-        stopped_mask = last_visits['time_since_last'] > 180  # 6+ months
-        stopped_patients = last_visits[stopped_mask]
-        
-        if len(stopped_patients) > 0:
-            final_transitions = pd.DataFrame({
-                'patient_id': stopped_patients['patient_id'],
-                'from_state': stopped_patients['treatment_state'],
-                'to_state': 'No Further Visits',
-                'from_time_days': stopped_patients['time_days'],
-                'to_time_days': stopped_patients['time_days'],
-                'from_time': stopped_patients['time_days'] / DAYS_PER_MONTH,
-                'to_time': stopped_patients['time_days'] / DAYS_PER_MONTH,
-                'duration_days': 0,
-                'duration': 0,
-                'interval_days': 0
-            })
-            
+        final_transitions = _stopped_transitions(last_visits, sim_end_days)
+        if len(final_transitions) > 0:
             transitions_df = pd.concat([transitions_df, final_transitions], ignore_index=True)
         
         return transitions_df, visits_df
@@ -127,43 +119,261 @@ def extract_treatment_patterns_vectorized(results):
         return pd.DataFrame(), pd.DataFrame()
 
 
-def determine_treatment_state_vectorized(visits_df):
+def _state_change_transitions(state_changes):
+    """Build transition rows from visits whose state differs from the previous visit."""
+    return pd.DataFrame({
+        'patient_id': state_changes['patient_id'],
+        'from_state': state_changes['prev_treatment_state'],
+        'to_state': state_changes['treatment_state'],
+        'from_time_days': state_changes['prev_time_days'],
+        'to_time_days': state_changes['time_days'],
+        'from_time': state_changes['prev_time_days'] / DAYS_PER_MONTH,
+        'to_time': state_changes['time_days'] / DAYS_PER_MONTH,
+        'duration_days': state_changes['time_days'] - state_changes['prev_time_days'],
+        'duration': (state_changes['time_days'] - state_changes['prev_time_days']) / DAYS_PER_MONTH,
+        'interval_days': state_changes['interval_days']
+    })
+
+
+def _stopped_transitions(last_visits, sim_end_days):
     """
-    Determine treatment state based ONLY on visit intervals.
+    Create "No Further Visits" transitions for patients who appear to have stopped.
     
-    This mirrors what we can infer from real-world treatment data.
+    In real data, we'd define this as no visit for > 6 months from simulation end.
+    """
+    time_since_last = sim_end_days - last_visits['time_days']
+    stopped_patients = last_visits[time_since_last > 180]  # 6+ months
+    
+    if len(stopped_patients) == 0:
+        return pd.DataFrame()
+    
+    return pd.DataFrame({
+        'patient_id': stopped_patients['patient_id'],
+        'from_state': stopped_patients['treatment_state'],
+        'to_state': 'No Further Visits',
+        'from_time_days': stopped_patients['time_days'],
+        'to_time_days': stopped_patients['time_days'],
+        'from_time': stopped_patients['time_days'] / DAYS_PER_MONTH,
+        'to_time': stopped_patients['time_days'] / DAYS_PER_MONTH,
+        'duration_days': 0,
+        'duration': 0,
+        'interval_days': 0
+    })
+
+
+def aggregate_transition_counts(transitions_df):
+    """
+    Aggregate a transitions table into (from_state, to_state, count) flows.
+    
+    Terminal flows (Still in X, Discontinued, No Further Visits) count unique
+    patients rather than transitions.
+    """
+    from ape.components.treatment_patterns.sankey_patient_counts import adjust_terminal_node_counts
+    
+    if len(transitions_df) == 0:
+        return pd.DataFrame(columns=['from_state', 'to_state', 'count'])
+    
+    flow_counts = transitions_df.groupby(['from_state', 'to_state']).size().reset_index(name='count')
+    return adjust_terminal_node_counts(flow_counts, transitions_df)
+
+
+def _iter_visit_batches(results, batch_size):
+    """Yield (patient_id, time_days) visit batches, streaming from storage when possible."""
+    columns = ['patient_id', 'time_days']
+    if hasattr(results, 'reader'):
+        yield from results.reader.iterate_visits(batch_size=batch_size, columns=columns)
+    else:
+        yield results.get_visits_df()[columns]
+
+
+def _classify_visit_batch(batch, carry):
+    """
+    Assign treatment states to one batch of visits.
+    
+    Reproduces extract_treatment_patterns_vectorized for the batch, using the
+    per-patient state in ``carry`` for patients whose earlier visits were in
+    previous batches.
+    
+    Args:
+        batch: Visits with patient_id and time_days
+        carry: Per-patient state from earlier batches, indexed by patient_id
+        
+    Returns:
+        Tuple of (state change transitions, updated carry rows for the batch's patients)
+    """
+    batch = batch.sort_values(['patient_id', 'time_days'], kind='mergesort').reset_index(drop=True)
+    patient_ids = batch['patient_id']
+    time_days = batch['time_days']
+    
+    # 1. Pull carried state onto each row (NaN for patients not seen before)
+    prior = carry.reindex(patient_ids.to_numpy())
+    prior_visits = prior['visit_count'].fillna(0).to_numpy(dtype=np.int64)
+    first_in_batch = (batch.groupby('patient_id', sort=False).cumcount() == 0).to_numpy()
+    
+    seen = first_in_batch & (prior_visits > 0)
+    if (time_days.to_numpy()[seen] < prior['time_days'].to_numpy()[seen]).any():
+        raise ValueError("Visits must arrive in time order for each patient")
+    
+    # 2. Visit number and interval since previous visit
+    by_patient = batch.groupby('patient_id', sort=False)
+    visit_num = by_patient.cumcount().to_numpy() + prior_visits
+    prev_time_days = by_patient['time_days'].shift(1)
+    prev_time_days[first_in_batch] = prior['time_days'].to_numpy()[first_in_batch]
+    interval_days = time_days - prev_time_days
+    
+    # 3. Gap groups continue the carried group until the next long gap
+    had_long_gap = interval_days > 180
+    local_gap_group = had_long_gap.groupby(patient_ids, sort=False).cumsum()
+    gap_group = local_gap_group + prior['gap_group'].fillna(0).to_numpy(dtype=np.int64)
+    gap_group_visits = (
+        batch.groupby([patient_ids, local_gap_group], sort=False).cumcount()
+        + np.where(local_gap_group == 0, prior['gap_group_visits'].fillna(0).to_numpy(dtype=np.int64), 0)
+    )
+    
+    # 4. Treatment state from the interval, then restarts after long gaps
+    states = _interval_states(interval_days)
+    restart_mask = (
+        (gap_group > 0) &
+        (gap_group_visits < 3) &
+        (interval_days <= 63) &
+        interval_days.notna()
+    )
+    states[restart_mask] = 'Restarted After Gap'
+    
+    # 5. Previous state, with carried state at batch boundaries
+    prev_treatment_state = states.groupby(patient_ids, sort=False).shift(1)
+    prev_treatment_state[first_in_batch] = prior['treatment_state'].to_numpy()[first_in_batch]
+    first_visits = visit_num == 0
+    prev_treatment_state[first_visits] = 'Pre-Treatment'
+    prev_time_days[first_visits] = 0
+    
+    changed = (states != prev_treatment_state).to_numpy()
+    transitions = _state_change_transitions(pd.DataFrame({
+        'patient_id': patient_ids[changed],
+        'prev_treatment_state': prev_treatment_state[changed],
+        'treatment_state': states[changed],
+        'prev_time_days': prev_time_days[changed],
+        'time_days': time_days[changed],
+        'interval_days': interval_days[changed]
+    }))
+    
+    # 6. State to carry forward: each patient's last visit in this batch
+    last_rows = ~patient_ids.duplicated(keep='last').to_numpy()
+    carry_rows = pd.DataFrame({
+        'time_days': time_days.to_numpy()[last_rows],
+        'treatment_state': states.to_numpy()[last_rows],
+        'gap_group': gap_group.to_numpy()[last_rows],
+        'gap_group_visits': gap_group_visits.to_numpy()[last_rows] + 1,
+        'visit_count': visit_num[last_rows] + 1
+    }, index=pd.Index(patient_ids.to_numpy()[last_rows], name='patient_id'))
+    
+    return transitions, carry_rows
+
+
+def stream_treatment_patterns(results, batch_size=PATTERN_BATCH_SIZE):
     """
-    states = pd.Series('Initial Treatment', index=visits_df.index)
+    Extract treatment pattern transitions without loading all visits at once.
+    
+    Visits are read in batches of (patient_id, time_days) and each patient's
+    interval and gap state is carried across batch boundaries, so memory is
+    bounded by the batch size plus one row per patient. The transitions
+    match extract_treatment_patterns_vectorized.
+    
+    Args:
+        results: Simulation results with visit data
+        batch_size: Visits per batch
+        
+    Returns:
+        TreatmentPatternSummary with transitions, aggregated counts and last visits
+    """
+    # Per-patient state carried between batches
+    carry = pd.DataFrame({
+        'time_days': pd.Series(dtype=float),
+        'treatment_state': pd.Series(dtype=object),
+        'gap_group': pd.Series(dtype=np.int64),
+        'gap_group_visits': pd.Series(dtype=np.int64),
+        'visit_count': pd.Series(dtype=np.int64)
+    }, index=pd.Index([], name='patient_id'))
+    chunks = []
+    counts = Counter()
+    
+    for batch in _iter_visit_batches(results, batch_size):
+        if len(batch) == 0:
+            continue
+        transitions, carry_rows = _classify_visit_batch(batch, carry)
+        carry = pd.concat([carry[~carry.index.isin(carry_rows.index)], carry_rows]) if len(carry) else carry_rows
+        if len(transitions) > 0:
+            chunks.append(transitions)
+            counts.update(transitions.groupby(['from_state', 'to_state'], sort=False).size().to_dict())
+    
+    if not chunks:
+        empty = pd.DataFrame()
+        return TreatmentPatternSummary(empty, aggregate_transition_counts(empty), empty, 0)
+    
+    # Batches may interleave patients; order by patient like the vectorized path
+    transitions_df = pd.concat(chunks, ignore_index=True)
+    transitions_df = transitions_df.sort_values('patient_id', kind='mergesort', ignore_index=True)
+    
+    last_visits = carry[['time_days', 'treatment_state']].sort_index().reset_index()
+    sim_end_days = last_visits['time_days'].max()
+    final_transitions = _stopped_transitions(last_visits, sim_end_days)
+    if len(final_transitions) > 0:
+        transitions_df = pd.concat([transitions_df, final_transitions], ignore_index=True)
+        counts.update(final_transitions.groupby(['from_state', 'to_state'], sort=False).size().to_dict())
+    
+    transition_counts = pd.DataFrame(
+        [(from_state, to_state, count) for (from_state, to_state), count in sorted(counts.items())],
+        columns=['from_state', 'to_state', 'count']
+    )
+    
+    return TreatmentPatternSummary(transitions_df, transition_counts, last_visits, sim_end_days)
+
+
+def _interval_states(interval_days):
+    """Categorise visit intervals into treatment states (first visits are Initial)."""
+    states = pd.Series('Initial Treatment', index=interval_days.index)
     
     # For visits after the first one, categorize by interval
-    has_interval = visits_df['interval_days'].notna()
+    has_interval = interval_days.notna()
     
     # Intensive treatment (monthly - up to 5 weeks)
-    intensive_mask = has_interval & (visits_df['interval_days'] <= 35)
+    intensive_mask = has_interval & (interval_days <= 35)
     states[intensive_mask] = 'Intensive (Monthly)'
     
     # Regular treatment (6-8 weeks)
-    regular_mask = has_interval & (visits_df['interval_days'] > 35) & (visits_df['interval_days'] <= 63)
+    regular_mask = has_interval & (interval_days > 35) & (interval_days <= 63)
     states[regular_mask] = 'Regular (6-8 weeks)'
     
     # Extended treatment (12-15 weeks)
-    extended_mask = has_interval & (visits_df['interval_days'] > 63) & (visits_df['interval_days'] < 112)
+    extended_mask = has_interval & (interval_days > 63) & (interval_days < 112)
     states[extended_mask] = 'Extended (12+ weeks)'
     
     # Maximum extension (16 weeks)
-    max_mask = has_interval & (visits_df['interval_days'] >= 112) & (visits_df['interval_days'] <= 119)
+    max_mask = has_interval & (interval_days >= 112) & (interval_days <= 119)
     states[max_mask] = 'Maximum Extension (16 weeks)'
     
     # Treatment gaps
-    gap_3_6_mask = has_interval & (visits_df['interval_days'] > 119) & (visits_df['interval_days'] <= 180)
+    gap_3_6_mask = has_interval & (interval_days > 119) & (interval_days <= 180)
     states[gap_3_6_mask] = 'Treatment Gap (3-6 months)'
     
-    gap_6_12_mask = has_interval & (visits_df['interval_days'] > 180) & (visits_df['interval_days'] <= 365)
+    gap_6_12_mask = has_interval & (interval_days > 180) & (interval_days <= 365)
     states[gap_6_12_mask] = 'Extended Gap (6-12 months)'
     
-    gap_12plus_mask = has_interval & (visits_df['interval_days'] > 365)
+    gap_12plus_mask = has_interval & (interval_days > 365)
     states[gap_12plus_mask] = 'Long Gap (12+ months)'
     
+    return states
+
+
+def determine_treatment_state_vectorized(visits_df):
+    """
+    Determine treatment state based ONLY on visit intervals.
+    
+    This mirrors what we can infer from real-world treatment data.
+    """
+    states = _interval_states(visits_df['interval_days'])
+    has_interval = visits_df['interval_days'].notna()
+    
     # Mark visits after long gaps as restarted - FULLY VECTORIZED
     # Identify visits that follow a long gap
     visits_df['had_long_gap'] = visits_df['interval_days'] > 180
@@ -9,6 +9,12 @@ import pandas as pd
 import numpy as np
 from typing import Tuple, Dict, List
 from ape.utils.visualization_modes import get_mode_colors
+from ape.components.treatment_patterns.pattern_analyzer import (
+    PATTERN_BATCH_SIZE,
+    TreatmentPatternSummary,
+    aggregate_transition_counts,
+    stream_treatment_patterns
+)
 
 
 def create_terminal_transitions(visits_df: pd.DataFrame, transitions_df: pd.DataFrame, 
@@ -144,6 +150,42 @@ def extract_treatment_patterns_with_terminals(results) -> Tuple[pd.DataFrame, pd
     return enhanced_transitions, visits_df
 
 
+def stream_treatment_patterns_with_terminals(results, batch_size: int = PATTERN_BATCH_SIZE) -> TreatmentPatternSummary:
+    """
+    Streaming version of extract_treatment_patterns_with_terminals.
+    
+    Visits are processed in batches (see stream_treatment_patterns) and
+    terminal transitions are built from each patient's last visit, so the
+    full visits table is never materialised. Use this when only the
+    transitions or their counts are needed, e.g. for Sankey diagrams.
+    
+    Args:
+        results: Simulation results with visit data
+        batch_size: Visits per batch
+        
+    Returns:
+        TreatmentPatternSummary whose transitions and counts include terminal states
+    """
+    summary = stream_treatment_patterns(results, batch_size=batch_size)
+    if len(summary.transitions_df) == 0:
+        return summary
+    
+    # Remove "No Further Visits" transitions - we'll replace with proper "Discontinued"
+    transitions_df = summary.transitions_df[summary.transitions_df['to_state'] != 'No Further Visits']
+    
+    simulation_days = results.metadata.duration_years * 365
+    enhanced_transitions = create_terminal_transitions(
+        summary.last_visits, transitions_df, simulation_days, results
+    )
+    
+    return TreatmentPatternSummary(
+        transitions_df=enhanced_transitions,
+        transition_counts=aggregate_transition_counts(enhanced_transitions),
+        last_visits=summary.last_visits,
+        sim_end_days=summary.sim_end_days
+    )
+
+
 def get_terminal_node_colors() -> Dict[str, str]:
     """
     Get colors for terminal nodes that are visually distinct.
@@ -6,10 +6,23 @@ import plotly.graph_objects as go
 from typing import Dict, List
 import pandas as pd
 
-from .pattern_analyzer import get_treatment_state_colors
+from .pattern_analyzer import aggregate_transition_counts, get_treatment_state_colors
 from .pattern_analyzer_enhanced import get_terminal_node_colors
 
 
+def _as_flow_counts(transitions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return (from_state, to_state, count) flows for a Sankey diagram.
+    
+    Accepts either pre-aggregated counts (a ``count`` column, e.g.
+    TreatmentPatternSummary.transition_counts) or a per-patient transitions
+    table, which is aggregated here.
+    """
+    if 'count' in transitions_df.columns:
+        return transitions_df[['from_state', 'to_state', 'count']].copy()
+    return aggregate_transition_counts(transitions_df)
+
+
 def add_terminal_node_styling(nodes: List[Dict], node_map: Dict[str, int]):
     """
     Add special styling for terminal nodes.
@@ -44,6 +57,11 @@ def create_enhanced_sankey_with_terminals(transitions_df, results=None):
     Create Sankey diagram with terminal state nodes for patients still in treatment.
     
     This version includes special handling and styling for terminal nodes.
+    
+    Args:
+        transitions_df: Aggregated transition counts (from_state, to_state,
+            count) or a per-patient transitions table
+        results: Optional results object, used for the title
     """
     # Import mode colors for terminal status
     from ape.utils.visualization_modes import get_mode_colors
@@ -51,21 +69,16 @@ def create_enhanced_sankey_with_terminals(transitions_df, results=None):
     # Get colors from central system
     treatment_colors = get_treatment_state_colors()
     
-    # Filter out Pre-Treatment transitions (as requested by user)
-    filtered_df = transitions_df[
-        (transitions_df['from_state'] != 'Pre-Treatment') & 
-        (transitions_df['to_state'] != 'Pre-Treatment')
-    ].copy()
-    
-    # Aggregate transitions
-    flow_counts = filtered_df.groupby(['from_state', 'to_state']).size().reset_index(name='count')
-    
-    # Adjust terminal node counts to show unique patients
-    from ape.components.treatment_patterns.sankey_patient_counts import adjust_terminal_node_counts
-    flow_counts = adjust_terminal_node_counts(flow_counts, filtered_df)
+    # Aggregate transitions (terminal flows count unique patients), then
+    # filter out Pre-Treatment transitions (as requested by user)
+    flow_counts = _as_flow_counts(transitions_df)
+    flow_counts = flow_counts[
+        (flow_counts['from_state'] != 'Pre-Treatment') & 
+        (flow_counts['to_state'] != 'Pre-Treatment')
+    ]
     
     # Filter out small flows (but keep all terminal flows)
-    min_flow_size = max(1, len(filtered_df) * 0.001)
+    min_flow_size = max(1, flow_counts['count'].sum() * 0.001)
     is_terminal = flow_counts['to_state'].str.contains('Still in|No Further|Discontinued')
     flow_counts = flow_counts[(flow_counts['count'] >= min_flow_size) | is_terminal]
     
@@ -266,15 +279,17 @@ def create_enhanced_sankey_with_terminals(transitions_df, results=None):
 def create_enhanced_sankey_with_terminals_destination_colored(transitions_df):
     """
     Create Sankey diagram with terminal nodes and destination-based coloring.
+    
+    Accepts aggregated transition counts or a per-patient transitions table.
     """
     # Get colors from central system
     treatment_colors = get_treatment_state_colors()
     
     # Aggregate transitions
-    flow_counts = transitions_df.groupby(['from_state', 'to_state']).size().reset_index(name='count')
+    flow_counts = _as_flow_counts(transitions_df)
     
     # Don't filter out terminal flows
-    min_flow_size = max(1, len(transitions_df) * 0.001)
+    min_flow_size = max(1, flow_counts['count'].sum() * 0.001)
     is_terminal = flow_counts['to_state'].str.contains('Still in')
     flow_counts = flow_counts[(flow_counts['count'] >= min_flow_size) | is_terminal]
     
@@ -44,9 +44,10 @@ def adjust_terminal_node_counts(flow_counts_df: pd.DataFrame, transitions_df: pd
                 
                 # Adjust each flow proportionally
                 for idx in flows_to_terminal.index:
+                    # Integer arithmetic so counts are unchanged when every
+                    # transition is a distinct patient
                     original_count = flow_counts.loc[idx, 'count']
-                    proportion = original_count / total_flow
-                    adjusted_count = int(unique_patient_count * proportion)
+                    adjusted_count = int(unique_patient_count * original_count // total_flow)
                     flow_counts.loc[idx, 'count'] = adjusted_count
     
     return flow_counts
\ No newline at end of file
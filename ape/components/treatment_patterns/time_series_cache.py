@@ -5,6 +5,9 @@ import pandas as pd
 from typing import Tuple, Optional
 import hashlib
 
+# Upper bound on weekly time points offered in the UI
+MAX_WEEK_POINTS = 2600
+
 def get_cache_key(sim_id: str, time_resolution: str) -> str:
     """Generate cache key for time series data."""
     return f"time_series_{sim_id}_{time_resolution}"
@@ -63,14 +66,9 @@ def should_show_week_resolution(n_patients: int, duration_years: float) -> bool:
     """
     Determine if week resolution should be offered based on data size.
     
-    Week resolution creates ~52 points per year, so:
-    - 10,000 patients × 10 years = 520 time points = slow
-    - 1,000 patients × 5 years = 260 time points = acceptable
-    - 100 patients × 2 years = 104 time points = fast
+    The sweep-line occupancy engine costs O(visits + time points x states),
+    so patient count no longer matters; only absurdly long horizons (over
+    MAX_WEEK_POINTS weekly points, i.e. ~50 years) are excluded.
     """
     expected_points = duration_years * 52
-    data_complexity = n_patients * expected_points
-    
-    # Threshold based on testing: 
-    # Above 200,000 complexity units, week resolution becomes sluggish
-    return data_complexity < 200_000
\ No newline at end of file
+    return expected_points <= MAX_WEEK_POINTS
@@ -1,10 +1,32 @@
-"""Generate time series data for treatment state visualization."""
+"""
+Generate time series data for treatment state visualization.
+
+State occupancy is computed with a sweep line rather than by evaluating
+every patient at every time point. Each patient's visits become state
+intervals, interval boundaries are mapped onto the time grid with
+searchsorted, and per-state counts are cumulative sums of +1/-1 deltas.
+Cost is O(visits log grid + grid x states) with no patient x time matrix,
+so weekly resolution stays cheap for large simulations.
+"""
 
 import pandas as pd
 import numpy as np
 from typing import Optional
 import streamlit as st
 
+DAYS_PER_MONTH = 30.44
+
+# Grid step in months for each supported resolution
+TIME_STEPS = {
+    'week': 0.25,
+    'month': 1.0,
+    'quarter': 3.0
+}
+
+# Without discontinuation info, patients are lost to follow-up this long after their last visit
+LOST_TO_FOLLOW_UP_MONTHS = 12
+
+
 def generate_patient_state_time_series(
     visits_df: pd.DataFrame,
     time_resolution: str = 'month',
@@ -15,248 +37,224 @@ def generate_patient_state_time_series(
 ) -> pd.DataFrame:
     """
     Generate time series of patient counts by state.
-    
+
     Args:
         visits_df: DataFrame with columns: patient_id, time_days, treatment_state
-        time_resolution: 'week' or 'month'
+        time_resolution: 'week', 'month' or 'quarter'
         start_time: Start time in months
         end_time: End time in months (None = max from data)
         enrollment_df: Optional DataFrame with patient enrollment info (patient_id, enrollment_time_days)
-    
+        results: Optional results object; when given, discontinued patients are
+            shown as 'Discontinued' from their discontinuation time
+
     Returns:
         DataFrame with columns:
         - time_point: Time in months
         - state: Treatment state name
         - patient_count: Number of patients in state
-        - percentage: Percentage of total patients
+        - percentage: Percentage of enrolled patients
     """
     # Handle edge cases
     if len(visits_df) == 0:
         return pd.DataFrame(columns=['time_point', 'state', 'patient_count', 'percentage'])
-    
+
     # Validate data
     if visits_df['patient_id'].nunique() == 1:
         st.warning("Streamgraph may not be meaningful with single patient")
-    
-    # Add discontinued information if results provided
+
+    # Per-patient discontinuation times if results provided
+    discontinuation_days = None
     if results is not None:
-        from ape.components.treatment_patterns.discontinued_utils import add_discontinued_info_to_visits
-        visits_df = add_discontinued_info_to_visits(visits_df, results)
-    
-    # Convert patient-relative time to calendar time
-    visits_df = visits_df.copy()
-    
-    # Convert enrollment times to months for consistency
-    if enrollment_df is not None and 'enrollment_time_days' in enrollment_df.columns:
-        enrollment_times = dict(zip(
-            enrollment_df['patient_id'],
-            enrollment_df['enrollment_time_days'] / 30.44
-        ))
-        
-        # Convert patient-relative visit times to calendar times (vectorized)
-        # Calendar time = enrollment time + patient time
-        visits_df['patient_time_months'] = visits_df['time_days'] / 30.44
-        visits_df['enrollment_time_months'] = visits_df['patient_id'].map(enrollment_times).fillna(0)
-        visits_df['calendar_time_months'] = visits_df['enrollment_time_months'] + visits_df['patient_time_months']
-        visits_df['time_months'] = visits_df['calendar_time_months']
+        from ape.components.treatment_patterns.discontinued_utils import get_discontinued_patients
+        discontinued_info = get_discontinued_patients(results)
+        discontinuation_days = pd.Series({
+            pid: info['discontinuation_time'] if info.get('discontinued') else None
+            for pid, info in discontinued_info.items()
+        }, dtype=float)
+
+    # Enrollment times in months (calendar time = enrollment time + patient time)
+    enrollment_months = None
+    if enrollment_df is not None and 'enrollment_time_days' in enrollment_df.columns and len(enrollment_df) > 0:
+        enrollment_months = pd.Series(
+            enrollment_df['enrollment_time_days'].to_numpy() / DAYS_PER_MONTH,
+            index=enrollment_df['patient_id'].to_numpy()
+        )
+        enrollment_months = enrollment_months[~enrollment_months.index.duplicated(keep='last')]
+        visit_enrollment = visits_df['patient_id'].map(enrollment_months).fillna(0)
+        time_months = visit_enrollment + visits_df['time_days'] / DAYS_PER_MONTH
     else:
         # If no enrollment data, assume all patients enrolled at time 0
-        # So patient time = calendar time
-        visits_df['time_months'] = visits_df['time_days'] / 30.44
-        enrollment_times = {}
-    
-    # Determine time range
+        time_months = visits_df['time_days'] / DAYS_PER_MONTH
+
+    visits = pd.DataFrame({
+        'patient_id': visits_df['patient_id'],
+        'time_months': time_months,
+        'treatment_state': visits_df['treatment_state']
+    })
+
+    # Determine time range and grid
     if end_time is None:
-        end_time = visits_df['time_months'].max()
-    
-    # Create time points based on resolution
-    if time_resolution == 'week':
-        time_step = 0.25  # ~1 week in months
-    elif time_resolution == 'quarter':
-        time_step = 3.0   # 3 months
-    else:  # month
-        time_step = 1.0
-    
-    # Limit number of time points for performance
-    max_points = 500
-    if (end_time - start_time) / time_step > max_points:
-        time_step = (end_time - start_time) / max_points
-        st.info(f"Using {time_step:.1f} month intervals for performance")
-    
+        end_time = visits['time_months'].max()
+    time_step = TIME_STEPS.get(time_resolution, 1.0)
     time_points = np.arange(start_time, end_time + time_step, time_step)
-    
-    # Get all unique patients
-    all_patients = visits_df['patient_id'].unique()
-    total_patients = len(all_patients)
-    
-    # Pre-compute enrolled counts for all time points (enrollment_times already computed above)
-    if enrollment_times:
-        # Pre-compute enrolled counts for all time points at once (major optimization)
-        enrollment_months = enrollment_df['enrollment_time_days'].values / 30.44
-        enrollment_months_sorted = np.sort(enrollment_months)
-        # Use searchsorted for O(log n) lookup per time point instead of O(n)
-        enrolled_at_time = np.searchsorted(enrollment_months_sorted, time_points, side='right')
+
+    occupancy = compute_state_occupancy(
+        visits, time_points,
+        enrollment_months=enrollment_months,
+        discontinuation_days=discontinuation_days
+    )
+
+    # Denominator: all enrolled patients at each time point
+    if enrollment_months is not None:
+        all_enrollment_months = enrollment_df['enrollment_time_days'].to_numpy() / DAYS_PER_MONTH
+        enrolled_at_time = np.searchsorted(np.sort(all_enrollment_months), time_points, side='right')
     else:
-        # If no enrollment data, all patients enrolled at time 0
-        enrolled_at_time = np.full(len(time_points), total_patients)
-    
-    # Prepare result list
-    time_series_results = []
-    
-    # For each time point, determine each patient's state
-    for i, t in enumerate(time_points):
-        # Count patients in each state at this time
-        state_counts = get_patient_states_at_time(visits_df, t, end_time, enrollment_times, results)
-        
-        # Get pre-computed enrolled count (much faster than counting in loop)
-        enrolled_count = enrolled_at_time[i]
-        
-        # Add to results
-        for state, count in state_counts.items():
-            percentage = (count / enrolled_count * 100) if enrolled_count > 0 else 0
-            
-            time_series_results.append({
-                'time_point': t,
-                'state': state,
-                'patient_count': count,
-                'percentage': percentage
-            })
-    
-    return pd.DataFrame(time_series_results)
-
-def get_patient_states_at_time(visits_df: pd.DataFrame, time_point: float, sim_end_time: float, 
-                              enrollment_times: dict = None, results: Optional[object] = None) -> dict:
+        enrolled_at_time = np.full(len(time_points), visits['patient_id'].nunique())
+
+    # Long format, keeping only occupied states
+    counts = occupancy.to_numpy()
+    time_idx, state_idx = np.nonzero(counts)
+    patient_count = counts[time_idx, state_idx]
+    enrolled = enrolled_at_time[time_idx]
+    percentage = np.divide(
+        patient_count * 100.0, enrolled,
+        out=np.zeros(len(patient_count)), where=enrolled > 0
+    )
+
+    return pd.DataFrame({
+        'time_point': time_points[time_idx],
+        'state': occupancy.columns.to_numpy()[state_idx],
+        'patient_count': patient_count,
+        'percentage': percentage
+    })
+
+
+def compute_state_occupancy(
+    visits: pd.DataFrame,
+    time_points: np.ndarray,
+    enrollment_months: Optional[pd.Series] = None,
+    discontinuation_days: Optional[pd.Series] = None
+) -> pd.DataFrame:
     """
-    Determine patient states at a specific time point using vectorized operations.
-    
+    Count patients in each treatment state at every time point.
+
+    At time t a patient who is enrolled (enrollment <= t) is in:
+    - 'Pre-Treatment' before their first visit
+    - 'Discontinued' once t reaches their discontinuation time, when
+      discontinuation_days is given
+    - 'Lost to Follow-up' more than 12 months after their last visit, when
+      discontinuation_days is not given
+    - otherwise the treatment_state of their most recent visit (<= t)
+
     Args:
-        visits_df: Visit data (may include patient_discontinued column)
-        time_point: Time point in months
-        sim_end_time: Simulation end time in months
-        enrollment_times: Dict of {patient_id: enrollment_time_months}
-        results: Optional results object for discontinued info
-    
-    Returns dict of {state: count}
+        visits: DataFrame with patient_id, time_months (calendar) and treatment_state
+        time_points: Sorted grid of time points in months
+        enrollment_months: Optional enrollment time in months, indexed by
+            patient_id (missing patients enroll at 0). None means every
+            patient is enrolled throughout.
+        discontinuation_days: Optional discontinuation time in days, indexed
+            by patient_id (NaN = not discontinued)
+
+    Returns:
+        DataFrame indexed by time point with one count column per state
     """
-    # Filter visits before or at this time point
-    past_visits = visits_df[visits_df['time_months'] <= time_point].copy()
-    
-    # Get all unique patients (no need for set conversion)
-    all_patients = visits_df['patient_id'].unique()
-    
-    # If we have enrollment times, filter to only enrolled patients
-    if enrollment_times:
-        # Vectorized enrollment check for better performance
-        enrolled_mask = np.array([
-            enrollment_times.get(pid, 0) <= time_point 
-            for pid in all_patients
-        ])
-        enrolled_patients = set(all_patients[enrolled_mask])
-        
-        if not enrolled_patients:
-            return {}  # No patients enrolled yet
+    time_points = np.asarray(time_points, dtype=float)
+    n_grid = len(time_points)
+
+    # 1. Order visits per patient; at tied times the first visit wins
+    patient_codes, patients = pd.factorize(visits['patient_id'])
+    state_codes, visit_states = pd.factorize(visits['treatment_state'])
+    visit_months = visits['time_months'].to_numpy(dtype=float)
+    order = np.lexsort((visit_months, patient_codes))
+    patient_codes, state_codes, visit_months = patient_codes[order], state_codes[order], visit_months[order]
+    keep = np.r_[True, (patient_codes[1:] != patient_codes[:-1]) | (visit_months[1:] != visit_months[:-1])]
+    patient_codes, state_codes, visit_months = patient_codes[keep], state_codes[keep], visit_months[keep]
+
+    terminal_state = 'Lost to Follow-up' if discontinuation_days is None else 'Discontinued'
+    states = ['Pre-Treatment'] + [s for s in visit_states if s not in ('Pre-Treatment', terminal_state)]
+    states.append(terminal_state)
+    state_index = {state: i for i, state in enumerate(states)}
+    visit_state_idx = np.array([state_index[s] for s in visit_states], dtype=np.int64)[state_codes]
+
+    # 2. Grid index at which each visit becomes the most recent one (first t >= visit)
+    starts = np.searchsorted(time_points, visit_months, side='left')
+    is_first = np.r_[True, patient_codes[1:] != patient_codes[:-1]]
+    is_last = np.r_[patient_codes[1:] != patient_codes[:-1], True]
+    ends = np.r_[starts[1:], n_grid]
+    ends[is_last] = n_grid
+
+    # Patients count only once enrolled (first t >= enrollment)
+    if enrollment_months is not None:
+        patient_enrollment = enrollment_months.reindex(patients).fillna(0).to_numpy(dtype=float)
+        enrolled_from = np.searchsorted(time_points, patient_enrollment, side='left')
     else:
-        # If no enrollment data, assume all patients enrolled at time 0
-        enrolled_patients = set(all_patients)
-    
-    if len(past_visits) == 0:
-        # All enrolled patients are pre-treatment
-        return {'Pre-Treatment': len(enrolled_patients)}
-    
-    # Get the most recent visit for each patient
-    idx = past_visits.groupby('patient_id')['time_months'].idxmax()
-    last_visits = past_visits.loc[idx].copy()
-    
-    # Calculate time since last visit
-    time_since_last = time_point - last_visits['time_months']
-    
-    # Special handling for Initial Treatment state
-    # A patient is in "Initial Treatment" if:
-    # 1. They are enrolled but have not had their first visit yet, OR
-    # 2. They have had their first visit but it was marked as "Initial Treatment"
-    #    and not enough time has passed for a second visit
-    
-    # Check if each patient's most recent visit is their first visit
-    is_first_visit = last_visits['visit_num'] == 0
-    
-    # For patients whose most recent visit is their first visit,
-    # they could still be in "Initial Treatment" phase
-    # We'll keep them in Initial Treatment for a reasonable period (e.g., up to 2 months)
-    # after their first visit to represent the initial treatment period
-    
-    # Check if we have discontinued information
-    has_discontinued_info = 'patient_discontinued' in last_visits.columns
-    
-    if has_discontinued_info:
-        # Check discontinuation time if available
-        if 'discontinuation_time_days' in last_visits.columns:
-            # Convert time point to days for comparison
-            time_point_days = time_point * 30.44
-            
-            # Patient is discontinued if:
-            # 1. They have the discontinued flag AND
-            # 2. The discontinuation happened before current time point
-            is_discontinued = (
-                last_visits['patient_discontinued'] & 
-                (last_visits['discontinuation_time_days'] <= time_point_days)
-            )
-        else:
-            # Just use the flag if no time info
-            is_discontinued = last_visits['patient_discontinued']
-        
-        # Vectorized state determination with discontinued info
-        conditions = [
-            is_discontinued,  # Discontinued patients
-            is_first_visit & (time_since_last <= 2) & (last_visits['treatment_state'] == 'Initial Treatment'),
-            True  # Default case
-        ]
-        
-        choices = [
-            'Discontinued',  # Use "Discontinued" not "No Further Visits"
-            'Initial Treatment',
-            last_visits['treatment_state']  # Use actual treatment state
-        ]
+        enrolled_from = np.zeros(len(patients), dtype=np.int64)
+    visit_enrolled_from = enrolled_from[patient_codes]
+    first_visit_start = starts[is_first]
+
+    segments = [
+        # Enrolled, no visit yet
+        (np.zeros(len(patients), dtype=np.int64), enrolled_from, first_visit_start)
+    ]
+
+    # 3. Terminal state boundaries
+    if discontinuation_days is None:
+        # Lost to follow-up once t - last visit > 12 months
+        cutoffs = _first_index_beyond(time_points, visit_months, LOST_TO_FOLLOW_UP_MONTHS)
+        visit_ends = np.minimum(ends, cutoffs)
+        segments.append((
+            np.full(len(visit_months), state_index[terminal_state]),
+            np.maximum(np.maximum(starts, cutoffs), visit_enrolled_from),
+            ends
+        ))
     else:
-        # Fall back to time-based logic if no discontinued info
-        # But use a more conservative cutoff and different label
-        conditions = [
-            time_since_last > 12,  # Only after 12 months, not 6
-            is_first_visit & (time_since_last <= 2) & (last_visits['treatment_state'] == 'Initial Treatment'),
-            True  # Default case
-        ]
-        
-        choices = [
-            'Lost to Follow-up',  # More accurate than "No Further Visits"
-            'Initial Treatment',
-            last_visits['treatment_state']
-        ]
-    
-    last_visits['current_state'] = np.select(conditions, choices)
-    
-    # Filter to only enrolled patients
-    last_visits = last_visits[last_visits['patient_id'].isin(enrolled_patients)]
-    
-    # Count states
-    state_counts = last_visits['current_state'].value_counts().to_dict()
-    
-    # Add pre-treatment patients (enrolled but not yet visited)
-    patients_with_visits = set(last_visits['patient_id'].unique())
-    pre_treatment_count = len(enrolled_patients - patients_with_visits)
-    
-    if pre_treatment_count > 0:
-        state_counts['Pre-Treatment'] = pre_treatment_count
-    
-    return state_counts
+        # Discontinued once discontinuation time <= t (in days), after the first visit
+        patient_discontinuation = discontinuation_days.reindex(patients).to_numpy(dtype=float)
+        discontinued_from = np.searchsorted(time_points * DAYS_PER_MONTH, patient_discontinuation, side='left')
+        visit_ends = np.minimum(ends, discontinued_from[patient_codes])
+        segments.append((
+            np.full(len(patients), state_index[terminal_state]),
+            np.maximum(np.maximum(first_visit_start, discontinued_from), enrolled_from),
+            np.full(len(patients), n_grid)
+        ))
+
+    segments.append((visit_state_idx, np.maximum(starts, visit_enrolled_from), visit_ends))
+
+    # 4. Sweep: +1 at segment start, -1 at segment end, cumulative sum over the grid
+    width = n_grid + 1
+    deltas = np.zeros(len(states) * width, dtype=np.int64)
+    for state_idx, lo, hi in segments:
+        valid = lo < hi
+        deltas += np.bincount(state_idx[valid] * width + lo[valid], minlength=len(deltas))
+        deltas -= np.bincount(state_idx[valid] * width + hi[valid], minlength=len(deltas))
+    counts = np.cumsum(deltas.reshape(len(states), width), axis=1)[:, :n_grid]
+
+    return pd.DataFrame(counts.T, index=pd.Index(time_points, name='time_point'), columns=states)
+
+
+def _first_index_beyond(time_points: np.ndarray, times: np.ndarray, gap: float) -> np.ndarray:
+    """First grid index i with time_points[i] - times > gap, for each time."""
+    n_grid = len(time_points)
+    idx = np.searchsorted(time_points, times + gap, side='right')
+
+    # Correct for rounding in times + gap so the comparison matches t - time > gap exactly
+    prev = np.clip(idx - 1, 0, max(n_grid - 1, 0))
+    step_back = (idx > 0) & (time_points[prev] - times > gap)
+    idx[step_back] -= 1
+    cur = np.clip(idx, 0, max(n_grid - 1, 0))
+    step_forward = (idx < n_grid) & ~(time_points[cur] - times > gap)
+    idx[step_forward] += 1
+    return idx
+
 
 def validate_time_series_data(time_series_df: pd.DataFrame, total_patients: int):
     """Validate that patient counts are conserved."""
-    # Check each time point
-    for time_point in time_series_df['time_point'].unique():
-        point_data = time_series_df[time_series_df['time_point'] == time_point]
-        total_at_point = point_data['patient_count'].sum()
-        
-        if abs(total_at_point - total_patients) > 1:  # Allow for rounding
-            st.error(f"Patient count mismatch at t={time_point}: {total_at_point} vs {total_patients}")
-            return False
-    
-    return True
\ No newline at end of file
+    totals = time_series_df.groupby('time_point')['patient_count'].sum()
+    mismatched = totals[(totals - total_patients).abs() > 1]  # Allow for rounding
+
+    if len(mismatched) > 0:
+        time_point, total_at_point = next(iter(mismatched.items()))
+        st.error(f"Patient count mismatch at t={time_point}: {total_at_point} vs {total_patients}")
+        return False
+
+    return True
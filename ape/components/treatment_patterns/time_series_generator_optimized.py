@@ -1,280 +0,0 @@
-"""Optimized time series generator using vectorized operations."""
-
-import pandas as pd
-import numpy as np
-from typing import Optional
-import streamlit as st
-
-def generate_patient_state_time_series_optimized(
-    visits_df: pd.DataFrame,
-    time_resolution: str = 'month',
-    start_time: float = 0,
-    end_time: Optional[float] = None,
-    enrollment_df: Optional[pd.DataFrame] = None
-) -> pd.DataFrame:
-    """
-    Generate time series of patient counts by state using vectorized operations.
-    
-    This optimized version eliminates loops over time points and uses 
-    broadcasting and vectorized pandas operations for 10-100x speedup.
-    """
-    # Handle edge cases
-    if len(visits_df) == 0:
-        return pd.DataFrame(columns=['time_point', 'state', 'patient_count', 'percentage'])
-    
-    # Convert patient-relative time to calendar time
-    visits_df = visits_df.copy()
-    
-    # Convert enrollment times to months for consistency
-    enrollment_times = {}
-    if enrollment_df is not None and 'enrollment_time_days' in enrollment_df.columns:
-        enrollment_times = dict(zip(
-            enrollment_df['patient_id'],
-            enrollment_df['enrollment_time_days'] / 30.44
-        ))
-        
-        # Convert patient-relative visit times to calendar times (vectorized)
-        # Calendar time = enrollment time + patient time
-        visits_df['patient_time_months'] = visits_df['time_days'] / 30.44
-        visits_df['enrollment_time_months'] = visits_df['patient_id'].map(enrollment_times).fillna(0)
-        visits_df['calendar_time_months'] = visits_df['enrollment_time_months'] + visits_df['patient_time_months']
-        visits_df['time_months'] = visits_df['calendar_time_months']
-    else:
-        # If no enrollment data, assume all patients enrolled at time 0
-        # So patient time = calendar time
-        visits_df['time_months'] = visits_df['time_days'] / 30.44
-    
-    # Determine time range
-    if end_time is None:
-        end_time = visits_df['time_months'].max()
-    
-    # Create time points based on resolution
-    time_steps = {
-        'week': 0.25,      # ~1 week in months
-        'quarter': 3.0,    # 3 months
-        'month': 1.0       # 1 month
-    }
-    time_step = time_steps.get(time_resolution, 1.0)
-    
-    # Limit number of time points for performance
-    max_points = 500
-    if (end_time - start_time) / time_step > max_points:
-        time_step = (end_time - start_time) / max_points
-        st.info(f"Using {time_step:.1f} month intervals for performance")
-    
-    time_points = np.arange(start_time, end_time + time_step, time_step)
-    
-    # Pre-process enrollment data if available
-    if enrollment_df is not None and 'enrollment_time_days' in enrollment_df.columns:
-        enrollment_df = enrollment_df.copy()
-        enrollment_df['enrollment_months'] = enrollment_df['enrollment_time_days'] / 30.44
-        
-        # Pre-compute enrolled patient counts at each time point
-        # This is the key optimization - vectorized computation
-        enrolled_counts = np.searchsorted(
-            np.sort(enrollment_df['enrollment_months'].values), 
-            time_points, 
-            side='right'
-        )
-    else:
-        # If no enrollment data, all patients enrolled at time 0
-        total_patients = visits_df['patient_id'].nunique()
-        enrolled_counts = np.full(len(time_points), total_patients)
-    
-    # Prepare for vectorized state computation
-    # Sort visits by patient and time for efficient processing
-    visits_sorted = visits_df.sort_values(['patient_id', 'time_months'])
-    
-    # Get unique states for consistent ordering
-    unique_states = ['Pre-Treatment', 'Initial Treatment', 'Intensive (Monthly)', 
-                     'Regular (6-8 weeks)', 'Extended (12+ weeks)', 
-                     'Maximum Extension (16 weeks)', 'Restarted After Gap',
-                     'Treatment Gap (3-6 months)', 'Extended Gap (6-12 months)',
-                     'Long Gap (12+ months)', 'No Further Visits']
-    
-    # Pre-allocate result array for efficiency
-    n_time_points = len(time_points)
-    n_states = len(unique_states)
-    state_counts_array = np.zeros((n_time_points, n_states), dtype=np.int32)
-    
-    # Process all time points at once using broadcasting
-    # This is the main optimization - no loop over time points
-    state_counts_array = compute_state_counts_vectorized(
-        visits_sorted, time_points, enrollment_df, unique_states
-    )
-    
-    # Convert to DataFrame format
-    results = []
-    for i, t in enumerate(time_points):
-        enrolled = enrolled_counts[i]
-        for j, state in enumerate(unique_states):
-            count = state_counts_array[i, j]
-            if count > 0:  # Only include non-zero counts
-                percentage = (count / enrolled * 100) if enrolled > 0 else 0
-                results.append({
-                    'time_point': t,
-                    'state': state,
-                    'patient_count': count,
-                    'percentage': percentage
-                })
-    
-    return pd.DataFrame(results)
-
-
-def compute_state_counts_vectorized(visits_df, time_points, enrollment_df, unique_states):
-    """
-    Compute state counts for all time points using vectorized operations.
-    
-    This eliminates the need to loop over time points.
-    """
-    n_time_points = len(time_points)
-    n_states = len(unique_states)
-    state_counts = np.zeros((n_time_points, n_states), dtype=np.int32)
-    
-    # Get all unique patients
-    all_patients = visits_df['patient_id'].unique()
-    patient_to_idx = {pid: i for i, pid in enumerate(all_patients)}
-    n_patients = len(all_patients)
-    
-    # Create enrollment time array (already converted to months in the calling function)
-    if enrollment_df is not None:
-        enrollment_times = np.zeros(n_patients)
-        for _, row in enrollment_df.iterrows():
-            if row['patient_id'] in patient_to_idx:
-                idx = patient_to_idx[row['patient_id']]
-                enrollment_times[idx] = row['enrollment_time_days'] / 30.44
-    else:
-        enrollment_times = np.zeros(n_patients)  # All enrolled at time 0
-    
-    # Pre-compute last visit info for each patient at each time point
-    # This is done using searchsorted which is O(log n) per query
-    
-    # Group visits by patient
-    patient_groups = visits_df.groupby('patient_id')
-    
-    # For each time point, we need to find each patient's state
-    # We'll use numpy broadcasting to do this efficiently
-    time_points_broadcast = time_points[:, np.newaxis]  # Shape: (n_time_points, 1)
-    enrollment_broadcast = enrollment_times[np.newaxis, :]  # Shape: (1, n_patients)
-    
-    # Mask for enrolled patients at each time point
-    enrolled_mask = time_points_broadcast >= enrollment_broadcast  # Shape: (n_time_points, n_patients)
-    
-    # Pre-allocate patient states array
-    patient_states = np.full((n_time_points, n_patients), -1, dtype=np.int32)
-    
-    # Process each patient's visits once
-    for patient_id, patient_visits in patient_groups:
-        if patient_id not in patient_to_idx:
-            continue
-            
-        patient_idx = patient_to_idx[patient_id]
-        visit_times = patient_visits['time_months'].values
-        visit_states = patient_visits['treatment_state'].values
-        
-        # For each time point, find the last visit before that time
-        # Using searchsorted is much faster than looping
-        last_visit_indices = np.searchsorted(visit_times, time_points, side='right') - 1
-        
-        # Process each time point for this patient
-        for t_idx, last_visit_idx in enumerate(last_visit_indices):
-            if not enrolled_mask[t_idx, patient_idx]:
-                continue  # Not enrolled yet
-                
-            if last_visit_idx < 0:
-                # No visits yet - pre-treatment
-                patient_states[t_idx, patient_idx] = unique_states.index('Pre-Treatment')
-            else:
-                # Check time since last visit
-                time_since_last = time_points[t_idx] - visit_times[last_visit_idx]
-                
-                if time_since_last > 6:  # 6 months
-                    patient_states[t_idx, patient_idx] = unique_states.index('No Further Visits')
-                else:
-                    # Use the state from the last visit, but handle Initial Treatment specially
-                    state_name = visit_states[last_visit_idx]
-                    
-                    # If this is the first visit (visit index 0) and it's Initial Treatment,
-                    # keep them in Initial Treatment for up to 2 months
-                    if (last_visit_idx == 0 and 
-                        state_name == 'Initial Treatment' and 
-                        time_since_last <= 2):
-                        state_name = 'Initial Treatment'
-                    
-                    if state_name in unique_states:
-                        patient_states[t_idx, patient_idx] = unique_states.index(state_name)
-    
-    # Count states for each time point
-    for t_idx in range(n_time_points):
-        for state_idx in range(n_states):
-            state_counts[t_idx, state_idx] = np.sum(patient_states[t_idx, :] == state_idx)
-    
-    return state_counts
-
-
-def get_patient_states_at_time_vectorized(visits_df: pd.DataFrame, time_point: float, 
-                                         enrollment_times: dict = None) -> dict:
-    """
-    Vectorized version of getting patient states at a specific time.
-    
-    Uses numpy operations instead of apply() for better performance.
-    """
-    # Filter visits before or at this time point
-    past_visits = visits_df[visits_df['time_months'] <= time_point].copy()
-    
-    # Get all unique patients
-    all_patients = visits_df['patient_id'].unique()
-    
-    # Vectorized enrollment filtering
-    if enrollment_times:
-        enrollment_array = np.array([enrollment_times.get(pid, 0) for pid in all_patients])
-        enrolled_mask = enrollment_array <= time_point
-        enrolled_patients = set(all_patients[enrolled_mask])
-        
-        if not enrolled_patients:
-            return {}
-    else:
-        enrolled_patients = set(all_patients)
-    
-    if len(past_visits) == 0:
-        return {'Pre-Treatment': len(enrolled_patients)}
-    
-    # Get the most recent visit for each patient - already optimized
-    idx = past_visits.groupby('patient_id')['time_months'].idxmax()
-    last_visits = past_visits.loc[idx].copy()
-    
-    # Vectorized state determination using np.where with Initial Treatment handling
-    time_since_last = time_point - last_visits['time_months']
-    
-    # Check if each patient's most recent visit is their first visit
-    is_first_visit = last_visits['visit_num'] == 0
-    
-    # Vectorized state determination with Initial Treatment logic
-    conditions = [
-        time_since_last > 6,  # No further visits after 6 months
-        is_first_visit & (time_since_last <= 2) & (last_visits['treatment_state'] == 'Initial Treatment'),  # Still in initial period
-        True  # Default case
-    ]
-    
-    choices = [
-        'No Further Visits',
-        'Initial Treatment',  # Keep in Initial Treatment for up to 2 months after first visit
-        last_visits['treatment_state']  # Use the visit's treatment state
-    ]
-    
-    last_visits['current_state'] = np.select(conditions, choices)
-    
-    # Filter to only enrolled patients
-    last_visits = last_visits[last_visits['patient_id'].isin(enrolled_patients)]
-    
-    # Count states
-    state_counts = last_visits['current_state'].value_counts().to_dict()
-    
-    # Add pre-treatment patients
-    patients_with_visits = set(last_visits['patient_id'].unique())
-    pre_treatment_count = len(enrolled_patients - patients_with_visits)
-    
-    if pre_treatment_count > 0:
-        state_counts['Pre-Treatment'] = pre_treatment_count
-    
-    return state_counts
\ No newline at end of file
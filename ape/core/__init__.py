@@ -1,5 +1,12 @@
 """Core package for streamlit simulation runner."""
 
-from .simulation_runner import SimulationRunner, upgrade_existing_results
+# SimulationRunner pulls in the simulation engines, so it is only
+# imported when first used (e.g. not by pages that just read results)
+__all__ = ['SimulationRunner', 'upgrade_existing_results']
 
-__all__ = ['SimulationRunner', 'upgrade_existing_results']
\ No newline at end of file
+
+def __getattr__(name):
+    if name in __all__:
+        from . import simulation_runner
+        return getattr(simulation_runner, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
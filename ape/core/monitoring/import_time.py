@@ -0,0 +1,218 @@
+"""
+Cold-start import budgets for the Streamlit app.
+
+Each page is run once in a fresh interpreter, the way the first visitor
+after a container restart gets it: startup done, no active simulation.
+The report gives, per page, the time spent importing modules the page
+pulled in (from python -X importtime, excluding streamlit itself), the
+time to render and which heavy libraries were loaded. Pages defer the
+heavy libraries (plotting, scipy, reportlab, the simulation engines)
+to the sections that use them, so a cold page should not load them.
+
+IMPORT_BUDGETS records what each page may cost; check_page returns the
+violations, and tests/performance/test_import_budgets.py fails on them
+(pytest -m performance).
+
+Example usage:
+    python -m ape.core.monitoring.import_time           # report
+    python -m ape.core.monitoring.import_time --check   # exit 1 over budget
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+APP_ROOT = Path(__file__).resolve().parents[3]
+
+# Libraries a page should only import in the sections that need them
+HEAVY_MODULES = ('plotly', 'matplotlib', 'seaborn', 'scipy', 'reportlab', 'simulation_v2.engines')
+
+# Session state after APE.py startup (see ape.utils.startup_redirect)
+STARTUP_SESSION = {
+    'startup_complete': True,
+    'simulation_results': None,
+    'current_protocol': None,
+    'audit_trail': None,
+    'active_simulation_id': None,
+    'active_simulation_name': None
+}
+
+_MARKER = '--- page import start ---'
+
+# Runs in the fresh interpreter: page path, timeout and session are
+# filled in by measure_page
+_PROBE = '''
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+baseline = set(sys.modules)
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+app = AppTest.from_file({path!r}, default_timeout={timeout!r})
+for key, value in {session!r}.items():
+    app.session_state[key] = value
+app.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "render_seconds": elapsed,
+    "modules": sorted(set(sys.modules) - baseline),
+    "exceptions": [str(e.value) for e in app.exception]
+}}))
+'''
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    """
+    What a cold visit of a page may cost.
+
+    Attributes:
+        seconds: Maximum import time
+        heavy: HEAVY_MODULES the page may load on a cold visit
+    """
+    seconds: float
+    heavy: Tuple[str, ...] = ()
+
+
+# Budgets per page, relative to APP_ROOT. Import times measured on one
+# CPU are roughly half of these; the headroom absorbs slower machines.
+IMPORT_BUDGETS: Dict[str, ImportBudget] = {
+    'APE.py': ImportBudget(0.5),
+    # Draws the selected protocol's baseline vision distribution; the impact
+    # preview, and with it the engines, only runs on request
+    'pages/1_Protocol_Manager.py': ImportBudget(6.0, ('matplotlib', 'scipy')),
+    'pages/2_Simulations.py': ImportBudget(2.0),
+    'pages/3_Analysis.py': ImportBudget(2.0),
+    # Unmaintained copy of the Analysis page, kept as it was
+    'pages/3_Analysis_backup.py': ImportBudget(6.0, ('matplotlib', 'scipy', 'seaborn')),
+    'pages/4_Simulation_Comparison.py': ImportBudget(2.0),
+    'pages/5_Workload_Analysis.py': ImportBudget(2.0),
+    'pages/6_Financial_Parameters.py': ImportBudget(2.0),
+    'pages/7_Discontinuation_Analysis.py': ImportBudget(2.0),
+}
+
+# Budget of pages missing from IMPORT_BUDGETS
+DEFAULT_BUDGET = ImportBudget(2.0)
+
+
+@dataclass
+class PageImportReport:
+    """Cold-visit measurements of one page."""
+    page: str
+    import_seconds: float
+    render_seconds: float
+    modules: List[str]
+    exceptions: List[str] = field(default_factory=list)
+
+    @property
+    def heavy(self) -> List[str]:
+        """HEAVY_MODULES (or their submodules) the page loaded."""
+        return [name for name in HEAVY_MODULES
+                if any(m == name or m.startswith(name + '.') for m in self.modules)]
+
+
+def app_pages(root: Path = APP_ROOT) -> List[str]:
+    """The entry point and every page Streamlit serves, relative to root."""
+    return ['APE.py'] + sorted(str(p.relative_to(root)) for p in (root / 'pages').glob('*.py'))
+
+
+def _import_seconds(importtime_log: str) -> float:
+    """Total cumulative time of the top-level imports after the marker."""
+    total = 0
+    started = False
+    for line in importtime_log.splitlines():
+        if line.strip() == _MARKER:
+            started = True
+        elif started and line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not name[1:].startswith(' '):   # nested imports are indented
+                total += int(cumulative)
+    return total / 1e6
+
+
+def measure_page(page: str, root: Path = APP_ROOT, timeout: float = 120) -> PageImportReport:
+    """
+    Run a page in a fresh interpreter and measure its cold imports.
+
+    Args:
+        page: Page script relative to root (e.g. 'pages/3_Analysis.py')
+        root: App directory (the working directory of the run)
+        timeout: Seconds the page may take to render
+
+    Returns:
+        PageImportReport
+    """
+    probe = _PROBE.format(root=str(root), marker=_MARKER, path=str(root / page),
+                          timeout=timeout, session=STARTUP_SESSION)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe],
+                            cwd=root, capture_output=True, text=True, timeout=timeout + 60)
+    if result.returncode != 0:
+        raise RuntimeError(f"Measuring {page} failed:\n{result.stderr[-2000:]}")
+
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return PageImportReport(
+        page=page,
+        import_seconds=_import_seconds(result.stderr),
+        render_seconds=data['render_seconds'],
+        modules=data['modules'],
+        exceptions=data['exceptions']
+    )
+
+
+def check_page(report: PageImportReport, budget: Optional[ImportBudget] = None) -> List[str]:
+    """
+    Budget violations of a page.
+
+    Args:
+        report: Measurements of the page
+        budget: Defaults to the page's entry in IMPORT_BUDGETS
+
+    Returns:
+        One message per violation (empty within budget)
+    """
+    if budget is None:
+        budget = IMPORT_BUDGETS.get(report.page, DEFAULT_BUDGET)
+    violations = []
+    if report.import_seconds > budget.seconds:
+        violations.append(f"{report.page}: imports took {report.import_seconds:.2f}s "
+                          f"(budget {budget.seconds:.2f}s)")
+    unexpected = [name for name in report.heavy if name not in budget.heavy]
+    if unexpected:
+        violations.append(f"{report.page}: cold visit imports {', '.join(unexpected)}; "
+                          f"import them in the section that uses them")
+    return violations
+
+
+def format_report(reports: Sequence[PageImportReport]) -> str:
+    """Table of the measurements, with budget violations marked."""
+    width = max(len(r.page) for r in reports)
+    lines = [f"{'page':<{width}}  {'imports':>8}  {'budget':>7}  {'render':>7}  {'modules':>7}  heavy"]
+    for r in reports:
+        budget = IMPORT_BUDGETS.get(r.page, DEFAULT_BUDGET)
+        flag = '  OVER BUDGET' if check_page(r, budget) else ''
+        lines.append(f"{r.page:<{width}}  {r.import_seconds:>7.2f}s  {budget.seconds:>6.2f}s  "
+                     f"{r.render_seconds:>6.2f}s  {len(r.modules):>7}  {', '.join(r.heavy) or '-'}{flag}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start import report for the APE pages")
+    parser.add_argument('pages', nargs='*', help="Pages to measure (default: all)")
+    parser.add_argument('--check', action='store_true', help="Exit 1 if a page is over budget")
+    args = parser.parse_args(argv)
+
+    reports = [measure_page(page) for page in (args.pages or app_pages())]
+    print(format_report(reports))
+    violations = [v for r in reports for v in check_page(r)]
+    for violation in violations:
+        print(violation)
+    return 1 if args.check and violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
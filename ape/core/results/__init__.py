@@ -3,9 +3,16 @@
 from .base import SimulationResults
 from .parquet import ParquetResults
 from .factory import ResultsFactory
+from .outcome_metrics import OUTCOME_METRICS, register_metric, compute_patient_metrics, summarize_metrics
+from .discontinuation_summary import load_discontinuation_summary
 
 __all__ = [
     'SimulationResults',
     'ParquetResults',
-    'ResultsFactory'
+    'ResultsFactory',
+    'OUTCOME_METRICS',
+    'register_metric',
+    'compute_patient_metrics',
+    'summarize_metrics',
+    'load_discontinuation_summary'
 ]
\ No newline at end of file
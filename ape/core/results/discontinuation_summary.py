@@ -0,0 +1,203 @@
+"""
+Discontinuation summary stored alongside each simulation.
+
+Reason counts, Kaplan-Meier time-to-discontinuation curves (overall and
+per reason) and retreatment rates are computed once from the patient
+table and each patient's last visit time, then saved as a small JSON file
+next to the Parquet results. Pages read that file instead of loading the
+patient and visit tables on every rerun. Simulations saved before the
+summary existed get one written the first time it is asked for.
+
+Time to discontinuation runs from enrollment. Patients still on treatment
+are censored at their last visit; in a per-reason curve discontinuations
+for any other reason are censored too (cause-specific survival).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ape.core.storage import ParquetReader
+
+DISCONTINUATION_SUMMARY_FILE = 'discontinuation_summary.json'
+
+# Bump when the stored layout changes; older files are recomputed
+SUMMARY_VERSION = 1
+
+UNKNOWN_REASON = 'unknown'
+
+
+def kaplan_meier(durations: np.ndarray, events: np.ndarray) -> Dict[str, Any]:
+    """
+    Kaplan-Meier estimate for one or more event indicators.
+
+    Args:
+        durations: Days from enrollment to event or censoring, one per patient
+        events: Boolean event indicator per patient, or a (patients, curves)
+            matrix to estimate several curves over the same durations at once
+
+    Returns:
+        Dict with the distinct times ('time_days'), patients at risk just
+        before each, and per-curve event counts and survival after each
+        time ('events' and 'survival', shaped like events without the
+        patient axis)
+    """
+    durations = np.asarray(durations)
+    events = np.asarray(events, dtype=np.int64)
+    order = np.argsort(durations, kind='stable')
+    durations, events = durations[order], events[order]
+
+    times, first = np.unique(durations, return_index=True)
+    if len(times) == 0:
+        empty = np.zeros((0,) + events.shape[1:])
+        return {'time_days': times, 'at_risk': np.zeros(0, dtype=np.int64), 'events': empty, 'survival': empty}
+
+    at_risk = len(durations) - first
+    event_counts = np.add.reduceat(events, first, axis=0)
+    hazard = event_counts / at_risk.reshape((-1,) + (1,) * (events.ndim - 1))
+    return {
+        'time_days': times,
+        'at_risk': at_risk,
+        'events': event_counts,
+        'survival': np.cumprod(1 - hazard, axis=0)
+    }
+
+
+def _curve(times: np.ndarray, at_risk: np.ndarray, events: np.ndarray, survival: np.ndarray) -> Dict[str, Any]:
+    """Step points of one curve: start, every event time and the end of follow-up."""
+    keep = events > 0
+    if len(times):
+        keep[-1] = True
+    below_half = np.flatnonzero(survival[keep] <= 0.5)
+    return {
+        'time_days': [0.0] + times[keep].astype(float).tolist(),
+        'survival': [1.0] + survival[keep].tolist(),
+        'at_risk': [int(at_risk[0]) if len(at_risk) else 0] + at_risk[keep].astype(int).tolist(),
+        'events': int(events.sum()),
+        'median_days': float(times[keep][below_half[0]]) if len(below_half) else None
+    }
+
+
+def compute_discontinuation_summary(
+    patients_df: pd.DataFrame,
+    follow_up_days: Optional[pd.Series] = None
+) -> Dict[str, Any]:
+    """
+    Summarize discontinuations of one simulation.
+
+    Args:
+        patients_df: Patient table as written by ParquetWriter
+        follow_up_days: Last visit time_days per patient_id, used to censor
+            patients without a recorded discontinuation (default: 0)
+
+    Returns:
+        JSON-serializable summary; see load_discontinuation_summary
+    """
+    total = len(patients_df)
+    discontinued = patients_df['discontinued'].fillna(False).to_numpy(dtype=bool)
+    if 'discontinuation_reason' in patients_df.columns:
+        reasons = patients_df['discontinuation_reason'].astype(object).where(
+            patients_df['discontinuation_reason'].notna(), UNKNOWN_REASON
+        ).astype(str).to_numpy()
+    else:
+        reasons = np.full(total, UNKNOWN_REASON, dtype=object)
+    retreatments = patients_df['retreatment_count'].fillna(0).to_numpy(dtype=np.int64) \
+        if 'retreatment_count' in patients_df.columns else np.zeros(total, dtype=np.int64)
+
+    # Stop times are days from simulation start, visit times days from enrollment
+    stop_days = (
+        pd.to_numeric(patients_df['discontinuation_time'], errors='coerce').to_numpy(dtype=float)
+        - patients_df['enrollment_time_days'].to_numpy(dtype=float)
+    )
+    # Retreated patients keep the time and reason of their last stop
+    stopped = ~np.isnan(stop_days) & (discontinued | (retreatments > 0))
+    if follow_up_days is not None:
+        censor_days = patients_df['patient_id'].map(follow_up_days).fillna(0).to_numpy(dtype=float)
+    else:
+        censor_days = np.zeros(total)
+    durations = np.maximum(np.where(stopped, stop_days, censor_days), 0)
+
+    reason_counts = pd.Series(reasons[discontinued]).value_counts()
+    stopped_reasons = pd.Series(reasons[stopped]).value_counts()
+    curve_reasons = stopped_reasons.index.tolist()
+
+    # One pass for the overall curve and every per-reason curve
+    events = np.column_stack([stopped] + [stopped & (reasons == reason) for reason in curve_reasons])
+    km = kaplan_meier(durations, events)
+    curves = {
+        name: _curve(km['time_days'], km['at_risk'], km['events'][:, i], km['survival'][:, i])
+        for i, name in enumerate(['all'] + curve_reasons)
+    }
+
+    retreated = stopped & (retreatments > 0)
+    retreated_by_reason = pd.Series(reasons[retreated]).value_counts()
+    ever_discontinued = int(stopped.sum())
+
+    return {
+        'version': SUMMARY_VERSION,
+        'total_patients': total,
+        'total_discontinued': int(discontinued.sum()),
+        'discontinuation_rate': float(discontinued.mean()) if total else 0.0,
+        'reason_counts': {str(reason): int(count) for reason, count in reason_counts.items()},
+        'retreatment': {
+            'ever_discontinued': ever_discontinued,
+            'retreated_patients': int(retreated.sum()),
+            'total_retreatments': int(retreatments.sum()),
+            'retreatment_rate': float(retreated.sum() / ever_discontinued) if ever_discontinued else 0.0,
+            'by_reason': {
+                str(reason): float(retreated_by_reason.get(reason, 0) / count)
+                for reason, count in stopped_reasons.items()
+            }
+        },
+        'time_to_discontinuation': curves
+    }
+
+
+def write_discontinuation_summary(data_path: Path) -> Dict[str, Any]:
+    """
+    Compute the summary of saved results and store it next to them.
+
+    Reads the patient table and two visit columns (patient_id, time_days).
+
+    Args:
+        data_path: Directory containing the Parquet results
+
+    Returns:
+        The stored summary
+    """
+    data_path = Path(data_path)
+    reader = ParquetReader(data_path)
+    patients_df = pd.read_parquet(data_path / 'patients.parquet')
+    visits_df = reader.read_visits(columns=['patient_id', 'time_days'])
+    follow_up_days = visits_df.groupby('patient_id', sort=False)['time_days'].max()
+
+    summary = compute_discontinuation_summary(patients_df, follow_up_days)
+    with open(data_path / DISCONTINUATION_SUMMARY_FILE, 'w') as f:
+        json.dump(summary, f)
+    return summary
+
+
+def load_discontinuation_summary(data_path: Path) -> Dict[str, Any]:
+    """
+    Load the stored discontinuation summary, writing it first if missing.
+
+    Args:
+        data_path: Directory containing the Parquet results
+
+    Returns:
+        Dict with total_patients, total_discontinued, discontinuation_rate,
+        reason_counts (currently discontinued patients by reason),
+        retreatment (rates among patients who ever stopped, overall and by
+        reason) and time_to_discontinuation ('all' and one curve per reason,
+        each with time_days, survival, at_risk, events and median_days)
+    """
+    summary_path = Path(data_path) / DISCONTINUATION_SUMMARY_FILE
+    if summary_path.exists():
+        with open(summary_path, 'r') as f:
+            summary = json.load(f)
+        if summary.get('version') == SUMMARY_VERSION:
+            return summary
+    return write_discontinuation_summary(data_path)
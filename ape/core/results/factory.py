@@ -8,7 +8,7 @@ and easy persistence.
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List
 
 from .base import SimulationResults, SimulationMetadata
 from .parquet import ParquetResults
@@ -40,7 +40,8 @@ class ResultsFactory:
         duration_years: float,
         seed: int,
         runtime_seconds: float,
-        model_type: str = "visit_based"
+        model_type: str = "visit_based",
+        visit_partitioning: Optional[List[str]] = None
     ) -> SimulationResults:
         """
         Create SimulationResults instance with Parquet storage.
@@ -55,6 +56,8 @@ class ResultsFactory:
             seed: Random seed used
             runtime_seconds: Time taken to run simulation
             model_type: 'visit_based' or 'time_based'
+            visit_partitioning: Optional hive partition keys for visits
+                ('enrollment_cohort' and/or 'calendar_year')
             
         Returns:
             ParquetResults instance
@@ -120,7 +123,8 @@ class ResultsFactory:
         results = ParquetResults.create_from_raw_results(
             raw_results=raw_results,
             metadata=metadata,
-            save_path=save_path
+            save_path=save_path,
+            visit_partitioning=visit_partitioning
         )
         
         return results
@@ -0,0 +1,25 @@
+"""
+Registry of per-patient vision outcome measures.
+
+The registry is defined in simulation_v2.core.outcome_metrics, so
+simulation code (e.g. cost-effectiveness) shares the same definitions
+without importing the application layer. This module re-exports it for
+the results classes and pages.
+"""
+
+from simulation_v2.core.outcome_metrics import (
+    AGGREGATES,
+    DAYS_PER_MONTH,
+    OUTCOME_METRICS,
+    VISION_MAINTAINED_MAX_LOSS,
+    YEAR1_WINDOW,
+    YEAR2_WINDOW,
+    OutcomeMetric,
+    PatientBatch,
+    batched,
+    compute_patient_metrics,
+    register_metric,
+    required_columns,
+    summarize_metrics,
+    vision_maintained,
+)
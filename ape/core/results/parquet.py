@@ -6,6 +6,8 @@ loading only what's needed into memory. Suitable for large simulations.
 """
 
 import json
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Iterator, Optional, List, Tuple, Callable
 from pathlib import Path
 import pandas as pd
@@ -14,8 +16,25 @@ import numpy as np
 from datetime import datetime
 
 from .base import SimulationResults, SimulationMetadata
+from .outcome_metrics import OUTCOME_METRICS, compute_patient_metrics, required_columns, summarize_metrics
+from .discontinuation_summary import load_discontinuation_summary, write_discontinuation_summary
 from ape.core.storage import ParquetWriter, ParquetReader
 
+# Bin widths in days for vision_trajectory
+VISION_BIN_DAYS = {
+    'week': 7.0,
+    'month': 30.44,
+    'quarter': 91.31,
+    'year': 365.25
+}
+
+VISION_ALIGNMENTS = ('enrollment', 'calendar')
+
+# Statistics vision_trajectory can return; 'n' counts visits, 'n_patients' distinct patients
+VISION_STATS = ('mean', 'sd', 'min', 'p10', 'p25', 'median', 'p75', 'p90', 'max', 'n', 'n_patients')
+
+_VISION_QUANTILES = {'p10': 0.10, 'p25': 0.25, 'median': 0.50, 'p75': 0.75, 'p90': 0.90}
+
 
 class ParquetResults(SimulationResults):
     """
@@ -25,6 +44,21 @@ class ParquetResults(SimulationResults):
     providing memory-efficient access to large datasets.
     """
     
+    # Vision aggregates keyed by (data path, sim_id, bin, alignment); simulations
+    # are immutable once written, so entries never go stale. Least recently
+    # used entries are dropped beyond MAX_CACHED_VISION
+    MAX_CACHED_VISION = 64
+    _vision_cache: 'OrderedDict[Tuple[str, str, str, str], pd.DataFrame]' = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    # Per-patient outcome metrics keyed by (data path, sim_id, registered metrics),
+    # least recently used dropped beyond MAX_CACHED_METRICS
+    MAX_CACHED_METRICS = 16
+    _metrics_cache: 'OrderedDict[Tuple[str, str, Tuple[str, ...]], pd.DataFrame]' = OrderedDict()
+
+    # Visits per batch when streaming outcome metrics
+    METRICS_BATCH_SIZE = 200_000
+
     def __init__(self, metadata: SimulationMetadata, data_path: Path):
         """
         Initialize with metadata and path to Parquet files.
@@ -118,10 +152,18 @@ class ParquetResults(SimulationResults):
                     from datetime import datetime
                     
                     daily_usage = defaultdict(lambda: defaultdict(int))
-                    for _, row in daily_df.iterrows():
-                        date = datetime.fromisoformat(row['date']).date()
-                        for role, count in row['usage'].items():
-                            daily_usage[date][role] = count
+                    dates = [datetime.fromisoformat(d).date() for d in daily_df['date']]
+                    if 'usage' in daily_df.columns:
+                        # Older saves: one dict of role -> count per date
+                        for date, usage in zip(dates, daily_df['usage']):
+                            for role, count in usage.items():
+                                daily_usage[date][role] = count
+                    else:
+                        # One column per role, null where the role was not needed
+                        for role in daily_df.columns.drop('date'):
+                            for date, count in zip(dates, daily_df[role]):
+                                if pd.notna(count):
+                                    daily_usage[date][role] = int(count)
                     
                     tracker.daily_usage = dict(daily_usage)
                     tracker.get_all_dates_with_visits = lambda: sorted(daily_usage.keys())
@@ -251,7 +293,7 @@ class ParquetResults(SimulationResults):
         
     def get_vision_trajectory_df(self, sample_size: Optional[int] = None) -> pd.DataFrame:
         """Get vision trajectories as DataFrame."""
-        visits_path = self.data_path / 'visits.parquet'
+        columns = ['patient_id', 'time_days', 'vision']
         
         if sample_size:
             # Sample patients
@@ -263,16 +305,187 @@ class ParquetResults(SimulationResults):
             
             # Read visits for sampled patients
             filters = [('patient_id', 'in', sample_ids)]
-            visits_df = pd.read_parquet(visits_path, filters=filters)
+            visits_df = self.reader.read_visits(columns=columns, filters=filters)
         else:
             # Read all visits
-            visits_df = pd.read_parquet(visits_path)
+            visits_df = self.reader.read_visits(columns=columns)
             
         # Return with time_days (no conversion needed)
-        result_df = visits_df[['patient_id', 'time_days', 'vision']].copy()
-        
-        return result_df
+        return visits_df
         
+    def vision_trajectory(
+        self,
+        bin: str = 'month',
+        stats: Tuple[str, ...] = ('mean', 'sd', 'p10', 'p90', 'n'),
+        align: str = 'enrollment'
+    ) -> pd.DataFrame:
+        """
+        Population vision statistics per time bin.
+
+        All statistics for a (bin, alignment) pair are computed in one grouped
+        pass over the patient_id/time_days/vision columns and cached, so
+        repeated calls with different stats are free.
+
+        Args:
+            bin: 'week', 'month', 'quarter' or 'year'
+            stats: Any of VISION_STATS. 'sd' is the sample standard deviation,
+                'pXX' are percentiles, 'n' is the number of visits in the bin
+                and 'n_patients' the number of distinct patients.
+            align: 'enrollment' bins by time since each patient's enrollment;
+                'calendar' bins by time since simulation start.
+
+        Returns:
+            DataFrame with one row per non-empty bin: a column named after the
+            bin unit holding the integer bin index (bin 12 of 'month' covers
+            days [12 * 30.44, 13 * 30.44)), followed by the requested stats.
+        """
+        if bin not in VISION_BIN_DAYS:
+            raise ValueError(f"Unknown bin '{bin}'. Expected one of {list(VISION_BIN_DAYS)}")
+        if align not in VISION_ALIGNMENTS:
+            raise ValueError(f"Unknown alignment '{align}'. Expected one of {list(VISION_ALIGNMENTS)}")
+        stats = [stats] if isinstance(stats, str) else list(stats)
+        unknown = [s for s in stats if s not in VISION_STATS]
+        if unknown:
+            raise ValueError(f"Unknown vision statistics {unknown}. Expected any of {list(VISION_STATS)}")
+
+        key = (str(self.data_path.resolve()), self.metadata.sim_id, bin, align)
+        table = self._cached(self._vision_cache, key, self.MAX_CACHED_VISION,
+                             lambda: self._compute_vision_trajectory(bin, align))
+
+        return table[[bin] + stats].copy()
+
+    def vision_endpoints(self) -> pd.DataFrame:
+        """
+        First and last recorded vision for every patient with visits.
+
+        Cached alongside vision_trajectory.
+
+        Returns:
+            DataFrame with patient_id, baseline_vision, final_vision and
+            final_time_days, ordered by patient_id
+        """
+        key = (str(self.data_path.resolve()), self.metadata.sim_id, 'patient', 'enrollment')
+
+        def compute():
+            visits_df = self.reader.read_visits(columns=['patient_id', 'time_days', 'vision'])
+            visits_df = visits_df.sort_values(['patient_id', 'time_days'], kind='stable')
+            grouped = visits_df.groupby('patient_id', sort=False)
+            return pd.DataFrame({
+                'baseline_vision': grouped['vision'].first(),
+                'final_vision': grouped['vision'].last(),
+                'final_time_days': grouped['time_days'].last()
+            }).rename_axis('patient_id').reset_index()
+
+        return self._cached(self._vision_cache, key, self.MAX_CACHED_VISION, compute).copy()
+
+    def patient_outcomes(self, metrics: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Per-patient values of registered outcome metrics.
+
+        Every registered metric is computed in one streaming pass over the
+        visits and cached, so later calls (and new metric subsets) do not
+        re-read visits until another metric is registered.
+
+        Args:
+            metrics: Metric names (default: all registered)
+
+        Returns:
+            DataFrame indexed by patient_id with one column per metric
+        """
+        key = (str(self.data_path.resolve()), self.metadata.sim_id, tuple(OUTCOME_METRICS))
+        table = self._cached(self._metrics_cache, key, self.MAX_CACHED_METRICS, self._compute_patient_outcomes)
+        if metrics is not None:
+            unknown = [name for name in metrics if name not in table.columns]
+            if unknown:
+                raise ValueError(f"Unknown outcome metrics: {unknown}. Available: {list(table.columns)}")
+            table = table[list(metrics)]
+        return table.copy()
+
+    def outcome_metrics(self, metrics: Optional[List[str]] = None) -> Dict[str, float]:
+        """Population value of each outcome metric (see summarize_metrics)."""
+        return summarize_metrics(self.patient_outcomes(metrics))
+
+    def discontinuation_summary(self) -> Dict[str, Any]:
+        """Reason counts, time-to-discontinuation curves and retreatment rates (see load_discontinuation_summary)."""
+        return load_discontinuation_summary(self.data_path)
+
+    @classmethod
+    def _cached(cls, cache: 'OrderedDict', key: Tuple, limit: int, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Entry of an LRU class cache, computed (outside the lock) when missing."""
+        with cls._cache_lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = compute()
+        with cls._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > limit:
+                cache.popitem(last=False)
+        return value
+
+    def _compute_patient_outcomes(self) -> pd.DataFrame:
+        """Stream patient-grouped visits through every registered metric."""
+        patients_df = self.get_patients_df()
+        stored = set(self.reader.visits_dataset.schema.names)
+        names = [
+            name for name, metric in OUTCOME_METRICS.items()
+            if set(metric.columns) <= stored and set(metric.patient_columns) <= set(patients_df.columns)
+        ]
+        columns = required_columns(names)
+
+        def batches():
+            if self.reader.is_partitioned:
+                # Partitions split patients; read_visits returns them regrouped
+                visits_df = self.reader.read_visits(columns=columns)
+                for start in range(0, len(visits_df), self.METRICS_BATCH_SIZE):
+                    yield visits_df.iloc[start:start + self.METRICS_BATCH_SIZE]
+            else:
+                yield from self.reader.iterate_visits(batch_size=self.METRICS_BATCH_SIZE, columns=columns)
+
+        try:
+            return compute_patient_metrics(batches(), patients_df, names)
+        except ValueError:
+            # Visits written out of patient order: group them in memory instead
+            visits_df = self.reader.read_visits(columns=columns)
+            visits_df = visits_df.sort_values(['patient_id', 'time_days'], kind='stable')
+            return compute_patient_metrics([visits_df], patients_df, names)
+
+    def _compute_vision_trajectory(self, bin: str, align: str) -> pd.DataFrame:
+        """Compute every statistic in VISION_STATS for one (bin, alignment) pair."""
+        visits_df = self.reader.read_visits(columns=['patient_id', 'time_days', 'vision'])
+
+        # 1. Days on the requested axis
+        days = visits_df['time_days'].to_numpy(dtype=float)
+        if align == 'calendar':
+            patients_df = pd.read_parquet(
+                self.data_path / 'patients.parquet',
+                columns=['patient_id', 'enrollment_time_days']
+            )
+            enrollment = pd.Series(
+                patients_df['enrollment_time_days'].to_numpy(dtype=float),
+                index=patients_df['patient_id']
+            )
+            days = days + visits_df['patient_id'].map(enrollment).fillna(0).to_numpy()
+
+        # 2. Integer bin index per visit
+        binned = pd.DataFrame({
+            bin: np.floor(days / VISION_BIN_DAYS[bin]).astype(np.int64),
+            'patient_id': visits_df['patient_id'].to_numpy(),
+            'vision': visits_df['vision'].to_numpy(dtype=float)
+        })
+        grouped = binned.groupby(bin)
+
+        # 3. Moments, counts and percentiles in one grouped pass each
+        table = grouped['vision'].agg(['mean', 'std', 'min', 'max', 'count'])
+        table = table.rename(columns={'std': 'sd', 'count': 'n'})
+        table['n_patients'] = grouped['patient_id'].nunique()
+        quantiles = grouped['vision'].quantile(list(_VISION_QUANTILES.values())).unstack()
+        for name, q in _VISION_QUANTILES.items():
+            table[name] = quantiles[q]
+
+        return table.reset_index()[[bin] + list(VISION_STATS)]
+
     def get_patients_df(self) -> pd.DataFrame:
         """Get patient summary data as DataFrame including enrollment info."""
         patients_path = self.data_path / 'patients.parquet'
@@ -280,8 +493,7 @@ class ParquetResults(SimulationResults):
         
     def get_visits_df(self) -> pd.DataFrame:
         """Get all visits as DataFrame with discontinuation/retreatment info."""
-        visits_path = self.data_path / 'visits.parquet'
-        visits_df = pd.read_parquet(visits_path)
+        visits_df = self.reader.read_visits()
         
         # Add discontinuation and retreatment columns if not present
         if 'is_discontinuation_visit' not in visits_df.columns:
@@ -295,8 +507,7 @@ class ParquetResults(SimulationResults):
     
     def get_treatment_intervals_df(self) -> pd.DataFrame:
         """Get treatment intervals as DataFrame - VECTORIZED for speed."""
-        visits_path = self.data_path / 'visits.parquet'
-        visits_df = pd.read_parquet(visits_path)
+        visits_df = self.reader.read_visits(columns=['patient_id', 'time_days'])
         
         # Sort by patient and time once
         visits_df = visits_df.sort_values(['patient_id', 'time_days'])
@@ -335,7 +546,11 @@ class ParquetResults(SimulationResults):
         path.mkdir(parents=True, exist_ok=True)
         
         for file in self.data_path.glob('*'):
-            shutil.copy2(file, path / file.name)
+            if file.is_dir():
+                # Partitioned visit dataset
+                shutil.copytree(file, path / file.name, dirs_exist_ok=True)
+            else:
+                shutil.copy2(file, path / file.name)
             
         self.data_path = path
         
@@ -394,7 +609,8 @@ class ParquetResults(SimulationResults):
         raw_results: Any,
         metadata: SimulationMetadata,
         save_path: Path,
-        progress_callback: Optional[Callable[[float, str], None]] = None
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+        visit_partitioning: Optional[List[str]] = None
     ) -> 'ParquetResults':
         """
         Create ParquetResults from raw simulation results.
@@ -406,6 +622,8 @@ class ParquetResults(SimulationResults):
             metadata: Simulation metadata
             save_path: Directory to save results
             progress_callback: Optional progress callback
+            visit_partitioning: Optional hive partition keys for visits
+                ('enrollment_cohort', 'calendar_year') for very large runs
             
         Returns:
             ParquetResults instance
@@ -419,11 +637,14 @@ class ParquetResults(SimulationResults):
             json.dump(metadata.to_dict(), f, indent=2)
             
         # Use ParquetWriter for efficient chunked writing
-        writer = ParquetWriter(save_path)
+        writer = ParquetWriter(save_path, visit_partitioning=visit_partitioning)
         writer.write_simulation_results(raw_results, progress_callback)
         
         # Create index for fast lookup
         reader = ParquetReader(save_path)
         reader.create_patient_index()
+
+        # Discontinuation analytics, so pages never scan visits for them
+        write_discontinuation_summary(save_path)
         
         return ParquetResults(metadata, save_path)
\ No newline at end of file
@@ -72,7 +72,8 @@ class SimulationRunner:
         show_progress: bool = True,
         recruitment_mode: str = "Fixed Total",
         patient_arrival_rate: Optional[float] = None,
-        enable_resource_tracking: Optional[bool] = None
+        enable_resource_tracking: Optional[bool] = None,
+        visit_partitioning: Optional[List[str]] = None
     ) -> SimulationResults:
         """
         Run simulation and return results in Parquet format.
@@ -85,6 +86,8 @@ class SimulationRunner:
             show_progress: Show progress indicators
             recruitment_mode: "Fixed Total" or "Constant Rate"
             patient_arrival_rate: Patients per week (Constant Rate Mode only)
+            visit_partitioning: Optional hive partition keys for the visits
+                dataset ('enrollment_cohort', 'calendar_year') for very large runs
             
         Returns:
             ParquetResults instance with simulation data
@@ -120,7 +123,8 @@ class SimulationRunner:
             duration_years=duration_years,
             seed=seed,
             runtime_seconds=runtime_seconds,
-            model_type="time_based" if self.is_time_based else "visit_based"
+            model_type="time_based" if self.is_time_based else "visit_based",
+            visit_partitioning=visit_partitioning
         )
         
         # Save the full protocol specification with the results
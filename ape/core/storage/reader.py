@@ -6,14 +6,27 @@ what's needed when it's needed.
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
+from datetime import datetime
 from pathlib import Path
 from typing import Iterator, Optional, List, Dict, Any, Tuple
 import numpy as np
 
+from .writer import PARTITIONED_VISITS_DIR, VISIT_PARTITION_COLUMNS, VISIT_PARTITION_SCHEMA
+
 
 class ParquetReader:
-    """Read simulation data from Parquet files lazily."""
+    """
+    Read simulation data from Parquet files lazily.
+    
+    Visits may be stored either as a single visits.parquet file or as a
+    hive-partitioned visits/ dataset (see ParquetWriter visit_partitioning).
+    Both layouts are read through pyarrow.dataset, so filters are pushed
+    down (partition pruning and row-group statistics) and batches are
+    streamed without materialising the filtered result.
+    """
     
     def __init__(self, data_dir: Path):
         """
@@ -28,14 +41,92 @@ class ParquetReader:
         # Cache metadata
         self._metadata = None
         self._patient_count = None
+        self._visits_dataset = None
         
     def _validate_files(self) -> None:
         """Validate required files exist."""
-        required_files = ['patients.parquet', 'visits.parquet', 'metadata.parquet']
+        required_files = ['patients.parquet', 'metadata.parquet']
         for file in required_files:
             if not (self.data_dir / file).exists():
                 raise FileNotFoundError(f"Required file {file} not found in {self.data_dir}")
-                
+        if not self.visits_path.exists():
+            raise FileNotFoundError(f"Required file visits.parquet not found in {self.data_dir}")
+    
+    @property
+    def is_partitioned(self) -> bool:
+        """Whether visits are stored as a hive-partitioned dataset."""
+        return (self.data_dir / PARTITIONED_VISITS_DIR).is_dir()
+    
+    @property
+    def visits_path(self) -> Path:
+        """Path to the visits file or partitioned dataset directory."""
+        if self.is_partitioned:
+            return self.data_dir / PARTITIONED_VISITS_DIR
+        return self.data_dir / 'visits.parquet'
+    
+    @property
+    def partition_columns(self) -> List[str]:
+        """Partition keys present in the visits dataset (empty for single file)."""
+        if not self.is_partitioned:
+            return []
+        names = self.visits_dataset.schema.names
+        return [c for c in VISIT_PARTITION_COLUMNS if c in names]
+    
+    @property
+    def visits_dataset(self) -> ds.Dataset:
+        """Cached pyarrow dataset over the visits, whichever layout is on disk."""
+        if self._visits_dataset is None:
+            if self.is_partitioned:
+                # Only declare the keys actually used in the directory layout
+                first_file = next(self.visits_path.rglob('*.parquet'), None)
+                keys = [] if first_file is None else [
+                    part.split('=', 1)[0]
+                    for part in first_file.relative_to(self.visits_path).parts[:-1]
+                ]
+                partitioning = ds.partitioning(
+                    pa.schema([VISIT_PARTITION_SCHEMA.field(key) for key in keys]),
+                    flavor='hive'
+                )
+                self._visits_dataset = ds.dataset(
+                    self.visits_path, format='parquet', partitioning=partitioning
+                )
+            else:
+                self._visits_dataset = ds.dataset(self.visits_path, format='parquet')
+        return self._visits_dataset
+    
+    @staticmethod
+    def _filter_expression(filters: Optional[List[Tuple]]) -> Optional[ds.Expression]:
+        """Convert PyArrow DNF filters (list of tuples) to a dataset expression."""
+        if not filters:
+            return None
+        return pq.filters_to_expression(filters)
+    
+    def read_visits(
+        self,
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple]] = None
+    ) -> pd.DataFrame:
+        """
+        Read visits into a DataFrame with filter pushdown.
+        
+        Partitioned datasets are returned sorted by patient and time so the
+        result matches the single-file layout.
+        
+        Args:
+            columns: Specific columns to load (None for all)
+            filters: PyArrow filters to apply
+            
+        Returns:
+            DataFrame with visit data
+        """
+        table = self.visits_dataset.to_table(
+            columns=columns, filter=self._filter_expression(filters)
+        )
+        df = table.to_pandas()
+        if self.is_partitioned and {'patient_id', 'time_days'} <= set(df.columns):
+            df = df.sort_values(['patient_id', 'time_days'], kind='stable').reset_index(drop=True)
+        return df
+        
     @property
     def metadata(self) -> Dict[str, Any]:
         """Get cached metadata."""
@@ -118,11 +209,7 @@ class ParquetReader:
         """
         filters = [('patient_id', '==', patient_id)]
         
-        df = pd.read_parquet(
-            self.data_dir / 'visits.parquet',
-            filters=filters,
-            columns=columns
-        )
+        df = self.read_visits(columns=columns, filters=filters)
         
         return df.sort_values('time_days')
         
@@ -143,25 +230,77 @@ class ParquetReader:
         Yields:
             DataFrames with visit data
         """
-        parquet_file = pq.ParquetFile(self.data_dir / 'visits.parquet')
+        # Stream record batches with the filter pushed into the scan; only
+        # row groups (and partitions) that can match are read
+        scanner = self.visits_dataset.scanner(
+            columns=columns,
+            filter=self._filter_expression(filters),
+            batch_size=batch_size
+        )
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+    
+    def iterate_visits_in_period(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        batch_size: int = 5000,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over visits whose date falls in [start_date, end_date).
+        
+        With a calendar_year partition only the matching year directories are
+        scanned; single files fall back to row-group statistics on date.
+        
+        Args:
+            start_date: Inclusive start of the window
+            end_date: Exclusive end of the window
+            batch_size: Number of visits per batch
+            columns: Specific columns to load
+            
+        Yields:
+            DataFrames with visit data
+        """
+        filters = [('date', '>=', pd.Timestamp(start_date)), ('date', '<', pd.Timestamp(end_date))]
+        if 'calendar_year' in self.partition_columns:
+            last_year = (pd.Timestamp(end_date) - pd.Timedelta(microseconds=1)).year
+            filters += [('calendar_year', '>=', start_date.year), ('calendar_year', '<=', last_year)]
+        yield from self.iterate_visits(batch_size=batch_size, columns=columns, filters=filters)
+    
+    def iterate_cohort_visits(
+        self,
+        cohorts: List[str],
+        batch_size: int = 5000,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over visits for patients enrolled in the given quarters.
         
-        # If filters provided, we need to read differently
-        if filters:
-            # Read with filters (less efficient but necessary)
-            df = pd.read_parquet(
-                self.data_dir / 'visits.parquet',
-                filters=filters,
-                columns=columns
-            )
+        Args:
+            cohorts: Enrollment quarter labels, e.g. ['2025Q2']
+            batch_size: Number of visits per batch
+            columns: Specific columns to load
             
-            # Yield in batches
-            for start_idx in range(0, len(df), batch_size):
-                end_idx = min(start_idx + batch_size, len(df))
-                yield df.iloc[start_idx:end_idx]
+        Yields:
+            DataFrames with visit data
+        """
+        if 'enrollment_cohort' in self.partition_columns:
+            filters = [('enrollment_cohort', 'in', list(cohorts))]
         else:
-            # Use native batch reading
-            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
-                yield batch.to_pandas()
+            # Single-file layout: resolve the cohort to patient ids first
+            patients = pd.read_parquet(
+                self.data_dir / 'patients.parquet',
+                columns=['patient_id', 'enrollment_date']
+            )
+            enrollment = pd.to_datetime(patients['enrollment_date'])
+            labels = enrollment.dt.year.astype(str) + 'Q' + enrollment.dt.quarter.astype(str)
+            patient_ids = patients.loc[labels.isin(cohorts), 'patient_id'].tolist()
+            if not patient_ids:
+                return
+            filters = [('patient_id', 'in', patient_ids)]
+        yield from self.iterate_visits(batch_size=batch_size, columns=columns, filters=filters)
                 
     def get_summary_statistics(self) -> Dict[str, Any]:
         """
@@ -175,10 +314,9 @@ class ParquetReader:
         
         # Add patient-level summaries using Parquet metadata
         patients_file = pq.ParquetFile(self.data_dir / 'patients.parquet')
-        visits_file = pq.ParquetFile(self.data_dir / 'visits.parquet')
         
         stats['total_patients'] = patients_file.metadata.num_rows
-        stats['total_visits'] = visits_file.metadata.num_rows
+        stats['total_visits'] = self.visits_dataset.count_rows()
         stats['mean_visits_per_patient'] = stats['total_visits'] / stats['total_patients']
         
         return stats
@@ -209,15 +347,17 @@ class ParquetReader:
             )
             patient_ids = all_patients.sample(n=min(sample_size, len(all_patients)))['patient_id'].tolist()
             
-        # Set up filters
-        filters = []
-        if patient_ids:
-            filters.append(('patient_id', 'in', patient_ids))
+        # Set up filters in disjunctive normal form: one conjunction per
+        # time point window (OR-ed), each also restricted to the patients
+        base = [('patient_id', 'in', patient_ids)] if patient_ids else []
         if time_points:
-            # Time points should be in days now
-            for tp in time_points:
-                filters.append(('time_days', '>=', tp - 1))
-                filters.append(('time_days', '<=', tp + 1))
+            # Time points are in days; keep visits within a day of each point
+            filters = [
+                base + [('time_days', '>=', tp - 1), ('time_days', '<=', tp + 1)]
+                for tp in time_points
+            ]
+        else:
+            filters = base
                 
         # Iterate over visits with filters
         columns = ['patient_id', 'time_days', 'vision']
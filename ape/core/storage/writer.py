@@ -9,28 +9,63 @@ import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Any, Iterator, Optional, Callable
+from typing import Any, Iterator, Optional, Callable, Dict, Sequence, Tuple
 import time
 from datetime import datetime
 
 from .writer_types import PatientRecord, VisitRecord, ensure_datetime, ensure_int_days
 
 
+# Hive partition keys supported for the partitioned visit layout
+VISIT_PARTITION_COLUMNS = ('enrollment_cohort', 'calendar_year')
+VISIT_PARTITION_SCHEMA = pa.schema([
+    ('enrollment_cohort', pa.string()),  # Enrollment quarter, e.g. "2025Q2"
+    ('calendar_year', pa.int32())        # Calendar year of the visit date
+])
+PARTITIONED_VISITS_DIR = 'visits'
+
+# Nullable visit columns whose type cannot be inferred from an all-None chunk
+NULLABLE_VISIT_TYPES = {'next_interval_days': pa.int64()}
+
+
+def enrollment_cohort_label(enrollment_date: datetime) -> str:
+    """Label an enrollment date with its calendar quarter, e.g. '2025Q2'."""
+    return f"{enrollment_date.year}Q{(enrollment_date.month - 1) // 3 + 1}"
+
+
 class ParquetWriter:
     """Write simulation data to Parquet files in chunks with progress tracking."""
     
-    def __init__(self, output_dir: Path, chunk_size: int = 5000):
+    def __init__(
+        self,
+        output_dir: Path,
+        chunk_size: int = 5000,
+        visit_partitioning: Optional[Sequence[str]] = None
+    ):
         """
         Initialize Parquet writer.
         
         Args:
             output_dir: Directory to write Parquet files
             chunk_size: Number of records to process at once
+            visit_partitioning: Optional hive partition keys for visits, any of
+                'enrollment_cohort' and 'calendar_year'. When set, visits are
+                written to a visits/ dataset directory instead of visits.parquet.
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.chunk_size = chunk_size
         
+        self.visit_partitioning = tuple(visit_partitioning or ())
+        unknown = set(self.visit_partitioning) - set(VISIT_PARTITION_COLUMNS)
+        if unknown:
+            raise ValueError(
+                f"Unknown visit partition keys: {sorted(unknown)}. "
+                f"Supported: {list(VISIT_PARTITION_COLUMNS)}"
+            )
+        # One open file writer per partition, closed when visits are complete
+        self._partition_writers: Dict[Tuple, pq.ParquetWriter] = {}
+        
     def write_simulation_results(
         self,
         raw_results: Any,
@@ -209,95 +244,106 @@ class ParquetWriter:
         total_patients = len(raw_results.patient_histories)
         patients_processed = 0
         
-        for patient_id, patient in raw_results.patient_histories.items():
-            # Extract visits
-            visits = getattr(patient, 'visit_history', getattr(patient, 'visits', []))
+        # Partition files stay open across chunks; close them even if a patient fails
+        try:
+            for patient_id, patient in raw_results.patient_histories.items():
+                # Extract visits
+                visits = getattr(patient, 'visit_history', getattr(patient, 'visits', []))
             
-            # Get patient's enrollment date - REQUIRED
-            enrollment_date = getattr(patient, 'enrollment_date', None)
-            if not enrollment_date:
-                raise ValueError(
-                    f"Patient {patient_id} missing enrollment_date. "
-                    "All patients must have an enrollment date."
-                )
+                # Get patient's enrollment date - REQUIRED
+                enrollment_date = getattr(patient, 'enrollment_date', None)
+                if not enrollment_date:
+                    raise ValueError(
+                        f"Patient {patient_id} missing enrollment_date. "
+                        "All patients must have an enrollment date."
+                    )
+                cohort = enrollment_cohort_label(enrollment_date)
             
-            for i, visit in enumerate(visits):
-                # Handle both dict and object formats
-                if isinstance(visit, dict):
-                    # Dict format from visit_history
-                    visit_date = visit.get('date')
-                    if not visit_date:
-                        raise ValueError(
-                            f"Visit {i} for patient {patient_id} missing date"
-                        )
+                for i, visit in enumerate(visits):
+                    # Handle both dict and object formats
+                    if isinstance(visit, dict):
+                        # Dict format from visit_history
+                        visit_date = visit.get('date')
+                        if not visit_date:
+                            raise ValueError(
+                                f"Visit {i} for patient {patient_id} missing date"
+                            )
                     
-                    # Ensure visit date is a datetime object
-                    visit_date = ensure_datetime(visit_date, f"Patient {patient_id} visit {i} date")
+                        # Ensure visit date is a datetime object
+                        visit_date = ensure_datetime(visit_date, f"Patient {patient_id} visit {i} date")
                     
-                    # Calculate days from patient enrollment
-                    time_delta = visit_date - enrollment_date
-                    time_days_from_enrollment = ensure_int_days(
-                        time_delta.total_seconds(),
-                        f"Patient {patient_id} visit {i} time_days"
-                    )
-                        
-                    # Build record with strict typing
-                    record: VisitRecord = {
-                        'patient_id': str(patient_id),
-                        'date': visit_date,  # datetime object
-                        'time_days': int(time_days_from_enrollment),  # int days
-                        'vision': int(visit.get('vision', 70)),
-                        'injected': bool(visit.get('treatment_given', False)),
-                        'next_interval_days': visit.get('next_interval_days', None) if visit.get('next_interval_days') is None else int(visit.get('next_interval_days')),
-                        'disease_state': str(visit.get('disease_state', ''))
-                    }
-                else:
-                    # Object format
-                    visit_date = getattr(visit, 'date', None)
-                    if not visit_date:
-                        raise ValueError(
-                            f"Visit {i} for patient {patient_id} missing date attribute"
+                        # Calculate days from patient enrollment
+                        time_delta = visit_date - enrollment_date
+                        time_days_from_enrollment = ensure_int_days(
+                            time_delta.total_seconds(),
+                            f"Patient {patient_id} visit {i} time_days"
                         )
+                        
+                        # Build record with strict typing
+                        record: VisitRecord = {
+                            'patient_id': str(patient_id),
+                            'date': visit_date,  # datetime object
+                            'time_days': int(time_days_from_enrollment),  # int days
+                            'vision': int(visit.get('vision', 70)),
+                            'injected': bool(visit.get('treatment_given', False)),
+                            'next_interval_days': visit.get('next_interval_days', None) if visit.get('next_interval_days') is None else int(visit.get('next_interval_days')),
+                            'disease_state': str(visit.get('disease_state', ''))
+                        }
+                        if self.visit_partitioning:
+                            record['enrollment_cohort'] = cohort
+                            record['calendar_year'] = visit_date.year
+                    else:
+                        # Object format
+                        visit_date = getattr(visit, 'date', None)
+                        if not visit_date:
+                            raise ValueError(
+                                f"Visit {i} for patient {patient_id} missing date attribute"
+                            )
                     
-                    # Ensure visit date is a datetime object
-                    visit_date = ensure_datetime(visit_date, f"Patient {patient_id} visit {i} date")
+                        # Ensure visit date is a datetime object
+                        visit_date = ensure_datetime(visit_date, f"Patient {patient_id} visit {i} date")
                     
-                    # Calculate days from patient enrollment
-                    time_delta = visit_date - enrollment_date
-                    time_days_from_enrollment = ensure_int_days(
-                        time_delta.total_seconds(),
-                        f"Patient {patient_id} visit {i} time_days"
-                    )
+                        # Calculate days from patient enrollment
+                        time_delta = visit_date - enrollment_date
+                        time_days_from_enrollment = ensure_int_days(
+                            time_delta.total_seconds(),
+                            f"Patient {patient_id} visit {i} time_days"
+                        )
                     
-                    # Build record with strict typing
-                    next_interval = getattr(visit, 'next_interval_days', None)
-                    record: VisitRecord = {
-                        'patient_id': str(patient_id),
-                        'date': visit_date,  # datetime object
-                        'time_days': int(time_days_from_enrollment),  # int days
-                        'vision': int(getattr(visit, 'visual_acuity', getattr(visit, 'vision', 70))),
-                        'injected': bool(getattr(visit, 'received_injection', getattr(visit, 'injected', False))),
-                        'next_interval_days': None if next_interval is None else int(next_interval),
-                        'disease_state': str(getattr(visit, 'disease_state', ''))
-                    }
-                visit_records.append(record)
+                        # Build record with strict typing
+                        next_interval = getattr(visit, 'next_interval_days', None)
+                        record: VisitRecord = {
+                            'patient_id': str(patient_id),
+                            'date': visit_date,  # datetime object
+                            'time_days': int(time_days_from_enrollment),  # int days
+                            'vision': int(getattr(visit, 'visual_acuity', getattr(visit, 'vision', 70))),
+                            'injected': bool(getattr(visit, 'received_injection', getattr(visit, 'injected', False))),
+                            'next_interval_days': None if next_interval is None else int(next_interval),
+                            'disease_state': str(getattr(visit, 'disease_state', ''))
+                        }
+                        if self.visit_partitioning:
+                            record['enrollment_cohort'] = cohort
+                            record['calendar_year'] = visit_date.year
+                    visit_records.append(record)
                 
-                # Write chunk if needed
-                if len(visit_records) >= self.chunk_size:
-                    self._write_visit_chunk(visit_records, False)
-                    visit_records = []
+                    # Write chunk if needed
+                    if len(visit_records) >= self.chunk_size:
+                        self._write_visit_chunk(visit_records, False)
+                        visit_records = []
                     
-            patients_processed += 1
-            if progress_callback and patients_processed % 100 == 0:
-                progress = 50 + (patients_processed / total_patients) * 45  # 50-95%
-                progress_callback(
-                    progress,
-                    f"Processing visits: {patients_processed:,}/{total_patients:,} patients"
-                )
+                patients_processed += 1
+                if progress_callback and patients_processed % 100 == 0:
+                    progress = 50 + (patients_processed / total_patients) * 45  # 50-95%
+                    progress_callback(
+                        progress,
+                        f"Processing visits: {patients_processed:,}/{total_patients:,} patients"
+                    )
                 
-        # Write remaining visits
-        if visit_records:
-            self._write_visit_chunk(visit_records, True)
+            # Write remaining visits
+            if visit_records:
+                self._write_visit_chunk(visit_records, True)
+        finally:
+            self._close_partition_writers()
             
     def _write_visit_chunk(self, records: list, is_final: bool) -> None:
         """Write a chunk of visit records."""
@@ -306,6 +352,10 @@ class ParquetWriter:
         # Sort by patient and time for better query performance
         df = df.sort_values(['patient_id', 'time_days'])
         
+        if self.visit_partitioning:
+            self._write_partitioned_visit_chunk(df)
+            return
+        
         # Convert to table without index
         table = pa.Table.from_pandas(df, preserve_index=False)
         
@@ -320,6 +370,44 @@ class ParquetWriter:
             # First write
             pq.write_table(table, file_path)
             
+    def _write_partitioned_visit_chunk(self, df: pd.DataFrame) -> None:
+        """
+        Append a chunk of visits to a hive-partitioned dataset.
+        
+        Each partition (e.g. visits/enrollment_cohort=2025Q2/calendar_year=2027/)
+        gets a single file that stays open across chunks, so every chunk adds
+        one row group per partition instead of rewriting existing data.
+        """
+        drop_columns = [c for c in VISIT_PARTITION_COLUMNS if c not in self.visit_partitioning]
+        df = df.drop(columns=drop_columns)
+        
+        for key, part_df in df.groupby(list(self.visit_partitioning), sort=False):
+            key = key if isinstance(key, tuple) else (key,)
+            table = pa.Table.from_pandas(
+                part_df.drop(columns=list(self.visit_partitioning)),
+                preserve_index=False
+            )
+            # Keep every chunk on the same schema so partition files can be appended
+            for column, arrow_type in NULLABLE_VISIT_TYPES.items():
+                index = table.schema.get_field_index(column)
+                if index >= 0 and table.schema.field(index).type != arrow_type:
+                    table = table.set_column(index, column, table.column(index).cast(arrow_type))
+            writer = self._partition_writers.get(key)
+            if writer is None:
+                part_dir = self.output_dir / PARTITIONED_VISITS_DIR
+                for column, value in zip(self.visit_partitioning, key):
+                    part_dir = part_dir / f"{column}={value}"
+                part_dir.mkdir(parents=True, exist_ok=True)
+                writer = pq.ParquetWriter(part_dir / 'part-0.parquet', table.schema)
+                self._partition_writers[key] = writer
+            writer.write_table(table)
+    
+    def _close_partition_writers(self) -> None:
+        """Close all open partition file writers."""
+        for writer in self._partition_writers.values():
+            writer.close()
+        self._partition_writers = {}
+    
     def _write_metadata(self, raw_results: Any, write_time_seconds: float) -> None:
         """Write simulation metadata."""
         metadata = {
@@ -329,7 +417,8 @@ class ParquetWriter:
             'std_final_vision': raw_results.final_vision_std,
             'discontinuation_rate': raw_results.discontinuation_rate,
             'write_time_seconds': write_time_seconds,
-            'chunk_size': self.chunk_size
+            'chunk_size': self.chunk_size,
+            'visit_partitioning': ','.join(self.visit_partitioning)
         }
         
         # Check if resource tracking data is available
@@ -382,32 +471,12 @@ class ParquetWriter:
         with open(self.output_dir / 'bottlenecks.json', 'w') as f:
             json.dump(bottleneck_data, f, indent=2)
         
-        # Write daily usage data
-        daily_usage_data = []
-        for date in resource_tracker.get_all_dates_with_visits():
-            daily_usage_data.append({
-                'date': date.isoformat(),
-                'usage': dict(resource_tracker.daily_usage[date])
-            })
-        
-        daily_usage_df = pd.DataFrame(daily_usage_data)
+        # Write daily usage (one column per role) and visits with costs
+        # straight from the tracker's columns
+        daily_usage_df = resource_tracker.daily_usage_frame()
         if not daily_usage_df.empty:
             daily_usage_df.to_parquet(self.output_dir / 'daily_resource_usage.parquet', index=False)
         
-        # Write visits with costs
-        visit_records = []
-        for visit in resource_tracker.visits:
-            record = {
-                'date': visit['date'].isoformat(),
-                'patient_id': visit['patient_id'],
-                'visit_type': visit['visit_type'],
-                'injection_given': visit['injection_given'],
-                'oct_performed': visit['oct_performed'],
-                'total_cost': sum(visit['costs'].values()),
-                **visit['costs']  # Include individual cost components
-            }
-            visit_records.append(record)
-        
-        if visit_records:
-            visits_with_costs_df = pd.DataFrame(visit_records)
+        visits_with_costs_df = resource_tracker.visits_frame()
+        if not visits_with_costs_df.empty:
             visits_with_costs_df.to_parquet(self.output_dir / 'visits_with_costs.parquet', index=False)
\ No newline at end of file
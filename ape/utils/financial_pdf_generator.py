@@ -39,13 +39,15 @@ class HRFlowable(Flowable):
 
 
 def generate_financial_parameters_pdf(resource_config: Optional[Dict[str, Any]] = None,
-                                    resource_config_path: Optional[Path] = None) -> bytes:
+                                    resource_config_path: Optional[Path] = None,
+                                    generated_at: Optional[datetime] = None) -> bytes:
     """
     Generate a PDF report for financial/resource parameters.
     
     Args:
         resource_config: Resource configuration dictionary (takes precedence)
         resource_config_path: Path to resource configuration file
+        generated_at: Time printed on the report (default: now)
         
     Returns:
         PDF file as bytes
@@ -119,7 +121,7 @@ def generate_financial_parameters_pdf(resource_config: Optional[Dict[str, Any]]
     
     # Metadata
     metadata = [
-        ["Generated:", datetime.now().strftime("%Y-%m-%d %H:%M")],
+        ["Generated:", (generated_at or datetime.now()).strftime("%Y-%m-%d %H:%M")],
         ["Configuration:", "NHS Standard Resources"],
         ["Purpose:", "Economic analysis of anti-VEGF treatment protocols"],
     ]
@@ -19,10 +19,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
-# For creating distribution plots
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
+from ape.utils.report_rendering import FigureJob, render_figure
 
 
 class HRFlowable(Flowable):
@@ -73,13 +70,14 @@ def load_parameter_file(spec, file_attr: str, base_path: Optional[Path] = None)
         return None
 
 
-def generate_protocol_pdf(spec, is_time_based: bool) -> bytes:
+def generate_protocol_pdf(spec, is_time_based: bool, generated_at: Optional[datetime] = None) -> bytes:
     """
     Generate a PDF report for a protocol specification.
     
     Args:
         spec: Protocol specification object
         is_time_based: Whether this is a time-based protocol
+        generated_at: Time printed on the report (default: now)
         
     Returns:
         PDF file as bytes
@@ -138,7 +136,7 @@ def generate_protocol_pdf(spec, is_time_based: bool) -> bytes:
     
     # Metadata
     metadata = [
-        ["Generated:", datetime.now().strftime("%Y-%m-%d %H:%M")],
+        ["Generated:", (generated_at or datetime.now()).strftime("%Y-%m-%d %H:%M")],
         ["Protocol Type:", "Time-Based" if is_time_based else "Visit-Based"],
         ["Version:", spec.version],
         ["Author:", getattr(spec, 'author', 'Not specified')],
@@ -302,27 +300,22 @@ def generate_protocol_pdf(spec, is_time_based: bool) -> bytes:
             try:
                 from ape.utils.vision_distribution_viz import create_compact_vision_distribution_plot
                 
-                # Create the plot
-                fig = create_compact_vision_distribution_plot(
-                    dist if isinstance(dist, dict) else {
+                # Render the plot (cached by distribution, so re-exports don't redraw it)
+                png = render_figure(FigureJob(
+                    create_compact_vision_distribution_plot,
+                    (dist if isinstance(dist, dict) else {
                         'type': getattr(dist, 'name', 'normal').lower(),
                         'mean': getattr(dist, 'mean', 70),
                         'std': getattr(dist, 'std', 10),
                         'min': getattr(dist, 'min_value', 20),
                         'max': getattr(dist, 'max_value', 90)
-                    },
-                    figsize=(3, 2),
-                    show_stats=False
-                )
-                
-                # Save to temporary buffer
-                img_buffer = io.BytesIO()
-                fig.savefig(img_buffer, format='png', bbox_inches='tight', pad_inches=0.1)
-                img_buffer.seek(0)
-                plt.close(fig)
+                    },),
+                    {'figsize': (3, 2), 'show_stats': False},
+                    dpi=100
+                ))
                 
                 # Create image flowable
-                img = Image(img_buffer, width=3*inch, height=2*inch)
+                img = Image(io.BytesIO(png), width=3*inch, height=2*inch)
                 
                 # Create two-column layout
                 dist_col_data = [[param_table, img]]
@@ -0,0 +1,210 @@
+"""
+Cached rendering of report figures and documents.
+
+Streamlit reruns the whole page on every interaction, and a download
+button needs its bytes up front, so report exports used to rebuild every
+matplotlib figure and reportlab document on each rerun. This module
+keys rendered assets by a content hash of their inputs:
+
+- FigureJob describes a figure (a module-level builder function returning
+  a matplotlib Figure, its arguments and the output format). Rendered
+  PNG/SVG bytes are cached by the hash of all of these, so the same
+  chart of the same data is drawn once.
+- render_figures renders the uncached jobs of a batch in a process pool,
+  so reports with many figures are not drawn serially.
+- cached_report caches whole documents (e.g. generate_workload_results_pdf
+  output) by the hash of the generator's arguments. Generators that print
+  a generation time take it as an argument (generated_at), so the stamp
+  is part of the key rather than frozen at the first render.
+
+Example usage:
+    job = FigureJob(create_compact_vision_distribution_plot, (dist,), {'figsize': (3, 2)})
+    png = render_figure(job)
+    pdf = cached_report(generate_workload_results_pdf, simulation_info=..., generated_at=report_time(), ...)
+"""
+
+import hashlib
+import io
+import json
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import PurePath
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Rendered assets kept in memory, per kind
+MAX_CACHED_FIGURES = 256
+MAX_CACHED_REPORTS = 32
+
+_figures: 'OrderedDict[str, bytes]' = OrderedDict()
+_reports: 'OrderedDict[str, bytes]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def _encode(value: Any) -> Any:
+    """JSON encoding of values json can't serialize, stable across processes."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return {'pandas': hashlib.sha256(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()).hexdigest(),
+                'columns': [str(c) for c in value.columns] if isinstance(value, pd.DataFrame) else str(value.name)}
+    if isinstance(value, np.ndarray):
+        return {'array': hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest(),
+                'dtype': str(value.dtype), 'shape': value.shape}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, PurePath):
+        return str(value)
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    # A repr may hide content (or carry an id), so unknown types must be
+    # converted by the caller or replaced with an explicit cache_key
+    raise TypeError(f"Cannot hash {type(value).__name__} for a render cache key")
+
+
+def content_hash(*parts: Any) -> str:
+    """
+    sha256 of the canonical JSON encoding of parts (dicts, lists, arrays, DataFrames, ...).
+
+    Raises:
+        TypeError: If a part contains a type without a stable encoding
+    """
+    encoded = json.dumps(parts, sort_keys=True, default=_encode)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class FigureJob:
+    """
+    A figure to render.
+
+    Attributes:
+        builder: Module-level function returning a matplotlib Figure (it
+            must be importable by worker processes)
+        args: Positional arguments of builder
+        kwargs: Keyword arguments of builder
+        fmt: 'png' or 'svg'
+        dpi: Resolution of raster output
+        savefig_kwargs: Extra savefig options (e.g. bbox_inches)
+    """
+    builder: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    fmt: str = 'png'
+    dpi: int = 150
+    savefig_kwargs: Dict[str, Any] = field(default_factory=lambda: {'bbox_inches': 'tight', 'pad_inches': 0.1})
+
+    @property
+    def key(self) -> str:
+        return content_hash(self.builder, self.args, self.kwargs, self.fmt, self.dpi, self.savefig_kwargs)
+
+
+def _render(job: FigureJob) -> bytes:
+    """Draw a figure and return its bytes (runs in workers too)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = job.builder(*job.args, **job.kwargs)
+    try:
+        buffer = io.BytesIO()
+        # No creation date or random element ids in SVGs, so equal inputs give equal bytes
+        metadata = {'Date': None} if job.fmt == 'svg' else None
+        with matplotlib.rc_context({'svg.hashsalt': job.key}):
+            fig.savefig(buffer, format=job.fmt, dpi=job.dpi, metadata=metadata, **job.savefig_kwargs)
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def _remember(cache: 'OrderedDict[str, bytes]', key: str, value: bytes, limit: int) -> None:
+    with _lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+
+def _recall(cache: 'OrderedDict[str, bytes]', key: str) -> Optional[bytes]:
+    with _lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def render_figures(jobs: Sequence[FigureJob], max_workers: Optional[int] = 0) -> List[bytes]:
+    """
+    Rendered bytes of each job, drawing only those not in the cache.
+
+    Args:
+        jobs: Figures to render
+        max_workers: Worker processes for uncached figures (None: CPU
+            count - 1, 0: render in this process)
+
+    Returns:
+        Bytes per job, in order
+    """
+    keys = [job.key for job in jobs]
+    rendered = {key: _recall(_figures, key) for key in keys}
+    missing = {key: job for key, job in zip(keys, jobs) if rendered[key] is None}
+
+    if max_workers is None:
+        max_workers = max(1, multiprocessing.cpu_count() - 1)
+    if max_workers == 0 or len(missing) <= 1:
+        images = [_render(job) for job in missing.values()]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            images = list(executor.map(_render, missing.values()))
+
+    for key, image in zip(missing, images):
+        _remember(_figures, key, image, MAX_CACHED_FIGURES)
+        rendered[key] = image
+    return [rendered[key] for key in keys]
+
+
+def render_figure(job: FigureJob) -> bytes:
+    """Rendered bytes of one figure, from the cache when its inputs are unchanged."""
+    return render_figures([job])[0]
+
+
+def cached_report(generator: Callable[..., bytes], *args: Any, cache_key: Any = None, **kwargs: Any) -> bytes:
+    """
+    Output of a report generator, regenerated only when its arguments change.
+
+    Args:
+        generator: Function returning the document bytes (e.g. a PDF)
+        *args, **kwargs: Arguments of generator
+        cache_key: Identifies the report content instead of the arguments,
+            for inputs the arguments don't capture (e.g. files a protocol
+            specification refers to)
+
+    Returns:
+        Document bytes
+    """
+    key = content_hash(generator, args, kwargs) if cache_key is None else content_hash(generator, cache_key)
+    report = _recall(_reports, key)
+    if report is None:
+        report = generator(*args, **kwargs)
+        _remember(_reports, key, report, MAX_CACHED_REPORTS)
+    return report
+
+
+def report_time() -> datetime:
+    """Current time at the minute resolution reports print, for generated_at."""
+    return datetime.now().replace(second=0, microsecond=0)
+
+
+def clear_render_cache() -> None:
+    """Drop all cached figures and reports."""
+    with _lock:
+        _figures.clear()
+        _reports.clear()
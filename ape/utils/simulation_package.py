@@ -5,16 +5,20 @@ Manages the creation and import of portable simulation packages for APE V2.
 Implements secure package handling with data integrity validation.
 """
 
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Union, BinaryIO
+import io
+import os
 import zipfile
 import json
 import hashlib
-import tempfile
 import shutil
 from pathlib import Path
 from datetime import datetime
 import logging
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +74,24 @@ class SimulationPackageError(Exception):
         super().__init__(message)
 
 
+class _HashingWriter(io.RawIOBase):
+    """Write-through file wrapper that hashes everything written to it."""
+    
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self._hash = hashlib.sha256()
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._hash.update(data)
+        return self._raw.write(data)
+    
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
 class SimulationPackageManager:
     """Manages export/import of simulation packages"""
     
@@ -92,6 +114,7 @@ class SimulationPackageManager:
     MAX_FILE_COUNT = 1000  # Maximum files in package
     MAX_PATH_DEPTH = 10  # Maximum directory depth
     MAX_MANIFEST_SIZE = 1_000_000  # 1MB max for manifest
+    STREAM_CHUNK_SIZE = 1024 * 1024  # 1MB copy buffer for streaming members
     ALLOWED_EXTENSIONS = {'.parquet', '.json', '.yaml', '.txt'}
     DISALLOWED_FILENAMES = {'con', 'prn', 'aux', 'nul', 'com1', 'com2', 'com3', 'com4', 
                           'com5', 'com6', 'com7', 'com8', 'com9', 'lpt1', 'lpt2', 
@@ -99,103 +122,158 @@ class SimulationPackageManager:
     
     def create_package(self, results: 'SimulationResults', 
                       output_path: Optional[Path] = None) -> bytes:
-        """Create simulation package from results"""
-        logger.info(f"Creating package for simulation {results.metadata.sim_id}")
+        """
+        Create simulation package from results.
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Extract duration info from sim_id if available (new format has duration encoding)
-            sim_id_parts = results.metadata.sim_id.split('_')
-            if len(sim_id_parts) >= 4:  # New format: sim_TIMESTAMP_DURATION_NAME
-                duration_code = sim_id_parts[2]  # YY-FF format
-                memorable_name = '_'.join(sim_id_parts[3:])  # Rejoin name parts
-                package_name = f"APE_sim_{sim_id_parts[1]}_{duration_code}_{memorable_name}.zip"
-            else:
-                # Old format fallback
-                package_name = f"APE_simulation_{results.metadata.sim_id}_{datetime.now().strftime('%Y%m%d')}.zip"
-                
-            package_path = temp_path / package_name
-            
-            # Create package structure
-            files = self._prepare_package_files(results, temp_path)
-            
-            # Generate manifest with checksums
-            manifest = self._generate_manifest(results.metadata.sim_id, files)
-            manifest_path = temp_path / "manifest.json"
-            with open(manifest_path, 'w') as f:
-                json.dump(manifest, f, indent=2)
-            
-            # Create ZIP package
-            with zipfile.ZipFile(package_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
-                # Add manifest
-                zf.write(manifest_path, "manifest.json")
-                
-                # Add all package files
-                for archive_path, file_path in files.items():
-                    if file_path.exists():
-                        zf.write(file_path, archive_path)
-                
-                # Add README
-                readme_content = self._generate_readme(results)
-                zf.writestr("README.txt", readme_content)
-            
-            # Read package data
-            with open(package_path, 'rb') as f:
-                package_data = f.read()
-            
-            logger.info(f"Package created successfully, size: {len(package_data)} bytes")
-            return package_data
-    
-    def import_package(self, package_data: bytes) -> 'SimulationResults':
-        """Import simulation package"""
-        logger.info(f"Importing package, size: {len(package_data)} bytes")
+        The archive is streamed straight from the results directory into an
+        in-memory buffer. Use write_package() to stream to disk instead when
+        the package does not need to be held in memory (e.g. large exports).
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            package_path = temp_path / "package.zip"
+        Args:
+            results: Simulation results to package
+            output_path: Optional path to also write the package to
             
-            # Write package data to temp file
-            with open(package_path, 'wb') as f:
+        Returns:
+            Package ZIP archive as bytes
+        """
+        logger.info(f"Creating package for simulation {results.metadata.sim_id}")
+        
+        buffer = io.BytesIO()
+        self.write_package(results, buffer)
+        package_data = buffer.getvalue()
+        
+        if output_path is not None:
+            with open(output_path, 'wb') as f:
                 f.write(package_data)
-            
-            # Validate security
-            self._validate_security(package_path)
-            
-            # Validate structure
-            validation_result = self.validate_package(package_path)
-            if not validation_result["valid"]:
-                raise PackageValidationError(f"Invalid package structure: {validation_result['errors']}")
-            
-            # Extract and load simulation results
-            extract_path = temp_path / "extracted"
-            extract_path.mkdir()
-            
-            with zipfile.ZipFile(package_path, 'r') as zf:
-                zf.extractall(extract_path)
-            
+        
+        logger.info(f"Package created successfully, size: {len(package_data)} bytes")
+        return package_data
+    
+    def write_package(self, results: 'SimulationResults',
+                      destination: Union[Path, BinaryIO]) -> Dict[str, Any]:
+        """
+        Stream a simulation package into a file or binary file object.
+        
+        Source files are copied into the archive in fixed-size chunks and
+        checksummed while they are written, so no temporary copies are made.
+        Parquet files are already compressed and are stored (ZIP_STORED);
+        everything else is deflated.
+        
+        Args:
+            results: Simulation results to package
+            destination: Output path or writable binary file object
+            
+        Returns:
+            The manifest written into the package
+        """
+        files = self._prepare_package_files(results)
+        checksums = {}
+        
+        with zipfile.ZipFile(destination, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            # Data files first - checksums are only known once they are written
+            for archive_path, source in files.items():
+                checksums[archive_path] = self._write_member(zf, archive_path, source)
+            
+            # Manifest is written last; the central directory makes order irrelevant
+            manifest = self._generate_manifest(results.metadata.sim_id, files, checksums)
+            zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+            zf.writestr("README.txt", self._generate_readme(results))
+        
+        return manifest
+    
+    def _write_member(self, zf: zipfile.ZipFile, archive_path: str,
+                      source: Union[Path, bytes, ds.Dataset]) -> str:
+        """Write one package member, returning its SHA256 checksum."""
+        compress_type = (zipfile.ZIP_STORED if archive_path.endswith('.parquet')
+                         else zipfile.ZIP_DEFLATED)
+        
+        if isinstance(source, ds.Dataset):
+            # Partitioned dataset: re-encode batch by batch into a single file
+            info = zipfile.ZipInfo(archive_path, date_time=datetime.now().timetuple()[:6])
+            info.compress_type = compress_type
+            with zf.open(info, 'w', force_zip64=True) as dst:
+                sink = _HashingWriter(dst)
+                with pq.ParquetWriter(pa.PythonFile(sink, mode='w'), source.schema) as writer:
+                    for batch in source.to_batches():
+                        writer.write_batch(batch)
+            return sink.hexdigest()
+        
+        if isinstance(source, bytes):
+            info = zipfile.ZipInfo(archive_path, date_time=datetime.now().timetuple()[:6])
+            info.compress_type = compress_type
+            zf.writestr(info, source)
+            return hashlib.sha256(source).hexdigest()
+        
+        info = zipfile.ZipInfo.from_file(source, archive_path)
+        info.compress_type = compress_type
+        file_hash = hashlib.sha256()
+        with open(source, 'rb') as src, zf.open(info, 'w') as dst:
+            for chunk in iter(lambda: src.read(self.STREAM_CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+                dst.write(chunk)
+        return file_hash.hexdigest()
+    
+    def import_package(self, package_data: Union[bytes, BinaryIO, Path]) -> 'SimulationResults':
+        """
+        Import simulation package.
+        
+        Members are validated and read directly from the archive. Bytes are
+        wrapped rather than written to disk, and file objects (such as
+        Streamlit uploads) and paths are read in place, so the upload is never
+        buffered a second time.
+        
+        Args:
+            package_data: Package as bytes, a seekable binary file object or a path
+            
+        Returns:
+            The imported simulation results
+        """
+        package = self._open_package_source(package_data)
+        if isinstance(package_data, bytes):
+            logger.info(f"Importing package, size: {len(package_data)} bytes")
+        else:
+            logger.info("Importing package")
+        
+        # Validate security
+        self._validate_security(package)
+        
+        # Validate structure
+        validation_result = self.validate_package(package)
+        if not validation_result["valid"]:
+            raise PackageValidationError(f"Invalid package structure: {validation_result['errors']}")
+        
+        with zipfile.ZipFile(package, 'r') as zf:
             # Load manifest with size limit
-            manifest_path = extract_path / "manifest.json"
-            if manifest_path.stat().st_size > self.MAX_MANIFEST_SIZE:
-                raise SecurityError("Manifest file too large")
-            
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
+            manifest = self._read_manifest(zf)
             
             # Validate manifest structure and content
             self._validate_manifest(manifest)
             
-            # Validate checksums
-            self._validate_checksums(extract_path, manifest.get("file_checksums", {}))
-            
-            # Load simulation results
-            results = self._load_simulation_from_package(extract_path, manifest)
-            
-            logger.info(f"Package imported successfully for simulation {results.metadata.sim_id}")
-            return results
+            # Load simulation results (checksums are validated while extracting)
+            results = self._load_simulation_from_package(zf, manifest)
+        
+        logger.info(f"Package imported successfully for simulation {results.metadata.sim_id}")
+        return results
     
-    def validate_package(self, package_path: Path) -> Dict[str, Any]:
-        """Validate package structure and integrity"""
+    @staticmethod
+    def _open_package_source(package_data: Union[bytes, BinaryIO, Path]) -> Union[BinaryIO, Path]:
+        """Normalise package input to something zipfile can open without copying."""
+        if isinstance(package_data, (bytes, bytearray, memoryview)):
+            return io.BytesIO(package_data)
+        if isinstance(package_data, (str, Path)):
+            return Path(package_data)
+        if hasattr(package_data, 'seek'):
+            package_data.seek(0)
+        return package_data
+    
+    def _read_manifest(self, zf: zipfile.ZipFile) -> Dict[str, Any]:
+        """Read manifest.json from an open package, enforcing the size limit."""
+        if zf.getinfo("manifest.json").file_size > self.MAX_MANIFEST_SIZE:
+            raise SecurityError("Manifest file too large")
+        return json.loads(zf.read("manifest.json"))
+    
+    def validate_package(self, package_path: Union[Path, BinaryIO]) -> Dict[str, Any]:
+        """Validate package structure and integrity (path or binary file object)"""
         try:
             with zipfile.ZipFile(package_path, 'r') as zf:
                 files_in_package = set(zf.namelist())
@@ -228,9 +306,10 @@ class SimulationPackageManager:
                 "files_found": []
             }
     
-    def _generate_manifest(self, sim_id: str, files: Dict[str, Path]) -> Dict[str, Any]:
-        """Generate package manifest with checksums"""
-        file_checksums = self._calculate_checksums(files)
+    def _generate_manifest(self, sim_id: str, files: Dict[str, Union[Path, bytes]],
+                           checksums: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Generate package manifest with checksums (computed if not supplied)"""
+        file_checksums = checksums if checksums is not None else self._calculate_checksums(files)
         
         manifest = {
             "package_version": self.PACKAGE_VERSION,
@@ -243,21 +322,25 @@ class SimulationPackageManager:
         
         return manifest
     
-    def _calculate_checksums(self, files: Dict[str, Path]) -> Dict[str, str]:
-        """Calculate SHA256 checksums for all files"""
+    def _calculate_checksums(self, files: Dict[str, Union[Path, bytes]]) -> Dict[str, str]:
+        """Calculate SHA256 checksums for all files, reading in chunks"""
         checksums = {}
         
-        for archive_path, file_path in files.items():
-            if file_path.exists():
-                with open(file_path, 'rb') as f:
-                    file_hash = hashlib.sha256(f.read()).hexdigest()
-                    checksums[archive_path] = file_hash
+        for archive_path, source in files.items():
+            if isinstance(source, bytes):
+                checksums[archive_path] = hashlib.sha256(source).hexdigest()
+            elif source.exists():
+                file_hash = hashlib.sha256()
+                with open(source, 'rb') as f:
+                    for chunk in iter(lambda: f.read(self.STREAM_CHUNK_SIZE), b''):
+                        file_hash.update(chunk)
+                checksums[archive_path] = file_hash.hexdigest()
             else:
-                logger.warning(f"File not found for checksum calculation: {file_path}")
+                logger.warning(f"File not found for checksum calculation: {source}")
         
         return checksums
     
-    def _validate_security(self, package_path: Path) -> None:
+    def _validate_security(self, package_path: Union[Path, BinaryIO]) -> None:
         """Validate package for security concerns"""
         try:
             with zipfile.ZipFile(package_path, 'r') as zf:
@@ -449,43 +532,39 @@ class SimulationPackageManager:
         if re.search(r'[<>\'";]', sim_id):
             raise SecurityError("Invalid characters in sim_id")
     
-    def _prepare_package_files(self, results: 'SimulationResults', temp_path: Path) -> Dict[str, Path]:
-        """Prepare files for packaging with real simulation data"""
-        files = {}
-        data_dir = temp_path / "data"
-        data_dir.mkdir(exist_ok=True)
+    def _prepare_package_files(self, results: 'SimulationResults') -> Dict[str, Union[Path, bytes]]:
+        """
+        Collect package members without copying simulation data.
+        
+        Returns a mapping of archive path to either the source file on disk
+        (streamed into the archive later) or the bytes of a small generated file.
+        """
+        files: Dict[str, Union[Path, bytes]] = {}
         
         try:
-            # Export real parquet data files
-            logger.info("Exporting simulation data to parquet files...")
+            logger.info("Collecting simulation data files...")
             
-            # 1. Patients data  
-            # All results are ParquetResults now - copy the existing parquet file
+            # 1. Patients data - streamed from the existing parquet file
             source_patients_path = results.data_path / "patients.parquet"
-            if source_patients_path.exists():
-                patients_path = data_dir / "patients.parquet"
-                shutil.copy2(source_patients_path, patients_path)
-                files["data/patients.parquet"] = patients_path
-                
-                # Read to get count for logging
-                patients_df = pd.read_parquet(patients_path)
-                logger.info(f"Exported {len(patients_df):,} patients")
-            else:
+            if not source_patients_path.exists():
                 raise PackageValidationError("Patients parquet file not found")
-            
-            # 2. Visits data
-            # Copy existing visits.parquet file
-            source_visits_path = results.data_path / "visits.parquet"
-            if source_visits_path.exists():
-                visits_path = data_dir / "visits.parquet"
-                shutil.copy2(source_visits_path, visits_path)
-                files["data/visits.parquet"] = visits_path
-                
-                # Read to get count for logging
-                visits_df = pd.read_parquet(visits_path)
-                logger.info(f"Exported {len(visits_df):,} visits")
+            files["data/patients.parquet"] = source_patients_path
+            patient_count = pq.ParquetFile(source_patients_path).metadata.num_rows
+            logger.info(f"Exporting {patient_count:,} patients")
+            
+            # 2. Visits data - streamed from the existing parquet file, or
+            # consolidated batch by batch from a partitioned visits dataset
+            reader = getattr(results, 'reader', None)
+            if reader is not None and reader.is_partitioned:
+                files["data/visits.parquet"] = reader.visits_dataset
+                visit_count = reader.visits_dataset.count_rows()
             else:
-                raise PackageValidationError("Visits parquet file not found")
+                source_visits_path = results.data_path / "visits.parquet"
+                if not source_visits_path.exists():
+                    raise PackageValidationError("Visits parquet file not found")
+                files["data/visits.parquet"] = source_visits_path
+                visit_count = pq.ParquetFile(source_visits_path).metadata.num_rows
+            logger.info(f"Exporting {visit_count:,} visits")
             
             # 3. Metadata parquet (simulation metadata as single-row dataframe)
             metadata_dict = {
@@ -501,48 +580,25 @@ class SimulationPackageManager:
                 'storage_type': [results.metadata.storage_type],
                 'memorable_name': [results.metadata.memorable_name]
             }
+            files["data/metadata.parquet"] = self._to_parquet_bytes(pd.DataFrame(metadata_dict))
             
-            metadata_df = pd.DataFrame(metadata_dict)
-            metadata_path = data_dir / "metadata.parquet"
-            metadata_df.to_parquet(metadata_path, compression='snappy')
-            files["data/metadata.parquet"] = metadata_path
+            # 4. Patient index - reuse the one written with the simulation if present
+            source_index_path = results.data_path / "patient_index.parquet"
+            if source_index_path.exists():
+                files["data/patient_index.parquet"] = source_index_path
+            else:
+                try:
+                    index_df = pd.read_parquet(source_patients_path, columns=['patient_id'])
+                except Exception as e:
+                    logger.warning(f"Could not create patient index: {e}")
+                    index_df = pd.DataFrame({'patient_id': range(patient_count)})
+                files["data/patient_index.parquet"] = self._to_parquet_bytes(index_df)
             
-            # 4. Patient index (if available - for large parquet simulations)
-            try:
-                # For ParquetResults, there might be a patient index
-                if hasattr(results, 'get_patient_index'):
-                    patient_index_df = results.get_patient_index()
-                    index_path = data_dir / "patient_index.parquet"
-                    patient_index_df.to_parquet(index_path, compression='snappy')
-                    files["data/patient_index.parquet"] = index_path
-                else:
-                    # Create a simple index from patients data
-                    if not patients_df.empty:
-                        # Use patient_id column if available, otherwise index
-                        if 'patient_id' in patients_df.columns:
-                            index_df = patients_df[['patient_id']].reset_index(drop=True)
-                        else:
-                            index_df = pd.DataFrame({'patient_id': patients_df.index})
-                        
-                        index_path = data_dir / "patient_index.parquet"
-                        index_df.to_parquet(index_path, compression='snappy')
-                        files["data/patient_index.parquet"] = index_path
-            except Exception as e:
-                logger.warning(f"Could not create patient index: {e}")
-                # Create minimal index file
-                minimal_index = pd.DataFrame({'patient_id': range(len(patients_df))})
-                index_path = data_dir / "patient_index.parquet"
-                minimal_index.to_parquet(index_path, compression='snappy')
-                files["data/patient_index.parquet"] = index_path
-            
-            # 5. Protocol YAML - copy the full protocol specification
+            # 5. Protocol YAML - the full protocol specification
             source_protocol_path = results.data_path / "protocol.yaml"
             if source_protocol_path.exists():
-                # Copy the full protocol spec that was saved with the simulation
-                protocol_path = temp_path / "protocol.yaml"
-                shutil.copy2(source_protocol_path, protocol_path)
-                files["protocol.yaml"] = protocol_path
-                logger.info("Copied full protocol specification from simulation data")
+                files["protocol.yaml"] = source_protocol_path
+                logger.info("Using full protocol specification from simulation data")
             else:
                 # This should not happen for new simulations, but handle gracefully
                 logger.warning("Protocol.yaml not found in simulation data, creating minimal version")
@@ -551,12 +607,10 @@ class SimulationPackageManager:
                     'version': results.metadata.protocol_version,
                     '_note': 'Full protocol specification was not saved with this simulation.'
                 }
-                
-                protocol_path = temp_path / "protocol.yaml"
                 import yaml
-                with open(protocol_path, 'w') as f:
-                    yaml.dump(protocol_data, f, default_flow_style=False, sort_keys=False)
-                files["protocol.yaml"] = protocol_path
+                files["protocol.yaml"] = yaml.dump(
+                    protocol_data, default_flow_style=False, sort_keys=False
+                ).encode('utf-8')
             
             # 6. Parameters JSON
             params_data = {
@@ -566,19 +620,12 @@ class SimulationPackageManager:
                 'seed': results.metadata.seed,
                 'runtime_seconds': results.metadata.runtime_seconds
             }
+            files["parameters.json"] = json.dumps(params_data, indent=2).encode('utf-8')
             
-            params_path = temp_path / "parameters.json"
-            with open(params_path, 'w') as f:
-                json.dump(params_data, f, indent=2)
-            files["parameters.json"] = params_path
-            
-            # 7. Summary statistics
-            # Copy existing summary_stats.json (all ParquetResults have this)
+            # 7. Summary statistics (all ParquetResults have this)
             source_stats_path = results.data_path / "summary_stats.json"
             if source_stats_path.exists():
-                stats_path = data_dir / "summary_stats.json"
-                shutil.copy2(source_stats_path, stats_path)
-                files["data/summary_stats.json"] = stats_path
+                files["data/summary_stats.json"] = source_stats_path
             else:
                 # This shouldn't happen with ParquetResults, but create it just in case
                 logger.warning("summary_stats.json not found, creating from results data")
@@ -591,10 +638,7 @@ class SimulationPackageManager:
                     'discontinuation_rate': results.get_discontinuation_rate(),
                     'patient_count': results.get_patient_count()
                 }
-                stats_path = data_dir / "summary_stats.json"
-                with open(stats_path, 'w') as f:
-                    json.dump(stats_data, f, indent=2)
-                files["data/summary_stats.json"] = stats_path
+                files["data/summary_stats.json"] = json.dumps(stats_data, indent=2).encode('utf-8')
             
             # 8. Audit log - REQUIRED
             source_audit_path = results.data_path / "audit_log.json"
@@ -603,12 +647,7 @@ class SimulationPackageManager:
                     f"Simulation {results.metadata.sim_id} has no audit log. "
                     "All simulations must have audit logs."
                 )
-            
-            # Copy the audit log
-            audit_path = temp_path / "audit_log.json"
-            shutil.copy2(source_audit_path, audit_path)
-            files["audit_log.json"] = audit_path
-            logger.info("Copied audit log from simulation data")
+            files["audit_log.json"] = source_audit_path
             
             logger.info(f"Prepared {len(files)} files for packaging")
             return files
@@ -617,6 +656,13 @@ class SimulationPackageManager:
             logger.error(f"Failed to prepare package files: {e}")
             raise PackageValidationError(f"Could not prepare simulation data for packaging: {e}")
     
+    @staticmethod
+    def _to_parquet_bytes(df: pd.DataFrame) -> bytes:
+        """Serialise a small DataFrame to Parquet bytes."""
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, compression='snappy')
+        return buffer.getvalue()
+    
     def _generate_readme(self, results: 'SimulationResults') -> str:
         """Generate human-readable README for package"""
         return f"""APE Simulation Package
@@ -645,33 +691,61 @@ Package Contents:
 For support, please refer to APE documentation.
 """
     
-    def _validate_checksums(self, extract_path: Path, expected_checksums: Dict[str, str]) -> None:
-        """Validate file checksums after extraction"""
+    def _validate_checksums(self, zf: zipfile.ZipFile, expected_checksums: Dict[str, str]) -> None:
+        """Validate member checksums by streaming them from the open package"""
         for file_path, expected_checksum in expected_checksums.items():
-            actual_file_path = extract_path / file_path
-            
-            if not actual_file_path.exists():
-                raise PackageValidationError(f"Missing file after extraction: {file_path}")
-            
-            with open(actual_file_path, 'rb') as f:
-                actual_checksum = hashlib.sha256(f.read()).hexdigest()
-            
-            if actual_checksum != expected_checksum:
-                raise PackageValidationError(f"Checksum mismatch for {file_path}")
+            self._extract_member(zf, file_path, None, expected_checksum)
     
-    def _load_simulation_from_package(self, extract_path: Path, manifest: Dict[str, Any]) -> 'SimulationResults':
-        """Load SimulationResults from extracted package"""
+    def _extract_member(self, zf: zipfile.ZipFile, archive_path: str,
+                        dest_path: Optional[Path], expected_checksum: Optional[str]) -> None:
+        """
+        Stream one member out of the package with bounded memory.
+        
+        The checksum is computed while copying. If dest_path is None the member
+        is only verified. Raises PackageValidationError on a mismatch.
+        """
+        try:
+            info = zf.getinfo(archive_path)
+        except KeyError:
+            raise PackageValidationError(f"Missing file in package: {archive_path}")
+        
+        file_hash = hashlib.sha256()
+        with zf.open(info, 'r') as src:
+            dst = open(dest_path, 'wb') if dest_path is not None else None
+            try:
+                for chunk in iter(lambda: src.read(self.STREAM_CHUNK_SIZE), b''):
+                    file_hash.update(chunk)
+                    if dst is not None:
+                        dst.write(chunk)
+            finally:
+                if dst is not None:
+                    dst.close()
+        
+        if expected_checksum is not None and file_hash.hexdigest() != expected_checksum:
+            raise PackageValidationError(f"Checksum mismatch for {archive_path}")
+    
+    def _load_simulation_from_package(self, zf: zipfile.ZipFile, manifest: Dict[str, Any]) -> 'SimulationResults':
+        """
+        Load SimulationResults from an open package.
+        
+        Members are extracted one at a time into a staging directory next to
+        the results directory, validating checksums as they stream. The files
+        are only moved into place once every member has been verified.
+        """
+        staging_path = None
         try:
             from ape.core.results.base import SimulationMetadata
             from ape.core.results.parquet import ParquetResults
             from ape.core.results.factory import ResultsFactory
-            import shutil
             
-            # Load parquet data files
-            data_dir = extract_path / "data"
+            expected_checksums = manifest.get("file_checksums", {})
             
-            # 1. Load metadata from parquet
-            metadata_df = pd.read_parquet(data_dir / "metadata.parquet")
+            # 1. Load metadata parquet directly from the package (single row)
+            metadata_bytes = zf.read("data/metadata.parquet")
+            expected = expected_checksums.get("data/metadata.parquet")
+            if expected is not None and hashlib.sha256(metadata_bytes).hexdigest() != expected:
+                raise PackageValidationError("Checksum mismatch for data/metadata.parquet")
+            metadata_df = pd.read_parquet(io.BytesIO(metadata_bytes))
             metadata_row = metadata_df.iloc[0]
             
             # 2. Extract original memorable name (if available)
@@ -752,41 +826,44 @@ For support, please refer to APE documentation.
                 memorable_name=new_memorable_name
             )
             
-            # 3. Create destination directory for the imported simulation
-            dest_path = ResultsFactory.DEFAULT_RESULTS_DIR / new_sim_id
-            dest_path.mkdir(parents=True, exist_ok=True)
-            
-            # 4. Copy parquet files to destination
-            for parquet_file in data_dir.glob("*.parquet"):
-                shutil.copy2(parquet_file, dest_path / parquet_file.name)
-            
-            # 5. Copy all other necessary files to preserve complete simulation context
-            # Copy summary_stats.json from data directory
-            summary_stats_path = data_dir / "summary_stats.json"
-            if summary_stats_path.exists():
-                shutil.copy2(summary_stats_path, dest_path / "summary_stats.json")
-            
-            # Copy protocol.yaml (or protocol.json) to preserve protocol configuration
-            protocol_yaml_path = extract_path / "protocol.yaml"
-            protocol_json_path = extract_path / "protocol.json"
-            if protocol_yaml_path.exists():
-                shutil.copy2(protocol_yaml_path, dest_path / "protocol.yaml")
-            elif protocol_json_path.exists():
-                shutil.copy2(protocol_json_path, dest_path / "protocol.json")
-                
-            # Copy parameters.json to preserve simulation parameters
-            params_path = extract_path / "parameters.json"
-            if params_path.exists():
-                shutil.copy2(params_path, dest_path / "parameters.json")
-                
-            # Copy audit_log.json - REQUIRED (preserve as-is)
-            audit_path = extract_path / "audit_log.json"
-            if not audit_path.exists():
+            # 3. Stream members into a staging directory, verifying checksums
+            ResultsFactory.DEFAULT_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+            staging_path = ResultsFactory.DEFAULT_RESULTS_DIR / f".{new_sim_id}.importing"
+            if staging_path.exists():
+                shutil.rmtree(staging_path)
+            staging_path.mkdir()
+            
+            members = {}
+            for name in zf.namelist():
+                # Parquet data files live flat in the simulation directory
+                if name.startswith("data/") and name.count("/") == 1 and name.endswith(".parquet"):
+                    members[name] = Path(name).name
+            members["data/summary_stats.json"] = "summary_stats.json"
+            # Protocol configuration (yaml preferred, json for older packages)
+            if "protocol.yaml" in zf.namelist():
+                members["protocol.yaml"] = "protocol.yaml"
+            elif "protocol.json" in zf.namelist():
+                members["protocol.json"] = "protocol.json"
+            members["parameters.json"] = "parameters.json"
+            # Audit log - REQUIRED (preserved as-is)
+            if "audit_log.json" not in zf.namelist():
                 raise PackageValidationError("Package missing required audit_log.json")
-            shutil.copy2(audit_path, dest_path / "audit_log.json")
+            members["audit_log.json"] = "audit_log.json"
+            
+            for archive_path, file_name in members.items():
+                if archive_path not in zf.namelist():
+                    continue
+                self._extract_member(zf, archive_path, staging_path / file_name,
+                                     expected_checksums.get(archive_path))
+            
+            # Anything else listed in the manifest is verified without extracting
+            self._validate_checksums(zf, {
+                path: checksum for path, checksum in expected_checksums.items()
+                if path not in members
+            })
             logger.info("Preserved original audit log without modifications")
             
-            # Save the new metadata (already cleaned above)
+            # 4. Save the new metadata (already cleaned above)
             metadata_dict = {
                 'sim_id': new_metadata.sim_id,
                 'protocol_name': new_metadata.protocol_name,  # Already cleaned
@@ -801,9 +878,17 @@ For support, please refer to APE documentation.
                 'memorable_name': new_metadata.memorable_name
             }
             
-            with open(dest_path / "metadata.json", 'w') as f:
+            with open(staging_path / "metadata.json", 'w') as f:
                 json.dump(metadata_dict, f, indent=2)
             
+            # 5. Move verified files into place
+            dest_path = ResultsFactory.DEFAULT_RESULTS_DIR / new_sim_id
+            dest_path.mkdir(parents=True, exist_ok=True)
+            for staged_file in staging_path.iterdir():
+                os.replace(staged_file, dest_path / staged_file.name)
+            staging_path.rmdir()
+            staging_path = None
+            
             # 6. Load the ParquetResults from the saved location
             results = ParquetResults.load(dest_path)
             
@@ -811,9 +896,14 @@ For support, please refer to APE documentation.
             
             return results
             
+        except PackageValidationError:
+            raise
         except Exception as e:
             logger.error(f"Failed to load simulation from package: {e}")
             raise PackageValidationError(f"Could not load simulation data from package: {str(e)}")
+        finally:
+            if staging_path is not None and staging_path.exists():
+                shutil.rmtree(staging_path, ignore_errors=True)
 
 
 # Legacy functions for backward compatibility
@@ -829,10 +919,4 @@ def create_simulation_package(
 def validate_package_integrity(package_bytes: bytes) -> Dict[str, Any]:
     """Legacy function - use SimulationPackageManager.validate_package() instead"""
     manager = SimulationPackageManager()
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        package_path = Path(temp_dir) / "package.zip"
-        with open(package_path, 'wb') as f:
-            f.write(package_bytes)
-        
-        return manager.validate_package(package_path)
\ No newline at end of file
+    return manager.validate_package(io.BytesIO(package_bytes))
\ No newline at end of file
@@ -5,8 +5,12 @@ Users can toggle between modes based on their current needs.
 """
 
 import streamlit as st
-import matplotlib.pyplot as plt
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+# matplotlib is imported where a figure is styled, so pages can show the
+# mode selector without loading it
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
 
 
 class VisualizationMode:
@@ -139,7 +143,7 @@ class VisualizationMode:
         return selected
 
 
-def apply_visualization_mode(fig: Optional[plt.Figure] = None) -> Dict[str, Any]:
+def apply_visualization_mode(fig: Optional['plt.Figure'] = None) -> Dict[str, Any]:
     """
     Apply current visualization mode settings.
     
@@ -149,6 +153,8 @@ def apply_visualization_mode(fig: Optional[plt.Figure] = None) -> Dict[str, Any]
     Returns:
         Dictionary of style parameters
     """
+    import matplotlib.pyplot as plt
+
     params = VisualizationMode.get_style_params()
     
     # Base font size
@@ -214,6 +220,7 @@ def mode_aware_figure(title: str,
     apply_visualization_mode()
     
     # Create figure
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=figsize, **kwargs)
     
     # Set title with mode-appropriate styling
@@ -45,7 +45,8 @@ def generate_workload_results_pdf(
     utilization_data: List[Dict[str, Any]],
     staffing_data: List[Dict[str, Any]],
     bottlenecks: List[Dict[str, Any]] = None,
-    patient_outcomes: Optional[Dict[str, Any]] = None
+    patient_outcomes: Optional[Dict[str, Any]] = None,
+    generated_at: Optional[datetime] = None
 ) -> bytes:
     """
     Generate a PDF report for workload and cost results.
@@ -57,6 +58,7 @@ def generate_workload_results_pdf(
         utilization_data: Resource utilization statistics
         staffing_data: Staffing requirements analysis
         bottlenecks: List of capacity bottlenecks (optional)
+        generated_at: Time printed on the report (default: now)
         
     Returns:
         PDF file as bytes
@@ -115,7 +117,7 @@ def generate_workload_results_pdf(
     
     # Simulation metadata
     metadata = [
-        ["Generated:", datetime.now().strftime("%Y-%m-%d %H:%M")],
+        ["Generated:", (generated_at or datetime.now()).strftime("%Y-%m-%d %H:%M")],
         ["Protocol:", simulation_info['protocol']],
         ["Total Patients:", f"{simulation_info['n_patients']:,}"],
         ["Duration:", f"{simulation_info['duration_years']} years"],
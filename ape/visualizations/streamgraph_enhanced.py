@@ -12,6 +12,8 @@ import plotly.graph_objects as go
 from typing import Optional, TYPE_CHECKING
 import streamlit as st
 
+from ape.core.storage import ParquetReader
+
 # Use TYPE_CHECKING to avoid circular imports
 if TYPE_CHECKING:
     from ape.core.results.parquet import ParquetResults
@@ -42,7 +44,7 @@ def calculate_patient_states_enhanced(
         
     # ParquetResults - load from files
     patients_df = pd.read_parquet(_results.data_path / 'patients.parquet')
-    visits_df = pd.read_parquet(_results.data_path / 'visits.parquet')
+    visits_df = ParquetReader(_results.data_path).read_visits(columns=['patient_id', 'time_days'])
     
     # Get max time in days
     if len(visits_df) == 0:
@@ -21,6 +21,7 @@ import json
 from collections import defaultdict
 
 # Import style constants for consistent theming
+from ape.core.storage import ParquetReader
 from ape.utils.style_constants import StyleConstants
 
 
@@ -66,7 +67,7 @@ def extract_patient_states_comprehensive(
     # Load patient and visit data
     if hasattr(results, 'data_path'):
         patients_df = pd.read_parquet(results.data_path / 'patients.parquet')
-        visits_df = pd.read_parquet(results.data_path / 'visits.parquet')
+        visits_df = ParquetReader(results.data_path).read_visits(columns=['patient_id', 'time_days'])
     else:
         raise ValueError("Expected ParquetResults with data_path attribute")
     
@@ -13,6 +13,7 @@ from pathlib import Path
 from typing import Optional
 
 # Import ChartBuilder for consistent styling
+from ape.core.storage import ParquetReader
 from ape.utils.chart_builder import ChartBuilder
 from ape.utils.style_constants import StyleConstants
 
@@ -33,7 +34,7 @@ def calculate_patient_states_simple(
     # ParquetResults - load from files
     # discontinuation_time should already be in days (integer) from ParquetWriter
     patients_df = pd.read_parquet(_results.data_path / 'patients.parquet')
-    visits_df = pd.read_parquet(_results.data_path / 'visits.parquet')
+    visits_df = ParquetReader(_results.data_path).read_visits(columns=['patient_id', 'time_days'])
     
     # Get max time in days
     if len(visits_df) == 0:
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Adaptive calibration search for Eylea parameters.
+
+Instead of simulating every point of a grid at full size, candidates are
+drawn with Latin hypercube or Sobol sampling over continuous ranges and
+screened by successive halving: all candidates are simulated on a small
+cohort, the best 1/eta are promoted to a cohort eta times larger, and so
+on up to the full cohort size. Every candidate in a rung is simulated with
+the same seeds (common random numbers), so differences in score come from
+the parameters rather than from Monte Carlo noise.
+
+Each completed simulation is appended to a JSON-lines store. Re-running
+the same search (same ranges, sampling seed and schedule) skips every
+simulation already in the store, so an interrupted sweep resumes where it
+stopped.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashlib
+import json
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.stats import qmc
+
+from calibration.eylea_calibration_framework import (
+    EyleaCalibrationFramework,
+    ParameterSet,
+    CalibrationResult
+)
+
+# Outcome metrics in the order EyleaCalibrationFramework.analyze_results returns them
+OUTCOME_METRICS = (
+    'vision_gain_year1',
+    'vision_year2',
+    'injections_year1',
+    'injections_year2',
+    'discontinuation_year1',
+    'discontinuation_year2'
+)
+
+SAMPLING_METHODS = ('lhs', 'sobol')
+
+
+@dataclass
+class ParameterBounds:
+    """Continuous range [low, high] for one ParameterSet field."""
+    name: str
+    low: float
+    high: float
+    description: str = ""
+    integer: bool = False
+
+
+def evaluate_candidate(base_protocol_path: str, parameters: Dict[str, Any],
+                       n_patients: int, seed: int) -> Dict[str, float]:
+    """
+    Simulate one candidate and return its outcome metrics.
+
+    Module-level so it can run in a worker process.
+
+    Args:
+        base_protocol_path: Protocol the candidate's overrides apply to
+        parameters: ParameterSet field values
+        n_patients: Cohort size
+        seed: Simulation seed
+
+    Returns:
+        Dict keyed by OUTCOME_METRICS
+    """
+    framework = EyleaCalibrationFramework(base_protocol_path)
+    params = ParameterSet(name="candidate", description="Adaptive calibration candidate", **parameters)
+    result = framework.evaluate_parameters(params, n_patients=n_patients, seed=seed)
+    return {metric: float(getattr(result, metric)) for metric in OUTCOME_METRICS}
+
+
+class CalibrationStore:
+    """Append-only JSON-lines store of simulated outcomes."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self.records: Dict[str, Dict[str, Any]] = {}
+
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Last line of an interrupted write
+                        continue
+                    self.records[record['key']] = record
+
+    @staticmethod
+    def make_key(base_protocol_path: str, parameters: Dict[str, Any], n_patients: int, seed: int) -> str:
+        """Stable key for one simulation."""
+        payload = json.dumps({
+            'protocol': str(base_protocol_path),
+            'parameters': parameters,
+            'n_patients': n_patients,
+            'seed': seed
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        record = self.records.get(key)
+        return record['outcomes'] if record else None
+
+    def put(self, key: str, parameters: Dict[str, Any], n_patients: int, seed: int,
+            outcomes: Dict[str, float]) -> None:
+        """Record a simulation, flushing it to disk immediately."""
+        record = {
+            'key': key,
+            'parameters': parameters,
+            'n_patients': n_patients,
+            'seed': seed,
+            'outcomes': outcomes
+        }
+        self.records[key] = record
+
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab+') as f:
+                # A partial line from an interrupted write must not swallow this record
+                line = (json.dumps(record) + '\n').encode()
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = b'\n' + line
+                f.write(line)
+
+
+class AdaptiveCalibration:
+    """Successive-halving calibration search with common random numbers."""
+
+    def __init__(
+        self,
+        bounds: List[ParameterBounds],
+        base_protocol_path: str = "protocols/v2/eylea_treat_and_extend_v1.0.yaml",
+        store_path: Optional[str] = "calibration/adaptive_calibration_results.jsonl",
+        fixed_parameters: Optional[Dict[str, Any]] = None,
+        evaluator: Callable[[str, Dict[str, Any], int, int], Dict[str, float]] = evaluate_candidate
+    ):
+        """
+        Args:
+            bounds: Ranges to search; names must be ParameterSet fields
+            base_protocol_path: Protocol the candidates are applied to
+            store_path: JSON-lines file for completed simulations (None
+                keeps results in memory only)
+            fixed_parameters: ParameterSet values shared by all candidates
+            evaluator: Module-level function (protocol path, parameters,
+                n_patients, seed) -> outcome metrics
+        """
+        valid_names = {f.name for f in fields(ParameterSet)} - {'name', 'description'}
+        unknown = [b.name for b in bounds if b.name not in valid_names]
+        unknown += [name for name in (fixed_parameters or {}) if name not in valid_names]
+        if unknown:
+            raise ValueError(f"Unknown ParameterSet fields: {unknown}")
+        for b in bounds:
+            if not b.low < b.high:
+                raise ValueError(f"Empty range for {b.name}: [{b.low}, {b.high}]")
+
+        self.bounds = bounds
+        self.base_protocol_path = str(base_protocol_path)
+        self.fixed_parameters = dict(fixed_parameters or {})
+        self.evaluator = evaluator
+        self.store = CalibrationStore(store_path)
+        self.framework = EyleaCalibrationFramework(base_protocol_path)
+
+        # One list of (n_patients, results sorted by score) per rung of the last run
+        self.rungs: List[Tuple[int, List[CalibrationResult]]] = []
+
+    def sample(self, n_candidates: int, method: str = 'lhs', seed: int = 42) -> List[Dict[str, Any]]:
+        """
+        Draw candidate parameter values over the bounds.
+
+        Args:
+            n_candidates: Number of candidates
+            method: 'lhs' (Latin hypercube) or 'sobol' (scrambled Sobol)
+            seed: Sampling seed; the same seed reproduces the same candidates
+
+        Returns:
+            List of parameter dicts, fixed parameters included
+        """
+        if method not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method '{method}'. Valid methods: {SAMPLING_METHODS}")
+
+        dimensions = len(self.bounds)
+        if method == 'lhs':
+            unit = qmc.LatinHypercube(d=dimensions, seed=seed).random(n_candidates)
+        else:
+            # Sobol points are balanced in blocks of 2^m; draw a full block
+            m = max(0, math.ceil(math.log2(n_candidates)))
+            unit = qmc.Sobol(d=dimensions, scramble=True, seed=seed).random_base2(m)[:n_candidates]
+
+        low = np.array([b.low for b in self.bounds], dtype=float)
+        high = np.array([b.high for b in self.bounds], dtype=float)
+        values = qmc.scale(unit, low, high)
+
+        candidates = []
+        for row in values:
+            candidate = dict(self.fixed_parameters)
+            for b, value in zip(self.bounds, row):
+                candidate[b.name] = int(round(value)) if b.integer else float(value)
+            candidates.append(candidate)
+        return candidates
+
+    @staticmethod
+    def rung_sizes(min_patients: int, max_patients: int, eta: int) -> List[int]:
+        """Cohort sizes min_patients * eta^k, ending at max_patients."""
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        if not 0 < min_patients <= max_patients:
+            raise ValueError("Need 0 < min_patients <= max_patients")
+
+        sizes = []
+        n_patients = min_patients
+        while n_patients < max_patients:
+            sizes.append(n_patients)
+            n_patients *= eta
+        sizes.append(max_patients)
+        return sizes
+
+    def run(
+        self,
+        n_candidates: int = 27,
+        min_patients: int = 50,
+        max_patients: int = 450,
+        eta: int = 3,
+        replicates: int = 2,
+        sampling: str = 'lhs',
+        seed: int = 42,
+        max_workers: Optional[int] = None
+    ) -> List[CalibrationResult]:
+        """
+        Run the search.
+
+        Args:
+            n_candidates: Candidates in the first rung
+            min_patients: Cohort size of the first rung
+            max_patients: Cohort size of the last rung
+            eta: Promotion factor; the best 1/eta candidates advance and
+                the cohort grows eta-fold per rung
+            replicates: Seeds per candidate per rung; outcomes are averaged
+            sampling: 'lhs' or 'sobol'
+            seed: Seed for sampling and for the common simulation seeds
+            max_workers: Worker processes (None: CPU count - 1, 0: run in
+                this process)
+
+        Returns:
+            Results of the last rung, best first
+        """
+        candidates = self.sample(n_candidates, method=sampling, seed=seed)
+        # Common random numbers: every candidate uses the same simulation seeds
+        seeds = [seed + r for r in range(replicates)]
+        sizes = self.rung_sizes(min_patients, max_patients, eta)
+
+        if max_workers is None:
+            max_workers = max(1, multiprocessing.cpu_count() - 1)
+
+        self.rungs = []
+        survivors = list(range(len(candidates)))
+        executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 0 else None
+        try:
+            for rung, n_patients in enumerate(sizes):
+                print(f"Rung {rung + 1}/{len(sizes)}: {len(survivors)} candidates x "
+                      f"{len(seeds)} seeds at {n_patients} patients")
+
+                outcomes = self._evaluate(executor, [candidates[i] for i in survivors], n_patients, seeds)
+                results = [
+                    self._score(index, candidates[index], n_patients, candidate_outcomes)
+                    for index, candidate_outcomes in zip(survivors, outcomes)
+                ]
+                ranked = sorted(zip(results, survivors), key=lambda item: (item[0].total_score, item[1]))
+                self.rungs.append((n_patients, [result for result, _ in ranked]))
+
+                print(f"  Best score: {ranked[0][0].total_score:.2f} ({ranked[0][0].parameter_set.name})")
+
+                # Promote the best 1/eta to the next rung
+                n_keep = max(1, math.ceil(len(ranked) / eta))
+                survivors = [index for _, index in ranked[:n_keep]]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return self.rungs[-1][1]
+
+    def simulate(self, candidates: List[Dict[str, Any]], n_patients: int, seeds: List[int],
+                 max_workers: Optional[int] = None) -> List[List[Optional[Dict[str, float]]]]:
+        """
+        Outcomes per candidate per seed, reusing stored simulations.
+
+        Args:
+            candidates: Parameter dicts
+            n_patients: Cohort size
+            seeds: Simulation seeds, shared by all candidates
+            max_workers: Worker processes (None: CPU count - 1, 0: run in
+                this process)
+
+        Returns:
+            outcomes[i][j] for candidate i and seed j (None if it failed)
+        """
+        if max_workers is None:
+            max_workers = max(1, multiprocessing.cpu_count() - 1)
+        if max_workers == 0:
+            return self._evaluate(None, candidates, n_patients, seeds)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return self._evaluate(executor, candidates, n_patients, seeds)
+
+    def _evaluate(self, executor: Optional[ProcessPoolExecutor], candidates: List[Dict[str, Any]],
+                  n_patients: int, seeds: List[int]) -> List[List[Optional[Dict[str, float]]]]:
+        """Outcomes per candidate per seed, simulating only what the store lacks."""
+        outcomes = [[None] * len(seeds) for _ in candidates]
+        pending = {}
+
+        # 1. Reuse stored simulations
+        for i, candidate in enumerate(candidates):
+            for j, seed in enumerate(seeds):
+                key = CalibrationStore.make_key(self.base_protocol_path, candidate, n_patients, seed)
+                stored = self.store.get(key)
+                if stored is not None:
+                    outcomes[i][j] = stored
+                else:
+                    pending[(i, j)] = key
+
+        if len(pending) < len(candidates) * len(seeds):
+            print(f"  Reusing {len(candidates) * len(seeds) - len(pending)} stored simulations")
+
+        # 2. Simulate the rest, recording each as soon as it completes
+        def record(i: int, j: int, result: Dict[str, float]) -> None:
+            self.store.put(pending[(i, j)], candidates[i], n_patients, seeds[j], result)
+            outcomes[i][j] = result
+
+        if executor is None:
+            for (i, j) in pending:
+                try:
+                    record(i, j, self.evaluator(self.base_protocol_path, candidates[i], n_patients, seeds[j]))
+                except Exception as exc:
+                    print(f"  Candidate {i} (seed {seeds[j]}) generated an exception: {exc}")
+        else:
+            futures = {
+                executor.submit(self.evaluator, self.base_protocol_path, candidates[i], n_patients, seeds[j]): (i, j)
+                for (i, j) in pending
+            }
+            for future in as_completed(futures):
+                i, j = futures[future]
+                try:
+                    record(i, j, future.result())
+                except Exception as exc:
+                    print(f"  Candidate {i} (seed {seeds[j]}) generated an exception: {exc}")
+
+        return outcomes
+
+    def _score(self, index: int, candidate: Dict[str, Any], n_patients: int,
+               outcomes: List[Optional[Dict[str, float]]]) -> CalibrationResult:
+        """Score a candidate on its outcomes averaged over seeds; failed candidates score inf."""
+        params = ParameterSet(
+            name=f"adaptive_{index}",
+            description=f"Adaptive calibration candidate {index} ({n_patients} patients)",
+            **candidate
+        )
+        completed = [o for o in outcomes if o is not None]
+        if not completed:
+            result = self.framework.create_result(params, (np.nan,) * len(OUTCOME_METRICS))
+            result.total_score = float('inf')
+            return result
+
+        metrics = tuple(float(np.mean([o[metric] for o in completed])) for metric in OUTCOME_METRICS)
+        return self.framework.create_result(params, metrics)
+
+
+def run_adaptive_exploration():
+    """Adaptive counterpart of parameter_exploration.run_focused_exploration."""
+    search = AdaptiveCalibration([
+        ParameterBounds('discontinuation_year1', 0.03, 0.125, 'Year 1 discontinuation rate'),
+        ParameterBounds('discontinuation_year2', 0.10, 0.18, 'Year 2 discontinuation rate'),
+        ParameterBounds('good_responder_ratio', 0.25, 0.40, 'Proportion of good responders'),
+        ParameterBounds('good_responder_multiplier', 1.3, 2.0, 'Vision response multiplier for good responders')
+    ])
+
+    print("Starting adaptive parameter exploration...")
+    results = search.run(n_candidates=81, min_patients=50, max_patients=450, eta=3)
+
+    best = results[0]
+    print(f"\n{'='*60}")
+    print("BEST PARAMETER COMBINATION:")
+    print(f"Total Score: {best.total_score:.2f}")
+    print("\nParameters:")
+    for b in search.bounds:
+        print(f"  {b.name}: {getattr(best.parameter_set, b.name):.3f}")
+    print("\nOutcomes:")
+    print(f"  Vision gain Y1: {best.vision_gain_year1:.1f} letters")
+    print(f"  Vision Y2: {best.vision_year2:.1f} letters")
+    print(f"  Injections Y1: {best.injections_year1:.1f}")
+    print(f"  Injections Y2: {best.injections_year2:.1f}")
+    print(f"  Discontinuation Y2: {best.discontinuation_year2:.1%}")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    run_adaptive_exploration()
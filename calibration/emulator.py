@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Gaussian-process emulator of simulated protocol outcomes.
+
+A full simulation takes seconds to minutes; the emulator is fitted once on
+stored simulation results (parameter vectors and their outcome metrics)
+and then predicts every outcome metric with an uncertainty in well under a
+millisecond per point. It also proposes which simulations to run next
+(active learning), so calibration can spend simulations where the
+emulator is uncertain and the score could be good.
+
+One independent GP is fitted per outcome metric, with an ARD squared
+exponential kernel over the parameter box scaled to [0, 1] and a learned
+noise term for Monte Carlo noise. Hyperparameters maximise the log
+marginal likelihood with scipy.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+
+from calibration.adaptive_calibration import (
+    AdaptiveCalibration,
+    CalibrationStore,
+    ParameterBounds,
+    OUTCOME_METRICS
+)
+from calibration.eylea_calibration_framework import EyleaCalibrationFramework
+
+ACQUISITION_STRATEGIES = ('lcb', 'variance')
+
+# Log-hyperparameter limits: lengthscales, signal variance, noise variance
+_LOG_BOUNDS_LENGTHSCALE = (np.log(0.02), np.log(20.0))
+_LOG_BOUNDS_SIGNAL = (np.log(1e-3), np.log(1e2))
+_LOG_BOUNDS_NOISE = (np.log(1e-6), np.log(1.0))
+
+
+class _GaussianProcess:
+    """Single-output GP regression on inputs in the unit cube."""
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> '_GaussianProcess':
+        self.X = X
+        self.y_mean = float(y.mean())
+        self.y_std = float(y.std()) or 1.0
+        z = (y - self.y_mean) / self.y_std
+
+        dims = X.shape[1]
+        start = np.concatenate([np.full(dims, np.log(0.3)), [0.0, np.log(0.05)]])
+        bounds = [_LOG_BOUNDS_LENGTHSCALE] * dims + [_LOG_BOUNDS_SIGNAL, _LOG_BOUNDS_NOISE]
+        result = minimize(self._negative_log_likelihood, start, args=(X, z),
+                          method='L-BFGS-B', bounds=bounds)
+        self.log_params = result.x
+
+        # Cache the factorisation so predictions are two matrix products
+        K = self._kernel(X, X) + np.eye(len(X)) * (np.exp(self.log_params[-1]) + 1e-10)
+        self.cho = cho_factor(K, lower=True)
+        self.alpha = cho_solve(self.cho, z)
+        return self
+
+    def _kernel(self, A: np.ndarray, B: np.ndarray, log_params: Optional[np.ndarray] = None) -> np.ndarray:
+        log_params = self.log_params if log_params is None else log_params
+        lengthscales = np.exp(log_params[:-2])
+        signal = np.exp(log_params[-2])
+        diff = (A[:, None, :] - B[None, :, :]) / lengthscales
+        return signal * np.exp(-0.5 * np.sum(diff ** 2, axis=-1))
+
+    def _negative_log_likelihood(self, log_params: np.ndarray, X: np.ndarray, z: np.ndarray) -> float:
+        K = self._kernel(X, X, log_params) + np.eye(len(X)) * (np.exp(log_params[-1]) + 1e-10)
+        try:
+            L, lower = cho_factor(K, lower=True)
+        except np.linalg.LinAlgError:
+            return 1e10
+        alpha = cho_solve((L, lower), z)
+        return 0.5 * z @ alpha + np.sum(np.log(np.diag(L))) + 0.5 * len(z) * np.log(2 * np.pi)
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Posterior mean and standard deviation of the latent function."""
+        K_star = self._kernel(X, self.X)
+        mean = K_star @ self.alpha
+        v = cho_solve(self.cho, K_star.T)
+        variance = np.exp(self.log_params[-2]) - np.sum(K_star * v.T, axis=1)
+        std = np.sqrt(np.maximum(variance, 0.0))
+        return mean * self.y_std + self.y_mean, std * self.y_std
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'X': self.X.tolist(),
+            'y_mean': self.y_mean,
+            'y_std': self.y_std,
+            'log_params': self.log_params.tolist(),
+            'alpha': self.alpha.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> '_GaussianProcess':
+        gp = cls()
+        gp.X = np.array(data['X'], dtype=float)
+        gp.y_mean = data['y_mean']
+        gp.y_std = data['y_std']
+        gp.log_params = np.array(data['log_params'], dtype=float)
+        gp.alpha = np.array(data['alpha'], dtype=float)
+        K = gp._kernel(gp.X, gp.X) + np.eye(len(gp.X)) * (np.exp(gp.log_params[-1]) + 1e-10)
+        gp.cho = cho_factor(K, lower=True)
+        return gp
+
+
+class GaussianProcessEmulator:
+    """Emulates outcome metrics as functions of bounded parameters."""
+
+    def __init__(self, bounds: List[ParameterBounds], metrics: Sequence[str] = OUTCOME_METRICS):
+        """
+        Args:
+            bounds: Parameters the emulator is a function of
+            metrics: Outcome metrics to emulate
+        """
+        self.bounds = bounds
+        self.metrics = tuple(metrics)
+        self.models: Dict[str, _GaussianProcess] = {}
+        self.n_training = 0
+
+    @property
+    def parameter_names(self) -> List[str]:
+        return [b.name for b in self.bounds]
+
+    def _to_unit(self, parameters: Union[Dict[str, Any], List[Dict[str, Any]]]) -> np.ndarray:
+        """Parameter dicts to rows in the unit cube."""
+        if isinstance(parameters, dict):
+            parameters = [parameters]
+        missing = [name for name in self.parameter_names if name not in parameters[0]]
+        if missing:
+            raise ValueError(f"Missing emulator parameters: {missing}")
+        low = np.array([b.low for b in self.bounds], dtype=float)
+        high = np.array([b.high for b in self.bounds], dtype=float)
+        X = np.array([[p[name] for name in self.parameter_names] for p in parameters], dtype=float)
+        return (X - low) / (high - low)
+
+    def fit(self, parameters: List[Dict[str, Any]], outcomes: List[Dict[str, float]]) -> 'GaussianProcessEmulator':
+        """
+        Fit one GP per metric.
+
+        Args:
+            parameters: Parameter dicts of the simulations
+            outcomes: Outcome metrics of the same simulations
+
+        Returns:
+            self
+        """
+        if len(parameters) != len(outcomes):
+            raise ValueError("parameters and outcomes must have the same length")
+        if len(parameters) < 2:
+            raise ValueError("At least 2 simulations are needed to fit the emulator")
+
+        X = self._to_unit(parameters)
+        self.models = {}
+        for metric in self.metrics:
+            y = np.array([o[metric] for o in outcomes], dtype=float)
+            self.models[metric] = _GaussianProcess().fit(X, y)
+        self.n_training = len(parameters)
+        return self
+
+    @classmethod
+    def from_store(cls, store: Union[str, Path, CalibrationStore], bounds: List[ParameterBounds],
+                   n_patients: Optional[int] = None,
+                   fixed_parameters: Optional[Dict[str, Any]] = None,
+                   metrics: Sequence[str] = OUTCOME_METRICS) -> 'GaussianProcessEmulator':
+        """
+        Fit on simulations recorded by AdaptiveCalibration.
+
+        Replicates of the same parameters are averaged.
+
+        Args:
+            store: CalibrationStore or its JSON-lines path
+            bounds: Parameters the emulator is a function of
+            n_patients: Use only simulations of this cohort size (default:
+                the largest size in the store)
+            fixed_parameters: Use only simulations whose other parameters
+                equal these
+            metrics: Outcome metrics to emulate
+
+        Returns:
+            Fitted emulator
+        """
+        if not isinstance(store, CalibrationStore):
+            store = CalibrationStore(str(store))
+        records = list(store.records.values())
+        names = {b.name for b in bounds}
+        records = [r for r in records if names <= set(r['parameters'])]
+        if fixed_parameters is not None:
+            records = [
+                r for r in records
+                if {k: v for k, v in r['parameters'].items() if k not in names} == fixed_parameters
+            ]
+        if not records:
+            raise ValueError("No stored simulations cover the emulator parameters")
+
+        if n_patients is None:
+            n_patients = max(r['n_patients'] for r in records)
+        records = [r for r in records if r['n_patients'] == n_patients]
+
+        # Average replicate seeds of each parameter vector
+        grouped: Dict[str, Tuple[Dict[str, Any], List[Dict[str, float]]]] = {}
+        for r in records:
+            key = json.dumps(r['parameters'], sort_keys=True)
+            grouped.setdefault(key, (r['parameters'], []))[1].append(r['outcomes'])
+
+        parameters = [p for p, _ in grouped.values()]
+        outcomes = [
+            {metric: float(np.mean([o[metric] for o in runs])) for metric in metrics}
+            for _, runs in grouped.values()
+        ]
+        return cls(bounds, metrics).fit(parameters, outcomes)
+
+    def predict(self, parameters: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Predict every metric for one or more parameter dicts.
+
+        Returns:
+            Dict of metric -> (mean array, std array)
+        """
+        if not self.models:
+            raise RuntimeError("Emulator has not been fitted")
+        X = self._to_unit(parameters)
+        return {metric: model.predict(X) for metric, model in self.models.items()}
+
+    def predict_outcomes(self, parameters: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        """
+        Instant preview for a single parameter set.
+
+        Returns:
+            Dict of metric -> {'mean': ..., 'std': ...}
+        """
+        return {
+            metric: {'mean': float(mean[0]), 'std': float(std[0])}
+            for metric, (mean, std) in self.predict(parameters).items()
+        }
+
+    def suggest(self, n: int, framework: Optional[EyleaCalibrationFramework] = None,
+                strategy: str = 'lcb', kappa: float = 2.0, n_pool: int = 2000,
+                n_draws: int = 64, seed: int = 42) -> List[Dict[str, Any]]:
+        """
+        Choose parameter sets to simulate next.
+
+        'lcb' ranks a random pool by the lower confidence bound of the
+        calibration score (mean - kappa * std over posterior draws of the
+        outcomes), so promising and uncertain regions are both explored.
+        'variance' picks where the emulator is least certain. Picks are
+        kept apart so one batch does not cluster on a single optimum.
+
+        Args:
+            n: Number of parameter sets
+            framework: Scores outcomes against the targets (for 'lcb')
+            strategy: 'lcb' or 'variance'
+            kappa: Exploration weight for 'lcb'
+            n_pool: Random candidates to rank
+            n_draws: Posterior draws per candidate for 'lcb'
+            seed: Random seed
+
+        Returns:
+            List of parameter dicts
+        """
+        if strategy not in ACQUISITION_STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'. Valid strategies: {ACQUISITION_STRATEGIES}")
+
+        rng = np.random.default_rng(seed)
+        low = np.array([b.low for b in self.bounds], dtype=float)
+        high = np.array([b.high for b in self.bounds], dtype=float)
+        unit = rng.random((n_pool, len(self.bounds)))
+        pool = [dict(zip(self.parameter_names, row)) for row in low + unit * (high - low)]
+        predictions = self.predict(pool)
+
+        if strategy == 'variance':
+            acquisition = -sum(
+                (std / (self.models[metric].y_std or 1.0)) ** 2
+                for metric, (_, std) in predictions.items()
+            )
+        else:
+            framework = framework or EyleaCalibrationFramework()
+            draws = [
+                mean + std * rng.standard_normal((n_draws, n_pool))
+                for mean, std in (predictions[metric] for metric in OUTCOME_METRICS)
+            ]
+            scores = framework.calculate_scores(*draws)[-1]
+            acquisition = scores.mean(axis=0) - kappa * scores.std(axis=0)
+
+        # Greedy picks in acquisition order, at least min_distance apart
+        min_distance = 0.5 / max(n, 1) ** (1 / len(self.bounds))
+        chosen: List[int] = []
+        for index in np.argsort(acquisition, kind='stable'):
+            if all(np.linalg.norm(unit[index] - unit[c]) >= min_distance for c in chosen):
+                chosen.append(int(index))
+            if len(chosen) == n:
+                break
+
+        suggestions = []
+        for index in chosen:
+            suggestion = {}
+            for b in self.bounds:
+                value = pool[index][b.name]
+                suggestion[b.name] = int(round(value)) if b.integer else float(value)
+            suggestions.append(suggestion)
+        return suggestions
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Save the fitted emulator as JSON."""
+        data = {
+            'bounds': [vars(b) for b in self.bounds],
+            'metrics': list(self.metrics),
+            'n_training': self.n_training,
+            'models': {metric: model.to_dict() for metric, model in self.models.items()}
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'GaussianProcessEmulator':
+        """Load an emulator saved with save()."""
+        with open(path) as f:
+            data = json.load(f)
+        emulator = cls([ParameterBounds(**b) for b in data['bounds']], data['metrics'])
+        emulator.models = {metric: _GaussianProcess.from_dict(m) for metric, m in data['models'].items()}
+        emulator.n_training = data['n_training']
+        return emulator
+
+
+def run_active_learning(search: AdaptiveCalibration, n_patients: int = 200, n_initial: int = 16,
+                        n_rounds: int = 4, batch_size: int = 4, replicates: int = 1,
+                        strategy: str = 'lcb', seed: int = 42,
+                        max_workers: Optional[int] = None) -> GaussianProcessEmulator:
+    """
+    Alternate between fitting the emulator and simulating its suggestions.
+
+    Simulations go through the search's evaluator and store, so they are
+    reused by later searches and emulator fits.
+
+    Args:
+        search: Defines bounds, fixed parameters, evaluator and store
+        n_patients: Cohort size of every simulation
+        n_initial: Latin hypercube design before the first fit
+        n_rounds: Fit/suggest/simulate rounds
+        batch_size: Simulations per round
+        replicates: Common seeds per simulation
+        strategy: Acquisition strategy for GaussianProcessEmulator.suggest
+        seed: Seed for the design, the suggestions and the simulations
+        max_workers: Worker processes (see AdaptiveCalibration.simulate)
+
+    Returns:
+        Emulator fitted on all simulations
+    """
+    seeds = [seed + r for r in range(replicates)]
+
+    def fit() -> GaussianProcessEmulator:
+        return GaussianProcessEmulator.from_store(
+            search.store, search.bounds, n_patients=n_patients,
+            fixed_parameters=search.fixed_parameters
+        )
+
+    search.simulate(search.sample(n_initial, seed=seed), n_patients, seeds, max_workers=max_workers)
+    emulator = fit()
+
+    for round_index in range(n_rounds):
+        suggestions = emulator.suggest(batch_size, framework=search.framework,
+                                       strategy=strategy, seed=seed + round_index + 1)
+        candidates = [{**search.fixed_parameters, **s} for s in suggestions]
+        print(f"Active learning round {round_index + 1}/{n_rounds}: simulating {len(candidates)} suggestions")
+        search.simulate(candidates, n_patients, seeds, max_workers=max_workers)
+        emulator = fit()
+
+    return emulator
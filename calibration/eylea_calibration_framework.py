@@ -10,9 +10,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
-import numpy as np
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Tuple, Optional, Union
 import pandas as pd
 from pathlib import Path
 import yaml
@@ -22,10 +21,17 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 from simulation_v2.protocols.protocol_spec import ProtocolSpecification
+from simulation_v2.protocols.parameter_cache import load_yaml
 from simulation_v2.core.disease_model import DiseaseModel
 from simulation_v2.core.protocol import StandardProtocol
 from simulation_v2.core.simulation_runner import ABSEngineWithSpecs
 from simulation_v2.clinical_improvements import ClinicalImprovements
+from ape.core.results.outcome_metrics import compute_patient_metrics, summarize_metrics
+from calibration.real_world_targets import CalibrationTargets, TargetScore, score_simulation
+
+# Outcome metrics returned by analyze_results, in order
+CALIBRATION_METRICS = ['vision_gain_year1', 'vision_change_year2', 'injections_year1',
+                       'injections_year2', 'discontinuation_year1', 'discontinuation_year2']
 
 
 @dataclass
@@ -103,57 +109,78 @@ class CalibrationResult:
     
     # Raw data for detailed analysis
     patient_data: Optional[pd.DataFrame] = None
+    
+    # Distance from real-world targets, if the framework has them
+    real_world_score: Optional[TargetScore] = None
 
 
 class EyleaCalibrationFramework:
     """Framework for calibrating Eylea protocol parameters."""
     
-    def __init__(self, base_protocol_path: str = "protocols/v2/eylea_treat_and_extend_v1.0.yaml"):
+    def __init__(self, base_protocol_path: str = "protocols/v2/eylea_treat_and_extend_v1.0.yaml",
+                 real_world_targets: Optional[Union[str, Path, CalibrationTargets]] = None):
         self.base_protocol_path = Path(base_protocol_path)
         self.targets = EyleaCalibrationTarget()
         self.results: List[CalibrationResult] = []
         
-    def create_test_protocol(self, params: ParameterSet, output_path: Path) -> Path:
-        """Create a test protocol with specified parameters."""
-        # Load base protocol
-        with open(self.base_protocol_path) as f:
-            protocol = yaml.safe_load(f)
-        
-        # Add clinical improvements section
-        protocol['clinical_improvements'] = {
-            'enabled': True,
-            'use_loading_phase': params.use_loading_phase,
-            'use_time_based_discontinuation': params.use_time_based_discontinuation,
-            'use_response_based_vision': params.use_response_based_vision,
-            'use_baseline_distribution': params.use_baseline_distribution,
-            'use_response_heterogeneity': params.use_response_heterogeneity,
-            'response_types': {
-                'good': {
-                    'probability': params.good_responder_ratio,
-                    'multiplier': params.good_responder_multiplier
-                },
-                'average': {
-                    'probability': params.average_responder_ratio,
-                    'multiplier': params.average_responder_multiplier
+        # Real-world targets (see calibration/real_world_targets.py), loaded once
+        if real_world_targets is not None and not isinstance(real_world_targets, CalibrationTargets):
+            real_world_targets = CalibrationTargets.load(real_world_targets)
+        self.real_world_targets = real_world_targets
+        
+    def parameter_overrides(self, params: ParameterSet) -> Dict:
+        """Protocol overrides (YAML file layout) for a parameter set."""
+        overrides = {
+            'clinical_improvements': {
+                'enabled': True,
+                'use_loading_phase': params.use_loading_phase,
+                'use_time_based_discontinuation': params.use_time_based_discontinuation,
+                'use_response_based_vision': params.use_response_based_vision,
+                'use_baseline_distribution': params.use_baseline_distribution,
+                'use_response_heterogeneity': params.use_response_heterogeneity,
+                'response_types': {
+                    'good': {
+                        'probability': params.good_responder_ratio,
+                        'multiplier': params.good_responder_multiplier
+                    },
+                    'average': {
+                        'probability': params.average_responder_ratio,
+                        'multiplier': params.average_responder_multiplier
+                    },
+                    'poor': {
+                        'probability': params.poor_responder_ratio,
+                        'multiplier': params.poor_responder_multiplier
+                    }
                 },
-                'poor': {
-                    'probability': params.poor_responder_ratio,
-                    'multiplier': params.poor_responder_multiplier
+                'discontinuation_probabilities': {
+                    1: params.discontinuation_year1,
+                    2: params.discontinuation_year2,
+                    3: params.discontinuation_year3,
+                    4: params.discontinuation_year4,
+                    5: params.discontinuation_year5_plus
                 }
-            },
-            'discontinuation_probabilities': {
-                1: params.discontinuation_year1,
-                2: params.discontinuation_year2,
-                3: params.discontinuation_year3,
-                4: params.discontinuation_year4,
-                5: params.discontinuation_year5_plus
             }
         }
         
         # Update protocol interval if specified
         if hasattr(params, 'protocol_interval'):
-            protocol['min_interval_days'] = params.protocol_interval
-            protocol['max_interval_days'] = max(params.protocol_interval * 2, 112)
+            overrides['min_interval_days'] = params.protocol_interval
+            overrides['max_interval_days'] = max(params.protocol_interval * 2, 112)
+        
+        return overrides
+    
+    def create_test_spec(self, params: ParameterSet) -> ProtocolSpecification:
+        """Create a test protocol specification in memory, without writing YAML."""
+        base_spec = ProtocolSpecification.from_yaml(self.base_protocol_path)
+        # clinical_improvements is replaced as a whole, as in the exported file
+        base_spec = replace(base_spec, clinical_improvements=None)
+        return base_spec.with_overrides(self.parameter_overrides(params))
+    
+    def create_test_protocol(self, params: ParameterSet, output_path: Path) -> Path:
+        """Create a test protocol file with specified parameters."""
+        # Load base protocol
+        protocol = load_yaml(self.base_protocol_path)
+        protocol.update(self.parameter_overrides(params))
         
         # Save test protocol
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -162,11 +189,14 @@ class EyleaCalibrationFramework:
         
         return output_path
     
-    def run_simulation(self, protocol_path: Path, n_patients: int = 200, 
-                      simulation_months: int = 24) -> Dict:
-        """Run simulation with given protocol."""
+    def run_simulation(self, protocol_path: Union[Path, ProtocolSpecification], n_patients: int = 200, 
+                      simulation_months: int = 24, seed: int = 42) -> Dict:
+        """Run simulation with given protocol file or in-memory specification."""
         # Load protocol specification
-        spec = ProtocolSpecification.from_yaml(protocol_path)
+        if isinstance(protocol_path, ProtocolSpecification):
+            spec = protocol_path
+        else:
+            spec = ProtocolSpecification.from_yaml(Path(protocol_path))
         
         # Create disease model and protocol
         disease_model = DiseaseModel(
@@ -221,7 +251,7 @@ class EyleaCalibrationFramework:
             protocol=protocol,
             protocol_spec=spec,
             n_patients=n_patients,
-            seed=42,  # Fixed seed for reproducibility
+            seed=seed,  # Fixed seed for reproducibility
             clinical_improvements=clinical_improvements
         )
         
@@ -231,82 +261,52 @@ class EyleaCalibrationFramework:
         
         return results
     
-    def analyze_results(self, results) -> Tuple[float, float, float, float, float, float]:
-        """Extract key metrics from simulation results."""
+    def results_tables(self, results) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Visit and patient tables of simulation results."""
         # Access patient histories from SimulationResults object
         patient_histories = results.patient_histories
         
-        # Convert to DataFrame for easier analysis
         records = []
         for patient_id, patient in patient_histories.items():
             # Patient histories are Patient objects, not dicts
             for visit in patient.visit_history:
-                # Calculate time in months from enrollment
+                # Calculate time in days from enrollment
                 if hasattr(patient, 'enrollment_date') and patient.enrollment_date:
                     enrollment_date = patient.enrollment_date
                 else:
                     enrollment_date = visit['date']
                 
-                time_months = (visit['date'] - enrollment_date).days / 30.44
-                
                 records.append({
                     'patient_id': patient_id,
-                    'time': time_months,
+                    'time_days': (visit['date'] - enrollment_date).days,
                     'vision': visit['vision'],
-                    'received_injection': visit['treatment_given'],
-                    'discontinuation_type': visit.get('discontinuation_type'),
-                    'is_discontinuation_visit': patient.is_discontinued and visit == patient.visit_history[-1]
+                    'injected': visit['treatment_given']
                 })
         
-        df = pd.DataFrame(records)
-        
-        # Calculate metrics
-        baseline_vision = {}
-        year1_vision = {}
-        year2_vision = {}
-        injections_year1 = {}
-        injections_year2 = {}
-        discontinued_year1 = set()
-        discontinued_year2 = set()
-        
-        for patient_id in patient_histories:
-            patient_df = df[df['patient_id'] == patient_id].sort_values('time')
-            
-            # Baseline vision (first visit)
-            baseline_vision[patient_id] = patient_df.iloc[0]['vision']
-            
-            # Year 1 metrics (around month 12)
-            year1_df = patient_df[patient_df['time'] <= 12]
-            if not year1_df.empty:
-                year1_vision[patient_id] = year1_df.iloc[-1]['vision']
-                injections_year1[patient_id] = year1_df['received_injection'].sum()
-                if year1_df['is_discontinuation_visit'].any():
-                    discontinued_year1.add(patient_id)
-            
-            # Year 2 metrics (around month 24)
-            year2_df = patient_df[patient_df['time'] <= 24]
-            year2_only_df = patient_df[(patient_df['time'] > 12) & (patient_df['time'] <= 24)]
-            if not year2_df.empty:
-                year2_vision[patient_id] = year2_df.iloc[-1]['vision']
-                injections_year2[patient_id] = year2_only_df['received_injection'].sum()
-                if year2_df['is_discontinuation_visit'].any():
-                    discontinued_year2.add(patient_id)
-        
-        # Calculate aggregate metrics
-        vision_gains_year1 = [year1_vision[pid] - baseline_vision[pid] 
-                             for pid in year1_vision if pid in baseline_vision]
-        vision_year2_values = [year2_vision[pid] - baseline_vision[pid] 
-                              for pid in year2_vision if pid in baseline_vision]
-        
-        vision_gain_year1 = np.mean(vision_gains_year1) if vision_gains_year1 else 0
-        vision_year2 = np.mean(vision_year2_values) if vision_year2_values else 0
-        injections_year1_mean = np.mean(list(injections_year1.values())) if injections_year1 else 0
-        injections_year2_mean = np.mean(list(injections_year2.values())) if injections_year2 else 0
-        discontinuation_year1 = len(discontinued_year1) / len(patient_histories)
-        discontinuation_year2 = len(discontinued_year2) / len(patient_histories)
-        
-        return (vision_gain_year1, vision_year2, injections_year1_mean, 
-                injections_year2_mean, discontinuation_year1, discontinuation_year2)
+        visits = pd.DataFrame(records, columns=['patient_id', 'time_days', 'vision', 'injected'])
+        patients = pd.DataFrame({
+            'patient_id': list(patient_histories),
+            'discontinued': [patient.is_discontinued for patient in patient_histories.values()]
+        })
+        return visits, patients
+    
+    def analyze_results(self, results) -> Tuple[float, float, float, float, float, float]:
+        """Extract key metrics from simulation results."""
+        # Visit and patient tables for the outcome-metrics registry
+        visits, patients = self.results_tables(results)
+        
+        # Year-1/2 vision change, injections and discontinuations in one pass
+        outcomes = summarize_metrics(compute_patient_metrics([visits], patients, CALIBRATION_METRICS))
+        
+        # Discontinuation rates are fractions of all patients, not percentages
+        return tuple(outcomes[name] for name in CALIBRATION_METRICS)
+    
+    def score_real_world(self, results) -> TargetScore:
+        """Score simulation results (or a Parquet results directory) against the real-world targets."""
+        if self.real_world_targets is None:
+            raise ValueError("No real-world targets; pass real_world_targets to the framework")
+        source = results if isinstance(results, (str, Path)) else self.results_tables(results)
+        return score_simulation(source, self.real_world_targets)
     
     def calculate_scores(self, vision_gain_year1: float, vision_year2: float,
                         injections_year1: float, injections_year2: float,
@@ -335,28 +335,16 @@ class EyleaCalibrationFramework:
         
         return vision_score, injection_score, discontinuation_score, total_score
     
-    def test_parameters(self, params: ParameterSet, n_patients: int = 200) -> CalibrationResult:
-        """Test a single parameter set."""
-        print(f"\nTesting parameter set: {params.name}")
-        print(f"Description: {params.description}")
-        
-        # Create test protocol
-        protocol_path = Path(f"calibration/test_protocols/{params.name}.yaml")
-        self.create_test_protocol(params, protocol_path)
-        
-        # Run simulation
-        results = self.run_simulation(protocol_path, n_patients=n_patients)
-        
-        # Analyze results
-        metrics = self.analyze_results(results)
+    def create_result(self, params: ParameterSet,
+                      metrics: Tuple[float, float, float, float, float, float]) -> CalibrationResult:
+        """Score outcome metrics (as returned by analyze_results) against the targets."""
         vision_gain_year1, vision_year2, injections_year1, injections_year2, disc_year1, disc_year2 = metrics
         
         # Calculate scores
         scores = self.calculate_scores(*metrics)
         vision_score, injection_score, discontinuation_score, total_score = scores
         
-        # Create result
-        result = CalibrationResult(
+        return CalibrationResult(
             parameter_set=params,
             vision_gain_year1=vision_gain_year1,
             vision_year2=vision_year2,
@@ -369,9 +357,46 @@ class EyleaCalibrationFramework:
             discontinuation_score=discontinuation_score,
             total_score=total_score
         )
+    
+    def evaluate_parameters(self, params: ParameterSet, n_patients: int = 200,
+                            seed: int = 42) -> CalibrationResult:
+        """Simulate and score a parameter set without printing or recording it."""
+        # Create test protocol in memory
+        spec = self.create_test_spec(params)
         
+        # Run simulation
+        results = self.run_simulation(spec, n_patients=n_patients, seed=seed)
+        
+        result = self.create_result(params, self.analyze_results(results))
+        if self.real_world_targets is not None:
+            result.real_world_score = self.score_real_world(results)
+        return result
+
+    def emulate_parameters(self, params: ParameterSet, emulator) -> CalibrationResult:
+        """Score a parameter set on emulated outcomes (see calibration/emulator.py) instead of simulating."""
+        parameters = {name: getattr(params, name) for name in emulator.parameter_names}
+        predictions = emulator.predict(parameters)
+        metrics = tuple(float(predictions[metric][0][0]) for metric in (
+            'vision_gain_year1', 'vision_year2', 'injections_year1',
+            'injections_year2', 'discontinuation_year1', 'discontinuation_year2'
+        ))
+        return self.create_result(params, metrics)
+
+    def test_parameters(self, params: ParameterSet, n_patients: int = 200,
+                        seed: int = 42) -> CalibrationResult:
+        """Test a single parameter set."""
+        print(f"\nTesting parameter set: {params.name}")
+        print(f"Description: {params.description}")
+        
+        result = self.evaluate_parameters(params, n_patients=n_patients, seed=seed)
         self.results.append(result)
         
+        vision_gain_year1, vision_year2 = result.vision_gain_year1, result.vision_year2
+        injections_year1, injections_year2 = result.injections_year1, result.injections_year2
+        disc_year1, disc_year2 = result.discontinuation_year1, result.discontinuation_year2
+        vision_score, injection_score = result.vision_score, result.injection_score
+        discontinuation_score, total_score = result.discontinuation_score, result.total_score
+        
         # Print summary
         print(f"\nResults:")
         print(f"  Vision gain Y1: {vision_gain_year1:.1f} letters (target: {self.targets.VISION_GAIN_YEAR1_MEAN})")
@@ -385,6 +410,8 @@ class EyleaCalibrationFramework:
         print(f"  Injection score: {injection_score:.2f}")
         print(f"  Discontinuation score: {discontinuation_score:.2f}")
         print(f"  Total score: {total_score:.2f}")
+        if result.real_world_score is not None:
+            print(f"  Real-world score: {result.real_world_score.total:.2f}")
         
         return result
     
@@ -426,6 +453,8 @@ class EyleaCalibrationFramework:
                     'total_score': result.total_score
                 }
             }
+            if result.real_world_score is not None:
+                data['real_world_score'] = asdict(result.real_world_score)
             results_data.append(data)
         
         # Sort by total score
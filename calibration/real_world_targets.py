@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Real-world calibration targets.
+
+Summary statistics of an ingested real-world extract (see
+EyleaDataAnalyzer.ingest_to_parquet) are computed once and stored as a
+small JSON target file:
+
+- distribution of intervals between injections
+- injections per treated patient in each year of treatment
+- quantiles of vision change from baseline at years 1 and 2
+- discontinuation hazard by time on treatment (life table)
+
+A simulation is scored against the file with the same statistics,
+computed in one vectorized pass over its visits (Parquet results or the
+tables EyleaCalibrationFramework builds), so a calibration loop never
+touches the raw data again.
+
+Example usage:
+    python calibration/real_world_targets.py build output/real_site_a -o calibration/targets_site_a.json
+    python calibration/real_world_targets.py score simulation_results/sim_x calibration/targets_site_a.json
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ape.core.results.outcome_metrics import DAYS_PER_MONTH, PatientBatch
+
+TARGETS_VERSION = 1
+
+# Interval bins (days): around 4, 6, 8, 10 and 12 weeks, then 14-16 weeks,
+# up to 6 months, up to a year and longer
+INTERVAL_BIN_EDGES = (0, 35, 49, 63, 77, 91, 119, 182, 365, np.inf)
+
+# Treatment years with injection counts
+TREATMENT_YEARS = 5
+
+# Years with vision change quantiles, and the quantiles
+VISION_YEARS = (1, 2)
+VISION_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Life-table bands (months on treatment) for the discontinuation hazard
+HAZARD_BAND_EDGES = (0, 6, 12, 18, 24, 36, 48, 60)
+
+# Vision differences are scored in units of this many letters
+VISION_SCALE_LETTERS = 5.0
+
+DEFAULT_WEIGHTS = {'intervals': 1.0, 'injections': 1.0, 'vision': 1.0, 'discontinuation': 1.0}
+
+VISIT_COLUMNS = ['patient_id', 'time_days', 'vision', 'injected']
+
+
+@dataclass
+class CalibrationTargets:
+    """
+    Summary statistics of a cohort, as stored in a target file.
+
+    Attributes:
+        source: Where the statistics come from
+        n_patients: Patients with at least one visit
+        interval_distribution: Fraction of injection intervals per
+            INTERVAL_BIN_EDGES bin
+        n_intervals: Number of injection intervals
+        injections_by_year: Mean injections per patient with a visit in
+            treatment year 1..TREATMENT_YEARS (NaN if none)
+        patients_by_year: Patients with a visit in each treatment year
+        vision_change_quantiles: Per VISION_YEARS, VISION_QUANTILES of the
+            change from baseline (last reading up to the year's end), among
+            patients followed to the year's end
+        patients_by_vision_year: Patients behind each row of quantiles
+        discontinuation_hazard: Discontinuations per patient at risk in
+            each HAZARD_BAND_EDGES band of months on treatment
+        at_risk: Patients at risk at the start of each band
+    """
+    source: str
+    n_patients: int
+    interval_distribution: List[float]
+    n_intervals: int
+    injections_by_year: List[float]
+    patients_by_year: List[int]
+    vision_change_quantiles: List[List[float]]
+    patients_by_vision_year: List[int]
+    discontinuation_hazard: List[float]
+    at_risk: List[int]
+    interval_bin_edges: List[float] = field(default_factory=lambda: list(INTERVAL_BIN_EDGES))
+    vision_years: List[int] = field(default_factory=lambda: list(VISION_YEARS))
+    vision_quantiles: List[float] = field(default_factory=lambda: list(VISION_QUANTILES))
+    hazard_band_edges: List[float] = field(default_factory=lambda: list(HAZARD_BAND_EDGES))
+    version: int = TARGETS_VERSION
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Write the target file (NaN stored as null)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(_to_json(asdict(self)), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'CalibrationTargets':
+        """Read a target file written by save."""
+        with open(path) as f:
+            data = _from_json(json.load(f))
+        if data.get('version') != TARGETS_VERSION:
+            raise ValueError(f"Unsupported target file version {data.get('version')} in {path}")
+        return cls(**data)
+
+
+@dataclass
+class TargetScore:
+    """Distance of a simulation from the targets (lower is better, 0 is a perfect match)."""
+    intervals: float
+    injections: float
+    vision: float
+    discontinuation: float
+    total: float
+
+
+def _to_json(value):
+    if isinstance(value, float) and not np.isfinite(value):
+        return None if np.isnan(value) else 'inf'
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _from_json(value):
+    if value is None:
+        return np.nan
+    if value == 'inf':
+        return np.inf
+    if isinstance(value, dict):
+        return {key: value[key] if key == 'source' else _from_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    return value
+
+
+def compute_statistics(visits: pd.DataFrame, patients: pd.DataFrame, source: str = '') -> CalibrationTargets:
+    """
+    Target statistics of a cohort in one vectorized pass.
+
+    Args:
+        visits: patient_id, time_days, vision and injected, one row per visit
+            (any order; times relative to anything, each patient is rebased
+            to their first visit)
+        patients: patient_id and discontinued
+        source: Label stored with the statistics
+
+    Returns:
+        CalibrationTargets
+    """
+    batch = PatientBatch(visits, patients, columns=('vision', 'injected'), patient_columns=('discontinued',))
+    n_patients = batch.n_patients
+    injected = batch.column('injected', dtype=bool)
+    last_month = batch.month[batch.offsets[1:] - 1]
+
+    # Intervals between consecutive injections of the same patient
+    codes = batch.codes[injected]
+    days = batch.month[injected] * DAYS_PER_MONTH
+    same_patient = codes[1:] == codes[:-1]
+    intervals = np.round(np.diff(days)[same_patient])
+    counts, _ = np.histogram(intervals, bins=INTERVAL_BIN_EDGES)
+    distribution = counts / counts.sum() if len(intervals) else np.full(len(counts), np.nan)
+
+    # Injections per treatment year (year 1 includes month 0 and month 12)
+    year = np.clip(np.ceil(batch.month / 12), 1, None).astype(int) - 1
+    in_range = year < TREATMENT_YEARS
+    cell = batch.codes[in_range] * TREATMENT_YEARS + year[in_range]
+    injections = np.bincount(cell, weights=injected[in_range], minlength=n_patients * TREATMENT_YEARS)
+    visited = np.bincount(cell, minlength=n_patients * TREATMENT_YEARS) > 0
+    patients_by_year = visited.reshape(n_patients, TREATMENT_YEARS).sum(axis=0)
+    injections_by_year = np.divide(
+        injections.reshape(n_patients, TREATMENT_YEARS).sum(axis=0), patients_by_year,
+        out=np.full(TREATMENT_YEARS, np.nan), where=patients_by_year > 0
+    )
+
+    # Vision change among patients still followed at each year's end
+    baseline = batch.first('vision')
+    quantiles, followed = [], []
+    for years in VISION_YEARS:
+        change = (batch.last_until('vision', 12 * years) - baseline)[last_month >= 12 * years]
+        followed.append(len(change))
+        quantiles.append(np.quantile(change, VISION_QUANTILES).tolist() if len(change)
+                         else [np.nan] * len(VISION_QUANTILES))
+
+    # Life table: a patient is at risk until their last visit, which is a
+    # discontinuation or (if still on treatment) censoring
+    discontinued = batch.patient('discontinued').astype(bool)
+    low, high = np.array(HAZARD_BAND_EDGES[:-1]), np.array(HAZARD_BAND_EDGES[1:])
+    at_risk = (last_month[:, None] >= low).sum(axis=0)
+    events = (discontinued[:, None] & (last_month[:, None] >= low) & (last_month[:, None] < high)).sum(axis=0)
+    hazard = np.divide(events, at_risk, out=np.full(len(low), np.nan), where=at_risk > 0)
+
+    return CalibrationTargets(
+        source=source,
+        n_patients=int(n_patients),
+        interval_distribution=distribution.tolist(),
+        n_intervals=int(len(intervals)),
+        injections_by_year=injections_by_year.tolist(),
+        patients_by_year=patients_by_year.astype(int).tolist(),
+        vision_change_quantiles=quantiles,
+        patients_by_vision_year=followed,
+        discontinuation_hazard=hazard.tolist(),
+        at_risk=at_risk.astype(int).tolist()
+    )
+
+
+def load_tables(results_dir: Union[str, Path]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Visit and patient columns the statistics need, from Parquet results."""
+    from ape.core.storage.reader import ParquetReader
+
+    results_dir = Path(results_dir)
+    visits = ParquetReader(results_dir).read_visits(columns=VISIT_COLUMNS)
+    patients = pd.read_parquet(results_dir / 'patients.parquet', columns=['patient_id', 'discontinued'])
+    return visits, patients
+
+
+def build_targets(results_dir: Union[str, Path], output_path: Union[str, Path]) -> CalibrationTargets:
+    """
+    Compute and save the targets of ingested real-world data.
+
+    Args:
+        results_dir: Parquet results (e.g. from EyleaDataAnalyzer.ingest_to_parquet)
+        output_path: Target file to write
+
+    Returns:
+        CalibrationTargets
+    """
+    targets = compute_statistics(*load_tables(results_dir), source=str(results_dir))
+    targets.save(output_path)
+    return targets
+
+
+def _check_layout(statistics: CalibrationTargets, targets: CalibrationTargets) -> None:
+    layout = ('interval_bin_edges', 'vision_years', 'vision_quantiles', 'hazard_band_edges')
+    different = [name for name in layout if getattr(statistics, name) != getattr(targets, name)]
+    if different or len(statistics.injections_by_year) != len(targets.injections_by_year):
+        raise ValueError(f"Target file uses different bins ({different or ['injections_by_year']}); rebuild it")
+
+
+def _weighted_error(actual: Sequence[float], target: Sequence[float], weights: Sequence[float],
+                    scale: Optional[float] = None) -> float:
+    """Weighted mean absolute difference, relative to the target (or in units of scale)."""
+    actual, target, weights = (np.asarray(v, dtype=float) for v in (actual, target, weights))
+    valid = np.isfinite(actual) & np.isfinite(target) & (weights > 0)
+    if not valid.any():
+        return np.nan
+    actual, target, weights = actual[valid], target[valid], weights[valid]
+    error = np.sum(weights * np.abs(actual - target))
+    if scale is not None:
+        return float(error / (scale * weights.sum()))
+    denominator = np.sum(weights * np.abs(target))
+    return float(error / (denominator if denominator > 0 else weights.sum()))
+
+
+def score_statistics(statistics: CalibrationTargets, targets: CalibrationTargets,
+                     weights: Optional[Dict[str, float]] = None) -> TargetScore:
+    """
+    Score simulation statistics against targets.
+
+    Components:
+        intervals: total variation distance of the interval distributions (0-1)
+        injections: relative error of injections per year, weighted by the
+            target's patients per year
+        vision: mean absolute quantile difference in VISION_SCALE_LETTERS
+        discontinuation: relative error of the hazard, weighted by the
+            target's patients at risk
+
+    Args:
+        statistics: Statistics of the simulation (compute_statistics)
+        targets: Real-world targets
+        weights: Weight per component in the total (default DEFAULT_WEIGHTS)
+
+    Returns:
+        TargetScore; a component the targets cannot inform is NaN and left
+        out of the total
+    """
+    _check_layout(statistics, targets)
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+    components = {
+        'intervals': 0.5 * float(np.sum(np.abs(np.subtract(statistics.interval_distribution,
+                                                           targets.interval_distribution)))),
+        'injections': _weighted_error(statistics.injections_by_year, targets.injections_by_year,
+                                      targets.patients_by_year),
+        'vision': _weighted_error(
+            np.ravel(statistics.vision_change_quantiles), np.ravel(targets.vision_change_quantiles),
+            np.repeat(targets.patients_by_vision_year, len(targets.vision_quantiles)),
+            scale=VISION_SCALE_LETTERS
+        ),
+        'discontinuation': _weighted_error(statistics.discontinuation_hazard, targets.discontinuation_hazard,
+                                           targets.at_risk)
+    }
+    total = sum(weights[name] * value for name, value in components.items() if np.isfinite(value))
+    return TargetScore(**components, total=float(total))
+
+
+def score_simulation(source: Union[str, Path, Tuple[pd.DataFrame, pd.DataFrame]],
+                     targets: Union[str, Path, CalibrationTargets],
+                     weights: Optional[Dict[str, float]] = None) -> TargetScore:
+    """
+    Score a simulation against real-world targets.
+
+    Args:
+        source: Parquet results directory, or (visits, patients) tables
+        targets: CalibrationTargets or a target file
+        weights: Weight per component in the total
+
+    Returns:
+        TargetScore
+    """
+    if not isinstance(targets, CalibrationTargets):
+        targets = CalibrationTargets.load(targets)
+    tables = source if isinstance(source, tuple) else load_tables(source)
+    return score_statistics(compute_statistics(*tables), targets, weights)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build real-world calibration targets or score a simulation")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Compute targets from ingested real-world Parquet results")
+    build.add_argument('results_dir')
+    build.add_argument('-o', '--output', required=True, help="Target file to write")
+    score = commands.add_parser('score', help="Score simulation Parquet results against a target file")
+    score.add_argument('results_dir')
+    score.add_argument('targets')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        targets = build_targets(args.results_dir, args.output)
+        print(f"Targets from {targets.n_patients} patients and {targets.n_intervals} intervals "
+              f"written to {args.output}")
+    else:
+        result = score_simulation(args.results_dir, args.targets)
+        for name, value in asdict(result).items():
+            print(f"  {name}: {value:.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,7 @@ import random
 
 from simulation_v2.protocols.protocol_spec import ProtocolSpecification
 from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+from simulation_v2.protocols.protocol_library import PARAMETER_FILE_FIELDS, ProtocolLibrary
 from ape.utils.startup_redirect import handle_page_startup
 from simulation_v2.models.baseline_vision_distributions import (
     NormalDistribution, BetaWithThresholdDistribution, UniformDistribution
@@ -265,19 +266,21 @@ for temp_file in TEMP_DIR.glob("*.yaml"):
 MAX_PROTOCOLS = 100  # Maximum number of protocols allowed
 MAX_FILE_SIZE = 1_048_576  # 1MB max file size
 
-# Get available protocols (standard, time-based, and temp)
-standard_files = list(STANDARD_PROTOCOL_DIR.glob("*.yaml"))
-time_based_files = list(TIME_BASED_PROTOCOL_DIR.glob("*.yaml"))
-temp_files = list(TEMP_DIR.glob("*.yaml"))
+@st.cache_resource
+def get_protocol_library():
+    """Protocol library shared across reruns; files are only re-parsed when they change."""
+    return ProtocolLibrary({
+        "standard": STANDARD_PROTOCOL_DIR,
+        "time_based": TIME_BASED_PROTOCOL_DIR,
+        "temp": TEMP_DIR
+    })
 
-# Combine all protocol files with type information
-protocol_files = []
-for f in standard_files:
-    protocol_files.append((f, "standard"))
-for f in time_based_files:
-    protocol_files.append((f, "time_based"))
-for f in temp_files:
-    protocol_files.append((f, "temp"))
+protocol_library = get_protocol_library()
+
+# Get available protocols (standard, time-based, and temp) with type information
+library_entries = protocol_library.entries()
+protocol_files = [(entry.path, entry.kind) for entry in library_entries]
+temp_files = [entry.path for entry in library_entries if entry.kind == "temp"]
 
 # Load preferred protocols configuration
 if 'preferred_config' not in st.session_state:
@@ -340,11 +343,26 @@ def format_protocol(file_info):
     
     return formatted
 
+# Filter the list by name, author, description or protocol type
+search_query = st.text_input(
+    "Search protocols",
+    key="protocol_search",
+    placeholder="Search by name, author, description or type",
+    label_visibility="collapsed"
+)
+visible_protocols = protocol_files
+if search_query:
+    matching = {(entry.path, entry.kind) for entry in library_entries if entry.matches(search_query)}
+    visible_protocols = [item for item in protocol_files if item in matching]
+    if not visible_protocols:
+        st.caption(f"No protocols match '{search_query}' - showing all protocols")
+        visible_protocols = protocol_files
+
 # Try to maintain selection across reruns
 if 'selected_protocol_name' in st.session_state:
     # Find the file that matches the stored name
     default_index = 0
-    for i, (file, ptype) in enumerate(protocol_files):
+    for i, (file, ptype) in enumerate(visible_protocols):
         if file.stem == st.session_state.selected_protocol_name:
             default_index = i
             break
@@ -355,7 +373,7 @@ else:
         default_name = st.session_state.preferred_config.get('ui_settings', {}).get('default_selection')
         if default_name:
             # Try to find by partial match
-            for i, (file, ptype) in enumerate(protocol_files):
+            for i, (file, ptype) in enumerate(visible_protocols):
                 if file.stem in default_name or default_name.startswith(file.stem):
                     default_index = i
                     break
@@ -363,7 +381,7 @@ else:
 # Select protocol on its own line
 selected_item = st.selectbox(
     "Available Protocols",
-    protocol_files,
+    visible_protocols,
     format_func=format_protocol,
     label_visibility="collapsed",
     index=default_index,
@@ -881,8 +899,7 @@ if st.session_state.get('show_manage', False):
                     raw_yaml = f.read()
                     
                 # Parse to get basic info
-                with open(selected_file, 'r') as f:
-                    yaml_data = yaml.safe_load(f)
+                yaml_data = protocol_library.load_yaml(selected_file)
                     
                 protocol_name = yaml_data.get('name', 'protocol').lower().replace(' ', '_')
                 protocol_version = yaml_data.get('version', '1.0')
@@ -952,13 +969,19 @@ if st.session_state.get('show_manage', False):
                 if ape_button("Generate PDF Report", key="generate_pdf", icon="document", full_width=True):
                     try:
                         # Load spec for PDF generation
-                        if is_time_based:
-                            spec = TimeBasedProtocolSpecification.from_yaml(selected_file)
-                        else:
-                            spec = ProtocolSpecification.from_yaml(selected_file)
+                        spec = protocol_library.spec(selected_file, protocol_type)
+                        # The report includes the parameter files, so they version it too
+                        parameter_data = [
+                            protocol_library.load_yaml(protocol_library.parameter_path(selected_file, field))
+                            for field in PARAMETER_FILE_FIELDS
+                            if protocol_library.parameter_path(selected_file, field).exists()
+                        ] if is_time_based else []
                             
                         from ape.utils.protocol_pdf_generator import generate_protocol_pdf
-                        pdf_bytes = generate_protocol_pdf(spec, is_time_based)
+                        from ape.utils.report_rendering import cached_report, report_time
+                        generated_at = report_time()
+                        pdf_bytes = cached_report(generate_protocol_pdf, spec, is_time_based, generated_at,
+                                                  cache_key=(spec.checksum, is_time_based, parameter_data, generated_at))
                         
                         st.download_button(
                             label="Download PDF Report",
@@ -1048,14 +1071,12 @@ try:
     
     if protocol_type == "temp":
         # Check if this is actually a time-based protocol
-        with open(selected_file, 'r') as f:
-            data = yaml.safe_load(f)
-            if data.get('model_type') == 'time_based':
-                is_time_based_protocol = True
+        if protocol_library.get(selected_file, protocol_type).model_type == 'time_based':
+            is_time_based_protocol = True
     
     if is_time_based_protocol:
-        # Load as time-based protocol
-        spec = TimeBasedProtocolSpecification.from_yaml(selected_file)
+        # Load as time-based protocol (validated once per file change)
+        spec = protocol_library.spec(selected_file, protocol_type)
         st.session_state.current_protocol = {
             'name': spec.name,
             'version': spec.version,
@@ -1065,7 +1086,7 @@ try:
         }
     else:
         # Load as standard protocol
-        spec = ProtocolSpecification.from_yaml(selected_file)
+        spec = protocol_library.spec(selected_file, protocol_type)
         st.session_state.current_protocol = {
             'name': spec.name,
             'version': spec.version,
@@ -1105,6 +1126,51 @@ try:
             st.caption(f"Created: {spec.created_date}")
             st.caption(f"Checksum: {spec.checksum[:8]}...")
     
+    # Impact preview - small cached run, refreshed whenever the protocol or its parameters change.
+    # Runs while editing, or on request: it imports the simulation engine and simulates patients
+    if is_time_based_protocol:
+        in_edit_mode = st.session_state.get('edit_mode', False) and protocol_type == "temp"
+        if in_edit_mode or st.toggle("Show impact preview", key="show_impact_preview"):
+            st.subheader("Impact Preview")
+            try:
+                # Imported here: the preview pulls in the simulation engine
+                from simulation_v2.core.protocol_preview import preview_protocol
+                preview = preview_protocol(spec)
+                summary = preview.summary()
+                # Remember the preview before the latest edit to show what the edit changed
+                history = st.session_state.setdefault('protocol_preview', {}).setdefault(
+                    str(selected_file), {'current': summary, 'previous': None}
+                )
+                if history['current'] != summary:
+                    history['previous'], history['current'] = history['current'], summary
+                previous = history['previous']
+                
+                def preview_delta(metric, fmt):
+                    if previous is None or previous[metric] == summary[metric]:
+                        return None
+                    return fmt.format(summary[metric] - previous[metric])
+                
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Injections / year", f"{summary['injections_per_year']:.1f}",
+                              delta=preview_delta('injections_per_year', "{:+.1f}"), delta_color="off")
+                with col2:
+                    st.metric("Visits / year", f"{summary['visits_per_year']:.1f}",
+                              delta=preview_delta('visits_per_year', "{:+.1f}"), delta_color="off")
+                with col3:
+                    st.metric(f"Vision change at {preview.duration_years:g} years",
+                              f"{summary['vision_change']:+.1f} letters",
+                              delta=preview_delta('vision_change', "{:+.1f}"))
+                with col4:
+                    st.metric("Discontinued", f"{summary['discontinuation_rate']:.0%}",
+                              delta=preview_delta('discontinuation_rate', "{:+.0%}"), delta_color="inverse")
+                st.caption(
+                    f"Fixed-seed surrogate run of {preview.n_patients} patients enrolled together, "
+                    f"{preview.duration_years:g} years of follow-up. Indicative only - run a full simulation for results."
+                )
+            except Exception as e:
+                st.caption(f"Preview unavailable: {e}")
+    
     # Protocol parameters tabs - different for time-based
     if is_time_based_protocol:
         tab1, tab2, tab3, tab4 = st.tabs([
@@ -1513,8 +1579,7 @@ try:
             with param_tabs[0]:
                 transitions_path = protocol_dir / spec.disease_transitions_file
                 if transitions_path.exists():
-                    with open(transitions_path) as f:
-                        trans_data = yaml.safe_load(f)
+                    trans_data = protocol_library.load_yaml(transitions_path)
                     
                     transitions = trans_data.get('fortnightly_transitions', {})
                     states = list(transitions.keys())
@@ -1588,8 +1653,7 @@ try:
             with param_tabs[1]:
                 effects_path = protocol_dir / spec.treatment_effect_file
                 if effects_path.exists():
-                    with open(effects_path) as f:
-                        effects_data = yaml.safe_load(f)
+                    effects_data = protocol_library.load_yaml(effects_path)
                     
                     if st.session_state.get('edit_mode', False) and selected_file.parent == TEMP_DIR:
                         st.info("Edit treatment effect parameters")
@@ -1679,8 +1743,7 @@ try:
             with param_tabs[2]:
                 vision_path = protocol_dir / spec.vision_parameters_file
                 if vision_path.exists():
-                    with open(vision_path) as f:
-                        vision_data = yaml.safe_load(f)
+                    vision_data = protocol_library.load_yaml(vision_path)
                     
                     if st.session_state.get('edit_mode', False) and selected_file.parent == TEMP_DIR:
                         st.info("Edit vision model parameters")
@@ -1740,8 +1803,7 @@ try:
             with param_tabs[3]:
                 disc_path = protocol_dir / spec.discontinuation_parameters_file
                 if disc_path.exists():
-                    with open(disc_path) as f:
-                        disc_data = yaml.safe_load(f)
+                    disc_data = protocol_library.load_yaml(disc_path)
                     
                     if st.session_state.get('edit_mode', False) and selected_file.parent == TEMP_DIR:
                         st.info("Edit discontinuation parameters")
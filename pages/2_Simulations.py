@@ -13,7 +13,6 @@ import logging
 logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
 
 from simulation_v2.protocols.protocol_spec import ProtocolSpecification
-from ape.core.simulation_runner import SimulationRunner
 from ape.core.monitoring.memory import MemoryMonitor
 from ape.core.results.factory import ResultsFactory
 from ape.utils.state_helpers import (
@@ -314,6 +313,8 @@ if st.session_state.get('simulation_running', False):
         status_text.caption("Initializing...")
         enable_resource_tracking = recruitment_params.get('enable_resource_tracking', False)
         resource_config_path = recruitment_params.get('financial_config_path', None)
+        # Imported here: the engines are only needed once a run starts
+        from ape.core.simulation_runner import SimulationRunner
         runner = SimulationRunner(
             spec, 
             enable_resource_tracking=enable_resource_tracking,
@@ -6,9 +6,6 @@ import streamlit as st
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-import seaborn as sns
 import time
 import hashlib
 
@@ -17,11 +14,7 @@ from ape.utils.visualization_modes import (
     init_visualization_mode, mode_aware_figure, 
     get_mode_colors, apply_visualization_mode
 )
-from ape.utils.tufte_zoom_style import (
-    style_axis, add_reference_line, format_zoom_legend
-)
 from ape.utils.style_constants import StyleConstants
-from ape.utils.chart_builder import ChartBuilder
 from ape.utils.export_config import render_export_settings
 from ape.utils.startup_redirect import handle_page_startup
 
@@ -38,7 +31,6 @@ handle_page_startup("analysis")
 # Add parent for utils import
 from ape.utils.carbon_button_helpers import top_navigation_home_button, ape_button
 from ape.utils.state_helpers import get_active_simulation
-from ape.components.treatment_patterns.enhanced_tab import render_enhanced_treatment_patterns_tab
 
 # Import workflow indicator
 from ape.components.ui.workflow_indicator import workflow_progress_indicator
@@ -64,6 +56,16 @@ if not results_data:
             st.switch_page("pages/2_Simulations.py")
     st.stop()
 
+# Plotting stack, only loaded once there are results to plot
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import seaborn as sns
+from ape.utils.tufte_zoom_style import (
+    style_axis, add_reference_line, format_zoom_legend
+)
+from ape.utils.chart_builder import ChartBuilder
+from ape.components.treatment_patterns.enhanced_tab import render_enhanced_treatment_patterns_tab
+
 results = results_data['results']
 protocol = results_data['protocol']
 params = results_data['parameters']
@@ -83,16 +85,15 @@ def get_cached_stats(sim_id):
 @st.cache_data
 def calculate_vision_stats_vectorized(sim_id, sample_size=None):
     """Calculate vision statistics using vectorized operations."""
-    # Get vision trajectory data
-    vision_df = results.get_vision_trajectory_df(sample_size=sample_size)
-    
-    # Use groupby to get first and last vision for each patient - MUCH faster!
-    patient_stats = vision_df.groupby('patient_id')['vision'].agg(['first', 'last']).reset_index()
+    # Vision endpoints from the outcome-metrics registry, computed once per simulation
+    patient_stats = results.patient_outcomes(['baseline_vision', 'final_vision', 'vision_change']).dropna()
+    if sample_size:
+        patient_stats = patient_stats.sample(n=min(sample_size, len(patient_stats)), random_state=42)
     
     # Extract arrays
-    baseline_visions = patient_stats['first'].values
-    final_visions = patient_stats['last'].values
-    vision_changes = final_visions - baseline_visions
+    baseline_visions = patient_stats['baseline_vision'].values
+    final_visions = patient_stats['final_vision'].values
+    vision_changes = patient_stats['vision_change'].values
     
     return baseline_visions, final_visions, vision_changes, len(patient_stats)
 
@@ -117,7 +118,8 @@ with tab1:
     
     # Import enhanced analyzer if available
     try:
-        from ape.components.treatment_patterns.pattern_analyzer_enhanced import extract_treatment_patterns_with_terminals
+        from ape.components.treatment_patterns.pattern_analyzer import aggregate_transition_counts
+        from ape.components.treatment_patterns.pattern_analyzer_enhanced import stream_treatment_patterns_with_terminals
         from ape.components.treatment_patterns.sankey_builder_enhanced import create_enhanced_sankey_with_terminals
         enhanced_available = True
     except ImportError:
@@ -127,7 +129,7 @@ with tab1:
     
     @st.cache_data
     def get_cached_treatment_patterns(sim_id, include_terminals=False):
-        """Get treatment patterns with backward compatibility."""
+        """Get treatment transitions and their aggregated counts."""
         # First check if data was pre-calculated
         cache_key = f"treatment_patterns_{sim_id}"
         
@@ -135,16 +137,19 @@ with tab1:
             data = st.session_state[cache_key]
             # Handle enhanced terminals if requested and available
             if include_terminals and 'transitions_df_with_terminals' in data:
-                return data['transitions_df_with_terminals'], data['visits_df_with_terminals']
+                transitions_df = data['transitions_df_with_terminals']
             else:
-                return data['transitions_df'], data['visits_df']
+                transitions_df = data['transitions_df']
+            return transitions_df, aggregate_transition_counts(transitions_df)
         
         # Use enhanced version only - no fallbacks
         if not include_terminals or not enhanced_available:
             raise ValueError("Enhanced pattern analyzer with terminals is required")
-        transitions_df, visits_df = extract_treatment_patterns_with_terminals(results)
         
-        return transitions_df, visits_df
+        # Stream visits in batches; the full visits table is never loaded here
+        summary = stream_treatment_patterns_with_terminals(results)
+        
+        return summary.transitions_df, summary.transition_counts
     
     # Mobile device warning
     mobile_warning = """
@@ -169,7 +174,7 @@ with tab1:
     
     # Get treatment patterns - always include terminals if available
     with st.spinner("Analyzing treatment patterns..."):
-        transitions_df, visits_df = get_cached_treatment_patterns(
+        transitions_df, transition_counts = get_cached_treatment_patterns(
             results.metadata.sim_id, 
             include_terminals=enhanced_available
         )
@@ -179,7 +184,7 @@ with tab1:
         if not enhanced_available:
             raise ValueError("Enhanced pattern analyzer is required but not available")
         
-        fig = create_enhanced_sankey_with_terminals(transitions_df, results)
+        fig = create_enhanced_sankey_with_terminals(transition_counts, results)
         
         # Import export configuration
         from ape.utils.export_config import get_sankey_export_config
@@ -265,7 +270,7 @@ with tab2:
             resolution_help = "Choose time resolution"
         else:
             resolution_options = ["month", "quarter"]
-            resolution_help = f"Week resolution disabled for performance (large dataset)"
+            resolution_help = "Week resolution is not offered for very long simulations"
         
         time_resolution = st.radio(
             "Time Resolution",
@@ -404,22 +409,20 @@ with tab3:
         # Get all patients and their discontinuation status
         discontinued_info = get_discontinued_patients(results)
         
-        # Get vision trajectory data again
-        vision_df_full = results.get_vision_trajectory_df(sample_size=None)
+        # Vision endpoints per patient (cached with the vision statistics above)
+        patient_outcomes = results.patient_outcomes(['baseline_vision', 'final_vision', 'vision_change']).dropna()
         
         # Identify patients who were still active at the end
         active_patient_ids = {str(pid) for pid, info in discontinued_info.items() if not info['discontinued']}
         
-        # Filter vision data for only active patients
-        vision_df_active = vision_df_full[vision_df_full['patient_id'].astype(str).isin(active_patient_ids)]
+        # Filter to active patients only
+        active_patient_stats = patient_outcomes[patient_outcomes.index.astype(str).isin(active_patient_ids)]
         
-        if len(vision_df_active) > 0:
+        if len(active_patient_stats) > 0:
             # Calculate statistics for active patients only
-            active_patient_stats = vision_df_active.groupby('patient_id')['vision'].agg(['first', 'last']).reset_index()
-            
-            active_baseline_visions = active_patient_stats['first'].values
-            active_final_visions = active_patient_stats['last'].values
-            active_vision_changes = active_final_visions - active_baseline_visions
+            active_baseline_visions = active_patient_stats['baseline_vision'].values
+            active_final_visions = active_patient_stats['final_vision'].values
+            active_vision_changes = active_patient_stats['vision_change'].values
             n_active_patients = len(active_patient_stats)
             
             # Display count of active vs discontinued
@@ -833,9 +836,12 @@ with tab7:
     st.header("Pattern Details")
     
     # Reuse cached treatment patterns if available
-    if 'transitions_df' not in locals() or 'visits_df' not in locals():
+    if 'transitions_df' not in locals():
         with st.spinner("Loading treatment patterns..."):
-            transitions_df, visits_df = get_cached_treatment_patterns(results.metadata.sim_id)
+            transitions_df, _ = get_cached_treatment_patterns(
+                results.metadata.sim_id,
+                include_terminals=enhanced_available
+            )
     
     if len(transitions_df) > 0:
         # Show top transition patterns
@@ -9,7 +9,6 @@ import numpy as np
 from datetime import datetime
 import json
 import yaml
-import matplotlib.pyplot as plt
 from visualization.color_system import COLORS, ALPHAS
 
 # Page configuration
@@ -27,11 +26,10 @@ from ape.utils.carbon_button_helpers import ape_button, CarbonIcons
 # Import simulation loading utilities
 from ape.utils.simulation_loader import load_simulation_data
 from ape.core.results.factory import ResultsFactory
-# Import vision distribution visualization
-from ape.utils.vision_distribution_viz import create_compact_vision_distribution_plot
-# Import streamgraph and flow visualizations
-from ape.visualizations.streamgraph_treatment_states import create_treatment_state_streamgraph
-from ape.components.treatment_patterns.sankey_builder_enhanced import create_enhanced_sankey_with_terminals
+from ape.components.comparison_data import (
+    load_comparison_data,
+    discontinuation_summary
+)
 
 # Check for startup redirect
 handle_page_startup("comparison")
@@ -294,6 +292,14 @@ if not (sim_a and sim_b):
     st.info("Please select two simulations to compare")
     st.stop()
 
+# Plotting stack, only loaded once there is a comparison to plot
+import matplotlib.pyplot as plt
+# Import vision distribution visualization
+from ape.utils.vision_distribution_viz import create_compact_vision_distribution_plot
+# Import streamgraph and flow visualizations
+from ape.visualizations.streamgraph_treatment_states import create_treatment_state_streamgraph
+from ape.components.treatment_patterns.sankey_builder_enhanced import create_enhanced_sankey_with_terminals
+
 # Add to recent pairs
 def update_recent_pairs(sim_a, sim_b):
     """Update the list of recent comparison pairs."""
@@ -417,217 +423,50 @@ with col2:
                     st.caption("Could not display")
 
 # Helper function to load simulation data from path
-def load_simulation_from_path(sim_info):
-    """Load simulation data from parquet files."""
-    try:
-        sim_path = sim_info['path']
-        
-        # Load parquet data
-        patients_df = pd.read_parquet(sim_path / "patients.parquet")
-        visits_df = pd.read_parquet(sim_path / "visits.parquet")
-        
-        # Load summary stats
-        summary_stats = {}
-        summary_path = sim_path / "summary_stats.json"
-        if summary_path.exists():
-            with open(summary_path) as f:
-                summary_stats = json.load(f)
-        
-        # Convert to format expected by comparison functions
-        patient_histories = {}
-        
-        # Group visits by patient
-        for patient_id in patients_df['patient_id'].unique():
-            patient_visits = visits_df[visits_df['patient_id'] == patient_id].sort_values('date')
-            patient_data = patients_df[patients_df['patient_id'] == patient_id].iloc[0]
-            
-            visits = []
-            if len(patient_visits) > 0:
-                baseline_date = pd.to_datetime(patient_visits.iloc[0]['date'])
-                
-                for _, visit in patient_visits.iterrows():
-                    visit_date = pd.to_datetime(visit['date'])
-                    month = (visit_date - baseline_date).days / 30.44
-                    
-                    visits.append({
-                        'month': month,
-                        'vision': visit['vision'],  # Column is 'vision' not 'visual_acuity'
-                        'injection_given': visit['injected'],  # Column is 'injected' not 'injection_given'
-                        'date': str(visit_date)
-                    })
-            
-            patient_histories[patient_id] = {
-                'visits': visits,
-                'baseline_vision': float(patient_data['baseline_vision']),
-                'current_vision': float(patient_data['final_vision']),
-                'is_discontinued': bool(patient_data['discontinued'])
-            }
-        
-        # Get discontinuation summary
-        disc_summary = {
-            'by_reason': {},
-            'total': int(patients_df['discontinued'].sum())
-        }
-        
-        # Add reason breakdown if available
-        if 'discontinuation_reason' in patients_df.columns:
-            # Filter out None/NaN values
-            disc_patients = patients_df[patients_df['discontinued'] == True]
-            if len(disc_patients) > 0:
-                reason_counts = disc_patients['discontinuation_reason'].value_counts()
-                disc_summary['by_reason'] = reason_counts.to_dict()
-        
-        return {
-            'patient_histories': patient_histories,
-            'discontinuation_summary': disc_summary,
-            'summary_stats': summary_stats
-        }
-        
-    except Exception as e:
-        st.error(f"Error loading simulation data: {str(e)}")
-        import traceback
-        st.error(traceback.format_exc())
-        return None
+@st.cache_data(show_spinner=False)
+def load_simulation_from_path(sim_path):
+    """Load simulation data as patient-sorted columnar tables."""
+    return load_comparison_data(sim_path)
 
 # Load the actual simulation data
 with st.spinner("Loading simulation data..."):
     try:
-        results_a = load_simulation_from_path(sim_a)
-        results_b = load_simulation_from_path(sim_b)
+        data_a = load_simulation_from_path(str(sim_a['path']))
+        data_b = load_simulation_from_path(str(sim_b['path']))
+        
+        # Columnar results for vision statistics
+        parquet_a = ResultsFactory.load_results(sim_a['path'])
+        parquet_b = ResultsFactory.load_results(sim_b['path'])
         
-        if not results_a or not results_b:
-            st.error("Failed to load simulation data")
-            st.stop()
-            
     except Exception as e:
         st.error(f"Error loading simulations: {str(e)}")
         st.stop()
 
 # Helper function to calculate metrics
-def calculate_comparison_metrics(results_a, results_b):
+def calculate_comparison_metrics(data_a, data_b, results_a, results_b):
     """Calculate key comparison metrics from simulation results."""
     metrics = {}
     
-    # Extract patient histories
-    histories_a = results_a.get('patient_histories', {})
-    histories_b = results_b.get('patient_histories', {})
-    
-    # Visual Acuity Metrics
-    # Get visual acuity arrays for calculations
-    def get_vision_at_timepoints(histories):
-        """Extract vision values at key timepoints."""
-        baseline_values = []
-        year1_values = []
-        year2_values = []
-        final_values = []
-        
-        for patient_id, history in histories.items():
-            visits = history.get('visits', [])
-            if not visits:
-                continue
-                
-            # Baseline
-            baseline_values.append(visits[0]['vision'])
-            
-            # Find visits closest to 12, 24 months and final
-            for visit in visits:
-                month = visit['month']
-                if 11 <= month <= 13 and len(year1_values) < len(baseline_values):
-                    year1_values.append(visit['vision'])
-                elif 23 <= month <= 25 and len(year2_values) < len(baseline_values):
-                    year2_values.append(visit['vision'])
-            
-            # Final visit
-            if visits:
-                final_values.append(visits[-1]['vision'])
-        
-        return {
-            'baseline': np.array(baseline_values),
-            'year1': np.array(year1_values),
-            'year2': np.array(year2_values),
-            'final': np.array(final_values)
-        }
-    
-    vision_a = get_vision_at_timepoints(histories_a)
-    vision_b = get_vision_at_timepoints(histories_b)
-    
-    # Calculate means
+    # Vision and treatment burden from the outcome-metrics registry (cached per simulation)
+    outcomes_a = results_a.outcome_metrics()
+    outcomes_b = results_b.outcome_metrics()
+
+    def pair(name):
+        return (outcomes_a[name], outcomes_b[name])
+
     metrics['visual_acuity'] = {
-        'baseline': (
-            np.mean(vision_a['baseline']) if len(vision_a['baseline']) > 0 else 0,
-            np.mean(vision_b['baseline']) if len(vision_b['baseline']) > 0 else 0
-        ),
-        'year1': (
-            np.mean(vision_a['year1']) if len(vision_a['year1']) > 0 else 0,
-            np.mean(vision_b['year1']) if len(vision_b['year1']) > 0 else 0
-        ),
-        'year2': (
-            np.mean(vision_a['year2']) if len(vision_a['year2']) > 0 else 0,
-            np.mean(vision_b['year2']) if len(vision_b['year2']) > 0 else 0
-        ),
-        'final': (
-            np.mean(vision_a['final']) if len(vision_a['final']) > 0 else 0,
-            np.mean(vision_b['final']) if len(vision_b['final']) > 0 else 0
-        )
+        'baseline': pair('baseline_vision'),
+        'year1': pair('vision_year1'),
+        'year2': pair('vision_year2'),
+        'final': pair('final_vision'),
+        # Change from baseline and maintained vision (≤5 letter loss), paired per patient
+        'change': pair('vision_change'),
+        'maintained': pair('vision_maintained')
     }
-    
-    # Calculate change from baseline
-    if len(vision_a['baseline']) > 0 and len(vision_a['final']) > 0:
-        change_a = np.mean(vision_a['final'] - vision_a['baseline'][:len(vision_a['final'])])
-    else:
-        change_a = 0
-        
-    if len(vision_b['baseline']) > 0 and len(vision_b['final']) > 0:
-        change_b = np.mean(vision_b['final'] - vision_b['baseline'][:len(vision_b['final'])])
-    else:
-        change_b = 0
-        
-    metrics['visual_acuity']['change'] = (change_a, change_b)
-    
-    # Calculate maintained vision (≤5 letter loss)
-    if len(vision_a['baseline']) > 0 and len(vision_a['final']) > 0:
-        maintained_a = np.sum((vision_a['baseline'][:len(vision_a['final'])] - vision_a['final']) <= 5) / len(vision_a['final']) * 100
-    else:
-        maintained_a = 0
-        
-    if len(vision_b['baseline']) > 0 and len(vision_b['final']) > 0:
-        maintained_b = np.sum((vision_b['baseline'][:len(vision_b['final'])] - vision_b['final']) <= 5) / len(vision_b['final']) * 100
-    else:
-        maintained_b = 0
-        
-    metrics['visual_acuity']['maintained'] = (maintained_a, maintained_b)
-    
-    # Treatment Burden Metrics
-    def get_treatment_burden(histories):
-        """Calculate treatment burden metrics."""
-        total_injections = []
-        total_visits = []
-        
-        for patient_id, history in histories.items():
-            visits = history.get('visits', [])
-            injection_count = sum(1 for v in visits if v.get('injection_given', False))
-            visit_count = len(visits)
-            
-            total_injections.append(injection_count)
-            total_visits.append(visit_count)
-        
-        return {
-            'injections': np.array(total_injections),
-            'visits': np.array(total_visits)
-        }
-    
-    burden_a = get_treatment_burden(histories_a)
-    burden_b = get_treatment_burden(histories_b)
-    
+
     metrics['treatment_burden'] = {
-        'mean_injections': (
-            np.mean(burden_a['injections']) if len(burden_a['injections']) > 0 else 0,
-            np.mean(burden_b['injections']) if len(burden_b['injections']) > 0 else 0
-        ),
-        'mean_visits': (
-            np.mean(burden_a['visits']) if len(burden_a['visits']) > 0 else 0,
-            np.mean(burden_b['visits']) if len(burden_b['visits']) > 0 else 0
-        )
+        'mean_injections': pair('injections'),
+        'mean_visits': pair('visits')
     }
     
     # Calculate injection:visit ratio
@@ -636,14 +475,14 @@ def calculate_comparison_metrics(results_a, results_b):
     metrics['treatment_burden']['injection_ratio'] = (ratio_a, ratio_b)
     
     # Discontinuation Metrics
-    disc_summary_a = results_a.get('discontinuation_summary', {})
-    disc_summary_b = results_b.get('discontinuation_summary', {})
+    disc_summary_a = discontinuation_summary(data_a)
+    disc_summary_b = discontinuation_summary(data_b)
     
-    total_disc_a = sum(disc_summary_a.get('by_reason', {}).values())
-    total_disc_b = sum(disc_summary_b.get('by_reason', {}).values())
+    total_disc_a = sum(disc_summary_a['by_reason'].values())
+    total_disc_b = sum(disc_summary_b['by_reason'].values())
     
-    n_patients_a = len(histories_a)
-    n_patients_b = len(histories_b)
+    n_patients_a = data_a.n_patients
+    n_patients_b = data_b.n_patients
     
     metrics['discontinuations'] = {
         'total_pct': (
@@ -651,19 +490,15 @@ def calculate_comparison_metrics(results_a, results_b):
             (total_disc_b / n_patients_b * 100) if n_patients_b > 0 else 0
         ),
         'poor_vision_pct': (
-            (disc_summary_a.get('by_reason', {}).get('poor_vision', 0) / n_patients_a * 100) if n_patients_a > 0 else 0,
-            (disc_summary_b.get('by_reason', {}).get('poor_vision', 0) / n_patients_b * 100) if n_patients_b > 0 else 0
+            (disc_summary_a['by_reason'].get('poor_vision', 0) / n_patients_a * 100) if n_patients_a > 0 else 0,
+            (disc_summary_b['by_reason'].get('poor_vision', 0) / n_patients_b * 100) if n_patients_b > 0 else 0
         )
     }
     
     return metrics
 
 # Calculate metrics
-metrics = calculate_comparison_metrics(results_a, results_b)
-
-# Extract histories for visualization
-histories_a = results_a.get('patient_histories', {})
-histories_b = results_b.get('patient_histories', {})
+metrics = calculate_comparison_metrics(data_a, data_b, parquet_a, parquet_b)
 
 # Section 3: Key Insights
 st.markdown("---")
@@ -977,26 +812,11 @@ with col3:
 st.subheader("Visual Acuity Over Time")
 
 # Prepare data for visualization
-def prepare_vision_data(histories):
+def prepare_vision_data(sim_results):
     """Prepare vision data for plotting."""
-    # Collect all visits
-    all_months = []
-    all_visions = []
-    
-    for patient_id, history in histories.items():
-        visits = history.get('visits', [])
-        for visit in visits:
-            all_months.append(visit['month'])
-            all_visions.append(visit['vision'])
-    
-    # Create DataFrame
-    df = pd.DataFrame({
-        'Month': all_months,
-        'Vision': all_visions
-    })
-    
-    # Calculate statistics by month
-    stats = df.groupby('Month')['Vision'].agg(['mean', 'std', 'count']).reset_index()
+    # Monthly statistics since enrollment, computed in one pass and cached per simulation
+    stats = sim_results.vision_trajectory(bin='month', stats=['mean', 'sd', 'n'], align='enrollment')
+    stats = stats.rename(columns={'month': 'Month', 'sd': 'std', 'n': 'count'})
     stats['ci_lower'] = stats['mean'] - 1.96 * stats['std'] / np.sqrt(stats['count'])
     stats['ci_upper'] = stats['mean'] + 1.96 * stats['std'] / np.sqrt(stats['count'])
     
@@ -1064,8 +884,8 @@ def create_standardized_vision_plot(ax, vision_data, title, color='blue', show_c
         ax.legend().set_visible(False)
 
 # Prepare data
-vision_data_a = prepare_vision_data(histories_a)
-vision_data_b = prepare_vision_data(histories_b)
+vision_data_a = prepare_vision_data(parquet_a)
+vision_data_b = prepare_vision_data(parquet_b)
 
 # Calculate max month across both simulations for consistent x-axis
 max_month_a = vision_data_a['Month'].max() if len(vision_data_a) > 0 else 60
@@ -1255,9 +1075,11 @@ try:
 
     # Create the population outcome comparison
     with st.spinner("Generating population-level comparison..."):
+        population_a = {'visits': data_a.visits, 'patients': data_a.patients}
+        population_b = {'visits': data_b.visits, 'patients': data_b.patients}
         fig_population = create_population_outcome_comparison(
-            results_a,
-            results_b,
+            population_a,
+            population_b,
             label_a="Simulation A",
             label_b="Simulation B",
             max_months=int(max_month)
@@ -1270,8 +1092,8 @@ try:
         # Export data option
         with st.expander("📊 Export Population Comparison Data"):
             export_pop_df = export_population_comparison_data(
-                results_a,
-                results_b,
+                population_a,
+                population_b,
                 label_a=sim_a['protocol'],
                 label_b=sim_b['protocol'],
                 max_months=int(max_month)
@@ -1435,23 +1257,13 @@ if cost_config_a and cost_config_b:
                 original_costs = safe_call_method(resource_tracker, 'get_total_costs', {'total': 0, 'drug': 0})
                 workload_summary = safe_call_method(resource_tracker, 'get_workload_summary', {})
                 
-                # Count injections from visits
-                if hasattr(resource_tracker, '__dict__'):
-                    visits = resource_tracker.__dict__.get('visits', [])
-                else:
-                    visits = getattr(resource_tracker, 'visits', [])
-                
-                total_injections = sum(1 for v in visits if v.get('injection_given', False))
-                
-                # Calculate drug cost adjustment
-                drug_cost_diff = new_drug_cost - default_drug_cost
-                drug_cost_adjustment = drug_cost_diff * total_injections
+                # Re-price the stored visits at the new drug price
+                from simulation_v2.economics.repricing import RepricingEngine
+                engine = RepricingEngine.from_tracker(resource_tracker)
+                total_injections = int(engine.total_quantities[0])
                 
-                # Apply adjustment
-                adjusted_costs = original_costs.copy()
-                if 'drug' in adjusted_costs:
-                    adjusted_costs['drug'] = adjusted_costs.get('drug', 0) + drug_cost_adjustment
-                    adjusted_costs['total'] = adjusted_costs.get('total', 0) + drug_cost_adjustment
+                schedule = engine.recorded_schedule().with_drug_price(new_drug_cost)
+                adjusted_costs = engine.price(schedule).total_costs()
                 
                 return {
                     'costs': adjusted_costs,
@@ -1512,8 +1324,8 @@ if cost_config_a and cost_config_b:
             st.markdown("#### Key Financial Metrics")
             
             # Calculate metrics first
-            cost_per_patient_a = costs_a['costs']['total'] / len(histories_a)
-            cost_per_patient_b = costs_b['costs']['total'] / len(histories_b)
+            cost_per_patient_a = costs_a['costs']['total'] / data_a.n_patients
+            cost_per_patient_b = costs_b['costs']['total'] / data_b.n_patients
             
             # Calculate cost per vision maintained
             try:
@@ -2074,14 +1886,14 @@ try:
     if results_a:
         # Use the same approach as analysis page - check for enhanced version
         try:
-            from ape.components.treatment_patterns.pattern_analyzer_enhanced import extract_treatment_patterns_with_terminals
+            from ape.components.treatment_patterns.pattern_analyzer_enhanced import stream_treatment_patterns_with_terminals
             enhanced_available = True
         except ImportError:
             enhanced_available = False
             
-        # Get patterns with terminal states if available
+        # Get patterns with terminal states if available (streamed, visits are not needed here)
         if enhanced_available:
-            transitions_df_a, _ = extract_treatment_patterns_with_terminals(results_a)
+            transitions_df_a = stream_treatment_patterns_with_terminals(results_a).transitions_df
         else:
             from ape.components.treatment_patterns.data_manager import get_treatment_pattern_data
             transitions_df_a, _ = get_treatment_pattern_data(results_a)
@@ -2097,14 +1909,14 @@ try:
     if results_b:
         # Use the same approach as analysis page - check for enhanced version
         try:
-            from ape.components.treatment_patterns.pattern_analyzer_enhanced import extract_treatment_patterns_with_terminals
+            from ape.components.treatment_patterns.pattern_analyzer_enhanced import stream_treatment_patterns_with_terminals
             enhanced_available = True
         except ImportError:
             enhanced_available = False
             
-        # Get patterns with terminal states if available
+        # Get patterns with terminal states if available (streamed, visits are not needed here)
         if enhanced_available:
-            transitions_df_b, _ = extract_treatment_patterns_with_terminals(results_b)
+            transitions_df_b = stream_treatment_patterns_with_terminals(results_b).transitions_df
         else:
             from ape.components.treatment_patterns.data_manager import get_treatment_pattern_data
             transitions_df_b, _ = get_treatment_pattern_data(results_b)
@@ -10,8 +10,6 @@ This page provides detailed analysis of:
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
@@ -85,6 +83,10 @@ if not has_resource_tracking or resource_tracker is None:
     
     st.stop()
 
+# Charting stack, only loaded once there are resource results to chart
+import plotly.graph_objects as go
+import plotly.express as px
+
 # Main title
 st.title("Workload & Economic Analysis")
 
@@ -139,7 +141,7 @@ if hasattr(resource_tracker, '__dict__'):
     # SimpleNamespace wrapper
     rt_dict = resource_tracker.__dict__
     current_drug_costs = rt_dict.get('costs', {}).get('drugs', {})
-    visits = rt_dict.get('visits', [])
+    visits = getattr(resource_tracker, 'visits', [])
 else:
     # Direct ResourceTracker object
     current_drug_costs = resource_tracker.costs.get('drugs', {})
@@ -187,7 +189,7 @@ with tab1:
     elif hasattr(resource_tracker, '__dict__'):
         rt_dict = resource_tracker.__dict__
         # Try to get all dates from daily_usage keys
-        daily_usage = rt_dict.get('daily_usage', {})
+        daily_usage = getattr(resource_tracker, 'daily_usage', {})
         all_dates = sorted(daily_usage.keys()) if daily_usage else []
     else:
         all_dates = []
@@ -199,7 +201,7 @@ with tab1:
             # Get daily usage (handle SimpleNamespace)
             if hasattr(resource_tracker, '__dict__'):
                 rt_dict = resource_tracker.__dict__
-                daily_usage_dict = rt_dict.get('daily_usage', {})
+                daily_usage_dict = getattr(resource_tracker, 'daily_usage', {})
                 daily_usage = daily_usage_dict.get(date, {})
             else:
                 daily_usage = resource_tracker.daily_usage[date]
@@ -663,7 +665,7 @@ with st.expander("Export Options", expanded=False):
             'daily_usage': [
                 {
                     'date': date.isoformat(),
-                    'usage': dict(rt_dict.get('daily_usage', {}).get(date, {}) if hasattr(resource_tracker, '__dict__') else resource_tracker.daily_usage[date])
+                    'usage': dict(getattr(resource_tracker, 'daily_usage', {}).get(date, {}))
                 }
                 for date in all_dates
             ] if 'all_dates' in locals() else [],
@@ -719,6 +721,7 @@ with st.expander("Export Options", expanded=False):
         
         try:
             from ape.utils.financial_pdf_generator import generate_financial_parameters_pdf
+            from ape.utils.report_rendering import cached_report, report_time
             
             # Handle both direct ResourceTracker and wrapped versions
             if hasattr(resource_tracker, '__dict__'):
@@ -752,7 +755,8 @@ with st.expander("Export Options", expanded=False):
                     resource_config['capacity_constraints'] = resource_tracker.capacity_constraints
             
             # Generate PDF
-            pdf_bytes = generate_financial_parameters_pdf(resource_config=resource_config)
+            pdf_bytes = cached_report(generate_financial_parameters_pdf, resource_config=resource_config,
+                                      generated_at=report_time())
             
             st.download_button(
                 label="Download Financial Parameters (PDF)",
@@ -772,6 +776,7 @@ with st.expander("Export Options", expanded=False):
         
         try:
             from ape.utils.workload_results_pdf_generator import generate_workload_results_pdf
+            from ape.utils.report_rendering import cached_report, report_time
             
             # Prepare simulation info
             simulation_info = {
@@ -830,14 +835,16 @@ with st.expander("Export Options", expanded=False):
             ] if 'bottlenecks' in locals() else None
             
             # Generate PDF
-            pdf_bytes = generate_workload_results_pdf(
+            pdf_bytes = cached_report(
+                generate_workload_results_pdf,
                 simulation_info=simulation_info,
                 workload_summary=workload_summary,
                 total_costs=safe_call_method(resource_tracker, 'get_total_costs'),
                 utilization_data=utilization_data if 'utilization_data' in locals() else [],
                 staffing_data=staffing_data if 'staffing_data' in locals() else [],
                 bottlenecks=bottlenecks_for_pdf,
-                patient_outcomes=patient_outcomes_data
+                patient_outcomes=patient_outcomes_data,
+                generated_at=report_time()
             )
             
             st.download_button(
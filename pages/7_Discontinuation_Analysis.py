@@ -9,7 +9,6 @@ import streamlit as st
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
 import json
 from visualization.color_system import COLORS, ALPHAS
@@ -26,6 +25,7 @@ st.set_page_config(
 from ape.utils.startup_redirect import handle_page_startup
 from ape.components.ui.workflow_indicator import workflow_progress_indicator
 from ape.core.results.factory import ResultsFactory
+from ape.core.results.discontinuation_summary import load_discontinuation_summary
 
 # Check for startup redirect
 handle_page_startup("discontinuation_analysis")
@@ -114,36 +114,10 @@ with col2:
 # Load discontinuation data
 @st.cache_data
 def load_discontinuation_data(sim_path):
-    """Load and analyze discontinuation data from a simulation."""
+    """Load the discontinuation summary stored with a simulation."""
     try:
-        results = ResultsFactory.load_results(sim_path)
-        patients_df = results.get_patients_df()
-
-        # Get total patients
-        total_patients = len(patients_df)
-
-        # Get discontinued patients
-        discontinued_df = patients_df[patients_df['discontinued'] == True].copy()
-        total_discontinued = len(discontinued_df)
-
-        # Count by reason
-        reason_counts = {}
-        if 'discontinuation_reason' in discontinued_df.columns:
-            reason_counts = discontinued_df['discontinuation_reason'].value_counts().to_dict()
-
-        # If no reason column or all NaN, mark as unknown
-        if not reason_counts:
-            if total_discontinued > 0:
-                reason_counts = {'unknown': total_discontinued}
-
-        return {
-            'total_patients': total_patients,
-            'total_discontinued': total_discontinued,
-            'discontinuation_rate': total_discontinued / total_patients if total_patients > 0 else 0,
-            'reason_counts': reason_counts,
-            'discontinued_df': discontinued_df,
-            'patients_df': patients_df
-        }
+        # Written at save time (or once for older simulations), so no patient or visit scans
+        return load_discontinuation_summary(sim_path)
     except Exception as e:
         st.error(f"Error loading discontinuation data: {str(e)}")
         return None
@@ -157,6 +131,9 @@ if not data_a or not data_b:
     st.error("Failed to load discontinuation data")
     st.stop()
 
+# Plotting stack, only loaded once there is data to plot
+import matplotlib.pyplot as plt
+
 # Display summary
 st.markdown("---")
 st.markdown("### Summary")
@@ -168,6 +145,7 @@ with col1:
     - Total patients: {data_a['total_patients']}
     - Discontinued: {data_a['total_discontinued']} ({data_a['discontinuation_rate']:.1%})
     - Reasons: {len(data_a['reason_counts'])} categories
+    - Retreated: {data_a['retreatment']['retreated_patients']} ({data_a['retreatment']['retreatment_rate']:.1%} of those who stopped)
     """)
 
 with col2:
@@ -176,6 +154,7 @@ with col2:
     - Total patients: {data_b['total_patients']}
     - Discontinued: {data_b['total_discontinued']} ({data_b['discontinuation_rate']:.1%})
     - Reasons: {len(data_b['reason_counts'])} categories
+    - Retreated: {data_b['retreatment']['retreated_patients']} ({data_b['retreatment']['retreatment_rate']:.1%} of those who stopped)
     """)
 
 # Prepare data for visualization
@@ -538,6 +517,78 @@ plt.tight_layout()
 st.pyplot(fig4)
 plt.close(fig4)
 
+# ==============================================================================
+# VISUALIZATION 5: Time to Discontinuation (Kaplan-Meier)
+# ==============================================================================
+st.markdown("---")
+st.markdown("### Visualization 5: Time to Discontinuation")
+st.markdown("""
+**Concept:** Kaplan-Meier curves of the proportion still on treatment by time since enrollment.
+Patients still on treatment are censored at their last visit. In the by-reason panel, stopping
+for any other reason also censors, so each curve isolates one cause.
+Helps answer: "When do patients stop, and is it early or late in treatment?"
+""")
+
+fig5, (ax5a, ax5b) = plt.subplots(1, 2, figsize=(14, 6), facecolor='white')
+
+
+def plot_survival(ax, curve, **kwargs):
+    """Draw one stored curve as a step function over months since enrollment."""
+    months = np.asarray(curve['time_days']) / 30.44
+    ax.step(months, curve['survival'], where='post', **kwargs)
+
+
+for data, color, name in ((data_a, COLORS['primary'], 'Simulation A'), (data_b, COLORS['secondary'], 'Simulation B')):
+    overall = data['time_to_discontinuation']['all']
+    median = overall['median_days']
+    median_label = f"median {median / 30.44:.1f} months" if median is not None else "median not reached"
+    plot_survival(ax5a, overall, color=color, linewidth=1.5, alpha=0.8, label=f"{name} ({median_label})")
+
+for data, linestyle in ((data_a, '-'), (data_b, '--')):
+    for reason, curve in data['time_to_discontinuation'].items():
+        if reason == 'all':
+            continue
+        # Label each reason once; line style tells the simulations apart
+        label = REASON_LABELS.get(reason, reason) if data is data_a or reason not in data_a['time_to_discontinuation'] else None
+        plot_survival(ax5b, curve, color=REASON_COLORS.get(reason, '#7f7f7f'), linestyle=linestyle,
+                      linewidth=1.2, alpha=0.8, label=label)
+
+ax5a.set_title('All Reasons', fontsize=12, color='#333333', pad=15)
+ax5b.set_title('By Reason (solid: A, dashed: B)', fontsize=12, color='#333333', pad=15)
+
+for ax in (ax5a, ax5b):
+    ax.set_xlabel('Months Since Enrollment', fontsize=11, color='#333333')
+    ax.set_ylabel('Proportion Not Discontinued', fontsize=11, color='#333333')
+    ax.set_ylim(0, 1.02)
+    ax.set_xlim(left=0)
+
+    # Tufte spines
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#333333')
+    ax.spines['bottom'].set_color('#333333')
+    ax.spines['left'].set_linewidth(0.8)
+    ax.spines['bottom'].set_linewidth(0.8)
+    ax.tick_params(colors='#333333', width=0.8, length=4)
+    ax.grid(True, alpha=0.1, linewidth=0.5, color='#cccccc', axis='y')
+    ax.legend(loc='lower left', frameon=False, fontsize=9)
+
+plt.tight_layout()
+st.pyplot(fig5)
+plt.close(fig5)
+
+# Retreated patients are no longer discontinued, so their reasons may be missing from reason_counts
+retreatment_reasons = sorted(set(data_a['retreatment']['by_reason']) | set(data_b['retreatment']['by_reason']))
+retreatment_table = pd.DataFrame({
+    'Discontinuation Reason': [REASON_LABELS.get(r, r) for r in retreatment_reasons],
+    'Simulation A (retreated)': [f"{data_a['retreatment']['by_reason'][r]:.1%}"
+                                 if r in data_a['retreatment']['by_reason'] else "-" for r in retreatment_reasons],
+    'Simulation B (retreated)': [f"{data_b['retreatment']['by_reason'][r]:.1%}"
+                                 if r in data_b['retreatment']['by_reason'] else "-" for r in retreatment_reasons],
+})
+st.markdown("**Retreatment after discontinuation**")
+st.dataframe(retreatment_table, use_container_width=True)
+
 # Data table
 st.markdown("---")
 st.markdown("### Raw Data")
@@ -562,4 +613,5 @@ Which visualization approach works best for your analysis needs? Consider:
 - **Viz 2**: Makes reason-by-reason comparison easier
 - **Viz 3**: Separates good outcomes from bad
 - **Viz 4**: Shows the pattern/distribution within each protocol
+- **Viz 5**: Shows when patients stop, not just why
 """)
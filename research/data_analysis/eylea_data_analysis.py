@@ -19,6 +19,8 @@ Key Features
 - Visual acuity trajectory modeling
 - Automated visualization generation
 - Multiple export formats (CSV, SQLite)
+- Chunked ingestion of clinic CSV/SQLite extracts into the simulation
+  Parquet schema, so real data opens with ResultsFactory
 
 Classes
 -------
@@ -32,8 +34,15 @@ Examples
 """
 
 import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import seaborn as sns
@@ -53,6 +62,28 @@ logger = logging.getLogger(__name__)
 logging.getLogger('matplotlib').setLevel(logging.WARNING)
 logging.getLogger('PIL').setLevel(logging.WARNING)
 
+# Repository root, for the app's Parquet results classes
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Rows read per chunk during Parquet ingestion
+INGEST_CHUNK_SIZE = 100_000
+
+# Typed columns staged from each ingested chunk
+INGEST_SCHEMA = pa.schema([
+    ('patient_id', pa.string()),        # eye_key: UUID plus treated eye
+    ('date', pa.timestamp('us')),
+    ('vision', pa.float64()),           # VA letters at injection, NaN if missing/invalid
+    ('baseline_vision', pa.float64()),
+    ('deceased', pa.bool_())
+])
+
+# Gap between injections that starts a potential new treatment course
+NEW_COURSE_GAP_DAYS = 365
+
+# No injection for this long before the end of the extract counts as
+# discontinuation
+DISCONTINUATION_GAP_DAYS = NEW_COURSE_GAP_DAYS
+
 class EyleaDataAnalyzer:
     """Analyze Eylea treatment data to derive simulation parameters.
     
@@ -227,6 +258,52 @@ class EyleaDataAnalyzer:
         
         return self.data
     
+    @classmethod
+    def _match_columns(cls, columns):
+        """Find the source column of each standard column.
+        
+        Parameters
+        ----------
+        columns : iterable of str
+            Column names of the source data
+
+        Returns
+        -------
+        dict
+            Standard column name -> source column name, for the standard
+            columns that were found
+
+        Notes
+        -----
+        Exact matches against COLUMN_MAPPINGS are tried first, then fuzzy
+        matches (case insensitive, ignoring spaces) among columns not
+        mapped yet.
+        """
+        columns = list(columns)
+        mapping = {}
+        
+        for std_col, alternatives in cls.COLUMN_MAPPINGS.items():
+            # First try exact matches
+            match = next((alt for alt in alternatives if alt in columns), None)
+            
+            # If no exact match, try fuzzy matching
+            if match is None:
+                normalized_alts = {re.sub(r'\s+', '', alt.lower()) for alt in alternatives}
+                match = next((col for col in columns
+                              if col not in mapping.values()
+                              and re.sub(r'\s+', '', col.lower()) in normalized_alts), None)
+                if match is not None:
+                    logger.debug(f"Fuzzy matched column '{match}' to '{std_col}'")
+            else:
+                logger.debug(f"Mapped column '{match}' to '{std_col}'")
+            
+            if match is None:
+                logger.warning(f"Could not find any match for standard column '{std_col}'")
+            else:
+                mapping[std_col] = match
+        
+        return mapping
+    
     def map_column_names(self):
         """Map variant column names to standardized names.
         
@@ -253,49 +330,11 @@ class EyleaDataAnalyzer:
         
         # Track original column names
         original_columns = set(self.data.columns)
-        mapped_columns = set()
+        self.column_mapping_used = self._match_columns(self.data.columns)
+        mapped_columns = set(self.column_mapping_used.values())
         
         # Create a new DataFrame with standardized column names
-        new_data = pd.DataFrame()
-        
-        # For each standard column, check if any of its variations exist
-        for std_col, alternatives in self.COLUMN_MAPPINGS.items():
-            found = False
-            
-            # First try exact matches
-            for alt in alternatives:
-                if alt in self.data.columns:
-                    new_data[std_col] = self.data[alt]
-                    self.column_mapping_used[std_col] = alt
-                    mapped_columns.add(alt)
-                    found = True
-                    logger.debug(f"Mapped column '{alt}' to '{std_col}'")
-                    break
-            
-            # If no exact match, try fuzzy matching
-            if not found:
-                for col in self.data.columns:
-                    # Skip already mapped columns
-                    if col in mapped_columns:
-                        continue
-                    
-                    # Check for fuzzy matches (case insensitive, ignoring spaces)
-                    normalized_col = re.sub(r'\s+', '', col.lower())
-                    for alt in alternatives:
-                        normalized_alt = re.sub(r'\s+', '', alt.lower())
-                        if normalized_col == normalized_alt:
-                            new_data[std_col] = self.data[col]
-                            self.column_mapping_used[std_col] = col
-                            mapped_columns.add(col)
-                            found = True
-                            logger.debug(f"Fuzzy matched column '{col}' to '{std_col}'")
-                            break
-                    
-                    if found:
-                        break
-            
-            if not found:
-                logger.warning(f"Could not find any match for standard column '{std_col}'")
+        new_data = pd.DataFrame({std_col: self.data[col] for std_col, col in self.column_mapping_used.items()})
         
         # Add any unmapped columns to the new DataFrame using batch approach to prevent DataFrame fragmentation
         # This is more efficient than adding columns one by one with df[col] = value
@@ -1114,67 +1153,48 @@ class EyleaDataAnalyzer:
         
         logger.info("Analyzing injection intervals by eye")
         
-        # Create a list to store interval data
-        intervals_data = []
-        
         # Log the number of unique eye_keys
-        unique_eye_keys = self.data['eye_key'].unique()
-        logger.info(f"Found {len(unique_eye_keys)} unique eye_keys")
-        
-        # Group by eye_key instead of patient_id to track treatments per eye
-        for eye_key, eye_rows in self.data.groupby('eye_key'):
-            # Extract patient_id and eye from eye_key
-            patient_id = eye_rows['patient_id'].iloc[0]
-            uuid = eye_rows['UUID'].iloc[0] if 'UUID' in eye_rows.columns else patient_id
-            eye = eye_rows['Eye'].iloc[0] if 'Eye' in eye_rows.columns else 'Unknown'
-            
-            # Log the number of injections for this eye (at DEBUG level instead of INFO)
-            logger.debug(f"Processing eye_key {eye_key} with {len(eye_rows)} injections")
-            
-            # Sort by injection date
-            if 'Injection Date' in eye_rows.columns:
-                eye_rows = eye_rows.sort_values('Injection Date')
-                
-                # Calculate intervals between consecutive injections
-                injection_dates = pd.to_datetime(eye_rows['Injection Date'])
-                
-                if len(injection_dates) > 1:
-                    logger.debug(f"Eye {eye_key} has {len(injection_dates)} injection dates, calculating intervals")
-                    for i in range(1, len(injection_dates)):
-                        interval = (injection_dates.iloc[i] - injection_dates.iloc[i-1]).days
-                        
-                        # Flag very large gaps (>365 days) as potential new treatment course
-                        very_long_gap = interval > 365
-                        
-                        # Extract VA scores if available
-                        prev_va = None
-                        current_va = None
-                        
-                        if 'VA Letter Score at Injection' in eye_rows.columns:
-                            prev_va = eye_rows.iloc[i-1]['VA Letter Score at Injection']
-                            current_va = eye_rows.iloc[i]['VA Letter Score at Injection']
-                        
-                        # Removed redundant interval logging
-                        
-                        intervals_data.append({
-                            'uuid': uuid,
-                            'patient_id': patient_id,
-                            'eye': eye,
-                            'eye_key': eye_key,
-                            'injection_number': i,
-                            'previous_date': injection_dates.iloc[i-1],
-                            'current_date': injection_dates.iloc[i],
-                            'interval_days': interval,
-                            'prev_va': prev_va,
-                            'current_va': current_va,
-                            'long_gap': interval > 180,  # Flag gaps > 6 months
-                            'very_long_gap': very_long_gap,  # Flag gaps > 12 months
-                            'potential_new_course': very_long_gap  # Flag as potential new course
-                        })
-                else:
-                    logger.debug(f"Eye {eye_key} has only {len(injection_dates)} injection date(s), skipping interval calculation")
-        
-        self.injection_intervals = pd.DataFrame(intervals_data)
+        logger.info(f"Found {self.data['eye_key'].nunique()} unique eye_keys")
+        
+        if 'Injection Date' not in self.data.columns:
+            self.injection_intervals = pd.DataFrame()
+            return self.injection_intervals
+        
+        # Consecutive injections of an eye are adjacent rows after one sort,
+        # so every interval comes from a shift within the eye's rows
+        eyes = self.data.assign(
+            _date=pd.to_datetime(self.data['Injection Date']),
+            _uuid=self.data['UUID'] if 'UUID' in self.data.columns else self.data['patient_id'],
+            _eye=self.data['Eye'] if 'Eye' in self.data.columns else 'Unknown'
+        )
+        # Identifiers are taken from each eye's first row, as listed
+        first_rows = eyes.groupby('eye_key', sort=False)[['patient_id', '_uuid', '_eye']].transform('first')
+        eyes[['patient_id', '_uuid', '_eye']] = first_rows
+        eyes = eyes.sort_values(['eye_key', '_date'], kind='stable')
+        
+        by_eye = eyes.groupby('eye_key', sort=False)
+        previous_date = by_eye['_date'].shift(1)
+        has_va = 'VA Letter Score at Injection' in eyes.columns
+        intervals = pd.DataFrame({
+            'uuid': eyes['_uuid'],
+            'patient_id': eyes['patient_id'],
+            'eye': eyes['_eye'],
+            'eye_key': eyes['eye_key'],
+            'injection_number': by_eye.cumcount(),
+            'previous_date': previous_date,
+            'current_date': eyes['_date'],
+            'interval_days': (eyes['_date'] - previous_date).dt.days,
+            'prev_va': by_eye['VA Letter Score at Injection'].shift(1) if has_va else None,
+            'current_va': eyes['VA Letter Score at Injection'] if has_va else None
+        })
+        # First injections of each eye have no interval
+        intervals = intervals[intervals['injection_number'] > 0].reset_index(drop=True)
+        intervals['interval_days'] = intervals['interval_days'].astype(int)
+        intervals['long_gap'] = intervals['interval_days'] > 180  # Flag gaps > 6 months
+        intervals['very_long_gap'] = intervals['interval_days'] > NEW_COURSE_GAP_DAYS  # Flag gaps > 12 months
+        intervals['potential_new_course'] = intervals['very_long_gap']  # Flag as potential new course
+        
+        self.injection_intervals = intervals
         logger.debug(f"Created injection_intervals DataFrame with {len(self.injection_intervals)} rows")
         
         # Calculate summary statistics
@@ -1974,6 +1994,295 @@ class EyleaDataAnalyzer:
         
         return export_paths
     
+    def read_chunks(self, chunksize=INGEST_CHUNK_SIZE, table=None):
+        """Read the source data in chunks of rows.
+        
+        Parameters
+        ----------
+        chunksize : int, optional
+            Rows per chunk
+        table : str, optional
+            Table to read from a SQLite source. Defaults to the database's
+            only table.
+
+        Yields
+        ------
+        pandas.DataFrame
+            Raw rows with the source column names
+
+        Raises
+        ------
+        ValueError
+            If a SQLite source has several tables and none was given
+        """
+        path = Path(self.data_path)
+        if path.suffix.lower() not in ('.db', '.sqlite', '.sqlite3'):
+            yield from pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=True)
+            return
+        
+        conn = sqlite3.connect(path)
+        try:
+            if table is None:
+                tables = [row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")]
+                if len(tables) != 1:
+                    raise ValueError(f"Specify the table to ingest from {path.name}: {tables}")
+                table = tables[0]
+            yield from pd.read_sql_query(f'SELECT * FROM "{table}"', conn, chunksize=chunksize)
+        finally:
+            conn.close()
+    
+    def _typed_chunk(self, chunk, mapping):
+        """Convert a raw chunk to the typed INGEST_SCHEMA columns.
+        
+        Parameters
+        ----------
+        chunk : pandas.DataFrame
+            Raw rows
+        mapping : dict
+            Standard column name -> source column name (see _match_columns)
+
+        Returns
+        -------
+        pandas.DataFrame
+            Rows with a patient identifier and a valid injection date
+        """
+        def numeric(std_col, low, high):
+            if std_col not in mapping:
+                return pd.Series(np.nan, index=chunk.index)
+            values = pd.to_numeric(chunk[mapping[std_col]], errors='coerce')
+            # Out-of-range values are treated as missing
+            return values.where(values.between(low, high))
+        
+        patient_id = chunk[mapping['UUID']].astype('string').str.strip()
+        if 'Eye' in mapping:
+            # Same eye_key as create_patient_id
+            eye = chunk[mapping['Eye']].astype('string').str.upper().str.replace(' ', '_')
+            patient_id = patient_id + '_' + eye
+        
+        deceased = pd.Series(False, index=chunk.index)
+        if 'Deceased' in mapping:
+            deceased = pd.to_numeric(chunk[mapping['Deceased']], errors='coerce') == 1
+        
+        typed = pd.DataFrame({
+            'patient_id': patient_id,
+            'date': pd.to_datetime(chunk[mapping['Injection Date']], errors='coerce').astype('datetime64[us]'),
+            'vision': numeric('VA Letter Score at Injection', 0, 100),
+            'baseline_vision': numeric('Baseline VA Letter Score', 0, 100),
+            'deceased': deceased
+        })
+        return typed[typed['patient_id'].notna() & (typed['patient_id'] != '') & typed['date'].notna()]
+    
+    def ingest_to_parquet(self, output_dir, chunksize=INGEST_CHUNK_SIZE, table=None, sim_id=None,
+                          discontinuation_gap_days=DISCONTINUATION_GAP_DAYS):
+        """Convert the source extract into simulation-format Parquet results.
+        
+        Parameters
+        ----------
+        output_dir : str or Path
+            Results directory to create (e.g. simulation_results/real_site_a)
+        chunksize : int, optional
+            Rows read per chunk
+        table : str, optional
+            Table of a SQLite source (see read_chunks)
+        sim_id : str, optional
+            Results identifier. Defaults to the output directory name.
+        discontinuation_gap_days : int, optional
+            Eyes without an injection for this many days before the end of
+            the extract (or marked deceased) count as discontinued
+
+        Returns
+        -------
+        ParquetResults
+            The ingested data, as ResultsFactory.load_results(output_dir)
+            would open it
+
+        Raises
+        ------
+        ValueError
+            If the patient identifier or injection date column is missing,
+            or no rows remain after cleaning
+
+        Notes
+        -----
+        Each row is one injection. Rows are streamed in chunks, typed and
+        staged column-wise, so only the narrow typed columns are ever held
+        in memory. Then, in vectorized passes over the staged columns:
+        1. Duplicate injections (same eye and date) are dropped, keeping
+           a row with a VA measurement
+        2. Missing VA is carried forward within the eye (then backward
+           for leading gaps); eyes without any VA are dropped
+        3. Visit times and next intervals are derived per eye
+        4. Patient summaries are aggregated per eye
+
+        Each treated eye becomes one patient, as in the simulations. The
+        files match ParquetWriter's schema (patients, visits, metadata and
+        patient index), so Sankey, time-series and comparison views work
+        on real data unchanged.
+
+        Examples
+        --------
+        >>> analyzer = EyleaDataAnalyzer('site_a_extract.csv')
+        >>> results = analyzer.ingest_to_parquet('simulation_results/real_site_a')
+        >>> results.get_patient_count()
+        """
+        started = time.time()
+        output_dir = Path(output_dir)
+        created = not output_dir.exists()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        staging_path = output_dir / '_ingest_staging.parquet'
+        
+        # A failed ingestion leaves neither the staging file nor a partial results directory
+        try:
+            # Pass 1: stream, type and stage the chunks
+            rows_read = 0
+            mapping = None
+            writer = None
+            try:
+                for chunk in self.read_chunks(chunksize, table):
+                    if mapping is None:
+                        mapping = self._match_columns(chunk.columns)
+                        missing = [col for col in ('UUID', 'Injection Date') if col not in mapping]
+                        if missing:
+                            raise ValueError(f"Required columns missing: {missing}")
+                        self.column_mapping_used = mapping
+                    rows_read += len(chunk)
+                    staged = pa.Table.from_pandas(self._typed_chunk(chunk, mapping),
+                                                  schema=INGEST_SCHEMA, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(staging_path, INGEST_SCHEMA)
+                    writer.write_table(staged)
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is None:
+                raise ValueError(f"No rows in {self.data_path}")
+        
+            rows = pq.read_table(staging_path).to_pandas()
+            staging_path.unlink()
+            rows_valid = len(rows)
+        
+            # Pass 2: deduplicate, keeping a measured VA where one exists
+            rows = rows.sort_values(['patient_id', 'date', 'vision'], na_position='last', kind='stable')
+            rows = rows.drop_duplicates(['patient_id', 'date'], keep='first')
+            duplicates = rows_valid - len(rows)
+        
+            # Fill VA gaps within each eye, drop eyes never measured
+            by_eye = rows.groupby('patient_id', sort=False)
+            rows['vision'] = by_eye['vision'].ffill()
+            rows['vision'] = rows.groupby('patient_id', sort=False)['vision'].bfill()
+            unmeasured = int(rows['vision'].isna().sum())
+            rows = rows[rows['vision'].notna()].reset_index(drop=True)
+            if rows.empty:
+                raise ValueError(f"No valid injection rows in {self.data_path}")
+        
+            # Pass 3: visits, with times relative to each eye's first injection
+            by_eye = rows.groupby('patient_id', sort=False)
+            first_date = by_eye['date'].transform('min')
+            next_interval = (by_eye['date'].shift(-1) - rows['date']).dt.days
+            rows['new_course'] = by_eye['date'].diff().dt.days > NEW_COURSE_GAP_DAYS
+            visits = pd.DataFrame({
+                'patient_id': rows['patient_id'].astype(str),
+                'date': rows['date'],
+                'time_days': (rows['date'] - first_date).dt.days.astype('int64'),
+                'vision': rows['vision'].round().astype('int64'),
+                'injected': True,
+                'next_interval_days': next_interval.astype('float64'),
+                'disease_state': ''
+            })
+        
+            # Pass 4: patient summaries
+            extract_start, extract_end = rows['date'].min(), rows['date'].max()
+            summary = rows.groupby('patient_id', sort=True).agg(
+                enrollment_date=('date', 'min'),
+                last_date=('date', 'max'),
+                first_vision=('vision', 'first'),
+                final_vision=('vision', 'last'),
+                baseline_vision=('baseline_vision', 'first'),
+                total_visits=('date', 'size'),
+                deceased=('deceased', 'any'),
+                new_courses=('new_course', 'sum')
+            )
+            lost = (extract_end - summary['last_date']).dt.days > discontinuation_gap_days
+            discontinued = summary['deceased'] | lost
+            reason = pd.Series(np.where(summary['deceased'], 'death', 'attrition'), index=summary.index)
+            patients = pd.DataFrame({
+                'patient_id': summary.index.astype(str),
+                'enrollment_date': summary['enrollment_date'].to_numpy(),
+                'enrollment_time_days': (summary['enrollment_date'] - extract_start).dt.days.to_numpy(),
+                'baseline_vision': summary['baseline_vision'].fillna(summary['first_vision']).round().astype('int64').to_numpy(),
+                'final_vision': summary['final_vision'].round().astype('int64').to_numpy(),
+                'final_disease_state': 'unknown',
+                'total_injections': summary['total_visits'].to_numpy(),
+                'total_visits': summary['total_visits'].to_numpy(),
+                'discontinued': discontinued.to_numpy(),
+                'discontinuation_time': (summary['last_date'] - extract_start).dt.days.where(discontinued).astype('Int64').array,
+                'discontinuation_type': reason.where(discontinued).to_numpy(),
+                'discontinuation_reason': reason.where(discontinued).to_numpy(),
+                'pre_discontinuation_vision': summary['final_vision'].where(discontinued).to_numpy(),
+                'retreatment_count': summary['new_courses'].to_numpy()
+            })
+        
+            # Write in the layout ParquetWriter produces
+            pq.write_table(pa.Table.from_pandas(patients, preserve_index=False), output_dir / 'patients.parquet')
+            pq.write_table(pa.Table.from_pandas(visits.sort_values(['patient_id', 'time_days']), preserve_index=False),
+                           output_dir / 'visits.parquet')
+            pd.DataFrame([{
+                'total_patients': len(patients),
+                'total_injections': int(patients['total_injections'].sum()),
+                'mean_final_vision': float(patients['final_vision'].mean()),
+                'std_final_vision': float(patients['final_vision'].std()),
+                'discontinuation_rate': float(patients['discontinued'].mean()),
+                'write_time_seconds': time.time() - started,
+                'chunk_size': chunksize,
+                'visit_partitioning': '',
+                'has_resource_tracking': False
+            }]).to_parquet(output_dir / 'metadata.parquet', index=False)
+        
+            if str(REPO_ROOT) not in sys.path:
+                sys.path.insert(0, str(REPO_ROOT))
+            from ape.core.results.base import SimulationMetadata
+            from ape.core.results.discontinuation_summary import write_discontinuation_summary
+            from ape.core.results.factory import ResultsFactory
+            from ape.core.storage.reader import ParquetReader
+        
+            metadata = SimulationMetadata(
+                sim_id=sim_id or output_dir.name,
+                protocol_name='Real-world data',
+                protocol_version=Path(self.data_path).name,
+                engine_type='real_world',
+                n_patients=len(patients),
+                duration_years=round((extract_end - extract_start).days / 365.25, 2),
+                seed=0,
+                timestamp=datetime.now(),
+                runtime_seconds=time.time() - started,
+                storage_type='parquet',
+                memorable_name=Path(self.data_path).stem,
+                model_type='time_based'
+            )
+            with open(output_dir / 'metadata.json', 'w') as f:
+                json.dump(metadata.to_dict(), f, indent=2)
+            ParquetReader(output_dir).create_patient_index()
+            write_discontinuation_summary(output_dir)
+        
+            self.data_quality_report['ingestion'] = {
+                'rows_read': rows_read,
+                'rows_invalid': rows_read - rows_valid,
+                'duplicate_rows': duplicates,
+                'rows_without_va': unmeasured,
+                'patients': len(patients),
+                'visits': len(visits)
+            }
+            logger.info(f"Ingested {rows_read} rows into {len(patients)} eyes and {len(visits)} visits "
+                        f"at {output_dir}")
+            return ResultsFactory.load_results(output_dir)
+        except BaseException:
+            if created:
+                shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+        finally:
+            staging_path.unlink(missing_ok=True)
+    
     def run_analysis(self):
         """Execute complete analysis pipeline from data loading to export.
         
@@ -2072,10 +2381,14 @@ def main():
     --output : Output directory (default: 'output')
     --debug : Enable debug logging
     --validation-strictness : Set validation level ('strict', 'moderate', 'lenient')
+    --parquet : Ingest the data into this results directory instead of analyzing it
+    --table : Table to ingest from a SQLite source
+    --chunksize : Rows read per chunk during ingestion
 
     Example
     -------
     python eylea_data_analysis.py --data treatment_data.csv --output results
+    python eylea_data_analysis.py --data extract.db --parquet simulation_results/real_site_a
     """
     # Set up command line argument parsing
     import argparse
@@ -2088,6 +2401,12 @@ def main():
                         help='Enable debug output')
     parser.add_argument('--validation-strictness', type=str, choices=['strict', 'moderate', 'lenient'], 
                         default='moderate', help='Validation strictness level')
+    parser.add_argument('--parquet', type=str, default=None,
+                        help='Ingest into this results directory (simulation Parquet format)')
+    parser.add_argument('--table', type=str, default=None,
+                        help='Table to ingest from a SQLite source')
+    parser.add_argument('--chunksize', type=int, default=INGEST_CHUNK_SIZE,
+                        help='Rows read per chunk during ingestion')
     
     args = parser.parse_args()
     
@@ -2101,6 +2420,15 @@ def main():
     analyzer = EyleaDataAnalyzer(args.data, args.output)
     analyzer.debug = args.debug
     
+    if args.parquet:
+        analyzer.ingest_to_parquet(args.parquet, chunksize=args.chunksize, table=args.table)
+        ingestion = analyzer.data_quality_report['ingestion']
+        print("\nIngestion Summary:")
+        for key, value in ingestion.items():
+            print(f"{key.replace('_', ' ').capitalize()}: {value:,}")
+        print(f"Results saved to: {args.parquet}")
+        return
+    
     results = analyzer.run_analysis()
     
     # Print summary results
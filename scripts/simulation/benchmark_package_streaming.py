@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark simulation package export/import.
+
+Builds a synthetic Parquet simulation of roughly the requested size, then
+times SimulationPackageManager export (to disk and to bytes) and import
+(from a path), reporting wall time and peak traced Python memory.
+
+Usage:
+    python scripts/simulation/benchmark_package_streaming.py --size-mb 500
+"""
+
+import argparse
+import json
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from ape.core.results.factory import ResultsFactory
+from ape.core.results.parquet import ParquetResults
+from ape.utils.simulation_package import SimulationPackageManager
+
+# Approximate on-disk bytes per visit row for the synthetic schema below
+BYTES_PER_VISIT = 11
+VISITS_PER_PATIENT = 40
+
+
+def build_synthetic_simulation(sim_path: Path, size_mb: int, seed: int = 42) -> None:
+    """Write a synthetic simulation directory with visits.parquet of ~size_mb."""
+    rng = np.random.default_rng(seed)
+    n_visits = size_mb * 1024 * 1024 // BYTES_PER_VISIT
+    n_patients = max(1, n_visits // VISITS_PER_PATIENT)
+    sim_path.mkdir(parents=True)
+
+    patient_ids = np.array([f"P{i:07d}" for i in range(n_patients)])
+    pd.DataFrame({
+        'patient_id': patient_ids,
+        'final_vision': rng.integers(0, 85, n_patients),
+        'total_injections': rng.integers(0, 30, n_patients),
+        'discontinued': rng.random(n_patients) < 0.2
+    }).to_parquet(sim_path / "patients.parquet", index=False)
+
+    # Write visits in row groups so the generator itself stays bounded
+    writer = None
+    chunk = 2_000_000
+    for start in range(0, n_visits, chunk):
+        rows = min(chunk, n_visits - start)
+        idx = np.arange(start, start + rows)
+        table = pa.table({
+            'patient_id': patient_ids[np.minimum(idx // VISITS_PER_PATIENT, n_patients - 1)],
+            'time_days': rng.integers(0, 1825, rows).astype(np.int32),
+            'vision': rng.integers(0, 85, rows).astype(np.int32),
+            'injected': rng.random(rows) < 0.6,
+            'noise': rng.random(rows)
+        })
+        if writer is None:
+            writer = pq.ParquetWriter(sim_path / "visits.parquet", table.schema)
+        writer.write_table(table)
+    writer.close()
+
+    pd.DataFrame([{'total_patients': n_patients}]).to_parquet(sim_path / "metadata.parquet", index=False)
+    (sim_path / "summary_stats.json").write_text(json.dumps({'patient_count': n_patients}))
+    (sim_path / "audit_log.json").write_text(json.dumps([{'event': 'benchmark'}]))
+    (sim_path / "protocol.yaml").write_text("name: benchmark\n")
+    (sim_path / "metadata.json").write_text(json.dumps({
+        'sim_id': sim_path.name,
+        'protocol_name': 'benchmark',
+        'protocol_version': '1.0',
+        'engine_type': 'abs',
+        'n_patients': n_patients,
+        'duration_years': 5.0,
+        'seed': seed,
+        'timestamp': '2025-01-01T00:00:00',
+        'runtime_seconds': 0.0,
+        'storage_type': 'parquet',
+        'memorable_name': 'benchmark-run'
+    }))
+
+
+def measure(label: str, func):
+    """Run func, printing wall time and peak traced allocation."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed:8.2f} s   peak traced {peak / 1024 / 1024:8.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark simulation package export/import")
+    parser.add_argument("--size-mb", type=int, default=500, help="Approximate visits.parquet size")
+    parser.add_argument("--skip-bytes", action="store_true",
+                        help="Skip the in-memory create_package() export")
+    args = parser.parse_args()
+
+    manager = SimulationPackageManager()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        sim_path = temp_path / "source" / "sim_20250101_000000_05-00_benchmark-run"
+        print(f"Building ~{args.size_mb} MB synthetic simulation...")
+        build_synthetic_simulation(sim_path, args.size_mb)
+        data_mb = sum(f.stat().st_size for f in sim_path.iterdir()) / 1024 / 1024
+        print(f"Simulation data on disk: {data_mb:.1f} MB\n")
+
+        ResultsFactory.DEFAULT_RESULTS_DIR = temp_path / "results"
+        results = ParquetResults.load(sim_path)
+        package_path = temp_path / "package.zip"
+
+        measure("export (write_package)", lambda: manager.write_package(results, package_path))
+        print(f"{'package size':<28} {package_path.stat().st_size / 1024 / 1024:8.1f} MB")
+        if not args.skip_bytes:
+            measure("export (create_package)", lambda: manager.create_package(results))
+        measure("import (from path)", lambda: manager.import_package(package_path))
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\nProcess peak RSS: {peak_rss:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ Key components:
 - SimulationEnvironment: Global simulation state container
 """
 
+import heapq
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Union
@@ -85,7 +86,7 @@ class SimulationEnvironment:
         self.current_time = start_date
         self.global_state: Dict[str, Any] = {}
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """Simulation event.
 
@@ -118,7 +119,9 @@ class Event:
     Notes
     -----
     Events are comparable and hashable based on their time, type, and patient_id.
-    This enables proper ordering in priority queues and event lists.
+    This enables proper ordering in priority queues and event lists. Events
+    use __slots__: a run creates one per visit and decision, so they carry
+    no per-instance dict.
 
     Examples
     --------
@@ -262,8 +265,12 @@ class SimulationClock:
     """
     Manages simulation time and event scheduling.
 
-    Maintains ordered list of events and handles event scheduling with proper
-    temporal ordering and priority handling.
+    Pending events are kept in a calendar queue: one bucket per calendar
+    day, each a small heap ordered by time, priority and insertion order,
+    plus a heap of the days that have events. Scheduling and taking the
+    next event cost O(log days + log events per day), so a run scales
+    linearly in events however many are pending (e.g. every arrival of a
+    staggered enrollment scheduled up front).
 
     Parameters
     ----------
@@ -277,15 +284,25 @@ class SimulationClock:
     end_date : Optional[datetime]
         End date for the simulation
     event_list : List
-        Ordered list of pending events
+        Ordered snapshot of pending (time, priority, counter, event) records
     _counter : int
         Counter for tie-breaking event ordering
     """
     def __init__(self, start_date: datetime):
         self.current_time = start_date
         self.end_date = None  # Will be set when simulation runs
-        self.event_list = []
+        self._buckets: Dict[int, List[tuple]] = {}  # day ordinal -> heap of event records
+        self._days: List[int] = []  # heap of day ordinals with a bucket
+        self._size = 0
         self._counter = 0  # Add a counter for tie-breaking
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def event_list(self) -> List[tuple]:
+        """Pending event records in processing order (a copy; for inspection)."""
+        return [record for day in sorted(self._buckets) for record in sorted(self._buckets[day])]
     
     def schedule_event(self, event: Event):
         """
@@ -302,33 +319,21 @@ class SimulationClock:
         1. Time (earlier events first)
         2. Priority (lower numbers = higher priority)
         3. Insertion order (tie-breaker)
+
+        Events after end_date (once set) are dropped.
         """
-        self._counter += 1
-        # Create event tuple
-        event_tuple = (
-            event.time,  # Primary sort by time
-            event.priority,  # Secondary sort by priority
-            self._counter,  # Tertiary sort by insertion order
-            event
-        )
-        
-        # Find insertion point using binary search
-        left, right = 0, len(self.event_list)
-        while left < right:
-            mid = (left + right) // 2
-            # Compare full tuples for proper ordering
-            if self.event_list[mid] <= event_tuple:
-                left = mid + 1
-            else:
-                right = mid
-                
-        # Insert at the correct position
-        self.event_list.insert(left, event_tuple)
-        
-        # Safety check - verify event is not beyond end date
-        if hasattr(self, 'end_date') and event.time > self.end_date:
-            self.event_list.pop()
+        # Safety check - drop events beyond the end date
+        if self.end_date is not None and event.time > self.end_date:
             return
+
+        self._counter += 1
+        day = event.time.toordinal()
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            bucket = self._buckets[day] = []
+            heapq.heappush(self._days, day)
+        heapq.heappush(bucket, (event.time, event.priority, self._counter, event))
+        self._size += 1
     
     def get_next_event(self) -> Optional[Event]:
         """
@@ -339,10 +344,16 @@ class SimulationClock:
         Optional[Event]
             Next event in chronological order, or None if no events remain
         """
-        if not self.event_list:
+        if not self._days:
             return None
+        day = self._days[0]
+        bucket = self._buckets[day]
         # Get the next event but don't update time until it's processed
-        _, _, _, event = self.event_list.pop(0)
+        _, _, _, event = heapq.heappop(bucket)
+        if not bucket:
+            del self._buckets[day]
+            heapq.heappop(self._days)
+        self._size -= 1
         return event
 
 class BaseSimulation(ABC):
@@ -369,7 +380,12 @@ class BaseSimulation(ABC):
         Global simulation environment
     protocols : Dict[str, TreatmentProtocol]
         Registered treatment protocols
+    max_events : int
+        Safety limit on events processed by run (class attribute; raise it
+        for large staggered runs)
     """
+    max_events = 100000
+
     def __init__(self, start_date: datetime, environment: Optional[SimulationEnvironment] = None):
         self.clock = SimulationClock(start_date)
         self.metrics: Dict[str, List[Any]] = {}
@@ -412,7 +428,7 @@ class BaseSimulation(ABC):
         total_weeks = (until - start_time).days / 7
         current_week = 0
         last_week = -1
-        max_events = 100000  # Safety limit to prevent infinite loops
+        max_events = self.max_events  # Safety limit to prevent infinite loops
         event_count = 0
 
         while event_count < max_events:
@@ -439,6 +455,8 @@ class BaseSimulation(ABC):
                 last_week = int(current_week)
             
             self.process_event(event)
+
+        print(f"\nStopped at the limit of {max_events} events with {len(self.clock)} pending")
             
     def register_protocol(self, protocol_type: str, protocol: TreatmentProtocol):
         """
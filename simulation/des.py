@@ -89,6 +89,8 @@ class DiscreteEventSimulation(BaseSimulation):
         Generates patient arrival times
     patients : Dict[str, PatientState]
         Dictionary of patient states keyed by ID
+    clinical_model : ClinicalModel
+        Clinical model shared by all visits
 
     Notes
     -----
@@ -162,6 +164,9 @@ class DiscreteEventSimulation(BaseSimulation):
         
         # Patient state management
         self.patients: Dict[str, PatientState] = {}
+        
+        # The clinical model only reads the configuration; one serves every visit
+        self.clinical_model = ClinicalModel(config)
     
     def _schedule_patient_arrivals(self):
         """Schedule patient arrival events based on generator.
@@ -288,8 +293,7 @@ class DiscreteEventSimulation(BaseSimulation):
             
             # Process visit
             actions = [action.value for action in event.get_required_actions()]
-            clinical_model = ClinicalModel(self.config)
-            visit_data = patient.process_visit(event.time, actions, clinical_model)
+            visit_data = patient.process_visit(event.time, actions, self.clinical_model)
             
             # Update global stats
             if "injection" in actions:
@@ -68,6 +68,10 @@ class EnhancedDES(BaseSimulation):
         Dictionary of patient states keyed by ID
     event_handlers : Dict[str, EventHandler]
         Dictionary of event handlers keyed by event type
+    clinical_model : ClinicalModel
+        Clinical model shared by all visits
+    patient_histories : Dict[str, List[Dict[str, Any]]]
+        Visit history of each patient, captured as visits are recorded
     """
     
     def __init__(self, config: SimulationConfig,
@@ -132,6 +136,13 @@ class EnhancedDES(BaseSimulation):
         # Patient state management
         self.patients: Dict[str, PatientState] = {}
         
+        # Each patient's visit_history list, registered on arrival so that
+        # visits appended to it by any handler are captured as they happen
+        self.patient_histories: Dict[str, List[Dict[str, Any]]] = {}
+        
+        # The clinical model only reads the configuration; one serves every visit
+        self.clinical_model = ClinicalModel(config)
+        
         # Event handler registry
         self.event_handlers: Dict[str, EventHandler] = {}
         
@@ -238,10 +249,16 @@ class EnhancedDES(BaseSimulation):
         -------
         Dict[str, List[Dict[str, Any]]]
             Dictionary mapping patient IDs to lists of visit records
+            
+        Notes
+        -----
+        Visit histories are captured during the run (see patient_histories)
+        and returned as they are; only patients without one are rebuilt
+        from their visits.
         """
         histories = {}
         for patient_id, patient in self.patients.items():
-            # Extract visit history if available
+            # Captured visit history if available
             if "visit_history" in patient.state:
                 histories[patient_id] = patient.state["visit_history"]
             else:
@@ -349,6 +366,7 @@ class EnhancedDES(BaseSimulation):
         })
         
         self.patients[patient_id] = patient
+        self.patient_histories[patient_id] = patient.state["visit_history"]
         
         # Schedule initial visit
         initial_visit = {
@@ -416,8 +434,7 @@ class EnhancedDES(BaseSimulation):
                 self.global_stats["total_oct_scans"] += 1
             
             # Process visit
-            clinical_model = ClinicalModel(self.config)
-            visit_data = patient.process_visit(event.time, actions, clinical_model)
+            visit_data = patient.process_visit(event.time, actions, self.clinical_model)
             
             # Store current vision for vision change calculation
             current_vision = visit_data.get("new_vision", 0)
@@ -432,7 +449,7 @@ class EnhancedDES(BaseSimulation):
             
             # Add visit to patient history
             if "visit_history" not in patient.state:
-                patient.state["visit_history"] = []
+                patient.state["visit_history"] = self.patient_histories[patient_id] = []
             
             # Create visit record
             visit_record = {
@@ -62,9 +62,6 @@ class StaggeredEnhancedDES(EnhancedDES):
         # Initialize staggered enrollment parameters
         self.staggered_params = staggered_params or {}
         
-        # Override patient generator with staggered parameters
-        self._initialize_staggered_patient_generator()
-        
         # Additional tracking for staggered enrollment
         self.enrollment_stats = {
             "enrolled_patients": 0,
@@ -73,8 +70,14 @@ class StaggeredEnhancedDES(EnhancedDES):
             "final_enrollment_date": None
         }
         
+        # Override patient generator with staggered parameters
+        self._initialize_staggered_patient_generator()
+        
         # Track patient time vs. simulation time
         self.relative_time_tracking = self.staggered_params.get("relative_time_tracking", True)
+        
+        # Visits per patient already given their time since enrollment
+        self._stamped_visits: Dict[str, int] = {}
     
     def _initialize_staggered_patient_generator(self):
         """
@@ -143,7 +146,8 @@ class StaggeredEnhancedDES(EnhancedDES):
         
         # Find final enrollment date
         if self.patients:
-            enrollment_dates = [patient.start_time for patient in self.patients.values()]
+            enrollment_dates = [patient.state.get("enrollment_date", patient.state["treatment_start"])
+                                for patient in self.patients.values()]
             self.enrollment_stats["final_enrollment_date"] = max(enrollment_dates)
         
         # Add to results
@@ -265,6 +269,34 @@ class StaggeredEnhancedDES(EnhancedDES):
         
         # Process event using standard handler
         super().process_event(event)
+        
+        # Stamp the visits this event recorded while they are at hand
+        if self.relative_time_tracking and event.patient_id in self.patient_histories:
+            self._stamp_relative_times(event.patient_id, self.patient_histories[event.patient_id])
+    
+    def _stamp_relative_times(self, patient_id: str, visits: List[Dict[str, Any]]) -> None:
+        """
+        Add time since enrollment (days) to visits not stamped yet.
+        
+        Parameters
+        ----------
+        patient_id : str
+            Patient ID
+        visits : List[Dict[str, Any]]
+            The patient's captured visit history
+        """
+        start = self._stamped_visits.get(patient_id, 0)
+        if start >= len(visits):
+            return
+        patient = self.patients.get(patient_id)
+        enrollment_date = patient.state.get("enrollment_date") if patient else None
+        if not enrollment_date:
+            return
+        for visit in visits[start:]:
+            visit_date = visit.get("date")
+            if visit_date:
+                visit["time_since_enrollment"] = (visit_date - enrollment_date).days
+        self._stamped_visits[patient_id] = len(visits)
     
     def _get_patient_histories(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -281,22 +313,12 @@ class StaggeredEnhancedDES(EnhancedDES):
         # Get base histories
         histories = super()._get_patient_histories()
         
-        # Add relative time information if enabled
+        # Add relative time information if enabled. Captured histories were
+        # stamped as visits happened; others are stamped here.
         if self.relative_time_tracking:
             for patient_id, visits in histories.items():
-                patient = self.patients.get(patient_id)
-                if not patient:
-                    continue
-                    
-                enrollment_date = patient.state.get("enrollment_date")
-                if not enrollment_date:
-                    continue
-                    
-                # Add relative time to each visit
-                for visit in visits:
-                    visit_date = visit.get("date")
-                    if visit_date:
-                        time_since_enrollment = visit_date - enrollment_date
-                        visit["time_since_enrollment"] = time_since_enrollment.days
+                if visits is not self.patient_histories.get(patient_id):
+                    self._stamped_visits.pop(patient_id, None)
+                self._stamp_relative_times(patient_id, visits)
         
         return histories
\ No newline at end of file
@@ -6,13 +6,13 @@ patient states every 14 days regardless of when visits occur.
 """
 
 import random
-import yaml
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 from enum import Enum
 
 from .disease_model import DiseaseState
+from ..protocols.parameter_cache import load_yaml
 
 
 class DiseaseModelTimeBased:
@@ -40,12 +40,35 @@ class DiseaseModelTimeBased:
             DiseaseModelTimeBased instance
         """
         # Load transition parameters
-        with open(params_dir / 'disease_transitions.yaml') as f:
-            transitions_data = yaml.safe_load(f)
+        transitions_data = load_yaml(params_dir / 'disease_transitions.yaml')
         
         # Load treatment effect parameters
-        with open(params_dir / 'treatment_effect.yaml') as f:
-            treatment_data = yaml.safe_load(f)
+        treatment_data = load_yaml(params_dir / 'treatment_effect.yaml')
+        
+        return cls(
+            fortnightly_transitions=transitions_data['fortnightly_transitions'],
+            treatment_effect_multipliers=treatment_data['treatment_multipliers'],
+            treatment_half_life_days=treatment_data['treatment_decay']['half_life_days'],
+            seed=seed
+        )
+    
+    @classmethod
+    def from_protocol_spec(cls, spec, seed: Optional[int] = None):
+        """
+        Create model from a time-based protocol's parameters.
+        
+        Unlike from_parameter_files, this applies the spec's parameter
+        overrides (see TimeBasedProtocolSpecification.with_overrides).
+        
+        Args:
+            spec: TimeBasedProtocolSpecification
+            seed: Random seed for reproducibility
+            
+        Returns:
+            DiseaseModelTimeBased instance
+        """
+        transitions_data = spec.load_disease_transitions()
+        treatment_data = spec.load_treatment_effects()
         
         return cls(
             fortnightly_transitions=transitions_data['fortnightly_transitions'],
@@ -0,0 +1,414 @@
+"""
+Registry of per-patient vision outcome measures.
+
+Every outcome is an OutcomeMetric: the visit (and patient) columns it
+needs and a vectorized reducer that maps a PatientBatch - visits sorted
+by patient then time, one contiguous slice per patient - to one value per
+patient. compute_patient_metrics runs all requested metrics in a single
+pass over patient-grouped visit batches, so visits are read once however
+many endpoints are asked for. summarize_metrics reduces the per-patient
+table to population numbers.
+
+Adding an endpoint is one registration:
+
+    @register_metric('gain_10_letters', columns=('vision',), aggregate='percent',
+                     description='Patients gaining 10 or more letters')
+    def _gain_10(batch):
+        return batch.flag(batch.change() >= 10)
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_MONTH = 30.44
+
+# Windows (months since first visit) for the year-1 and year-2 vision readings
+YEAR1_WINDOW = (11, 13)
+YEAR2_WINDOW = (23, 25)
+
+# Largest loss from baseline (letters) that still counts as vision maintained
+VISION_MAINTAINED_MAX_LOSS = 5
+
+AGGREGATES = ('mean', 'percent', 'median', 'sum')
+
+
+class PatientBatch:
+    """
+    Visits of a group of complete patients, sorted by patient then time.
+
+    Attributes:
+        patient_ids: Patient id of each slice
+        offsets: Visits of patient i are at offsets[i]:offsets[i + 1]
+        codes: Patient index of every visit
+        month: Visit time in months since the patient's first visit
+        columns: Visit columns by name, in visit order
+        patients: Patient-level columns by name, aligned with patient_ids
+    """
+
+    def __init__(self, visits: pd.DataFrame, patients: Optional[pd.DataFrame] = None,
+                 columns: Sequence[str] = (), patient_columns: Sequence[str] = ()):
+        codes, self.patient_ids = pd.factorize(visits['patient_id'], sort=False)
+        if 'month' in visits.columns:
+            month = visits['month'].to_numpy(dtype=float)
+        else:
+            month = visits['time_days'].to_numpy(dtype=float) / DAYS_PER_MONTH
+
+        order = np.lexsort((month, codes))
+        self.codes = codes[order]
+        self.offsets = np.searchsorted(self.codes, np.arange(len(self.patient_ids) + 1), side='left')
+        month = month[order]
+        self.month = month - month[self.offsets[:-1]][self.codes]
+        self.columns = {
+            name: visits[name].to_numpy()[order]
+            for name in columns if name in visits.columns
+        }
+
+        self.patients = {
+            name: patients[name].reindex(self.patient_ids).to_numpy()
+            for name in patient_columns
+        } if patients is not None else {}
+
+        # Sort key that keeps each patient's visits in their own band, so one
+        # searchsorted finds a month threshold for every patient at once
+        self._span = 2 * np.abs(self.month).max() + 1 if len(self.month) else 1.0
+
+    @property
+    def n_patients(self) -> int:
+        return len(self.patient_ids)
+
+    def column(self, name: str, dtype=float) -> np.ndarray:
+        return self.columns[name].astype(dtype, copy=False)
+
+    def first(self, name: str) -> np.ndarray:
+        """Value at each patient's first visit."""
+        return self.column(name)[self.offsets[:-1]]
+
+    def last(self, name: str) -> np.ndarray:
+        """Value at each patient's last visit."""
+        return self.column(name)[self.offsets[1:] - 1]
+
+    def change(self, name: str = 'vision') -> np.ndarray:
+        """Last minus first value."""
+        return self.last(name) - self.first(name)
+
+    def _search(self, month: float, side: str) -> np.ndarray:
+        """Per patient, the visit position where month would be inserted."""
+        month = np.clip(month, -self._span / 2, self._span / 2)
+        key = self.codes * self._span + self.month
+        return np.searchsorted(key, np.arange(self.n_patients) * self._span + month, side=side)
+
+    def first_in_window(self, name: str, low: float, high: float) -> np.ndarray:
+        """Value at the first visit with low <= month <= high; NaN if none."""
+        first = self._search(low, 'left')
+        found = first < self.offsets[1:]
+        found[found] = self.month[first[found]] <= high
+        result = np.full(self.n_patients, np.nan)
+        result[found] = self.column(name)[first[found]]
+        return result
+
+    def last_until(self, name: str, month: float) -> np.ndarray:
+        """Value at the last visit at or before month; NaN if none."""
+        last = self._search(month, 'right') - 1
+        found = last >= self.offsets[:-1]
+        result = np.full(self.n_patients, np.nan)
+        result[found] = self.column(name)[last[found]]
+        return result
+
+    def sum_between(self, name: str, low: float, high: float) -> np.ndarray:
+        """Sum of a column over visits with low < month <= high (low=-inf includes month 0)."""
+        in_window = (self.month > low) & (self.month <= high)
+        return np.bincount(self.codes, weights=self.column(name) * in_window, minlength=self.n_patients)
+
+    def first_month_where(self, mask: np.ndarray) -> np.ndarray:
+        """Month of each patient's first visit where mask holds; NaN if never."""
+        hits = np.flatnonzero(mask)
+        result = np.full(self.n_patients, np.nan)
+        patients, first = np.unique(self.codes[hits], return_index=True)
+        result[patients] = self.month[hits[first]]
+        return result
+
+    def flag(self, condition: np.ndarray) -> np.ndarray:
+        """Boolean per-patient condition as 0/1 floats."""
+        return np.asarray(condition, dtype=float)
+
+    def patient(self, name: str) -> np.ndarray:
+        """Patient-level column aligned with patient_ids."""
+        return self.patients[name]
+
+
+@dataclass(frozen=True)
+class OutcomeMetric:
+    """A per-patient outcome and how it is summarised over patients."""
+
+    name: str
+    reducer: Callable[[PatientBatch], np.ndarray]
+    columns: Tuple[str, ...] = ('vision',)
+    patient_columns: Tuple[str, ...] = ()
+    aggregate: str = 'mean'
+    empty_value: float = np.nan
+    description: str = ''
+    units: str = ''
+
+
+OUTCOME_METRICS: Dict[str, OutcomeMetric] = {}
+
+
+def register_metric(name: str, columns: Sequence[str] = ('vision',), patient_columns: Sequence[str] = (),
+                    aggregate: str = 'mean', empty_value: float = np.nan, description: str = '',
+                    units: str = '') -> Callable:
+    """
+    Decorator registering a reducer as an outcome metric.
+
+    Args:
+        name: Metric name (unique)
+        columns: Visit columns the reducer reads, besides patient_id and time
+        patient_columns: Columns of the patients table the reducer reads
+        aggregate: How per-patient values are summarised: 'mean',
+            'percent' (mean of 0/1 values x 100), 'median' or 'sum';
+            NaN values are left out
+        empty_value: Value for patients without visits (NaN: left out)
+        description: One-line description for tables and exports
+        units: Units of the summarised value
+    """
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate '{aggregate}'. Expected one of {list(AGGREGATES)}")
+
+    def decorator(reducer: Callable[[PatientBatch], np.ndarray]) -> Callable[[PatientBatch], np.ndarray]:
+        if name in OUTCOME_METRICS:
+            raise ValueError(f"Outcome metric already registered: {name}")
+        OUTCOME_METRICS[name] = OutcomeMetric(
+            name=name, reducer=reducer, columns=tuple(columns), patient_columns=tuple(patient_columns),
+            aggregate=aggregate, empty_value=empty_value, description=description, units=units
+        )
+        return reducer
+
+    return decorator
+
+
+def _select(metrics: Optional[Sequence[str]], available_patient_columns: Sequence[str]) -> List[OutcomeMetric]:
+    """Requested metrics; by default every registered metric whose patient columns exist."""
+    if metrics is None:
+        return [m for m in OUTCOME_METRICS.values() if set(m.patient_columns) <= set(available_patient_columns)]
+    unknown = [name for name in metrics if name not in OUTCOME_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown outcome metrics: {unknown}. Registered: {list(OUTCOME_METRICS)}")
+    selected = [OUTCOME_METRICS[name] for name in metrics]
+    missing = {col for m in selected for col in m.patient_columns} - set(available_patient_columns)
+    if missing:
+        raise ValueError(f"Patients table missing columns {sorted(missing)} needed by {list(metrics)}")
+    return selected
+
+
+def required_columns(metrics: Optional[Sequence[str]] = None) -> List[str]:
+    """Visit columns needed to compute metrics (all registered by default)."""
+    selected = OUTCOME_METRICS.values() if metrics is None else [OUTCOME_METRICS[name] for name in metrics]
+    columns = ['patient_id', 'time_days']
+    for metric in selected:
+        columns += [col for col in metric.columns if col not in columns]
+    return columns
+
+
+def compute_patient_metrics(visit_batches: Iterable[pd.DataFrame], patients: Optional[pd.DataFrame] = None,
+                            metrics: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Per-patient values of outcome metrics in one pass over visit batches.
+
+    Args:
+        visit_batches: DataFrames with patient_id, time_days (or month) and
+            the metrics' columns. A patient's visits must be contiguous
+            across the stream, in any order within the patient; a patient
+            may span batch boundaries.
+        patients: Patients table with patient_id and any patient columns;
+            patients without visits get each metric's empty_value
+        metrics: Metric names (default: all registered that can be computed)
+
+    Returns:
+        DataFrame indexed by patient_id with one column per metric
+
+    Raises:
+        ValueError: If metrics are unknown or visits are not grouped by patient
+    """
+    if patients is not None:
+        patients = patients.set_index('patient_id') if 'patient_id' in patients.columns else patients
+    selected = _select(metrics, list(patients.columns) if patients is not None else [])
+    columns = sorted({col for m in selected for col in m.columns})
+    patient_columns = sorted({col for m in selected for col in m.patient_columns})
+
+    def reduce(frame: pd.DataFrame) -> pd.DataFrame:
+        batch = PatientBatch(frame, patients, columns, patient_columns)
+        return pd.DataFrame({m.name: np.asarray(m.reducer(batch), dtype=float) for m in selected},
+                            index=pd.Index(batch.patient_ids, name='patient_id'))
+
+    # Hold back each batch's last patient, who may continue in the next batch
+    parts = []
+    pending = None
+    for batch in visit_batches:
+        if len(batch) == 0:
+            continue
+        if pending is not None:
+            batch = pd.concat([pending, batch], ignore_index=True)
+        ids = batch['patient_id'].to_numpy()
+        tail = len(ids) - np.argmax(ids[::-1] != ids[-1]) if (ids != ids[-1]).any() else 0
+        if tail:
+            parts.append(reduce(batch.iloc[:tail]))
+        pending = batch.iloc[tail:]
+    if pending is not None and len(pending):
+        parts.append(reduce(pending))
+
+    empty = pd.DataFrame({m.name: pd.Series(dtype=float) for m in selected},
+                         index=pd.Index([], name='patient_id'))
+    table = pd.concat(parts) if parts else empty
+    if table.index.has_duplicates:
+        raise ValueError("Visits are not grouped by patient: "
+                         f"{table.index[table.index.duplicated()][:5].tolist()} appear in separate runs")
+
+    if patients is not None:
+        no_visits = patients.index.difference(table.index, sort=False)
+        filler = pd.DataFrame({m.name: m.empty_value for m in selected}, index=no_visits, dtype=float)
+        table = pd.concat([table, filler]) if len(filler) else table
+        table.index.name = 'patient_id'
+    return table
+
+
+def summarize_metrics(table: pd.DataFrame, metrics: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """Population value of each metric from a per-patient table (NaN values left out)."""
+    result = {}
+    for name in (metrics or [col for col in table.columns if col in OUTCOME_METRICS]):
+        values = table[name].to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        aggregate = OUTCOME_METRICS[name].aggregate
+        if len(values) == 0:
+            result[name] = 0.0
+        elif aggregate == 'percent':
+            result[name] = float(values.mean() * 100)
+        elif aggregate == 'median':
+            result[name] = float(np.median(values))
+        elif aggregate == 'sum':
+            result[name] = float(values.sum())
+        else:
+            result[name] = float(values.mean())
+    return result
+
+
+def batched(frame: pd.DataFrame, batch_size: int) -> Iterable[pd.DataFrame]:
+    """Slices of a patient-grouped frame, for compute_patient_metrics."""
+    for start in range(0, len(frame), batch_size):
+        yield frame.iloc[start:start + batch_size]
+
+
+# Vision endpoints
+
+@register_metric('baseline_vision', description='Vision at first visit', units='letters')
+def _baseline_vision(batch):
+    return batch.first('vision')
+
+
+@register_metric('final_vision', description='Vision at last visit', units='letters')
+def _final_vision(batch):
+    return batch.last('vision')
+
+
+@register_metric('vision_change', description='Final minus baseline vision', units='letters')
+def _vision_change(batch):
+    return batch.change()
+
+
+@register_metric('vision_year1', description='Vision at first visit 11-13 months after baseline',
+                 units='letters')
+def _vision_year1(batch):
+    return batch.first_in_window('vision', *YEAR1_WINDOW)
+
+
+@register_metric('vision_year2', description='Vision at first visit 23-25 months after baseline',
+                 units='letters')
+def _vision_year2(batch):
+    return batch.first_in_window('vision', *YEAR2_WINDOW)
+
+
+def vision_maintained(change):
+    """Whether each vision change from baseline (letters) counts as vision maintained."""
+    return change >= -VISION_MAINTAINED_MAX_LOSS
+
+
+@register_metric('vision_maintained', aggregate='percent',
+                 description=f'Patients losing {VISION_MAINTAINED_MAX_LOSS} letters or fewer', units='%')
+def _vision_maintained(batch):
+    return batch.flag(vision_maintained(batch.change()))
+
+
+@register_metric('loss_under_15_letters', aggregate='percent',
+                 description='Patients losing fewer than 15 letters', units='%')
+def _loss_under_15(batch):
+    return batch.flag(batch.change() > -15)
+
+
+@register_metric('gain_15_letters', aggregate='percent',
+                 description='Patients gaining 15 letters or more', units='%')
+def _gain_15(batch):
+    return batch.flag(batch.change() >= 15)
+
+
+@register_metric('time_to_15_letter_loss', aggregate='median',
+                 description='Months to first visit 15+ letters below baseline (patients who lost)',
+                 units='months')
+def _time_to_15_letter_loss(batch):
+    vision = batch.column('vision')
+    baseline = vision[batch.offsets[:-1]][batch.codes]
+    return batch.first_month_where(vision <= baseline - 15)
+
+
+# Treatment burden
+
+@register_metric('injections', columns=('injected',), empty_value=0.0, description='Injections per patient')
+def _injections(batch):
+    return batch.sum_between('injected', -np.inf, np.inf)
+
+
+@register_metric('visits', columns=(), empty_value=0.0, description='Visits per patient')
+def _visits(batch):
+    return np.diff(batch.offsets).astype(float)
+
+
+@register_metric('discontinued', columns=(), patient_columns=('discontinued',), aggregate='percent',
+                 empty_value=np.nan, description='Patients discontinued', units='%')
+def _discontinued(batch):
+    return batch.flag(batch.patient('discontinued').astype(bool))
+
+
+# Calibration targets (definitions of EyleaCalibrationFramework: last
+# reading up to month 12 / 24, injections in months 0-12 and 12-24, and
+# discontinuations whose last visit falls in the year)
+
+@register_metric('vision_gain_year1', description='Last vision up to month 12 minus baseline', units='letters')
+def _vision_gain_year1(batch):
+    return batch.last_until('vision', 12) - batch.first('vision')
+
+
+@register_metric('vision_change_year2', description='Last vision up to month 24 minus baseline', units='letters')
+def _vision_change_year2(batch):
+    return batch.last_until('vision', 24) - batch.first('vision')
+
+
+@register_metric('injections_year1', columns=('injected',), description='Injections in months 0-12')
+def _injections_year1(batch):
+    return batch.sum_between('injected', -np.inf, 12)
+
+
+@register_metric('injections_year2', columns=('injected',), description='Injections in months 12-24')
+def _injections_year2(batch):
+    return batch.sum_between('injected', 12, 24)
+
+
+@register_metric('discontinuation_year1', columns=(), patient_columns=('discontinued',), empty_value=0.0,
+                 description='Discontinued with last visit by month 12')
+def _discontinuation_year1(batch):
+    return batch.flag(batch.patient('discontinued').astype(bool) & (batch.month[batch.offsets[1:] - 1] <= 12))
+
+
+@register_metric('discontinuation_year2', columns=(), patient_columns=('discontinued',), empty_value=0.0,
+                 description='Discontinued with last visit by month 24')
+def _discontinuation_year2(batch):
+    return batch.flag(batch.patient('discontinued').astype(bool) & (batch.month[batch.offsets[1:] - 1] <= 24))
@@ -7,7 +7,7 @@ Separate from standard SimulationRunner as the models are fundamentally differen
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
 from simulation_v2.core.disease_model_time_based import DiseaseModelTimeBased
@@ -17,6 +17,7 @@ from simulation_v2.core.weekday_protocol import WeekdayLoadingDoseProtocol, Week
 from simulation_v2.engines.abs_engine_time_based_with_specs import ABSEngineTimeBasedWithSpecs
 from simulation_v2.engines.abs_engine_time_based_with_params import ABSEngineTimeBasedWithParams
 from simulation_v2.engines.abs_engine import SimulationResults
+from simulation_v2.models.cohort import Cohort
 
 
 class TimeBasedSimulationRunner:
@@ -44,7 +45,8 @@ class TimeBasedSimulationRunner:
         engine_type: str,
         n_patients: int,
         duration_years: float,
-        seed: int
+        seed: int,
+        cohort: Optional[Cohort] = None
     ) -> SimulationResults:
         """
         Run time-based simulation.
@@ -54,6 +56,8 @@ class TimeBasedSimulationRunner:
             n_patients: Number of patients to simulate
             duration_years: Simulation duration in years
             seed: Random seed for reproducibility
+            cohort: Patients to enroll, e.g. the same cohort for every
+                protocol in a comparison (default: drawn from the seed)
             
         Returns:
             SimulationResults with patient histories
@@ -82,12 +86,47 @@ class TimeBasedSimulationRunner:
             'model_type': self.spec.model_type
         })
         
-        # Create disease model from parameter files
-        params_dir = Path(self.spec.source_file).parent / 'parameters'
-        disease_model = DiseaseModelTimeBased.from_parameter_files(
-            params_dir=params_dir,
-            seed=seed
-        )
+        engine = self.create_engine(n_patients, seed, cohort=cohort)
+        
+        # Run simulation
+        results = engine.run(duration_years)
+        
+        # Log completion
+        self.audit_log.append({
+            'event': 'simulation_complete',
+            'timestamp': datetime.now().isoformat(),
+            'total_injections': results.total_injections,
+            'final_vision_mean': results.final_vision_mean,
+            'final_vision_std': results.final_vision_std,
+            'discontinuation_rate': results.discontinuation_rate,
+            'patient_count': results.patient_count
+        })
+        
+        return results
+    
+    def create_engine(
+        self,
+        n_patients: int,
+        seed: int,
+        cohort: Optional[Cohort] = None,
+        disease_model: Optional[DiseaseModelTimeBased] = None
+    ) -> ABSEngineTimeBasedWithParams:
+        """
+        Build the engine run() uses, without running it.
+        
+        Args:
+            n_patients: Number of patients to simulate
+            seed: Random seed for reproducibility
+            cohort: Patients to enroll (default: drawn from the seed)
+            disease_model: Disease model to use (default: built from the
+                protocol's parameters, including any overrides)
+            
+        Returns:
+            Engine ready to run
+        """
+        # Create disease model from the protocol's (possibly overridden) parameters
+        if disease_model is None:
+            disease_model = DiseaseModelTimeBased.from_protocol_spec(self.spec, seed=seed)
         
         # Create protocol with loading dose if specified
         # Use weekday-aware protocols to avoid weekend scheduling
@@ -120,30 +159,15 @@ class TimeBasedSimulationRunner:
         
         # Create time-based ABS engine with full parameter support
         # Use ABSEngineTimeBasedWithParams which removes all hardcoded values
-        engine = ABSEngineTimeBasedWithParams(
+        return ABSEngineTimeBasedWithParams(
             disease_model=disease_model,
             protocol=protocol,
             protocol_spec=self.spec,
             n_patients=n_patients,
             seed=seed,
-            baseline_vision_distribution=baseline_vision_distribution
+            baseline_vision_distribution=baseline_vision_distribution,
+            cohort=cohort
         )
-        
-        # Run simulation
-        results = engine.run(duration_years)
-        
-        # Log completion
-        self.audit_log.append({
-            'event': 'simulation_complete',
-            'timestamp': datetime.now().isoformat(),
-            'total_injections': results.total_injections,
-            'final_vision_mean': results.final_vision_mean,
-            'final_vision_std': results.final_vision_std,
-            'discontinuation_rate': results.discontinuation_rate,
-            'patient_count': results.patient_count
-        })
-        
-        return results
     
     def save_audit_trail(self, filepath: Path) -> None:
         """
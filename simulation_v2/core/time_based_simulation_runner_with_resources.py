@@ -13,13 +13,14 @@ from simulation_v2.core.disease_model_time_based import DiseaseModelTimeBased
 from simulation_v2.core.loading_dose_protocol import LoadingDoseProtocol
 from simulation_v2.core.protocol import StandardProtocol
 from simulation_v2.models.baseline_vision_distributions import DistributionFactory
+from simulation_v2.models.cohort import Cohort
 
 
 class TimeBasedSimulationRunnerWithResources(TimeBasedSimulationRunner):
     """Run time-based simulations with resource tracking."""
     
     def __init__(self, protocol_spec, resource_config: Optional[Dict[str, Any]] = None,
-                 resource_config_path: Optional[str] = None):
+                 resource_config_path: Optional[str] = None, enforce_capacity: bool = False):
         """
         Initialize with resource configuration.
         
@@ -27,12 +28,15 @@ class TimeBasedSimulationRunnerWithResources(TimeBasedSimulationRunner):
             protocol_spec: Time-based protocol specification
             resource_config: Resource configuration dictionary
             resource_config_path: Path to resource configuration YAML
+            enforce_capacity: Delay visits that exceed the daily session budget
         """
         super().__init__(protocol_spec)
         self.resource_config = resource_config
         self.resource_config_path = resource_config_path
+        self.enforce_capacity = enforce_capacity
     
-    def run(self, engine_type: str, n_patients: int, duration_years: float, seed: int):
+    def run(self, engine_type: str, n_patients: int, duration_years: float, seed: int,
+            cohort: Optional[Cohort] = None):
         """
         Run simulation with resource tracking.
         
@@ -41,6 +45,7 @@ class TimeBasedSimulationRunnerWithResources(TimeBasedSimulationRunner):
             n_patients: Number of patients to simulate
             duration_years: Simulation duration in years
             seed: Random seed for reproducibility
+            cohort: Patients to enroll (default: drawn from the seed)
             
         Returns:
             SimulationResults with resource tracking data
@@ -65,15 +70,12 @@ class TimeBasedSimulationRunnerWithResources(TimeBasedSimulationRunner):
             'seed': seed,
             'protocol_name': self.spec.name,
             'protocol_version': self.spec.version,
-            'resource_tracking': bool(self.resource_config or self.resource_config_path)
+            'resource_tracking': bool(self.resource_config or self.resource_config_path),
+            'enforce_capacity': self.enforce_capacity
         })
         
-        # Create disease model from parameter files
-        params_dir = Path(self.spec.source_file).parent / 'parameters'
-        disease_model = DiseaseModelTimeBased.from_parameter_files(
-            params_dir=params_dir,
-            seed=seed
-        )
+        # Create disease model from the protocol's (possibly overridden) parameters
+        disease_model = DiseaseModelTimeBased.from_protocol_spec(self.spec, seed=seed)
         
         # Create protocol with loading dose if specified
         # Use weekday-aware protocols to avoid weekend scheduling
@@ -109,12 +111,14 @@ class TimeBasedSimulationRunnerWithResources(TimeBasedSimulationRunner):
         engine = ABSEngineTimeBasedWithResources(
             resource_config=self.resource_config,
             resource_config_path=self.resource_config_path,
+            enforce_capacity=self.enforce_capacity,
             disease_model=disease_model,
             protocol=protocol,
             protocol_spec=self.spec,
             n_patients=n_patients,
             seed=seed,
-            baseline_vision_distribution=baseline_vision_distribution
+            baseline_vision_distribution=baseline_vision_distribution,
+            cohort=cohort
         )
         
         # Run simulation
@@ -142,6 +146,9 @@ class TimeBasedSimulationRunnerWithResources(TimeBasedSimulationRunner):
             completion_log['total_visits'] = results.workload_summary.get('total_visits', 0)
             completion_log['bottleneck_count'] = len(getattr(results, 'bottlenecks', []))
         
+        if getattr(results, 'capacity_summary', None):
+            completion_log['capacity_summary'] = results.capacity_summary
+        
         self.audit_log.append(completion_log)
         
         return results
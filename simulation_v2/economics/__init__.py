@@ -2,27 +2,45 @@
 V2 Economics module for financial analysis of simulations.
 
 This module provides native V2 support for cost tracking and analysis.
+
+Exports are imported on first use: some submodules (e.g. psa) pull in the
+simulation engines, which pages that only read a cost configuration
+should not pay for.
 """
 
-from .financial_results import (
-    FinancialResults,
-    PatientCostSummary,
-    CostBreakdown
-)
-from .cost_enhancer import create_v2_cost_enhancer
-from .integration import EconomicsIntegration
-from .cost_config import CostConfig
-from .cost_analyzer import CostAnalyzerV2, CostEvent
-from .cost_tracker import CostTrackerV2
+import importlib
+
+# Exported name -> submodule defining it
+_EXPORTS = {
+    'FinancialResults': 'financial_results',
+    'PatientCostSummary': 'financial_results',
+    'CostBreakdown': 'financial_results',
+    'CostConfig': 'cost_config',
+    'CostAnalyzerV2': 'cost_analyzer',
+    'CostEvent': 'cost_analyzer',
+    'CostTrackerV2': 'cost_tracker',
+    'PriceSchedule': 'repricing',
+    'RepricingEngine': 'repricing',
+    'RepricingResult': 'repricing',
+    'drug_price_sweep': 'repricing',
+    'CostEffectivenessResult': 'cost_effectiveness',
+    'compare_outcomes': 'cost_effectiveness',
+    'compare_simulations': 'cost_effectiveness',
+    'PSAParameter': 'psa',
+    'PSARunner': 'psa',
+    'PSAResult': 'psa',
+    'load_parameters': 'psa',
+    'sample_parameters': 'psa',
+    'create_v2_cost_enhancer': 'cost_enhancer',
+    'EconomicsIntegration': 'integration'
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'FinancialResults',
-    'PatientCostSummary', 
-    'CostBreakdown',
-    'CostConfig',
-    'CostAnalyzerV2',
-    'CostEvent',
-    'CostTrackerV2',
-    'create_v2_cost_enhancer',
-    'EconomicsIntegration'
-]
\ No newline at end of file
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
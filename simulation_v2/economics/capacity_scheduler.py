@@ -0,0 +1,236 @@
+"""
+Capacity-constrained visit booking for time-based simulations.
+
+ResourceTracker records demand after the fact; CapacityScheduler decides
+when visits can actually happen. Each role has a daily budget of
+capacity_per_session x sessions per day. A visit is booked on the first
+working day at or after its target date on which every role it needs
+still has a free slot, so overflow is pushed forward and patients are
+really delayed.
+
+Storage is one counter per (role, day) plus, per visit type, a
+"next day with room" index (a union-find over days with path
+compression). A full day points past itself, so a booking skips any run
+of full days and weekends in near-constant time however congested the
+clinic is.
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+
+class CapacityScheduler:
+    """Book visits against per-role daily session budgets."""
+
+    def __init__(self, resource_config: Dict[str, Any],
+                 allow_saturday: bool = False, allow_sunday: bool = False):
+        """
+        Initialize scheduler with resource configuration.
+
+        Args:
+            resource_config: Dictionary in the nhs_standard_resources.yaml layout
+            allow_saturday: Whether Saturday working is allowed
+            allow_sunday: Whether Sunday working is allowed
+
+        Raises:
+            ValueError: If the configuration is empty or incomplete
+        """
+        if not resource_config:
+            raise ValueError("Resource configuration cannot be empty")
+
+        resources = resource_config['resources']
+        roles = resources['roles']
+        default_sessions = resources['session_parameters']['sessions_per_day']
+
+        # Daily slots per role; a role may override the clinic's sessions per day
+        self.daily_capacity: Dict[str, int] = {
+            role: int(info['capacity_per_session'] * info.get('sessions_per_day', default_sessions))
+            for role, info in roles.items()
+        }
+        self.visit_roles: Dict[str, Dict[str, int]] = {
+            visit_type: dict(requirements['roles_needed'])
+            for visit_type, requirements in resources['visit_requirements'].items()
+        }
+        for visit_type, needed in self.visit_roles.items():
+            unknown = [role for role in needed if role not in self.daily_capacity]
+            if unknown:
+                raise ValueError(f"Visit type {visit_type} needs unknown roles: {unknown}")
+            short = [role for role, count in needed.items() if count > self.daily_capacity[role]]
+            if short:
+                raise ValueError(f"Visit type {visit_type} can never be booked; no daily capacity for: {short}")
+
+        self.allow_saturday = allow_saturday
+        self.allow_sunday = allow_sunday
+
+        self._roles = list(self.daily_capacity)
+        self._role_index = {role: i for i, role in enumerate(self._roles)}
+        self._visit_types = list(self.visit_roles)
+        self._visit_type_index = {visit_type: i for i, visit_type in enumerate(self._visit_types)}
+        # (visit type, slots needed) to check when a role's slots are taken
+        self._types_using_role = {
+            role: [(self._visit_type_index[vt], needed[role])
+                   for vt, needed in self.visit_roles.items() if role in needed]
+            for role in self._roles
+        }
+
+        # Day d is stored at offset d - origin (ordinal days); grown on demand
+        self._origin: Optional[int] = None
+        self._used: List[List[int]] = [[] for _ in self._roles]
+        self._next_open: List[List[int]] = [[] for _ in self._visit_types]
+
+        # Booking statistics
+        self.bookings = 0
+        self.delayed_bookings = 0
+        self.total_delay_days = 0
+        self.max_delay_days = 0
+        self.tolerance_breaches = 0
+        self.bookings_by_type: Dict[str, int] = {visit_type: 0 for visit_type in self._visit_types}
+
+    def _is_working_day(self, ordinal: int) -> bool:
+        weekday = date.fromordinal(ordinal).weekday()
+        if weekday < 5:
+            return True
+        return self.allow_saturday if weekday == 5 else self.allow_sunday
+
+    def _ensure_days(self, ordinal: int) -> None:
+        """Grow storage so that days up to ordinal (plus slack) exist."""
+        if self._origin is None:
+            self._origin = ordinal
+        if ordinal < self._origin:
+            # Rare: a booking before every earlier one; prepend days and shift offsets
+            shift = max(self._origin - ordinal, 64)
+            self._origin -= shift
+            self._used = [[0] * shift + counts for counts in self._used]
+            links = [
+                offset if self._is_working_day(self._origin + offset) else offset + 1
+                for offset in range(shift)
+            ]
+            for i, chain in enumerate(self._next_open):
+                self._next_open[i] = links + [link + shift for link in chain]
+
+        old_size = len(self._next_open[0]) if self._next_open else 0
+        needed = ordinal - self._origin + 2
+        if needed <= old_size:
+            return
+
+        new_size = max(needed, 2 * old_size, 64)
+        for counts in self._used:
+            counts.extend([0] * (new_size - old_size))
+        # Non-working days start closed: they point to the following day
+        new_days = range(old_size, new_size)
+        links = [
+            offset if self._is_working_day(self._origin + offset) else offset + 1
+            for offset in new_days
+        ]
+        for chain in self._next_open:
+            chain.extend(links)
+
+    def _find_open(self, type_index: int, offset: int) -> int:
+        """First day offset >= offset with room for the visit type."""
+        chain = self._next_open[type_index]
+        root = offset
+        while True:
+            if root + 1 >= len(chain):
+                self._ensure_days(self._origin + root + 1)
+                chain = self._next_open[type_index]
+            if chain[root] == root:
+                break
+            root = chain[root]
+        # Path compression
+        while chain[offset] != root:
+            chain[offset], offset = root, chain[offset]
+        return root
+
+    def book(self, visit_type: str, target_date: date, latest_date: Optional[date] = None) -> date:
+        """
+        Book a visit on the first feasible day at or after target_date.
+
+        Args:
+            visit_type: Key of visit_requirements
+            target_date: Date the protocol asks for
+            latest_date: End of the protocol tolerance window; bookings
+                after it are still made but counted as tolerance breaches
+
+        Returns:
+            Booked date
+
+        Raises:
+            KeyError: If visit_type is unknown
+        """
+        if visit_type not in self._visit_type_index:
+            raise KeyError(f"Unknown visit type: {visit_type}")
+
+        target = target_date.toordinal()
+        self._ensure_days(target)
+        offset = self._find_open(self._visit_type_index[visit_type], target - self._origin)
+
+        # Take the slots; close this day for every visit type that no longer fits
+        for role, count in self.visit_roles[visit_type].items():
+            counts = self._used[self._role_index[role]]
+            counts[offset] += count
+            free = self.daily_capacity[role] - counts[offset]
+            for type_index, needed in self._types_using_role[role]:
+                if needed > free:
+                    self._next_open[type_index][offset] = offset + 1
+
+        booked = date.fromordinal(self._origin + offset)
+        delay = (booked - target_date).days
+        self.bookings += 1
+        self.bookings_by_type[visit_type] += 1
+        if delay > 0:
+            self.delayed_bookings += 1
+            self.total_delay_days += delay
+            self.max_delay_days = max(self.max_delay_days, delay)
+        if latest_date is not None and booked > latest_date:
+            self.tolerance_breaches += 1
+        return booked
+
+    def booked(self, role: str, query_date: date) -> int:
+        """Slots of a role booked on a date."""
+        if role not in self._role_index:
+            raise ValueError(f"Unknown role: {role}")
+        if self._origin is None:
+            return 0
+        counts = self._used[self._role_index[role]]
+        offset = query_date.toordinal() - self._origin
+        if not 0 <= offset < len(counts):
+            return 0
+        return counts[offset]
+
+    def remaining(self, role: str, query_date: date) -> int:
+        """Free slots of a role on a date (0 on non-working days)."""
+        if not self._is_working_day(query_date.toordinal()):
+            return 0
+        return self.daily_capacity[role] - self.booked(role, query_date)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Booking and delay statistics."""
+        utilisation = {}
+        if self._origin is not None:
+            used = np.array(self._used, dtype=np.int64)
+            working = np.array([
+                self._is_working_day(self._origin + offset)
+                for offset in range(used.shape[1])
+            ])
+            booked_days = working & (used.sum(axis=0) > 0)
+            if booked_days.any():
+                # Over working days from the first to the last day with bookings
+                first, last = np.flatnonzero(booked_days)[[0, -1]]
+                span = working[first:last + 1]
+                for role, r in self._role_index.items():
+                    role_used = used[r, first:last + 1][span]
+                    utilisation[role] = float(role_used.sum() / (self.daily_capacity[role] * len(role_used)))
+
+        return {
+            'daily_capacity': dict(self.daily_capacity),
+            'total_bookings': self.bookings,
+            'bookings_by_type': dict(self.bookings_by_type),
+            'delayed_bookings': self.delayed_bookings,
+            'total_delay_days': self.total_delay_days,
+            'mean_delay_days': self.total_delay_days / self.bookings if self.bookings else 0.0,
+            'max_delay_days': self.max_delay_days,
+            'tolerance_breaches': self.tolerance_breaches,
+            'utilisation': utilisation
+        }
@@ -0,0 +1,318 @@
+"""
+Cost-effectiveness analysis between two stored simulations.
+
+Patient-level costs and effects are read from the saved Parquet tables
+(patients.parquet and visits_with_costs.parquet), optionally re-priced
+with a PriceSchedule. Uncertainty comes from a non-parametric bootstrap:
+each arm's patients are resampled with replacement, independently, and
+the resample means give samples of incremental cost and incremental
+effect on the cost-effectiveness plane. The ICER and the
+cost-effectiveness acceptability curve (CEAC) are summaries of those
+samples.
+
+Resampling is done in chunks of index matrices (resamples x patients),
+each seeded from its own SeedSequence child, so results depend only on
+the seed and chunk size, not on how many processes run the chunks.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from simulation_v2.core.outcome_metrics import OUTCOME_METRICS, vision_maintained
+from .repricing import PriceSchedule, RepricingEngine
+
+
+EFFECT_MEASURES = {
+    'vision_change': 'letters gained (final - baseline vision)',
+    # Same definition as the outcome metric, so both tables count the same patients
+    'vision_maintained': OUTCOME_METRICS['vision_maintained'].description.lower(),
+}
+
+# Index-matrix cells per bootstrap chunk (about 40 MB of int64)
+DEFAULT_CHUNK_CELLS = 5_000_000
+
+# CEAC thresholds (cost per unit effect) when none are given
+DEFAULT_WILLINGNESS_TO_PAY = np.arange(0, 10001, 100)
+
+
+def effect_from_vision_change(change: pd.Series, effect: str) -> pd.Series:
+    """Effect measure of each patient from their vision change in letters."""
+    return change if effect == 'vision_change' else vision_maintained(change).astype(float)
+
+
+def load_patient_outcomes(results_dir: Union[str, Path], effect: str = 'vision_change',
+                          schedule: Optional[PriceSchedule] = None) -> pd.DataFrame:
+    """
+    Per-patient cost and effect of a saved simulation.
+
+    Args:
+        results_dir: Directory with patients.parquet and visits_with_costs.parquet
+        effect: Key of EFFECT_MEASURES
+        schedule: Re-price visits with these prices instead of the recorded costs
+
+    Returns:
+        DataFrame indexed by patient_id with cost and effect columns;
+        patients without priced visits have zero cost
+
+    Raises:
+        FileNotFoundError: If either table is missing
+        ValueError: If effect is unknown
+    """
+    if effect not in EFFECT_MEASURES:
+        raise ValueError(f"Unknown effect measure: {effect}. Choose from {list(EFFECT_MEASURES)}")
+
+    results_dir = Path(results_dir)
+    patients_path = results_dir / 'patients.parquet'
+    if not patients_path.exists():
+        raise FileNotFoundError(f"Patient table not found: {patients_path}")
+    patients = pd.read_parquet(patients_path, columns=['patient_id', 'baseline_vision', 'final_vision'])
+    patients = patients.set_index('patient_id')
+
+    if schedule is not None:
+        costs = RepricingEngine.from_parquet(results_dir).price(schedule).per_patient[schedule.name]
+    else:
+        visits_path = results_dir / 'visits_with_costs.parquet'
+        if not visits_path.exists():
+            raise FileNotFoundError(f"Visit cost table not found: {visits_path}")
+        visits = pd.read_parquet(visits_path, columns=['patient_id', 'total_cost'])
+        costs = visits.groupby('patient_id', sort=False)['total_cost'].sum()
+
+    change = (patients['final_vision'] - patients['baseline_vision']).astype(float)
+    return pd.DataFrame({
+        'cost': costs.reindex(patients.index, fill_value=0.0).astype(float),
+        'effect': effect_from_vision_change(change, effect)
+    })
+
+
+def _bootstrap_chunk(values: np.ndarray, n_resamples: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Column means of n_resamples resamples of the rows of values."""
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, len(values), size=(n_resamples, len(values)))
+    # Gathering one contiguous column at a time is several times faster than values[indices]
+    return np.column_stack([
+        np.take(np.ascontiguousarray(values[:, c]), indices).mean(axis=1)
+        for c in range(values.shape[1])
+    ])
+
+
+def bootstrap_means(values: np.ndarray, n_resamples: int,
+                    seed: Union[int, np.random.SeedSequence, None] = None,
+                    max_workers: Optional[int] = 0,
+                    chunk_cells: int = DEFAULT_CHUNK_CELLS) -> np.ndarray:
+    """
+    Bootstrap distribution of column means.
+
+    Args:
+        values: (n_patients, k) array
+        n_resamples: Number of resamples
+        seed: Random seed or SeedSequence
+        max_workers: Worker processes (None: CPU count - 1, 0: run in
+            this process)
+        chunk_cells: Index-matrix size per chunk
+
+    Returns:
+        (n_resamples, k) array of resample means
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    if len(values) == 0:
+        raise ValueError("Cannot bootstrap an empty sample")
+
+    per_chunk = max(1, chunk_cells // len(values))
+    sizes = [min(per_chunk, n_resamples - start) for start in range(0, n_resamples, per_chunk)]
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    seeds = seed.spawn(len(sizes))
+
+    if max_workers is None:
+        max_workers = max(1, multiprocessing.cpu_count() - 1)
+    if max_workers == 0 or len(sizes) == 1:
+        chunks = [_bootstrap_chunk(values, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(_bootstrap_chunk, [values] * len(sizes), sizes, seeds))
+    return np.vstack(chunks)
+
+
+def summarize_plane(samples: pd.DataFrame, willingness_to_pay: Optional[Sequence[float]] = None):
+    """
+    CEAC and quadrant shares of samples on the cost-effectiveness plane.
+
+    Args:
+        samples: delta_cost and delta_effect per sample
+        willingness_to_pay: CEAC thresholds (default DEFAULT_WILLINGNESS_TO_PAY)
+
+    Returns:
+        (ceac DataFrame, quadrant shares dict)
+    """
+    if willingness_to_pay is None:
+        willingness_to_pay = DEFAULT_WILLINGNESS_TO_PAY
+    willingness_to_pay = np.asarray(willingness_to_pay, dtype=float)
+    delta_cost = samples['delta_cost'].to_numpy(dtype=float)
+    delta_effect = samples['delta_effect'].to_numpy(dtype=float)
+
+    # CEAC: probability that net monetary benefit is positive at each threshold
+    net_benefit = willingness_to_pay[None, :] * delta_effect[:, None] - delta_cost[:, None]
+    ceac = pd.DataFrame({
+        'willingness_to_pay': willingness_to_pay,
+        'probability_cost_effective': (net_benefit > 0).mean(axis=0)
+    })
+
+    more_effective = delta_effect > 0
+    more_costly = delta_cost > 0
+    quadrants = {
+        'north_east': float((more_effective & more_costly).mean()),   # trade-off
+        'south_east': float((more_effective & ~more_costly).mean()),  # dominant
+        'north_west': float((~more_effective & more_costly).mean()),  # dominated
+        'south_west': float((~more_effective & ~more_costly).mean())
+    }
+    return ceac, quadrants
+
+
+@dataclass
+class CostEffectivenessResult:
+    """Point estimates and bootstrap samples of an intervention vs comparator."""
+
+    effect: str
+    n_intervention: int
+    n_comparator: int
+    mean_cost: Dict[str, float]
+    mean_effect: Dict[str, float]
+    incremental_cost: float
+    incremental_effect: float
+    samples: pd.DataFrame  # delta_cost, delta_effect per resample (CE plane)
+    ceac: pd.DataFrame     # willingness_to_pay, probability_cost_effective
+    confidence: float = 0.95
+    quadrants: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def icer(self) -> Optional[float]:
+        """Incremental cost per unit of effect (e.g. cost per letter gained)."""
+        if self.incremental_effect == 0:
+            return None
+        return self.incremental_cost / self.incremental_effect
+
+    def interval(self, column: str) -> List[float]:
+        """Percentile confidence interval of a samples column."""
+        tail = (1 - self.confidence) / 2 * 100
+        return np.percentile(self.samples[column], [tail, 100 - tail]).tolist()
+
+    @property
+    def icer_interval(self) -> Optional[List[float]]:
+        """Percentile interval of the ICER; None if the effect interval includes zero."""
+        low, high = self.interval('delta_effect')
+        if low <= 0 <= high:
+            return None
+        tail = (1 - self.confidence) / 2 * 100
+        ratios = self.samples['delta_cost'] / self.samples['delta_effect']
+        return np.percentile(ratios, [tail, 100 - tail]).tolist()
+
+    def probability_cost_effective(self, willingness_to_pay: float) -> float:
+        """Share of resamples with positive net monetary benefit at a threshold."""
+        net_benefit = willingness_to_pay * self.samples['delta_effect'] - self.samples['delta_cost']
+        return float((net_benefit > 0).mean())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'effect': self.effect,
+            'effect_description': EFFECT_MEASURES[self.effect],
+            'n_intervention': self.n_intervention,
+            'n_comparator': self.n_comparator,
+            'mean_cost': self.mean_cost,
+            'mean_effect': self.mean_effect,
+            'incremental_cost': self.incremental_cost,
+            'incremental_cost_ci': self.interval('delta_cost'),
+            'incremental_effect': self.incremental_effect,
+            'incremental_effect_ci': self.interval('delta_effect'),
+            'icer': self.icer,
+            'icer_ci': self.icer_interval,
+            'quadrants': self.quadrants,
+            'n_resamples': len(self.samples),
+            'confidence': self.confidence
+        }
+
+
+def compare_outcomes(intervention: pd.DataFrame, comparator: pd.DataFrame, effect: str = 'vision_change',
+                     n_resamples: int = 2000, willingness_to_pay: Optional[Sequence[float]] = None,
+                     confidence: float = 0.95, seed: Optional[int] = None,
+                     max_workers: Optional[int] = 0) -> CostEffectivenessResult:
+    """
+    Bootstrap cost-effectiveness of two per-patient outcome tables.
+
+    Args:
+        intervention: cost and effect per patient (see load_patient_outcomes)
+        comparator: Same for the comparator arm
+        effect: Effect measure the tables hold
+        n_resamples: Bootstrap resamples per arm
+        willingness_to_pay: Thresholds (cost per unit effect) for the CEAC;
+            defaults to 0-10,000 in steps of 100
+        confidence: Confidence level of the intervals
+        seed: Random seed
+        max_workers: Worker processes for resampling (0: this process)
+
+    Returns:
+        CostEffectivenessResult
+    """
+    # Independent resamples of each arm, from separate seed streams
+    arm_seeds = np.random.SeedSequence(seed).spawn(2)
+    arms = {}
+    for name, outcomes, arm_seed in zip(('intervention', 'comparator'), (intervention, comparator), arm_seeds):
+        values = outcomes[['cost', 'effect']].to_numpy(dtype=float)
+        arms[name] = bootstrap_means(values, n_resamples, seed=arm_seed, max_workers=max_workers)
+
+    delta = arms['intervention'] - arms['comparator']
+    samples = pd.DataFrame({'delta_cost': delta[:, 0], 'delta_effect': delta[:, 1]})
+    ceac, quadrants = summarize_plane(samples, willingness_to_pay)
+
+    mean_cost = {'intervention': float(intervention['cost'].mean()), 'comparator': float(comparator['cost'].mean())}
+    mean_effect = {'intervention': float(intervention['effect'].mean()),
+                   'comparator': float(comparator['effect'].mean())}
+
+    return CostEffectivenessResult(
+        effect=effect,
+        n_intervention=len(intervention),
+        n_comparator=len(comparator),
+        mean_cost=mean_cost,
+        mean_effect=mean_effect,
+        incremental_cost=mean_cost['intervention'] - mean_cost['comparator'],
+        incremental_effect=mean_effect['intervention'] - mean_effect['comparator'],
+        samples=samples,
+        ceac=ceac,
+        confidence=confidence,
+        quadrants=quadrants
+    )
+
+
+def compare_simulations(intervention_dir: Union[str, Path], comparator_dir: Union[str, Path],
+                        effect: str = 'vision_change',
+                        intervention_prices: Optional[PriceSchedule] = None,
+                        comparator_prices: Optional[PriceSchedule] = None,
+                        **kwargs) -> CostEffectivenessResult:
+    """
+    Cost-effectiveness of one saved simulation against another.
+
+    Args:
+        intervention_dir: Saved results of the intervention protocol
+        comparator_dir: Saved results of the comparator protocol
+        effect: Key of EFFECT_MEASURES
+        intervention_prices: Re-price the intervention's visits (default: recorded costs)
+        comparator_prices: Re-price the comparator's visits (default: recorded costs)
+        **kwargs: Passed to compare_outcomes (n_resamples, willingness_to_pay,
+            confidence, seed, max_workers)
+
+    Returns:
+        CostEffectivenessResult
+    """
+    return compare_outcomes(
+        load_patient_outcomes(intervention_dir, effect, intervention_prices),
+        load_patient_outcomes(comparator_dir, effect, comparator_prices),
+        effect=effect,
+        **kwargs
+    )
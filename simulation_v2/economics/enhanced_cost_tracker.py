@@ -20,6 +20,10 @@ from .cost_analyzer import CostAnalyzerV2, CostEvent
 from .financial_results import FinancialResults, PatientCostSummary, CostBreakdown
 
 
+# Months after enrollment at which T&T patients have a full assessment
+ANNUAL_ASSESSMENT_MONTHS = [12, 24, 36, 48, 60]
+
+
 class VisitType(Enum):
     """Types of visits in the simulation."""
     INITIAL_ASSESSMENT = "initial_assessment"
@@ -332,6 +336,50 @@ class EnhancedCostTracker:
         
         return cost_breakdown
     
+    def record_patient_history(self, patient: Any,
+                               annual_assessment_months: List[int] = ANNUAL_ASSESSMENT_MONTHS) -> None:
+        """
+        Record every visit of a finished patient history.
+        
+        Used to cost simulations after the fact (e.g. once per parameter
+        set in a PSA) instead of tracking costs during the run.
+        
+        Args:
+            patient: Patient with enrollment_date and visit_history
+            annual_assessment_months: Months after enrollment that count as
+                annual assessments for fixed (T&T) protocols, within half a month
+        """
+        for visit_number, visit in enumerate(patient.visit_history):
+            is_annual = False
+            if self.protocol_type == "fixed" and patient.enrollment_date is not None:
+                months_since_start = (visit['date'] - patient.enrollment_date).days / 30.44
+                is_annual = any(abs(months_since_start - month) < 0.5 for month in annual_assessment_months)
+            
+            self.record_visit(
+                patient_id=patient.id,
+                visit_date=visit['date'],
+                visit_type=self.determine_visit_type(patient, visit_number, is_annual),
+                injection_given=visit['treatment_given'],
+                vision=visit['vision']
+            )
+    
+    def patient_outcomes(self) -> pd.DataFrame:
+        """
+        Per-patient cost, injections and vision change.
+        
+        Returns:
+            DataFrame indexed by patient_id
+        """
+        return pd.DataFrame(
+            {
+                'cost': [record.total_cost for record in self.patient_records.values()],
+                'injections': [record.total_injections for record in self.patient_records.values()],
+                'vision_change': [record.vision_change for record in self.patient_records.values()]
+            },
+            index=pd.Index(list(self.patient_records), name='patient_id'),
+            dtype=float
+        )
+    
     def get_workload_summary(self) -> pd.DataFrame:
         """
         Get task-based workload metrics as a DataFrame for visualization.
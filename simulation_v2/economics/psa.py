@@ -0,0 +1,526 @@
+"""
+Probabilistic sensitivity analysis (PSA) of time-based protocols.
+
+Uncertain inputs (transition probabilities, treatment effect multipliers,
+discontinuation rates, drug and visit costs) are declared as PSAParameters
+with a distribution. Each PSA draw samples one value per parameter, runs
+every arm through ABSEngineTimeBasedWithParams with those values, and
+costs the patient histories with an EnhancedCostTracker. The per-draw
+costs and effects give the scatter on the cost-effectiveness plane and
+the cost-effectiveness acceptability curve (CEAC).
+
+A draw only runs the simulations: specifications, parsed parameter files,
+the cost configuration and the cohort are set up once per worker process,
+parameter values are applied in memory with with_overrides, and nothing
+is written to disk. All arms and all draws enroll the same cohort, and
+within a draw every arm uses the same simulation seed, so differences
+between arms come from the protocols and the sampled parameters.
+
+Example usage:
+    parameters = [
+        PSAParameter('drug_cost', 'costs.drug_costs.eylea_2mg_biosimilar', 'gamma', mean=355, sd=50),
+        PSAParameter('attrition', 'discontinuation.discontinuation_parameters.attrition.'
+                     'base_probability_per_visit', 'beta', mean=0.01, sd=0.003),
+    ]
+    runner = PSARunner({'T&E': tae_spec, 'T&T': tnt_spec}, parameters, cost_config,
+                       n_patients=500, duration_years=2.0, seed=42)
+    result = runner.run(n_draws=200, max_workers=None)
+    result.cost_effectiveness('T&E', 'T&T').ceac
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from simulation_v2.core.disease_model_time_based import DiseaseModelTimeBased
+from simulation_v2.core.time_based_simulation_runner import TimeBasedSimulationRunner
+from simulation_v2.models.cohort import Cohort
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+
+from .cost_config import CostConfig
+from .cost_effectiveness import (
+    DEFAULT_WILLINGNESS_TO_PAY, EFFECT_MEASURES, CostEffectivenessResult, effect_from_vision_change,
+    summarize_plane
+)
+from .enhanced_cost_tracker import EnhancedCostTracker
+
+
+DISTRIBUTIONS = ('beta', 'gamma', 'lognormal', 'normal', 'uniform')
+
+# Target prefixes: parameter file kinds (see with_overrides) and cost sections
+PARAMETER_KINDS = ('disease_transitions', 'treatment_effect', 'vision', 'discontinuation')
+COST_SECTIONS = ('drug_costs', 'visit_components')
+
+# Same default start date as the engines
+START_DATE = datetime(2024, 1, 1)
+
+
+@dataclass(frozen=True)
+class PSAParameter:
+    """
+    One uncertain input and its sampling distribution.
+
+    Attributes:
+        name: Column name of the parameter in the draws table
+        target: '<kind>.<dotted path>' into a parameter file (kind is one of
+            PARAMETER_KINDS, e.g. 'disease_transitions.fortnightly_transitions.
+            STABLE.ACTIVE'), or 'costs.<section>.<key>' for drug_costs and
+            visit_components
+        distribution: One of DISTRIBUTIONS. beta, gamma and lognormal take
+            mean and sd; normal takes mean and sd and is optionally clipped
+            to [low, high]; uniform takes low and high.
+    """
+    name: str
+    target: str
+    distribution: str
+    mean: Optional[float] = None
+    sd: Optional[float] = None
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+    def __post_init__(self):
+        kind = self.target.split('.', 1)[0]
+        if kind not in PARAMETER_KINDS + ('costs',) or '.' not in self.target:
+            raise ValueError(f"Invalid target for {self.name}: {self.target}. "
+                             f"Must start with one of {list(PARAMETER_KINDS) + ['costs']}")
+        if kind == 'costs' and (len(self.path) != 2 or self.path[0] not in COST_SECTIONS):
+            raise ValueError(f"Cost target for {self.name} must be costs.<section>.<key> "
+                             f"with section in {list(COST_SECTIONS)}, got {self.target}")
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution for {self.name}: {self.distribution}. "
+                             f"Choose from {list(DISTRIBUTIONS)}")
+
+        if self.distribution == 'uniform':
+            if self.low is None or self.high is None or self.low > self.high:
+                raise ValueError(f"Uniform parameter {self.name} needs low <= high")
+            return
+        if self.mean is None or self.sd is None or self.sd < 0:
+            raise ValueError(f"Parameter {self.name} needs a mean and a non-negative sd")
+        if self.distribution == 'beta' and not (0 < self.mean < 1 and self.sd ** 2 < self.mean * (1 - self.mean)):
+            raise ValueError(f"Beta parameter {self.name} needs 0 < mean < 1 and sd^2 < mean * (1 - mean)")
+        if self.distribution in ('gamma', 'lognormal') and self.mean <= 0:
+            raise ValueError(f"{self.distribution.capitalize()} parameter {self.name} needs a positive mean")
+
+    @property
+    def kind(self) -> str:
+        """Parameter file kind, or 'costs'."""
+        return self.target.split('.', 1)[0]
+
+    @property
+    def path(self) -> Tuple[str, ...]:
+        """Keys below the kind."""
+        return tuple(self.target.split('.')[1:])
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Draw n values.
+
+        beta, gamma and lognormal are parameterized from mean and sd by the
+        method of moments.
+        """
+        if self.distribution == 'uniform':
+            return rng.uniform(self.low, self.high, n)
+        if self.sd == 0:
+            return np.full(n, float(self.mean))
+
+        if self.distribution == 'beta':
+            concentration = self.mean * (1 - self.mean) / self.sd ** 2 - 1
+            return rng.beta(self.mean * concentration, (1 - self.mean) * concentration, n)
+        if self.distribution == 'gamma':
+            return rng.gamma(self.mean ** 2 / self.sd ** 2, self.sd ** 2 / self.mean, n)
+        if self.distribution == 'lognormal':
+            sigma2 = np.log(1 + self.sd ** 2 / self.mean ** 2)
+            return rng.lognormal(np.log(self.mean) - sigma2 / 2, np.sqrt(sigma2), n)
+
+        values = rng.normal(self.mean, self.sd, n)
+        if self.low is not None or self.high is not None:
+            values = np.clip(values, self.low, self.high)
+        return values
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PSAParameter':
+        """Create from a dict with the attribute names as keys (e.g. a YAML entry)."""
+        return cls(**data)
+
+
+def load_parameters(filepath: Union[str, Path]) -> List[PSAParameter]:
+    """
+    Load PSA parameters from a YAML file with a 'parameters' list.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    filepath = Path(filepath)
+    if not filepath.exists():
+        raise FileNotFoundError(f"PSA parameter file not found: {filepath}")
+    with open(filepath, 'r') as f:
+        data = yaml.safe_load(f)
+    return [PSAParameter.from_dict(entry) for entry in data.get('parameters', [])]
+
+
+def sample_parameters(parameters: Sequence[PSAParameter], n_draws: int,
+                      seed: Union[int, np.random.SeedSequence, None] = None) -> pd.DataFrame:
+    """
+    Sample every parameter n_draws times.
+
+    Returns:
+        DataFrame with one column per parameter name and one row per draw
+    """
+    names = [parameter.name for parameter in parameters]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate PSA parameter names: {names}")
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({parameter.name: parameter.sample(n_draws, rng) for parameter in parameters},
+                        index=pd.RangeIndex(n_draws, name='draw'))
+
+
+def split_draw(parameters: Sequence[PSAParameter], values: Mapping[str, float]
+               ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, float]]]:
+    """
+    Turn one draw into parameter file overrides and cost overrides.
+
+    Args:
+        parameters: PSA parameters
+        values: Sampled value per parameter name
+
+    Returns:
+        (parameter_overrides for with_overrides, {cost section: {key: value}})
+    """
+    parameter_overrides: Dict[str, Dict[str, Any]] = {}
+    costs: Dict[str, Dict[str, float]] = {}
+    for parameter in parameters:
+        value = float(values[parameter.name])
+        if parameter.kind == 'costs':
+            section, key = parameter.path
+            costs.setdefault(section, {})[key] = value
+            continue
+        node = parameter_overrides.setdefault(parameter.kind, {})
+        for key in parameter.path[:-1]:
+            node = node.setdefault(key, {})
+        node[parameter.path[-1]] = value
+    return parameter_overrides, costs
+
+
+def rebalance_transitions(transitions: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Make every transition row sum to 1 after sampling off-diagonal entries.
+
+    The probability of staying in a state absorbs the change. If the
+    off-diagonal entries alone exceed 1, they are scaled down to sum to 1.
+    """
+    balanced = {}
+    for from_state, row in transitions.items():
+        leaving = sum(p for to_state, p in row.items() if to_state != from_state)
+        if leaving > 1:
+            balanced[from_state] = {
+                to_state: (0.0 if to_state == from_state else p / leaving) for to_state, p in row.items()
+            }
+        else:
+            balanced[from_state] = {**row, from_state: 1.0 - leaving}
+    return balanced
+
+
+def _resolve(data: Dict[str, Any], path: Sequence[str]) -> Any:
+    """Value at a key path, raising KeyError with the full path."""
+    node = data
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            raise KeyError('.'.join(path))
+        node = node[key]
+    return node
+
+
+class _DrawEvaluator:
+    """Per-process state for evaluating PSA draws (specs, costs, cohort)."""
+
+    def __init__(self, arms: Dict[str, TimeBasedProtocolSpecification], parameters: List[PSAParameter],
+                 cost_config: CostConfig, cohort: Cohort, duration_years: float,
+                 drug: Optional[str], effect: str):
+        self.arms = arms
+        self.parameters = parameters
+        self.cost_config = cost_config
+        self.cohort = cohort
+        self.duration_years = duration_years
+        self.drug = drug
+        self.effect = effect
+
+    def warm(self) -> None:
+        """Parse each arm's parameter files into this process's cache."""
+        for spec in self.arms.values():
+            spec.load_disease_transitions()
+            spec.load_treatment_effects()
+            spec.load_vision_parameters()
+            spec.load_discontinuation_parameters()
+            spec.load_demographics_parameters()
+
+    def __call__(self, seed: int, values: Dict[str, float]) -> Dict[str, float]:
+        """Cost and effect of every arm for one draw."""
+        parameter_overrides, cost_overrides = split_draw(self.parameters, values)
+        cost_config = replace(
+            self.cost_config,
+            drug_costs={**self.cost_config.drug_costs, **cost_overrides.get('drug_costs', {})},
+            visit_components={**self.cost_config.visit_components, **cost_overrides.get('visit_components', {})}
+        )
+
+        row = {}
+        for arm, spec in self.arms.items():
+            if parameter_overrides:
+                spec = spec.with_overrides(parameter_overrides=parameter_overrides)
+
+            # 1. Disease model from the (overridden) parameters
+            transitions = spec.load_disease_transitions()['fortnightly_transitions']
+            if 'disease_transitions' in parameter_overrides:
+                transitions = rebalance_transitions(transitions)
+            treatment = spec.load_treatment_effects()
+            disease_model = DiseaseModelTimeBased(
+                fortnightly_transitions=transitions,
+                treatment_effect_multipliers=treatment['treatment_multipliers'],
+                treatment_half_life_days=treatment['treatment_decay']['half_life_days'],
+                seed=seed
+            )
+
+            # 2. Simulate the shared cohort
+            engine = TimeBasedSimulationRunner(spec).create_engine(
+                len(self.cohort), seed, cohort=self.cohort, disease_model=disease_model
+            )
+            results = engine.run(self.duration_years, start_date=START_DATE)
+
+            # 3. Cost the histories
+            tracker = EnhancedCostTracker(cost_config, "fixed" if spec.protocol_type == "fixed" else "treat_and_extend")
+            if self.drug is not None:
+                tracker.set_drug_type(self.drug)
+            for patient in results.patient_histories.values():
+                tracker.record_patient_history(patient)
+
+            outcomes = tracker.patient_outcomes().reindex(list(results.patient_histories))
+            row[f'{arm}_cost'] = float(outcomes['cost'].fillna(0.0).mean())
+            row[f'{arm}_effect'] = float(effect_from_vision_change(outcomes['vision_change'].dropna(), self.effect).mean())
+            row[f'{arm}_injections'] = float(outcomes['injections'].fillna(0.0).mean())
+        return row
+
+
+_EVALUATOR: Optional[_DrawEvaluator] = None
+
+
+def _init_worker(evaluator: _DrawEvaluator) -> None:
+    """Process pool initializer: keep the evaluator and warm its caches."""
+    global _EVALUATOR
+    _EVALUATOR = evaluator
+    _EVALUATOR.warm()
+
+
+def _evaluate_draw(seed: int, values: Dict[str, float]) -> Dict[str, float]:
+    return _EVALUATOR(seed, values)
+
+
+@dataclass
+class PSAResult:
+    """Sampled parameters and per-arm outcomes of every PSA draw."""
+
+    arms: List[str]
+    parameters: List[PSAParameter]
+    effect: str
+    draws: pd.DataFrame  # seed, parameter values, <arm>_cost/_effect/_injections per draw
+    n_patients: int
+    duration_years: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def arm_outcomes(self, arm: str) -> pd.DataFrame:
+        """Mean cost and effect per patient of one arm, per draw."""
+        if arm not in self.arms:
+            raise ValueError(f"Unknown arm: {arm}. Choose from {self.arms}")
+        return pd.DataFrame({'cost': self.draws[f'{arm}_cost'], 'effect': self.draws[f'{arm}_effect']})
+
+    def scatter(self, intervention: str, comparator: str) -> pd.DataFrame:
+        """Incremental cost and effect per draw (the cost-effectiveness plane)."""
+        treated, control = self.arm_outcomes(intervention), self.arm_outcomes(comparator)
+        return pd.DataFrame({
+            'delta_cost': treated['cost'] - control['cost'],
+            'delta_effect': treated['effect'] - control['effect']
+        })
+
+    def ceac(self, willingness_to_pay: Optional[Sequence[float]] = None) -> pd.DataFrame:
+        """
+        Probability that each arm has the highest net monetary benefit.
+
+        Args:
+            willingness_to_pay: Thresholds (cost per unit effect); defaults
+                to 0-10,000 in steps of 100
+
+        Returns:
+            DataFrame with willingness_to_pay and one column per arm
+        """
+        if willingness_to_pay is None:
+            willingness_to_pay = DEFAULT_WILLINGNESS_TO_PAY
+        willingness_to_pay = np.asarray(willingness_to_pay, dtype=float)
+
+        costs = self.draws[[f'{arm}_cost' for arm in self.arms]].to_numpy(dtype=float)
+        effects = self.draws[[f'{arm}_effect' for arm in self.arms]].to_numpy(dtype=float)
+        # (thresholds, draws, arms) net benefit, best arm per threshold and draw
+        net_benefit = willingness_to_pay[:, None, None] * effects[None] - costs[None]
+        best = net_benefit.argmax(axis=2)
+
+        ceac = pd.DataFrame({'willingness_to_pay': willingness_to_pay})
+        for index, arm in enumerate(self.arms):
+            ceac[arm] = (best == index).mean(axis=1)
+        return ceac
+
+    def cost_effectiveness(self, intervention: str, comparator: str,
+                           willingness_to_pay: Optional[Sequence[float]] = None,
+                           confidence: float = 0.95) -> CostEffectivenessResult:
+        """
+        Pairwise result in the same form as a bootstrap comparison.
+
+        The samples are the PSA draws instead of bootstrap resamples, so the
+        intervals reflect parameter uncertainty.
+        """
+        samples = self.scatter(intervention, comparator).reset_index(drop=True)
+        ceac, quadrants = summarize_plane(samples, willingness_to_pay)
+        treated, control = self.arm_outcomes(intervention), self.arm_outcomes(comparator)
+        mean_cost = {'intervention': float(treated['cost'].mean()), 'comparator': float(control['cost'].mean())}
+        mean_effect = {'intervention': float(treated['effect'].mean()), 'comparator': float(control['effect'].mean())}
+        return CostEffectivenessResult(
+            effect=self.effect,
+            n_intervention=self.n_patients,
+            n_comparator=self.n_patients,
+            mean_cost=mean_cost,
+            mean_effect=mean_effect,
+            incremental_cost=mean_cost['intervention'] - mean_cost['comparator'],
+            incremental_effect=mean_effect['intervention'] - mean_effect['comparator'],
+            samples=samples,
+            ceac=ceac,
+            confidence=confidence,
+            quadrants=quadrants
+        )
+
+
+class PSARunner:
+    """Run protocol arms over sampled parameter sets."""
+
+    def __init__(self, arms: Mapping[str, TimeBasedProtocolSpecification], parameters: Sequence[PSAParameter],
+                 cost_config: CostConfig, n_patients: int = 500, duration_years: float = 2.0,
+                 seed: Optional[int] = None, drug: Optional[str] = None, effect: str = 'vision_change'):
+        """
+        Initialize runner.
+
+        Args:
+            arms: Protocol specification per arm name
+            parameters: Uncertain inputs
+            cost_config: Base cost configuration
+            n_patients: Patients in the shared cohort
+            duration_years: Simulated years per run
+            seed: Seed for parameter draws, the cohort and simulation seeds
+            drug: Drug priced for injections (default: the tracker's default)
+            effect: Key of EFFECT_MEASURES
+
+        Raises:
+            ValueError: If there are no arms, the effect or drug is unknown,
+                or a parameter target does not exist
+        """
+        if not arms:
+            raise ValueError("PSA needs at least one arm")
+        if effect not in EFFECT_MEASURES:
+            raise ValueError(f"Unknown effect measure: {effect}. Choose from {list(EFFECT_MEASURES)}")
+        if drug is not None and drug not in cost_config.drug_costs:
+            raise ValueError(f"Unknown drug: {drug}")
+        if n_patients <= 0:
+            raise ValueError(f"Number of patients must be positive, got {n_patients}")
+        if duration_years <= 0:
+            raise ValueError(f"Duration must be positive, got {duration_years}")
+
+        self.arms = dict(arms)
+        self.parameters = list(parameters)
+        self.cost_config = cost_config
+        self.n_patients = n_patients
+        self.duration_years = duration_years
+        self.seed = seed
+        self.drug = drug
+        self.effect = effect
+        self._check_targets()
+
+    def _check_targets(self) -> None:
+        """Every target must name an existing value (catches typos before hours of runs)."""
+        for parameter in self.parameters:
+            try:
+                if parameter.kind == 'costs':
+                    _resolve(vars(self.cost_config), parameter.path)
+                    continue
+                for spec in self.arms.values():
+                    loaders = {
+                        'disease_transitions': spec.load_disease_transitions,
+                        'treatment_effect': spec.load_treatment_effects,
+                        'vision': spec.load_vision_parameters,
+                        'discontinuation': spec.load_discontinuation_parameters
+                    }
+                    _resolve(loaders[parameter.kind](), parameter.path)
+            except KeyError:
+                raise ValueError(f"PSA parameter {parameter.name} targets a missing value: {parameter.target}")
+
+    def draw_cohort(self, seed: Union[int, np.random.SeedSequence, None] = None) -> Cohort:
+        """Cohort enrolled by every arm, drawn with the first arm's baseline settings."""
+        spec = next(iter(self.arms.values()))
+        engine = TimeBasedSimulationRunner(spec).create_engine(self.n_patients, 0)
+        end_date = START_DATE + timedelta(days=int(self.duration_years * 365.25))
+        return engine.cohort_generator.generate(self.n_patients, START_DATE, end_date, seed=np.random.default_rng(seed))
+
+    def run(self, n_draws: int, max_workers: Optional[int] = 0) -> PSAResult:
+        """
+        Sample n_draws parameter sets and simulate every arm for each.
+
+        Results depend only on the seed, not on the number of workers.
+
+        Args:
+            n_draws: Number of parameter sets
+            max_workers: Worker processes (None: CPU count - 1, 0: run in
+                this process)
+
+        Returns:
+            PSAResult
+        """
+        if n_draws <= 0:
+            raise ValueError(f"Number of draws must be positive, got {n_draws}")
+
+        # 1. Independent streams for parameters, cohort and simulation seeds
+        parameter_seed, cohort_seed, simulation_seed = np.random.SeedSequence(self.seed).spawn(3)
+        samples = sample_parameters(self.parameters, n_draws, parameter_seed)
+        seeds = [int(s) for s in simulation_seed.generate_state(n_draws)]
+        cohort = self.draw_cohort(cohort_seed)
+
+        # 2. Evaluate the draws with per-process state
+        evaluator = _DrawEvaluator(self.arms, self.parameters, self.cost_config, cohort,
+                                   self.duration_years, self.drug, self.effect)
+        values = samples.to_dict('records')
+        if max_workers is None:
+            max_workers = max(1, multiprocessing.cpu_count() - 1)
+        if max_workers == 0 or n_draws == 1:
+            evaluator.warm()
+            rows = [evaluator(seed, draw) for seed, draw in zip(seeds, values)]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(evaluator,)) as executor:
+                chunksize = max(1, n_draws // (4 * max_workers))
+                rows = list(executor.map(_evaluate_draw, seeds, values, chunksize=chunksize))
+
+        draws = pd.concat([samples, pd.DataFrame(rows, index=samples.index)], axis=1)
+        draws.insert(0, 'seed', seeds)
+        return PSAResult(
+            arms=list(self.arms),
+            parameters=self.parameters,
+            effect=self.effect,
+            draws=draws,
+            n_patients=len(cohort),
+            duration_years=self.duration_years,
+            metadata={
+                'seed': self.seed,
+                'drug': self.drug or EnhancedCostTracker(self.cost_config).active_drug,
+                'protocols': {arm: {'name': spec.name, 'version': spec.version, 'checksum': spec.checksum}
+                              for arm, spec in self.arms.items()}
+            }
+        )
@@ -0,0 +1,249 @@
+"""
+Post-hoc re-pricing of stored simulation visits.
+
+A visit's cost is a fixed set of components (drug, injection procedure,
+consultation, OCT scan) times their unit prices, and which components a
+visit incurs depends only on its visit type and procedures. Prices can
+therefore be changed after a simulation has run: the visit table is
+joined once to a component-quantity matrix and grouped by patient and by
+month, and every price scenario is then a matrix product with the
+aggregated quantities. A drug price sweep over a million visits costs
+little more than one scenario.
+"""
+
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .cost_config import CostConfig
+from .resource_tracker import COST_COMPONENTS
+
+
+# Cost config component names tried, in order, for each priced component
+COST_CONFIG_COMPONENTS = {
+    'injection_procedure': ['injection_administration', 'injection'],
+    'consultation': ['consultant_followup', 'face_to_face_review', 'consultation'],
+    'oct_scan': ['oct_scan']
+}
+
+REQUIRED_VISIT_COLUMNS = ['date', 'patient_id', 'visit_type', 'injection_given', 'oct_performed']
+
+
+@dataclass
+class PriceSchedule:
+    """Unit prices for the cost components recorded per visit."""
+
+    drug: float
+    injection_procedure: float
+    consultation: float
+    oct_scan: float
+    name: str = 'base'
+
+    @classmethod
+    def from_resource_config(cls, resource_config: Dict[str, Any], drug: str = 'aflibercept_2mg',
+                             name: Optional[str] = None) -> 'PriceSchedule':
+        """
+        Prices from the costs section of a resource configuration.
+
+        Args:
+            resource_config: Dictionary in the nhs_standard_resources.yaml layout
+            drug: Key of costs.drugs to price injections with
+            name: Scenario name (defaults to the drug)
+        """
+        costs = resource_config['costs']
+        procedures = costs['procedures']
+        return cls(
+            drug=costs['drugs'][drug]['unit_cost'],
+            injection_procedure=procedures['intravitreal_injection']['unit_cost'],
+            consultation=procedures['outpatient_assessment']['unit_cost'],
+            oct_scan=procedures['oct_scan']['unit_cost'],
+            name=name or drug
+        )
+
+    @classmethod
+    def from_cost_config(cls, cost_config: CostConfig, drug: Optional[str] = None,
+                         name: Optional[str] = None) -> 'PriceSchedule':
+        """
+        Prices from a cost configuration (protocols/cost_configs/*.yaml).
+
+        Args:
+            cost_config: Loaded cost configuration
+            drug: Key of drug_costs; defaults to the config's default_drug
+            name: Scenario name (defaults to the config name)
+
+        Raises:
+            ValueError: If the drug or a priced component is not in the config
+        """
+        drug = drug or cost_config.drug_costs.get('default_drug')
+        if drug not in cost_config.drug_costs or drug == 'default_drug':
+            raise ValueError(f"Drug not found in cost configuration: {drug}")
+        drug_cost = cost_config.drug_costs[drug]
+        if isinstance(drug_cost, dict):
+            drug_cost = drug_cost['unit_cost']
+
+        prices = {'drug': drug_cost}
+        for component, candidates in COST_CONFIG_COMPONENTS.items():
+            found = [key for key in candidates if key in cost_config.visit_components]
+            if not found:
+                raise ValueError(f"Cost configuration has no price for {component} (tried {candidates})")
+            prices[component] = cost_config.visit_components[found[0]]
+
+        return cls(**prices, name=name or cost_config.metadata.get('name', drug))
+
+    def with_drug_price(self, drug: float, name: Optional[str] = None) -> 'PriceSchedule':
+        """Copy with a different drug price."""
+        return replace(self, drug=drug, name=name or f"{self.name} @ {drug:g}")
+
+    def as_array(self) -> np.ndarray:
+        return np.array([getattr(self, component) for component in COST_COMPONENTS], dtype=float)
+
+
+def drug_price_sweep(base: PriceSchedule, prices: Sequence[float]) -> List[PriceSchedule]:
+    """One scenario per drug price, other prices as in base."""
+    return [base.with_drug_price(price, name=f"drug {price:g}") for price in prices]
+
+
+@dataclass
+class RepricingResult:
+    """Costs of every scenario; one column per scenario in the tables."""
+
+    scenarios: List[str]
+    totals: pd.DataFrame       # scenario x (components, total)
+    per_patient: pd.DataFrame  # patient_id x scenario
+    per_month: pd.DataFrame    # calendar month x scenario
+
+    def total_costs(self, scenario: Optional[str] = None) -> Dict[str, float]:
+        """Totals of one scenario (default the first) in the get_total_costs layout."""
+        row = self.totals.loc[scenario or self.scenarios[0]]
+        return {key: float(value) for key, value in row.items()}
+
+
+class RepricingEngine:
+    """Price a stored visit table under any number of price schedules."""
+
+    def __init__(self, visits: pd.DataFrame):
+        """
+        Initialize engine and aggregate component quantities.
+
+        Args:
+            visits: One row per visit with date, patient_id, visit_type,
+                injection_given and oct_performed (the visits_with_costs
+                table or ResourceTracker.visits_frame())
+
+        Raises:
+            ValueError: If required columns are missing
+        """
+        missing = [column for column in REQUIRED_VISIT_COLUMNS if column not in visits.columns]
+        if missing:
+            raise ValueError(f"Visit table missing columns: {missing}")
+
+        self.visits = visits
+        self.n_visits = len(visits)
+
+        # 1. Join visit types to the components they incur
+        type_codes, visit_types = pd.factorize(visits['visit_type'])
+        is_decision = np.array(['decision' in str(vtype) for vtype in visit_types], dtype=bool)
+        injection = visits['injection_given'].to_numpy(dtype=bool)
+        quantities = np.column_stack([
+            injection,
+            injection,
+            is_decision[type_codes] if len(type_codes) else np.zeros(0, dtype=bool),
+            visits['oct_performed'].to_numpy(dtype=bool)
+        ]).astype(float)
+
+        # 2. Group by patient and by calendar month
+        patient_codes, self.patients = pd.factorize(visits['patient_id'])
+        date_codes, unique_dates = pd.factorize(visits['date'])
+        unique_months = pd.to_datetime(pd.Series(unique_dates)).dt.to_period('M')
+        month_codes_by_date, self.months = pd.factorize(unique_months, sort=True)
+        month_codes = month_codes_by_date[date_codes]
+
+        self.patient_quantities = self._group(quantities, patient_codes, len(self.patients))
+        self.month_quantities = self._group(quantities, month_codes, len(self.months))
+        self.total_quantities = quantities.sum(axis=0)
+
+    @staticmethod
+    def _group(quantities: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+        return np.column_stack([
+            np.bincount(codes, weights=quantities[:, c], minlength=n_groups)
+            for c in range(quantities.shape[1])
+        ]) if n_groups else np.zeros((0, quantities.shape[1]))
+
+    @classmethod
+    def from_tracker(cls, resource_tracker: Any) -> 'RepricingEngine':
+        """Engine over a ResourceTracker or a tracker loaded from Parquet results."""
+        if hasattr(resource_tracker, 'visits_frame'):
+            return cls(resource_tracker.visits_frame())
+        visits = getattr(resource_tracker, 'visits', [])
+        return cls(pd.DataFrame(visits, columns=REQUIRED_VISIT_COLUMNS + ['costs']))
+
+    @classmethod
+    def from_parquet(cls, results_path: Union[str, Path]) -> 'RepricingEngine':
+        """Engine over the visits_with_costs.parquet of a saved simulation."""
+        path = Path(results_path)
+        if path.is_dir():
+            path = path / 'visits_with_costs.parquet'
+        if not path.exists():
+            raise FileNotFoundError(f"Visit cost table not found: {path}")
+        stored = pq.read_schema(path).names
+        columns = REQUIRED_VISIT_COLUMNS + [column for column in COST_COMPONENTS if column in stored]
+        return cls(pd.read_parquet(path, columns=columns))
+
+    def recorded_schedule(self) -> PriceSchedule:
+        """
+        Prices the simulation was run with, read from the stored cost columns.
+
+        Raises:
+            ValueError: If a component was charged at more than one price
+        """
+        prices = {}
+        for component in COST_COMPONENTS:
+            if component in self.visits.columns:
+                values = pd.unique(self.visits[component].dropna())
+                if len(values) > 1:
+                    raise ValueError(f"{component} was charged at several prices: {sorted(values)}")
+                prices[component] = float(values[0]) if len(values) else 0.0
+            elif 'costs' in self.visits.columns:
+                values = {costs[component] for costs in self.visits['costs'] if component in costs}
+                if len(values) > 1:
+                    raise ValueError(f"{component} was charged at several prices: {sorted(values)}")
+                prices[component] = float(values.pop()) if values else 0.0
+            else:
+                prices[component] = 0.0
+        return PriceSchedule(**prices, name='recorded')
+
+    def price(self, schedules: Union[PriceSchedule, Sequence[PriceSchedule]]) -> RepricingResult:
+        """
+        Costs under each price schedule.
+
+        Args:
+            schedules: One schedule or a batch (e.g. from drug_price_sweep)
+
+        Returns:
+            RepricingResult with totals, per-patient and per-month costs
+        """
+        if isinstance(schedules, PriceSchedule):
+            schedules = [schedules]
+        names = [schedule.name for schedule in schedules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Scenario names must be unique: {names}")
+
+        # components x scenarios
+        prices = np.column_stack([schedule.as_array() for schedule in schedules])
+
+        component_totals = self.total_quantities[:, None] * prices
+        totals = pd.DataFrame(component_totals.T, index=pd.Index(names, name='scenario'),
+                              columns=COST_COMPONENTS)
+        totals['total'] = totals.sum(axis=1)
+
+        per_patient = pd.DataFrame(self.patient_quantities @ prices,
+                                   index=pd.Index(self.patients, dtype=str, name='patient_id'), columns=names)
+        per_month = pd.DataFrame(self.month_quantities @ prices,
+                                 index=pd.Index(self.months.astype(str), name='month'), columns=names)
+
+        return RepricingResult(scenarios=names, totals=totals,
+                               per_patient=per_patient, per_month=per_month)
@@ -3,6 +3,14 @@ Resource tracking for economic and workload analysis.
 
 Tracks actual resource usage during simulations based on visit types.
 NO ESTIMATES OR FALLBACKS - only tracks what actually happens.
+
+Storage is columnar. Each tracked visit writes one row of preallocated
+visit columns (day, visit type, procedures) and increments one cell of a
+day x visit-type count matrix. The day x role usage matrix is that count
+matrix times the visit-type x role requirement matrix, so workload, peak
+and bottleneck queries are array operations rather than loops over
+nested dicts. Costs are a fixed function of visit type and procedures and
+are derived from the columns when asked for.
 """
 
 from collections import defaultdict
@@ -12,6 +20,13 @@ import math
 import yaml
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+
+# Cost components in the order they are reported
+COST_COMPONENTS = ['drug', 'injection_procedure', 'consultation', 'oct_scan']
+
 
 class ResourceTracker:
     """Track resource usage during simulation."""
@@ -36,14 +51,42 @@ class ResourceTracker:
         self.allow_saturday = allow_saturday
         self.allow_sunday = allow_sunday
         
-        # Daily usage tracking: date -> role -> count
-        self.daily_usage = defaultdict(lambda: defaultdict(int))
-        
-        # Visit tracking for cost calculation
-        self.visits = []
-        
         # Validate configuration
         self._validate_config()
+        
+        # Role columns: configured roles, then any role only named by a visit type
+        self.role_names: List[str] = list(self.roles)
+        for requirements in self.visit_requirements.values():
+            for role in requirements['roles_needed']:
+                if role not in self.role_names:
+                    self.role_names.append(role)
+        self.visit_types: List[str] = list(self.visit_requirements)
+        self._visit_type_index = {vtype: i for i, vtype in enumerate(self.visit_types)}
+        
+        # Visit type x role: slots needed, and whether the role is named at all
+        self._requirement_matrix = np.zeros((len(self.visit_types), len(self.role_names)), dtype=np.int64)
+        self._role_named = np.zeros_like(self._requirement_matrix, dtype=bool)
+        for t, vtype in enumerate(self.visit_types):
+            for role, count in self.visit_requirements[vtype]['roles_needed'].items():
+                r = self.role_names.index(role)
+                self._requirement_matrix[t, r] = count
+                self._role_named[t, r] = True
+        
+        # Day x visit type counts; row d is ordinal day origin + d
+        self._origin: Optional[int] = None
+        self._type_counts = np.zeros((0, len(self.visit_types)), dtype=np.int64)
+        
+        # Visit columns, grown by doubling
+        self._n_visits = 0
+        self._visit_day = np.zeros(0, dtype=np.int64)
+        self._visit_type = np.zeros(0, dtype=np.int16)
+        self._injection_given = np.zeros(0, dtype=bool)
+        self._oct_performed = np.zeros(0, dtype=bool)
+        self._patient_ids: List[str] = []
+        
+        # Materialised dict views, rebuilt when visits have been added
+        self._views: Dict[str, Any] = {}
+        self._views_at = -1
     
     def _validate_config(self) -> None:
         """Validate resource configuration has required fields."""
@@ -58,6 +101,73 @@ class ResourceTracker:
             if vtype not in self.visit_requirements:
                 raise ValueError(f"Missing required visit type: {vtype}")
     
+    def _ensure_day(self, ordinal: int) -> int:
+        """Row of the count matrix for an ordinal day, growing storage as needed."""
+        if self._origin is None:
+            self._origin = ordinal
+        offset = ordinal - self._origin
+        if offset < 0:
+            # A day before every earlier visit; prepend rows
+            shift = max(-offset, 64)
+            padding = np.zeros((shift, len(self.visit_types)), dtype=np.int64)
+            self._type_counts = np.vstack([padding, self._type_counts])
+            self._origin -= shift
+            offset += shift
+        elif offset >= len(self._type_counts):
+            new_size = max(offset + 1, 2 * len(self._type_counts), 366)
+            padding = np.zeros((new_size - len(self._type_counts), len(self.visit_types)), dtype=np.int64)
+            self._type_counts = np.vstack([self._type_counts, padding])
+        return offset
+    
+    def _grow_visits(self) -> None:
+        size = max(2 * len(self._visit_day), 1024)
+        for name in ('_visit_day', '_visit_type', '_injection_given', '_oct_performed'):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+    
+    def record_visit(self, visit_date: date, visit_type: str, patient_id: str,
+                     injection_given: bool = False, oct_performed: bool = False) -> int:
+        """
+        Record a visit without building a visit record.
+        
+        Same checks as track_visit; used by engines that only need the
+        aggregate results.
+        
+        Returns:
+            Row index of the visit (see get_visit)
+            
+        Raises:
+            KeyError: If visit_type is unknown
+            ValueError: If the visit falls on a non-working day
+        """
+        type_index = self._visit_type_index.get(visit_type)
+        if type_index is None:
+            raise KeyError(f"Unknown visit type: {visit_type}")
+            
+        # Check if visit is on allowed working day
+        weekday = visit_date.weekday()
+        if weekday == 5 and not self.allow_saturday:  # Saturday
+            raise ValueError(f"Visit scheduled on Saturday: {visit_date}")
+        elif weekday == 6 and not self.allow_sunday:  # Sunday
+            raise ValueError(f"Visit scheduled on Sunday: {visit_date}")
+        
+        ordinal = visit_date.toordinal()
+        row = self._ensure_day(ordinal)
+        self._type_counts[row, type_index] += 1
+        
+        i = self._n_visits
+        if i == len(self._visit_day):
+            self._grow_visits()
+        self._visit_day[i] = ordinal
+        self._visit_type[i] = type_index
+        self._injection_given[i] = injection_given
+        self._oct_performed[i] = oct_performed
+        self._patient_ids.append(patient_id)
+        self._n_visits = i + 1
+        return i
+    
     def track_visit(self, visit_date: date, visit_type: str, patient_id: str,
                    injection_given: bool = False, oct_performed: bool = False) -> Dict[str, Any]:
         """
@@ -77,40 +187,26 @@ class ResourceTracker:
             KeyError: If visit_type is unknown
             ValueError: If data is missing or invalid
         """
-        if visit_type not in self.visit_requirements:
-            raise KeyError(f"Unknown visit type: {visit_type}")
-            
-        # Check if visit is on allowed working day
-        weekday = visit_date.weekday()
-        if weekday == 5 and not self.allow_saturday:  # Saturday
-            raise ValueError(f"Visit scheduled on Saturday: {visit_date}")
-        elif weekday == 6 and not self.allow_sunday:  # Sunday
-            raise ValueError(f"Visit scheduled on Sunday: {visit_date}")
-        
-        # Get resource requirements for this visit type
-        requirements = self.visit_requirements[visit_type]['roles_needed']
-        
-        # Track resource usage
-        for role, count in requirements.items():
-            self.daily_usage[visit_date][role] += count
-        
-        # Calculate costs
-        visit_costs = self._calculate_visit_costs(visit_type, injection_given, oct_performed)
-        
-        # Create visit record
-        visit_record = {
-            'date': visit_date,
-            'patient_id': patient_id,
+        return self.get_visit(
+            self.record_visit(visit_date, visit_type, patient_id, injection_given, oct_performed)
+        )
+    
+    def get_visit(self, index: int) -> Dict[str, Any]:
+        """Visit record for a row index returned by record_visit."""
+        if not 0 <= index < self._n_visits:
+            raise IndexError(f"No visit at index {index}")
+        visit_type = self.visit_types[self._visit_type[index]]
+        injection_given = bool(self._injection_given[index])
+        oct_performed = bool(self._oct_performed[index])
+        return {
+            'date': date.fromordinal(int(self._visit_day[index])),
+            'patient_id': self._patient_ids[index],
             'visit_type': visit_type,
             'injection_given': injection_given,
             'oct_performed': oct_performed,
-            'costs': visit_costs,
-            'resources_used': dict(requirements)  # Copy to avoid reference issues
+            'costs': self._calculate_visit_costs(visit_type, injection_given, oct_performed),
+            'resources_used': dict(self.visit_requirements[visit_type]['roles_needed'])
         }
-        
-        self.visits.append(visit_record)
-        
-        return visit_record
     
     def _calculate_visit_costs(self, visit_type: str, injection_given: bool, 
                              oct_performed: bool) -> Dict[str, float]:
@@ -132,6 +228,84 @@ class ResourceTracker:
             
         return costs
     
+    def _cost_columns(self) -> Dict[str, np.ndarray]:
+        """Per-visit cost of each component, NaN where it does not apply."""
+        n = self._n_visits
+        injection = self._injection_given[:n]
+        is_decision = np.array(['decision' in vtype for vtype in self.visit_types], dtype=bool)
+        applies = {
+            'drug': injection,
+            'injection_procedure': injection,
+            'consultation': is_decision[self._visit_type[:n]],
+            'oct_scan': self._oct_performed[:n]
+        }
+        columns = {}
+        for component, mask in applies.items():
+            if not mask.any():
+                continue
+            if component == 'drug':
+                unit_cost = self.costs['drugs']['aflibercept_2mg']['unit_cost']
+            else:
+                procedure = {
+                    'injection_procedure': 'intravitreal_injection',
+                    'consultation': 'outpatient_assessment',
+                    'oct_scan': 'oct_scan'
+                }[component]
+                unit_cost = self.costs['procedures'][procedure]['unit_cost']
+            columns[component] = np.where(mask, float(unit_cost), np.nan)
+        return columns
+    
+    # Array views
+    
+    def _active_days(self) -> np.ndarray:
+        """Rows of the count matrix with at least one visit."""
+        return np.flatnonzero(self._type_counts.sum(axis=1))
+    
+    @property
+    def usage_matrix(self) -> np.ndarray:
+        """Day x role usage for days with visits (rows match get_all_dates_with_visits)."""
+        return self._type_counts[self._active_days()] @ self._requirement_matrix
+    
+    def _roles_named(self, rows: np.ndarray) -> np.ndarray:
+        """Day x role: whether any visit that day names the role."""
+        return ((self._type_counts[rows] > 0).astype(np.int64) @ self._role_named) > 0
+    
+    def _row(self, query_date: date) -> Optional[int]:
+        """Count-matrix row of a date, or None if it has no visits."""
+        if self._origin is None:
+            return None
+        offset = query_date.toordinal() - self._origin
+        if not 0 <= offset < len(self._type_counts) or not self._type_counts[offset].any():
+            return None
+        return offset
+    
+    def _build_views(self) -> Dict[str, Any]:
+        if self._views_at != self._n_visits:
+            rows = self._active_days()
+            usage = self._type_counts[rows] @ self._requirement_matrix
+            named = self._roles_named(rows)
+            daily_usage = {}
+            for day, counts, present in zip(rows.tolist(), usage.tolist(), named.tolist()):
+                daily_usage[date.fromordinal(self._origin + day)] = {
+                    role: count for role, count, keep in zip(self.role_names, counts, present) if keep
+                }
+            self._views = {'daily_usage': daily_usage}
+            self._views_at = self._n_visits
+        return self._views
+    
+    @property
+    def daily_usage(self) -> Dict[date, Dict[str, int]]:
+        """Resource usage by date and role (dates with visits only)."""
+        return self._build_views()['daily_usage']
+    
+    @property
+    def visits(self) -> List[Dict[str, Any]]:
+        """Visit records with costs, in tracking order."""
+        views = self._build_views()
+        if 'visits' not in views:
+            views['visits'] = [self.get_visit(i) for i in range(self._n_visits)]
+        return views['visits']
+    
     def get_daily_usage(self, query_date: date) -> Dict[str, int]:
         """
         Get resource usage for a specific date.
@@ -145,10 +319,14 @@ class ResourceTracker:
         Raises:
             ValueError: If no data exists for the date
         """
-        if query_date not in self.daily_usage:
+        row = self._row(query_date)
+        if row is None:
             raise ValueError(f"No visit data available for {query_date}")
             
-        return dict(self.daily_usage[query_date])
+        counts = self._type_counts[row]
+        usage = (counts @ self._requirement_matrix).tolist()
+        named = ((counts > 0).astype(np.int64) @ self._role_named > 0).tolist()
+        return {role: count for role, count, keep in zip(self.role_names, usage, named) if keep}
     
     def calculate_sessions_needed(self, query_date: date, role: str) -> float:
         """
@@ -179,48 +357,45 @@ class ResourceTracker:
     
     def get_all_dates_with_visits(self) -> List[date]:
         """Get all dates that have visits scheduled."""
-        return sorted(self.daily_usage.keys())
+        return [date.fromordinal(self._origin + day) for day in self._active_days().tolist()]
     
     def get_total_costs(self) -> Dict[str, float]:
         """Calculate total costs across all visits."""
-        total_costs = defaultdict(float)
-        
-        for visit in self.visits:
-            for cost_type, amount in visit['costs'].items():
-                total_costs[cost_type] += amount
-                
+        total_costs = {
+            component: float(np.nansum(column))
+            for component, column in self._cost_columns().items()
+        }
         total_costs['total'] = sum(total_costs.values())
         
-        return dict(total_costs)
+        return total_costs
     
     def get_workload_summary(self) -> Dict[str, Any]:
         """Generate workload summary statistics."""
+        rows = self._active_days()
+        usage = self._type_counts[rows] @ self._requirement_matrix
+        named = self._roles_named(rows)
+        visits_by_type = np.bincount(self._visit_type[:self._n_visits], minlength=len(self.visit_types))
+        
         summary = {
-            'total_visits': len(self.visits),
-            'visits_by_type': defaultdict(int),
+            'total_visits': self._n_visits,
+            'visits_by_type': defaultdict(int, {
+                vtype: int(count) for vtype, count in zip(self.visit_types, visits_by_type) if count
+            }),
             'peak_daily_demand': {},
             'average_daily_demand': {},
             'total_sessions_needed': {},
-            'dates_with_visits': len(self.daily_usage)
+            'dates_with_visits': len(rows)
         }
         
-        # Count visits by type
-        for visit in self.visits:
-            summary['visits_by_type'][visit['visit_type']] += 1
-        
-        # Calculate demand statistics by role
+        # Demand statistics by role, over the days on which the role was needed
         for role in self.roles:
-            daily_demands = []
-            total_procedures = 0
+            r = self.role_names.index(role)
+            daily_demands = usage[named[:, r], r]
             
-            for date_usage in self.daily_usage.values():
-                if role in date_usage:
-                    daily_demands.append(date_usage[role])
-                    total_procedures += date_usage[role]
-            
-            if daily_demands:
-                summary['peak_daily_demand'][role] = max(daily_demands)
-                summary['average_daily_demand'][role] = sum(daily_demands) / len(daily_demands)
+            if len(daily_demands):
+                total_procedures = int(daily_demands.sum())
+                summary['peak_daily_demand'][role] = int(daily_demands.max())
+                summary['average_daily_demand'][role] = total_procedures / len(daily_demands)
                 
                 # Total sessions needed
                 capacity = self.roles[role]['capacity_per_session']
@@ -234,24 +409,65 @@ class ResourceTracker:
     
     def identify_bottlenecks(self) -> List[Dict[str, Any]]:
         """Identify resource bottlenecks (days where capacity is exceeded)."""
+        rows = self._active_days()
+        role_columns = [self.role_names.index(role) for role in self.roles]
+        usage = (self._type_counts[rows] @ self._requirement_matrix)[:, role_columns]
+        capacity = np.array([info['capacity_per_session'] for info in self.roles.values()], dtype=float)
+        sessions_available = self.session_parameters['sessions_per_day']
+        
+        sessions_needed = usage / capacity
+        roles = list(self.roles)
         bottlenecks = []
         
-        for check_date in self.get_all_dates_with_visits():
-            for role, capacity_info in self.roles.items():
-                sessions_needed = self.calculate_sessions_needed(check_date, role)
-                sessions_available = self.session_parameters['sessions_per_day']
-                
-                if sessions_needed > sessions_available:
-                    bottlenecks.append({
-                        'date': check_date,
-                        'role': role,
-                        'sessions_needed': sessions_needed,
-                        'sessions_available': sessions_available,
-                        'overflow': sessions_needed - sessions_available,
-                        'procedures_affected': self.daily_usage[check_date][role]
-                    })
+        # Row-major order: by date, then by role
+        for day, r in zip(*np.nonzero(sessions_needed > sessions_available)):
+            needed = float(sessions_needed[day, r])
+            bottlenecks.append({
+                'date': date.fromordinal(self._origin + int(rows[day])),
+                'role': roles[r],
+                'sessions_needed': needed,
+                'sessions_available': sessions_available,
+                'overflow': needed - sessions_available,
+                'procedures_affected': int(usage[day, r])
+            })
         
         return bottlenecks
+    
+    def daily_usage_frame(self) -> pd.DataFrame:
+        """
+        Daily usage as a wide table: one row per date with visits, one
+        column per role (null where no visit that day needed the role).
+        """
+        rows = self._active_days()
+        usage = self._type_counts[rows] @ self._requirement_matrix
+        named = self._roles_named(rows)
+        dates = [date.fromordinal(self._origin + day).isoformat() for day in rows.tolist()]
+        
+        frame = pd.DataFrame({'date': pd.Series(dates, dtype=object)})
+        for r, role in enumerate(self.role_names):
+            frame[role] = pd.array(np.where(named[:, r], usage[:, r], 0), dtype='Int64')
+            frame.loc[~named[:, r], role] = pd.NA
+        return frame
+    
+    def visits_frame(self) -> pd.DataFrame:
+        """Visit records with cost components (NaN where not incurred) and total_cost."""
+        n = self._n_visits
+        days = self._visit_day[:n]
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        day_strings = np.array([date.fromordinal(int(day)).isoformat() for day in unique_days], dtype=object)
+        
+        frame = pd.DataFrame({
+            'date': day_strings[inverse] if n else np.array([], dtype=object),
+            'patient_id': pd.Series(self._patient_ids, dtype=object),
+            'visit_type': np.array(self.visit_types, dtype=object)[self._visit_type[:n]],
+            'injection_given': self._injection_given[:n].copy(),
+            'oct_performed': self._oct_performed[:n].copy()
+        })
+        costs = self._cost_columns()
+        frame['total_cost'] = np.nansum(np.vstack(list(costs.values())), axis=0) if costs else 0.0
+        for component, column in costs.items():
+            frame[component] = column
+        return frame
 
 
 def load_resource_config(config_path: str) -> Dict[str, Any]:
@@ -128,7 +128,7 @@ class ABSEngineTimeBased(ABSEngine):
                     first_visit_date = self.protocol.scheduler.adjust_to_weekday(
                         normalized_arrival_date, prefer_earlier=True
                     )
-                visit_schedule[patient_id] = first_visit_date
+                visit_schedule[patient_id] = self._schedule_first_visit(patient, first_visit_date)
                 
                 arrival_index += 1
             
@@ -149,7 +149,7 @@ class ABSEngineTimeBased(ABSEngine):
                         total_injections += 1
                     
                     # Schedule next visit
-                    next_date = self.protocol.next_visit_date(patient, current_date, treated)
+                    next_date = self._schedule_next_visit(patient, current_date, treated)
                     
                     # Ensure next visit is in the future and within simulation
                     if next_date > current_date and next_date <= end_date:
@@ -190,6 +190,14 @@ class ABSEngineTimeBased(ABSEngine):
             discontinuation_rate=discontinuation_rate
         )
     
+    def _schedule_first_visit(self, patient: Patient, first_visit_date: datetime) -> datetime:
+        """Date of a new patient's first visit. Hook for capacity-aware engines."""
+        return first_visit_date
+    
+    def _schedule_next_visit(self, patient: Patient, current_date: datetime, treated: bool) -> datetime:
+        """Date of the next visit after the one on current_date. Hook for capacity-aware engines."""
+        return self.protocol.next_visit_date(patient, current_date, treated)
+    
     def _perform_fortnightly_updates(self, current_date: datetime):
         """
         Perform fortnightly updates for all enrolled patients.
@@ -11,17 +11,19 @@ Implements the complete vision model including:
 
 import random
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 
-import yaml
 from pathlib import Path
+from simulation_v2.protocols.parameter_cache import load_yaml
 from simulation_v2.engines.abs_engine_time_based_with_specs import ABSEngineTimeBasedWithSpecs
 from simulation_v2.core.patient import Patient
 from simulation_v2.core.discontinuation_checker import DiscontinuationChecker
 from simulation_v2.core.disease_model import DiseaseState
 from simulation_v2.models.mortality import PopulationMortalityModel
+from simulation_v2.models.baseline_vision_distributions import NormalDistribution
+from simulation_v2.models.cohort import Cohort, CohortGenerator, vision_ceilings
 
 
 @dataclass
@@ -41,11 +43,25 @@ class ABSEngineTimeBasedWithParams(ABSEngineTimeBasedWithSpecs):
     All values come from parameter files - no hardcoded constants.
     """
     
-    def __init__(self, *args, **kwargs):
-        """Initialize with vision state tracking."""
+    def __init__(self, *args, cohort: Optional[Cohort] = None, **kwargs):
+        """
+        Initialize with vision state tracking.
+        
+        Args:
+            cohort: Patients to enroll (see CohortGenerator); reuse one cohort
+                across engines to compare protocols on identical patients.
+                By default a cohort is drawn from the seed when the run starts.
+            *args, **kwargs: Arguments for parent class
+        """
         super().__init__(*args, **kwargs)
         self.patient_vision_states: Dict[str, PatientVisionState] = {}
         
+        # Baseline characteristics come from a cohort drawn in one pass
+        self.cohort = cohort
+        self._cohort_rng = np.random.default_rng(kwargs.get('seed'))
+        self._cohort_rows: Dict[str, int] = {}
+        self._cohort_ceilings: Optional[np.ndarray] = None
+        
         # Initialize discontinuation checker if we have the parameters
         self.discontinuation_checker = None
         if hasattr(self, 'discontinuation_params') and self.discontinuation_params:
@@ -63,43 +79,72 @@ class ABSEngineTimeBasedWithParams(ABSEngineTimeBasedWithSpecs):
         if hasattr(self, 'protocol_spec') and hasattr(self.protocol_spec, 'demographics_parameters_file'):
             params_path = Path(self.protocol_spec.source_file).parent / self.protocol_spec.demographics_parameters_file
             if params_path.exists():
-                with open(params_path) as f:
-                    self.demographics_params = yaml.safe_load(f)
+                self.demographics_params = self.protocol_spec.load_demographics_parameters()
                 return
         
         # Fallback to default location
         default_path = Path(__file__).parent.parent.parent / 'protocols' / 'v2_time_based' / 'parameters' / 'demographics.yaml'
         if default_path.exists():
-            with open(default_path) as f:
-                self.demographics_params = yaml.safe_load(f)
+            self.demographics_params = load_yaml(default_path)
         else:
             # No demographics parameters available
             self.demographics_params = None
     
-    def _initialize_patient_vision(self, patient_id: str, patient: Patient, enrollment_date: datetime):
+    @property
+    def cohort_generator(self) -> CohortGenerator:
+        """Generator for this engine's baseline vision and demographics."""
+        age_distribution = None
+        if self.demographics_params:
+            age_distribution = self.demographics_params.get('demographics_parameters', {}).get('age_distribution', {})
+        # Same truncated normal as _sample_baseline_vision
+        baseline_distribution = NormalDistribution(
+            mean=self.protocol_spec.baseline_vision_mean,
+            std=self.protocol_spec.baseline_vision_std,
+            min_value=self.protocol_spec.baseline_vision_min,
+            max_value=self.protocol_spec.baseline_vision_max
+        )
+        return CohortGenerator(baseline_distribution, age_distribution, self.population_mortality)
+    
+    def _generate_arrival_schedule(self, start_date: datetime, end_date: datetime) -> List[Tuple[datetime, str]]:
+        """
+        Arrival schedule of the cohort, drawing the cohort first if none was given.
+        
+        Without a cohort, arrivals come from the parent's Poisson schedule
+        (so a seed enrolls the same patients as before) and only the
+        baseline characteristics are drawn in one pass. Vision ceilings for
+        the whole cohort are computed here in one pass.
+        """
+        if self.cohort is None:
+            arrivals = super()._generate_arrival_schedule(start_date, end_date)
+            self.cohort = self.cohort_generator.draw(
+                [patient_id for _, patient_id in arrivals],
+                [arrival for arrival, _ in arrivals],
+                self._cohort_rng
+            )
+        
+        schedule = self.cohort.arrival_schedule(end_date)
+        if self.is_fixed_total_mode:
+            schedule = schedule[:self.n_patients]
+        
+        self._cohort_rows = {patient_id: row for row, patient_id in enumerate(self.cohort.patient_ids)}
+        self._cohort_ceilings = vision_ceilings(self.cohort.baseline_vision, self.vision_params['vision_ceilings'])
+        return schedule
+    
+    def _initialize_patient_vision(self, patient_id: str, patient: Patient, enrollment_date: datetime,
+                                   vision_ceiling: Optional[int] = None):
         """
         Initialize vision tracking for a new patient.
         
         Uses parameters from vision.yaml for all calculations.
+        
+        Args:
+            vision_ceiling: Precomputed ceiling (see vision_ceilings)
         """
         baseline = float(patient.baseline_vision)
         
         # Calculate vision ceiling from parameters
-        ceiling_params = self.vision_params['vision_ceilings']
-        
-        # Individual ceiling based on baseline
-        individual_ceiling = baseline * ceiling_params['baseline_ceiling_factor']
-        
-        # Apply absolute ceiling based on baseline range
-        if baseline > ceiling_params['high_baseline_threshold']:
-            absolute_ceiling = ceiling_params['absolute_ceiling_high_baseline']
-        elif baseline < ceiling_params['low_baseline_threshold']:
-            absolute_ceiling = ceiling_params['absolute_ceiling_low_baseline']
-        else:
-            absolute_ceiling = ceiling_params['absolute_ceiling_default']
-        
-        # Take minimum of individual and absolute ceiling
-        vision_ceiling = int(min(individual_ceiling, absolute_ceiling))
+        if vision_ceiling is None:
+            vision_ceiling = int(vision_ceilings([baseline], self.vision_params['vision_ceilings'])[0])
         
         # Create vision state
         self.patient_vision_states[patient_id] = PatientVisionState(
@@ -396,40 +441,32 @@ class ABSEngineTimeBasedWithParams(ABSEngineTimeBasedWithSpecs):
     
     def _create_patient(self, patient_id: str, enrollment_date: datetime) -> Patient:
         """
-        Create patient with age and gender initialization using population model.
+        Create patient with baseline vision, age and sex from the cohort.
         
-        Override to add age/gender sampling and vision state initialization.
+        Patients outside the cohort (e.g. created directly in tests) get
+        their characteristics drawn on the spot from the same generator.
         """
-        # Create base patient
-        patient = super()._create_patient(patient_id, enrollment_date)
-        
-        # Sample age first from demographics
-        if self.demographics_params:
-            age_dist = self.demographics_params.get('demographics_parameters', {}).get('age_distribution', {})
-            mean_age = age_dist.get('mean', 77.5)
-            std_age = age_dist.get('std', 8.2)
-            min_age = age_dist.get('min', 50)
-            max_age = age_dist.get('max', 95)
-            
-            # Sample age from normal distribution, bounded
-            age = random.gauss(mean_age, std_age)
-            age = max(min_age, min(max_age, age))
-            patient.age_years = int(age)
-            
-            # Calculate birth date from age at enrollment
-            patient.birth_date = enrollment_date - timedelta(days=int(age * 365.25))
-            
-            # Determine gender based on age-dependent distribution
-            female_proportion = self.population_mortality.get_female_proportion(patient.age_years)
-            patient.sex = 'female' if random.random() < female_proportion else 'male'
+        row = self._cohort_rows.get(patient_id)
+        if row is not None:
+            cohort = self.cohort
+            ceiling = int(self._cohort_ceilings[row])
         else:
-            # Fallback: use simple demographics
-            patient.age_years = int(random.gauss(77.5, 8.2))
-            patient.birth_date = enrollment_date - timedelta(days=int(patient.age_years * 365.25))
-            patient.sex = 'female' if random.random() < 0.62 else 'male'
+            cohort = self.cohort_generator.draw([patient_id], [enrollment_date], self._cohort_rng)
+            row = 0
+            ceiling = None
+        
+        patient = Patient(
+            patient_id=patient_id,
+            baseline_vision=int(cohort.baseline_vision[row]),
+            visit_metadata_enhancer=self.visit_metadata_enhancer,
+            enrollment_date=enrollment_date
+        )
+        patient.age_years = int(cohort.age_years[row])
+        patient.birth_date = cohort.birth_dates[row]
+        patient.sex = 'female' if cohort.is_female[row] else 'male'
         
         # Initialize vision tracking
-        self._initialize_patient_vision(patient_id, patient, enrollment_date)
+        self._initialize_patient_vision(patient_id, patient, enrollment_date, vision_ceiling=ceiling)
         
         return patient
     
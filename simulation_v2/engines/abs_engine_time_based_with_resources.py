@@ -5,14 +5,16 @@ Extends the parameter-driven engine to track resource usage and costs
 for economic and workload analysis.
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
 from pathlib import Path
 
 from simulation_v2.engines.abs_engine_time_based_with_params import ABSEngineTimeBasedWithParams
 from simulation_v2.economics.resource_tracker import ResourceTracker, load_resource_config
+from simulation_v2.economics.capacity_scheduler import CapacityScheduler
 from simulation_v2.economics.visit_classifier import VisitClassifier
 from simulation_v2.core.patient import Patient
+from simulation_v2.core.weekday_scheduler import WeekdayScheduler
 
 
 class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
@@ -21,16 +23,23 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
     
     Tracks actual resource usage during simulation based on visit types.
     NO ESTIMATES - only tracks what actually happens.
+    
+    With enforce_capacity, visits are booked against each role's daily
+    session budget: a visit that does not fit on its target day moves to
+    the next working day with room, and the later visit lengthens the
+    treatment gap that drives disease progression and vision.
     """
     
     def __init__(self, resource_config: Optional[Dict[str, Any]] = None, 
-                 resource_config_path: Optional[str] = None, *args, **kwargs):
+                 resource_config_path: Optional[str] = None,
+                 enforce_capacity: bool = False, *args, **kwargs):
         """
         Initialize with resource tracking.
         
         Args:
             resource_config: Resource configuration dictionary
             resource_config_path: Path to resource configuration YAML
+            enforce_capacity: Delay visits that exceed the daily session budget
             *args, **kwargs: Arguments for parent class
         """
         super().__init__(*args, **kwargs)
@@ -43,24 +52,31 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
             allow_saturday = getattr(self.protocol_spec, 'allow_saturday_visits', False)
             allow_sunday = getattr(self.protocol_spec, 'allow_sunday_visits', False)
         
+        config = None
         if resource_config:
-            self.resource_tracker = ResourceTracker(resource_config, allow_saturday, allow_sunday)
+            config = resource_config
         elif resource_config_path:
             config = load_resource_config(resource_config_path)
-            self.resource_tracker = ResourceTracker(config, allow_saturday, allow_sunday)
         else:
             # Default to NHS standard resources
             default_path = Path(__file__).parent.parent.parent / 'protocols' / 'resources' / 'nhs_standard_resources.yaml'
             if default_path.exists():
                 config = load_resource_config(str(default_path))
-                self.resource_tracker = ResourceTracker(config, allow_saturday, allow_sunday)
-            else:
-                self.resource_tracker = None
+        
+        self.resource_tracker = ResourceTracker(config, allow_saturday, allow_sunday) if config else None
         
         # Initialize visit classifier based on protocol type
         protocol_type = self._determine_protocol_type()
         self.visit_classifier = VisitClassifier(protocol_type) if protocol_type else None
         
+        # Capacity-constrained booking (needs the classifier to know each visit's roles)
+        self.capacity_scheduler = None
+        if enforce_capacity and config and self.visit_classifier:
+            self.capacity_scheduler = CapacityScheduler(config, allow_saturday, allow_sunday)
+        
+        # Visit type each patient's next visit was booked as
+        self.booked_visit_types: Dict[str, str] = {}
+        
         # Track visit numbers for each patient
         self.patient_visit_numbers = {}
     
@@ -84,7 +100,7 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
         return None
     
     def _track_visit_resources(self, patient_id: str, visit_date: datetime, 
-                             injection_given: bool, visit_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                             injection_given: bool, visit_data: Dict[str, Any]) -> Optional[int]:
         """
         Track resources for a visit if resource tracking is enabled.
         
@@ -95,7 +111,8 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
             visit_data: Additional visit data
             
         Returns:
-            Visit record with costs and resources, or None if tracking disabled
+            Tracker row of the visit (see ResourceTracker.get_visit), or None
+            if tracking is disabled
         """
         if not self.resource_tracker or not self.visit_classifier:
             return None
@@ -106,36 +123,76 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
         self.patient_visit_numbers[patient_id] += 1
         visit_number = self.patient_visit_numbers[patient_id]
         
-        # Calculate days since treatment start
-        patient = self.patients[patient_id]
-        days_since_start = (visit_date - patient.enrollment_date).days
-        
-        # Determine visit type
-        is_assessment = (visit_number == 4)  # Post-loading assessment
-        is_annual = self._is_annual_review(days_since_start)
-        
-        visit_type = self.visit_classifier.get_visit_type(
-            visit_number, days_since_start, is_assessment, is_annual
-        )
+        # Determine visit type (as booked, so tracked demand matches reserved capacity)
+        visit_type = self.booked_visit_types.pop(patient_id, None)
+        if visit_type is None:
+            visit_type = self._classify_visit(self.patients[patient_id], visit_date, visit_number)
         
         # Determine what procedures were performed
         oct_performed = 'decision' in visit_type
         
         # Track the visit
         try:
-            visit_record = self.resource_tracker.track_visit(
+            return self.resource_tracker.record_visit(
                 visit_date.date(),
                 visit_type,
                 patient_id,
                 injection_given,
                 oct_performed
             )
-            return visit_record
         except ValueError as e:
             # Skip weekend visits or other invalid dates
             print(f"Warning: Could not track visit: {e}")
             return None
     
+    def _classify_visit(self, patient: Patient, visit_date: datetime, visit_number: int) -> str:
+        """Visit type of a patient's visit_number-th visit on visit_date."""
+        # Calculate days since treatment start
+        days_since_start = (visit_date - patient.enrollment_date).days
+        
+        is_assessment = (visit_number == 4)  # Post-loading assessment
+        is_annual = self._is_annual_review(days_since_start)
+        
+        return self.visit_classifier.get_visit_type(
+            visit_number, days_since_start, is_assessment, is_annual
+        )
+    
+    def _book_visit(self, patient: Patient, target_date: datetime,
+                    latest_date: Optional[datetime] = None) -> datetime:
+        """Book the patient's next visit on the first day with capacity at or after target_date."""
+        visit_number = self.patient_visit_numbers.get(patient.id, 0) + 1
+        visit_type = self._classify_visit(patient, target_date, visit_number)
+        booked = self.capacity_scheduler.book(
+            visit_type, target_date.date(), latest_date.date() if latest_date else None
+        )
+        self.booked_visit_types[patient.id] = visit_type
+        return target_date + timedelta(days=(booked - target_date.date()).days)
+    
+    def _schedule_first_visit(self, patient: Patient, first_visit_date: datetime) -> datetime:
+        """Book the first visit against clinic capacity."""
+        first_visit_date = super()._schedule_first_visit(patient, first_visit_date)
+        if not self.capacity_scheduler:
+            return first_visit_date
+        return self._book_visit(patient, first_visit_date)
+    
+    def _schedule_next_visit(self, patient: Patient, current_date: datetime, treated: bool) -> datetime:
+        """
+        Book the protocol's next visit against clinic capacity.
+        
+        Overflow moves to the next working day with room. The tolerance
+        window is the interval flexibility of WeekdayScheduler; later
+        bookings are still made and counted as tolerance breaches.
+        """
+        target_date = super()._schedule_next_visit(patient, current_date, treated)
+        if not self.capacity_scheduler or patient.is_discontinued or target_date <= current_date:
+            return target_date
+        
+        interval_days = (target_date - current_date).days
+        visit_number = self.patient_visit_numbers.get(patient.id, 0) + 1
+        _, max_days = WeekdayScheduler.get_interval_flexibility(visit_number, round(interval_days / 7))
+        latest_date = current_date + timedelta(days=max(max_days, interval_days))
+        return self._book_visit(patient, target_date, latest_date)
+    
     def _is_annual_review(self, days_since_start: int) -> bool:
         """Determine if this is an annual review visit."""
         # Annual reviews at 12, 24, 36 months etc.
@@ -180,6 +237,8 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
             - total_costs: Cost breakdown
             - workload_summary: Summary statistics
             - bottlenecks: Identified capacity issues
+            - capacity_summary: Booking delays and utilisation (empty unless
+              capacity is enforced)
         """
         if not self.resource_tracker:
             return {}
@@ -189,7 +248,8 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
             'total_costs': self.resource_tracker.get_total_costs(),
             'workload_summary': self.resource_tracker.get_workload_summary(),
             'bottlenecks': self.resource_tracker.identify_bottlenecks(),
-            'visits': self.resource_tracker.visits
+            'visits': self.resource_tracker.visits,
+            'capacity_summary': self.capacity_scheduler.get_summary() if self.capacity_scheduler else {}
         }
     
     def run(self, duration_years: float) -> Any:
@@ -218,6 +278,7 @@ class ABSEngineTimeBasedWithResources(ABSEngineTimeBasedWithParams):
             results.workload_summary = resource_results.get('workload_summary', {})
             results.bottlenecks = resource_results.get('bottlenecks', [])
             results.visit_records = resource_results.get('visits', [])
+            results.capacity_summary = resource_results.get('capacity_summary', {})
             
             # Calculate average cost per patient
             if results.patient_count > 0 and results.total_costs:
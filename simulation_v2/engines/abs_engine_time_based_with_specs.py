@@ -6,10 +6,10 @@ matching the pattern used by ABSEngineWithSpecs.
 """
 
 import random
-import yaml
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+from simulation_v2.protocols.parameter_cache import load_yaml
 from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
 from simulation_v2.core.disease_model_time_based import DiseaseModelTimeBased
 from simulation_v2.core.protocol import StandardProtocol
@@ -70,14 +70,13 @@ class ABSEngineTimeBasedWithSpecs(ABSEngineTimeBased):
             # Load from external file
             params_path = Path(self.protocol_spec.source_file).parent / self.protocol_spec.vision_parameters_file
             if params_path.exists():
-                with open(params_path) as f:
-                    self.vision_params = yaml.safe_load(f)
+                # Through the spec so cached parses and in-memory overrides apply
+                self.vision_params = self.protocol_spec.load_vision_parameters()
             else:
                 # Fallback to default location
                 default_path = Path(__file__).parent.parent.parent / 'protocols' / 'v2_time_based' / 'parameters' / 'vision.yaml'
                 if default_path.exists():
-                    with open(default_path) as f:
-                        self.vision_params = yaml.safe_load(f)
+                    self.vision_params = load_yaml(default_path)
                 else:
                     # Use default parameters
                     self.vision_params = self._get_default_vision_params()
@@ -89,9 +88,7 @@ class ABSEngineTimeBasedWithSpecs(ABSEngineTimeBased):
         """Load discontinuation parameters from protocol spec or parameter files."""
         if hasattr(self.protocol_spec, 'discontinuation_parameters_file'):
             # Load from external file
-            params_path = Path(self.protocol_spec.source_file).parent / self.protocol_spec.discontinuation_parameters_file
-            with open(params_path) as f:
-                self.discontinuation_params = yaml.safe_load(f)
+            self.discontinuation_params = self.protocol_spec.load_discontinuation_parameters()
         else:
             # Use default parameters
             self.discontinuation_params = self._get_default_discontinuation_params()
@@ -102,8 +99,7 @@ class ABSEngineTimeBasedWithSpecs(ABSEngineTimeBased):
             # Load from external file
             params_path = Path(self.protocol_spec.source_file).parent / self.protocol_spec.demographics_parameters_file
             if params_path.exists():
-                with open(params_path) as f:
-                    self.demographics_params = yaml.safe_load(f)
+                self.demographics_params = self.protocol_spec.load_demographics_parameters()
             else:
                 self.demographics_params = None
         else:
@@ -10,9 +10,8 @@ initial patient vision values, including:
 
 import random
 import numpy as np
-from typing import Dict, Any, Protocol, Tuple
+from typing import Dict, Any, Optional, Protocol, Tuple
 from abc import ABC, abstractmethod
-from scipy import stats
 
 
 class BaselineVisionDistribution(ABC):
@@ -23,6 +22,15 @@ class BaselineVisionDistribution(ABC):
         """Sample a baseline vision value in ETDRS letters (0-100)."""
         pass
     
+    def sample_array(self, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Sample n baseline vision values at once.
+
+        Subclasses override this with a vectorized draw; the default calls
+        sample() n times.
+        """
+        return np.array([self.sample() for _ in range(n)], dtype=np.int64)
+    
     @abstractmethod
     def get_parameters(self) -> Dict[str, Any]:
         """Return the parameters of this distribution."""
@@ -62,6 +70,12 @@ class NormalDistribution(BaselineVisionDistribution):
         vision = int(random.gauss(self.mean, self.std))
         return max(self.min_value, min(self.max_value, vision))
     
+    def sample_array(self, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Sample n values from the truncated normal distribution."""
+        rng = rng if rng is not None else np.random.default_rng()
+        vision = np.trunc(rng.normal(self.mean, self.std, n)).astype(np.int64)
+        return np.clip(vision, self.min_value, self.max_value)
+    
     def get_parameters(self) -> Dict[str, Any]:
         """Return distribution parameters."""
         return {
@@ -120,7 +134,8 @@ class BetaWithThresholdDistribution(BaselineVisionDistribution):
         # Create fine-grained x values
         self.x_values = np.linspace(self.min_value, self.max_value, 1000)
         
-        # Calculate raw beta PDF
+        # Calculate raw beta PDF (scipy is only needed here, so load it on first use)
+        from scipy import stats
         x_normalized = (self.x_values - self.min_value) / self.scale
         pdf_raw = stats.beta.pdf(x_normalized, self.alpha, self.beta)
         
@@ -132,10 +147,9 @@ class BetaWithThresholdDistribution(BaselineVisionDistribution):
         # Normalize to ensure valid probability distribution
         self.pdf = pdf_adjusted / np.trapezoid(pdf_adjusted, self.x_values)
         
-        # Calculate CDF for inverse transform sampling
-        self.cdf = np.zeros_like(self.pdf)
-        for i in range(1, len(self.pdf)):
-            self.cdf[i] = self.cdf[i-1] + np.trapezoid(self.pdf[i-1:i+1], self.x_values[i-1:i+1])
+        # Calculate CDF for inverse transform sampling (cumulative trapezoid rule)
+        increments = np.diff(self.x_values) * (self.pdf[1:] + self.pdf[:-1]) / 2.0
+        self.cdf = np.concatenate(([0.0], np.cumsum(increments)))
         self.cdf = self.cdf / self.cdf[-1]  # Ensure it ends at 1.0
     
     def sample(self) -> int:
@@ -147,6 +161,12 @@ class BetaWithThresholdDistribution(BaselineVisionDistribution):
             idx = len(self.x_values) - 1
         return int(round(self.x_values[idx]))
     
+    def sample_array(self, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Sample n values by inverse transform in one searchsorted call."""
+        rng = rng if rng is not None else np.random.default_rng()
+        idx = np.minimum(np.searchsorted(self.cdf, rng.random(n)), len(self.x_values) - 1)
+        return np.round(self.x_values[idx]).astype(np.int64)
+    
     def get_parameters(self) -> Dict[str, Any]:
         """Return distribution parameters."""
         return {
@@ -191,6 +211,11 @@ class UniformDistribution(BaselineVisionDistribution):
         """Sample uniformly between min and max."""
         return random.randint(self.min_value, self.max_value)
     
+    def sample_array(self, n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Sample n values uniformly between min and max."""
+        rng = rng if rng is not None else np.random.default_rng()
+        return rng.integers(self.min_value, self.max_value, endpoint=True, size=n)
+    
     def get_parameters(self) -> Dict[str, Any]:
         """Return distribution parameters."""
         return {
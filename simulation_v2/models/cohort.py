@@ -0,0 +1,248 @@
+"""
+Vectorized cohort generation for patient baseline characteristics.
+
+A Cohort holds enrollment dates, baseline vision, age, birth date and sex
+for every patient as arrays, drawn in one pass from a NumPy Generator
+instead of patient by patient from the global random state. Because the
+cohort depends only on its seed and the recruitment settings, the same
+Cohort can be passed to several engines so that protocol comparisons
+start from identical patients.
+
+Example usage:
+    generator = CohortGenerator(NormalDistribution(70, 10, 20, 90))
+    cohort = generator.generate(50000, datetime(2024, 1, 1), datetime(2026, 1, 1), seed=42)
+    engine_a = ABSEngineTimeBasedWithParams(..., cohort=cohort)
+    engine_b = ABSEngineTimeBasedWithParams(..., cohort=cohort)
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from simulation_v2.models.baseline_vision_distributions import BaselineVisionDistribution
+
+# Demographics used when no age distribution is configured
+FALLBACK_AGE_MEAN = 77.5
+FALLBACK_AGE_STD = 8.2
+FALLBACK_FEMALE_PROPORTION = 0.62
+
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+def vision_ceilings(baseline_vision: np.ndarray, ceiling_params: Dict[str, Any]) -> np.ndarray:
+    """
+    Individual vision ceiling for each baseline vision.
+
+    The ceiling is the smaller of baseline x baseline_ceiling_factor and an
+    absolute ceiling that depends on the baseline range (the vision_ceilings
+    section of vision.yaml).
+
+    Args:
+        baseline_vision: Baseline vision in ETDRS letters
+        ceiling_params: vision_ceilings parameters
+
+    Returns:
+        Integer ceiling per patient
+    """
+    baseline = np.asarray(baseline_vision, dtype=float)
+    individual = baseline * ceiling_params['baseline_ceiling_factor']
+    absolute = np.where(
+        baseline > ceiling_params['high_baseline_threshold'],
+        ceiling_params['absolute_ceiling_high_baseline'],
+        np.where(
+            baseline < ceiling_params['low_baseline_threshold'],
+            ceiling_params['absolute_ceiling_low_baseline'],
+            ceiling_params['absolute_ceiling_default']
+        )
+    )
+    return np.trunc(np.minimum(individual, absolute)).astype(np.int64)
+
+
+@dataclass
+class Cohort:
+    """
+    Baseline characteristics of a simulated cohort, one array entry per patient.
+
+    Attributes:
+        patient_ids: Patient identifiers (P0000, P0001, ...)
+        arrival_times: Arrival datetimes, in arrival order
+        baseline_vision: Baseline vision in ETDRS letters
+        age_years: Whole years of age at enrollment
+        birth_dates: Birth dates, from the (fractional) age at enrollment
+        is_female: Sex of each patient
+        seed: Seed the cohort was drawn with, if any
+    """
+    patient_ids: List[str]
+    arrival_times: List[datetime]
+    baseline_vision: np.ndarray
+    age_years: np.ndarray
+    birth_dates: List[datetime]
+    is_female: np.ndarray
+    seed: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.patient_ids)
+
+    def arrival_schedule(self, end_date: Optional[datetime] = None) -> List[Tuple[datetime, str]]:
+        """(arrival_datetime, patient_id) pairs, optionally only arrivals before end_date."""
+        return [
+            (arrival, patient_id)
+            for arrival, patient_id in zip(self.arrival_times, self.patient_ids)
+            if end_date is None or arrival < end_date
+        ]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Cohort as a DataFrame, e.g. for export or comparison."""
+        return pd.DataFrame({
+            'patient_id': self.patient_ids,
+            'arrival_time': self.arrival_times,
+            'baseline_vision': self.baseline_vision,
+            'age_years': self.age_years,
+            'birth_date': self.birth_dates,
+            'sex': np.where(self.is_female, 'female', 'male')
+        })
+
+
+class CohortGenerator:
+    """Draw baseline characteristics for many patients at once."""
+
+    def __init__(
+        self,
+        baseline_distribution: BaselineVisionDistribution,
+        age_distribution: Optional[Dict[str, float]] = None,
+        mortality_model: Optional[Any] = None
+    ):
+        """
+        Initialize generator.
+
+        Args:
+            baseline_distribution: Distribution of baseline vision
+            age_distribution: Dict with mean, std, min and max age (the
+                demographics_parameters.age_distribution section). Without
+                it ages are unbounded Normal(77.5, 8.2) and 62% of patients
+                are female.
+            mortality_model: Object with get_female_proportion(age), used
+                with age_distribution for the age-dependent sex ratio
+                (PopulationMortalityModel)
+        """
+        self.baseline_distribution = baseline_distribution
+        self.age_distribution = age_distribution
+        self.mortality_model = mortality_model
+
+    def generate(
+        self,
+        n_patients: Optional[int],
+        start_date: datetime,
+        end_date: datetime,
+        seed: Union[int, np.random.Generator, None] = None,
+        patient_arrival_rate: Optional[float] = None
+    ) -> Cohort:
+        """
+        Draw arrival times and baseline characteristics for a cohort.
+
+        Arrivals are a Poisson process over [start_date, end_date), as in
+        ABSEngine._generate_arrival_schedule.
+
+        Args:
+            n_patients: Total patients (Fixed Total Mode)
+            start_date: Recruitment start
+            end_date: Recruitment end (exclusive)
+            seed: Random seed or Generator
+            patient_arrival_rate: Patients per week (Constant Rate Mode)
+
+        Returns:
+            Cohort of everyone who arrives before end_date
+
+        Raises:
+            ValueError: If not exactly one of n_patients and
+                patient_arrival_rate is given
+        """
+        if (n_patients is None) == (patient_arrival_rate is None):
+            raise ValueError("Must specify either n_patients (Fixed Total Mode) or patient_arrival_rate (Constant Rate Mode), not both")
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        arrival_times = self._arrival_times(rng, n_patients, start_date, end_date, patient_arrival_rate)
+        patient_ids = [f"P{i:04d}" for i in range(len(arrival_times))]
+        return self.draw(patient_ids, arrival_times, rng, seed=seed if isinstance(seed, int) else None)
+
+    def draw(
+        self,
+        patient_ids: Sequence[str],
+        arrival_times: Sequence[datetime],
+        rng: np.random.Generator,
+        seed: Optional[int] = None
+    ) -> Cohort:
+        """
+        Draw baseline characteristics for given patients and arrival times.
+
+        Args:
+            patient_ids: Patient identifiers
+            arrival_times: Arrival datetime of each patient
+            rng: Random generator
+            seed: Seed recorded on the cohort
+
+        Returns:
+            Cohort of the given patients
+        """
+        n = len(patient_ids)
+        baseline_vision = self.baseline_distribution.sample_array(n, rng)
+
+        # 1. Age: clipped normal from the demographics, or the unbounded fallback
+        if self.age_distribution is not None:
+            age = np.clip(
+                rng.normal(self.age_distribution.get('mean', 77.5), self.age_distribution.get('std', 8.2), n),
+                self.age_distribution.get('min', 50),
+                self.age_distribution.get('max', 95)
+            )
+            age_years = np.trunc(age).astype(np.int64)
+        else:
+            age_years = np.trunc(rng.normal(FALLBACK_AGE_MEAN, FALLBACK_AGE_STD, n)).astype(np.int64)
+            age = age_years.astype(float)
+
+        # 2. Sex: age-dependent female proportion when demographics are configured
+        if self.age_distribution is not None and self.mortality_model is not None:
+            female_proportion = self.mortality_model.get_female_proportion(age_years)
+        else:
+            female_proportion = FALLBACK_FEMALE_PROPORTION
+        is_female = rng.random(n) < female_proportion
+
+        # 3. Birth dates from the age at the (midnight) enrollment date
+        enrollment = np.array([
+            np.datetime64(arrival.replace(hour=0, minute=0, second=0, microsecond=0), 'D')
+            for arrival in arrival_times
+        ], dtype='datetime64[D]')
+        birth_days = enrollment - np.trunc(age * 365.25).astype(np.int64).astype('timedelta64[D]')
+
+        return Cohort(
+            patient_ids=list(patient_ids),
+            arrival_times=list(arrival_times),
+            baseline_vision=np.asarray(baseline_vision, dtype=np.int64),
+            age_years=age_years,
+            birth_dates=birth_days.astype('datetime64[us]').tolist(),
+            is_female=is_female,
+            seed=seed
+        )
+
+    @staticmethod
+    def _arrival_times(rng: np.random.Generator, n_patients: Optional[int], start_date: datetime,
+                       end_date: datetime, patient_arrival_rate: Optional[float]) -> List[datetime]:
+        """Poisson arrivals before end_date, at most n_patients of them."""
+        duration_days = (end_date - start_date).days
+        if n_patients == 0 or duration_days <= 0:
+            return []
+        if n_patients is not None:
+            arrival_rate_per_day = n_patients / duration_days
+            expected_patients = int(n_patients * 1.3)  # 30% buffer
+        else:
+            arrival_rate_per_day = patient_arrival_rate / 7.0
+            expected_patients = int(arrival_rate_per_day * duration_days * 1.2)  # 20% buffer
+
+        days = np.cumsum(rng.exponential(1.0 / arrival_rate_per_day, size=expected_patients))
+        days = days[days < (end_date - start_date) / timedelta(days=1)]
+        if n_patients is not None:
+            days = days[:n_patients]
+
+        offsets = np.round(days * MICROSECONDS_PER_DAY).astype(np.int64).astype('timedelta64[us]')
+        return (np.datetime64(start_date, 'us') + offsets).tolist()
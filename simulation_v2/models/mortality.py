@@ -23,11 +23,12 @@ Example usage:
     avg_risk = pop_mortality.get_population_mortality(age=80, population_type='real_world')
 """
 
-import yaml
 from pathlib import Path
 from typing import Dict, Literal, Optional, Union, Tuple
 import numpy as np
 
+from simulation_v2.protocols.parameter_cache import load_yaml
+
 
 class MortalityModel:
     """Model for calculating mortality risk in AMD patients."""
@@ -42,8 +43,7 @@ class MortalityModel:
         if data_file is None:
             data_file = Path(__file__).parent.parent.parent / "protocols" / "v2_time_based" / "parameters" / "uk_mortality_wet_amd.yaml"
         
-        with open(data_file, 'r') as f:
-            self.data = yaml.safe_load(f)
+        self.data = load_yaml(data_file)
         
         self.mortality_rates = self.data['mortality_rates']
         self.wet_amd_rates = self.data['wet_amd_mortality_rates']
@@ -234,8 +234,7 @@ class PopulationMortalityModel:
         if demographics_file is None:
             demographics_file = Path(__file__).parent.parent.parent / "protocols" / "v2_time_based" / "parameters" / "demographics.yaml"
         
-        with open(demographics_file, 'r') as f:
-            self.demographics = yaml.safe_load(f)
+        self.demographics = load_yaml(demographics_file)
     
     def get_female_proportion(self, age: int) -> float:
         """
@@ -0,0 +1,98 @@
+"""
+Process-wide cache of parsed protocol and parameter YAML files.
+
+Calibration sweeps build thousands of specifications and engines from the
+same handful of files. Parsing is done once per (path, checksum): the file
+bytes are still read and hashed on every call, so an edited file is picked
+up immediately, but YAML parsing is skipped while the content is unchanged.
+Only the latest content of each path is kept, and at most
+MAX_CACHED_FILES paths (least recently used dropped first). Callers always
+receive a deep copy and may mutate it freely.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import yaml
+
+MAX_CACHED_FILES = 256
+
+# Resolved path -> (checksum, parsed data)
+_cache: 'OrderedDict[str, Tuple[str, Any]]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def load_yaml_with_checksum(path: Union[str, Path]) -> Tuple[Any, str]:
+    """
+    Load a YAML file through the cache.
+
+    Args:
+        path: YAML file path
+
+    Returns:
+        Tuple of (parsed data, sha256 hex digest of the file bytes)
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        yaml.YAMLError: If YAML is malformed
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+    checksum = hashlib.sha256(raw).hexdigest()
+    key = str(path.resolve())
+
+    with _lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0] != checksum:
+            # An edited file replaces its previous parse
+            cached = _cache[key] = (checksum, yaml.safe_load(raw))
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_FILES:
+            _cache.popitem(last=False)
+        data = cached[1]
+
+    return copy.deepcopy(data), checksum
+
+
+def load_yaml(path: Union[str, Path]) -> Any:
+    """Load a YAML file through the cache, discarding the checksum."""
+    return load_yaml_with_checksum(path)[0]
+
+
+def clear_parameter_cache() -> None:
+    """Drop all cached parses."""
+    with _lock:
+        _cache.clear()
+
+
+def apply_overrides(data: Dict[str, Any], overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Deep-merge overrides into a copy of data.
+
+    Nested dicts are merged key by key; any other value (including lists)
+    replaces the original.
+
+    Args:
+        data: Base dictionary (not modified)
+        overrides: Values to merge on top, or None
+
+    Returns:
+        Merged dictionary
+    """
+    merged = copy.deepcopy(data)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = apply_overrides(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def data_checksum(data: Any) -> str:
+    """sha256 of a canonical JSON dump, for specifications built in memory."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
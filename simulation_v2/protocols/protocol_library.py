@@ -0,0 +1,287 @@
+"""
+Indexed library of protocol files with a parse-once cache.
+
+The Protocol Manager lists every protocol in several directories and
+shows the parameter files of the selected one. Re-reading all of them on
+each Streamlit rerun makes every click cost a full YAML parse of the
+library. ProtocolLibrary instead keeps one entry per file, keyed by path,
+modification time and size: a file is only parsed (and its specification
+validated) again after it changes on disk, and removed files drop out of
+the index on the next scan. Each entry carries a summary of the protocol
+(name, version, type, intervals, ...) so listing, searching and filtering
+never touch YAML. Parsed YAML itself comes from the process-wide
+parameter_cache, which the specifications' own loaders share.
+
+Example usage:
+    library = ProtocolLibrary({'time_based': Path('protocols/v2_time_based')})
+    for entry in library.search('eylea', model_type='time_based'):
+        print(entry.name, entry.max_interval_days)
+    spec = library.spec(entry.path)
+    transitions = library.load_yaml(library.parameter_path(entry.path, 'disease_transitions_file'))
+"""
+
+import copy
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import yaml
+
+from simulation_v2.protocols import parameter_cache
+from simulation_v2.protocols.protocol_spec import ProtocolSpecification
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+
+# Parameter file references of a time-based protocol
+PARAMETER_FILE_FIELDS = (
+    'disease_transitions_file', 'treatment_effect_file',
+    'vision_parameters_file', 'discontinuation_parameters_file'
+)
+
+# Fields searched by ProtocolLibrary.search
+SEARCH_FIELDS = ('name', 'stem', 'author', 'description', 'protocol_type')
+
+
+@dataclass(frozen=True)
+class ProtocolEntry:
+    """
+    Summary of one protocol file.
+
+    Attributes:
+        path: Protocol file
+        kind: Library directory the file was found in (e.g. 'temp')
+        model_type: 'time_based' or 'standard'
+        error: Why the protocol failed validation, None if it is valid
+    """
+    path: Path
+    kind: str
+    model_type: str
+    name: str
+    version: str
+    author: str
+    description: str
+    protocol_type: str
+    created_date: str
+    min_interval_days: Optional[int]
+    max_interval_days: Optional[int]
+    loading_dose_injections: Optional[int]
+    checksum: str
+    mtime: float
+    error: Optional[str] = None
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
+
+    def matches(self, query: str) -> bool:
+        """Whether every word of query occurs in one of SEARCH_FIELDS (case-insensitive)."""
+        text = ' '.join(str(getattr(self, field) or '') for field in SEARCH_FIELDS).lower()
+        return all(word in text for word in query.lower().split())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name, 'stem': self.stem, 'path': str(self.path), 'kind': self.kind,
+            'model_type': self.model_type, 'version': self.version, 'author': self.author,
+            'protocol_type': self.protocol_type, 'min_interval_days': self.min_interval_days,
+            'max_interval_days': self.max_interval_days,
+            'loading_dose_injections': self.loading_dose_injections, 'valid': self.is_valid,
+            'error': self.error
+        }
+
+
+def _file_key(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, None if it doesn't exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ProtocolLibrary:
+    """Protocol files of several directories, parsed once per change."""
+
+    def __init__(self, directories: Mapping[str, Union[str, Path]], pattern: str = '*.yaml'):
+        """
+        Initialize library.
+
+        Args:
+            directories: Directory per kind, e.g. {'standard': ..., 'temp': ...};
+                missing directories are treated as empty
+            pattern: Glob pattern of protocol files
+        """
+        self.directories = {kind: Path(directory) for kind, directory in directories.items()}
+        self.pattern = pattern
+        self._lock = threading.Lock()
+        # (path, kind) -> ((mtime_ns, size), entry, spec)
+        self._entries: Dict[Tuple[str, str], Tuple[Tuple[int, int], ProtocolEntry, Any]] = {}
+
+    # YAML
+
+    def load_yaml(self, path: Union[str, Path]) -> Any:
+        """
+        Parsed YAML file (protocol or parameter file) as a deep copy.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            yaml.YAMLError: If YAML is malformed
+        """
+        return parameter_cache.load_yaml(path)
+
+    # Index
+
+    def entries(self) -> List[ProtocolEntry]:
+        """
+        All protocol files, in directory order then by file name.
+
+        Directories are re-listed on every call (cheap); only new or
+        changed files are parsed.
+        """
+        seen = set()
+        entries = []
+        for kind, directory in self.directories.items():
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.glob(self.pattern)):
+                key = (str(path), kind)
+                seen.add(key)
+                entry = self._entry(path, kind)
+                if entry is not None:
+                    entries.append(entry)
+
+        with self._lock:
+            for key in [key for key in self._entries if key not in seen]:
+                del self._entries[key]
+        return entries
+
+    def _entry(self, path: Path, kind: str) -> Optional[ProtocolEntry]:
+        """Entry of one file, rebuilt only if the file changed."""
+        file_key = _file_key(path)
+        if file_key is None:
+            return None
+        with self._lock:
+            cached = self._entries.get((str(path), kind))
+        if cached is not None and cached[0] == file_key:
+            return cached[1]
+
+        entry, spec = self._summarize(path, kind, file_key)
+        with self._lock:
+            self._entries[(str(path), kind)] = (file_key, entry, spec)
+        return entry
+
+    def _summarize(self, path: Path, kind: str, file_key: Tuple[int, int]) -> Tuple[ProtocolEntry, Any]:
+        """Parse, validate and summarize a protocol file."""
+        spec, error = None, None
+        try:
+            data, checksum = parameter_cache.load_yaml_with_checksum(path)
+            if not isinstance(data, dict):
+                raise ValueError("Protocol file must contain a mapping")
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            data, checksum, error = {}, '', f"Cannot read protocol: {e}"
+
+        model_type = 'time_based' if data.get('model_type') == 'time_based' else 'standard'
+        if error is None:
+            spec_class = TimeBasedProtocolSpecification if model_type == 'time_based' else ProtocolSpecification
+            try:
+                spec = spec_class.from_dict(copy.deepcopy(data), source_file=str(path.absolute()), checksum=checksum)
+            except (KeyError, TypeError, ValueError) as e:
+                error = str(e)
+        if spec is not None and model_type == 'time_based':
+            missing = [getattr(spec, field) for field in PARAMETER_FILE_FIELDS
+                       if not (path.parent / getattr(spec, field)).exists()]
+            if missing:
+                error = f"Missing parameter files: {missing}"
+
+        entry = ProtocolEntry(
+            path=path,
+            kind=kind,
+            model_type=model_type,
+            name=str(data.get('name', path.stem)),
+            version=str(data.get('version', '')),
+            author=str(data.get('author', '')),
+            description=str(data.get('description', '')),
+            protocol_type=str(data.get('protocol_type', '')),
+            created_date=str(data.get('created_date', 'unknown')),
+            min_interval_days=data.get('min_interval_days'),
+            max_interval_days=data.get('max_interval_days'),
+            loading_dose_injections=data.get('loading_dose_injections'),
+            checksum=checksum,
+            mtime=file_key[0] / 1e9,
+            error=error
+        )
+        return entry, spec
+
+    def get(self, path: Union[str, Path], kind: Optional[str] = None) -> ProtocolEntry:
+        """
+        Entry of a protocol file.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+        """
+        path = Path(path)
+        if kind is None:
+            kind = next((k for k, d in self.directories.items() if path.parent == d), 'other')
+        entry = self._entry(path, kind)
+        if entry is None:
+            raise FileNotFoundError(f"Protocol file not found: {path}")
+        return entry
+
+    def spec(self, path: Union[str, Path], kind: Optional[str] = None):
+        """
+        Validated specification of a protocol file (shared, do not mutate).
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If the protocol failed validation
+        """
+        entry = self.get(path, kind)
+        if entry.error is not None and not entry.error.startswith('Missing parameter files'):
+            raise ValueError(f"Invalid protocol {entry.path.name}: {entry.error}")
+        with self._lock:
+            return self._entries[(str(entry.path), entry.kind)][2]
+
+    def parameter_path(self, path: Union[str, Path], field: str) -> Path:
+        """File a time-based protocol references in one of PARAMETER_FILE_FIELDS."""
+        path = Path(path)
+        return path.parent / getattr(self.spec(path), field)
+
+    def search(self, query: str = '', kinds: Optional[Iterable[str]] = None,
+               model_type: Optional[str] = None, protocol_type: Optional[str] = None,
+               valid_only: bool = False) -> List[ProtocolEntry]:
+        """
+        Filter the library.
+
+        Args:
+            query: Words that must all occur in the name, file name, author,
+                description or protocol type
+            kinds: Only these directory kinds
+            model_type: 'time_based' or 'standard'
+            protocol_type: e.g. 'treat_and_extend'
+            valid_only: Skip protocols that failed validation
+
+        Returns:
+            Matching entries in library order
+        """
+        kinds = set(kinds) if kinds is not None else None
+        return [
+            entry for entry in self.entries()
+            if (kinds is None or entry.kind in kinds)
+            and (model_type is None or entry.model_type == model_type)
+            and (protocol_type is None or entry.protocol_type == protocol_type)
+            and (not valid_only or entry.is_valid)
+            and (not query or entry.matches(query))
+        ]
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Forget one file (e.g. after writing it twice within the mtime resolution) or everything."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = Path(path)
+            for key in [key for key in self._entries if key[0] == str(path)]:
+                del self._entries[key]
@@ -10,7 +10,8 @@ from pathlib import Path
 import yaml
 import json
 from datetime import datetime
-import hashlib
+
+from simulation_v2.protocols.parameter_cache import load_yaml_with_checksum, apply_overrides, data_checksum
 
 
 @dataclass(frozen=True)
@@ -78,14 +79,27 @@ class ProtocolSpecification:
         if not filepath.exists():
             raise FileNotFoundError(f"Protocol file not found: {filepath}")
             
-        # Load YAML
-        with open(filepath) as f:
-            data = yaml.safe_load(f)
+        # Load YAML (parsed once per file content) with checksum for audit trail
+        data, checksum = load_yaml_with_checksum(filepath)
+        
+        return cls.from_dict(data, source_file=str(filepath.absolute()), checksum=checksum)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source_file: str, checksum: str) -> 'ProtocolSpecification':
+        """
+        Build from already-parsed protocol data with strict validation.
+        
+        Args:
+            data: Protocol dictionary in the YAML file layout
+            source_file: File the data came from (or was derived from)
+            checksum: Checksum recorded in the audit trail
             
-        # Calculate checksum for audit trail
-        with open(filepath, 'rb') as f:
-            checksum = hashlib.sha256(f.read()).hexdigest()
+        Returns:
+            ProtocolSpecification instance
             
+        Raises:
+            ValueError: If required fields are missing
+        """
         # Validate all required top-level fields exist - NO DEFAULTS
         required_fields = [
             'name', 'version', 'author', 'description',
@@ -172,11 +186,31 @@ class ProtocolSpecification:
             baseline_vision_distribution=data['baseline_vision_distribution'],
             discontinuation_rules=data['discontinuation_rules'],
             clinical_improvements=data.get('clinical_improvements'),
-            source_file=str(filepath.absolute()),
+            source_file=source_file,
             load_timestamp=datetime.now().isoformat(),
             checksum=checksum
         )
     
+    def with_overrides(self, overrides: Dict[str, Any]) -> 'ProtocolSpecification':
+        """
+        Derive a specification in memory, without writing or re-parsing YAML.
+        
+        Overrides use the YAML file layout and are deep-merged: nested
+        dictionaries merge key by key, other values replace. The result is
+        validated like a loaded file, keeps this spec's source_file and gets a
+        checksum of the merged data.
+        
+        Args:
+            overrides: Values to change, e.g. {'min_interval_days': 56,
+                'clinical_improvements': {'use_loading_phase': False}}
+                
+        Returns:
+            New specification of the same class
+        """
+        data = apply_overrides(self.to_yaml_dict(), overrides)
+        data.pop('baseline_vision', None)
+        return type(self).from_dict(data, source_file=self.source_file, checksum=data_checksum(data))
+    
     def to_audit_log(self) -> Dict[str, Any]:
         """Generate complete audit log entry."""
         return {
@@ -7,10 +7,10 @@ base configurations from Python modules.
 
 from typing import Dict, Any, Optional
 from pathlib import Path
-import yaml
 import importlib
 import copy
 from simulation_v2.protocols.protocol_spec import ProtocolSpecification, _validate_disease_transitions, _validate_vision_change_model
+from simulation_v2.protocols.parameter_cache import load_yaml_with_checksum, data_checksum
 
 
 class EnhancedProtocolSpecification(ProtocolSpecification):
@@ -48,8 +48,7 @@ class EnhancedProtocolSpecification(ProtocolSpecification):
             raise FileNotFoundError(f"Protocol file not found: {filepath}")
             
         # Load YAML
-        with open(filepath) as f:
-            data = yaml.safe_load(f)
+        data, checksum = load_yaml_with_checksum(filepath)
             
         # Check if we need to import base configuration
         if data.get('import_base_config', False):
@@ -78,6 +77,9 @@ class EnhancedProtocolSpecification(ProtocolSpecification):
                 # Merge base config with protocol-specific data
                 data = merge_protocol_configs(base_config, data)
                 
+                # The file alone no longer determines the parameters
+                checksum = data_checksum(data)
+                
             except ImportError as e:
                 raise ImportError(f"Failed to import base config module {base_module_name}: {e}")
             except Exception as e:
@@ -87,35 +89,21 @@ class EnhancedProtocolSpecification(ProtocolSpecification):
         _ensure_required_fields(data)
         
         # Continue with standard loading process
-        return super().from_yaml_with_data(filepath, data)
+        return cls.from_yaml_with_data(filepath, data, checksum)
     
     @classmethod
-    def from_yaml_with_data(cls, filepath: Path, data: Dict[str, Any]) -> 'ProtocolSpecification':
+    def from_yaml_with_data(cls, filepath: Path, data: Dict[str, Any],
+                            checksum: Optional[str] = None) -> 'ProtocolSpecification':
         """
         Create specification from pre-loaded data.
         
         This is a helper method to avoid duplicating the validation logic.
         """
-        # Use the parent class's from_yaml but with our pre-processed data
-        # We need to temporarily save the data to use the parent's method
-        import tempfile
-        import os
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(data, f)
-            temp_path = f.name
-        
-        try:
-            # Load using parent class
-            result = ProtocolSpecification.from_yaml(Path(temp_path))
-            # Update source file to point to original
-            result = cls(
-                **{k: v if k != 'source_file' else str(filepath.absolute()) 
-                   for k, v in result.__dict__.items()}
-            )
-            return result
-        finally:
-            os.unlink(temp_path)
+        return cls.from_dict(
+            data,
+            source_file=str(Path(filepath).absolute()),
+            checksum=checksum or data_checksum(data)
+        )
 
 
 def merge_protocol_configs(base_config: Dict[str, Any], protocol_data: Dict[str, Any]) -> Dict[str, Any]:
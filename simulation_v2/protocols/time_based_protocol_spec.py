@@ -8,10 +8,16 @@ are fundamentally different in their parameters and behavior.
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from pathlib import Path
-import yaml
-import hashlib
+import copy
 from datetime import datetime
 
+from simulation_v2.protocols.parameter_cache import (
+    load_yaml,
+    load_yaml_with_checksum,
+    apply_overrides,
+    data_checksum
+)
+
 
 @dataclass(frozen=True)
 class TimeBasedProtocolSpecification:
@@ -80,6 +86,10 @@ class TimeBasedProtocolSpecification:
     allow_sunday_visits: bool = False
     prefer_weekday_for_first_visit: bool = True  # Whether to adjust first visit to weekday
     
+    # In-memory overrides merged over the parameter files, keyed by file kind
+    # ('disease_transitions', 'treatment_effect', 'vision', 'discontinuation', 'demographics')
+    parameter_overrides: Optional[Dict[str, Dict[str, Any]]] = None
+    
     @classmethod
     def from_yaml(cls, filepath: Path) -> 'TimeBasedProtocolSpecification':
         """
@@ -94,14 +104,28 @@ class TimeBasedProtocolSpecification:
         if not filepath.exists():
             raise FileNotFoundError(f"Protocol file not found: {filepath}")
         
-        # Load YAML
-        with open(filepath) as f:
-            data = yaml.safe_load(f)
+        # Load YAML (parsed once per file content) with checksum for audit trail
+        data, checksum = load_yaml_with_checksum(filepath)
         
-        # Calculate checksum for audit trail
-        with open(filepath, 'rb') as f:
-            checksum = hashlib.sha256(f.read()).hexdigest()
+        return cls.from_dict(data, source_file=str(filepath.absolute()), checksum=checksum)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source_file: str, checksum: str,
+                  parameter_overrides: Optional[Dict[str, Dict[str, Any]]] = None
+                  ) -> 'TimeBasedProtocolSpecification':
+        """
+        Build from already-parsed protocol data.
         
+        Args:
+            data: Protocol dictionary in the YAML file layout
+            source_file: File the data came from; parameter file references
+                are resolved relative to it
+            checksum: Checksum recorded in the audit trail
+            parameter_overrides: Optional overrides for the parameter files
+            
+        Returns:
+            TimeBasedProtocolSpecification instance
+        """
         # Validate model type
         model_type = data.get('model_type', '')
         if model_type != 'time_based':
@@ -195,34 +219,71 @@ class TimeBasedProtocolSpecification:
             allow_saturday_visits=data.get('allow_saturday_visits', False),
             allow_sunday_visits=data.get('allow_sunday_visits', False),
             prefer_weekday_for_first_visit=data.get('prefer_weekday_for_first_visit', True),
-            source_file=str(filepath.absolute()),
+            parameter_overrides=parameter_overrides,
+            source_file=source_file,
             load_timestamp=datetime.now().isoformat(),
             checksum=checksum
         )
     
+    def with_overrides(
+        self,
+        overrides: Optional[Dict[str, Any]] = None,
+        parameter_overrides: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> 'TimeBasedProtocolSpecification':
+        """
+        Derive a specification in memory, without writing or re-parsing YAML.
+        
+        Args:
+            overrides: Protocol fields in the YAML file layout, deep-merged
+                over this spec (e.g. {'max_interval_days': 84})
+            parameter_overrides: Parameter file contents to merge over the
+                files, keyed by kind (e.g. {'discontinuation': {...}});
+                merged with any overrides this spec already carries
+                
+        Returns:
+            New specification sharing this spec's source_file, with a
+            checksum of the merged data
+        """
+        base = self.to_yaml_dict()
+        base.pop('baseline_vision', None)
+        base.update(
+            allow_saturday_visits=self.allow_saturday_visits,
+            allow_sunday_visits=self.allow_sunday_visits,
+            prefer_weekday_for_first_visit=self.prefer_weekday_for_first_visit
+        )
+        data = apply_overrides(base, overrides)
+        
+        merged_parameters = copy.deepcopy(self.parameter_overrides) or {}
+        for kind, values in (parameter_overrides or {}).items():
+            merged_parameters[kind] = apply_overrides(merged_parameters.get(kind, {}), values)
+        
+        return type(self).from_dict(
+            data,
+            source_file=self.source_file,
+            checksum=data_checksum({'protocol': data, 'parameters': merged_parameters}),
+            parameter_overrides=merged_parameters or None
+        )
+    
+    def _load_parameter_file(self, kind: str, filename: str) -> Dict[str, Any]:
+        """Load a parameter file through the cache and apply any overrides."""
+        data = load_yaml(Path(self.source_file).parent / filename)
+        return apply_overrides(data, (self.parameter_overrides or {}).get(kind))
+    
     def load_disease_transitions(self) -> Dict[str, Any]:
         """Load disease transition parameters from file."""
-        param_path = Path(self.source_file).parent / self.disease_transitions_file
-        with open(param_path) as f:
-            return yaml.safe_load(f)
+        return self._load_parameter_file('disease_transitions', self.disease_transitions_file)
     
     def load_treatment_effects(self) -> Dict[str, Any]:
         """Load treatment effect parameters from file."""
-        param_path = Path(self.source_file).parent / self.treatment_effect_file
-        with open(param_path) as f:
-            return yaml.safe_load(f)
+        return self._load_parameter_file('treatment_effect', self.treatment_effect_file)
     
     def load_vision_parameters(self) -> Dict[str, Any]:
         """Load vision model parameters from file."""
-        param_path = Path(self.source_file).parent / self.vision_parameters_file
-        with open(param_path) as f:
-            return yaml.safe_load(f)
+        return self._load_parameter_file('vision', self.vision_parameters_file)
     
     def load_discontinuation_parameters(self) -> Dict[str, Any]:
         """Load discontinuation model parameters from file."""
-        param_path = Path(self.source_file).parent / self.discontinuation_parameters_file
-        with open(param_path) as f:
-            return yaml.safe_load(f)
+        return self._load_parameter_file('discontinuation', self.discontinuation_parameters_file)
     
     def load_demographics_parameters(self) -> Optional[Dict[str, Any]]:
         """Load demographics parameters from file if available."""
@@ -230,8 +291,7 @@ class TimeBasedProtocolSpecification:
             return None
         param_path = Path(self.source_file).parent / self.demographics_parameters_file
         if param_path.exists():
-            with open(param_path) as f:
-                return yaml.safe_load(f)
+            return self._load_parameter_file('demographics', self.demographics_parameters_file)
         return None
     
     def to_audit_log(self) -> Dict[str, Any]:
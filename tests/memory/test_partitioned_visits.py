@@ -0,0 +1,116 @@
+"""
+Test the optional hive-partitioned visit layout and filter pushdown.
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from ape.core.storage import ParquetWriter, ParquetReader
+from tests.memory.test_results_architecture import create_mock_v2_results
+
+
+@pytest.fixture
+def layouts():
+    """Write the same mock results as a single file and as a partitioned dataset."""
+    raw_results = create_mock_v2_results(150)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        single_dir = Path(tmpdir) / 'single'
+        partitioned_dir = Path(tmpdir) / 'partitioned'
+        ParquetWriter(single_dir).write_simulation_results(raw_results)
+        ParquetWriter(
+            partitioned_dir,
+            visit_partitioning=['enrollment_cohort', 'calendar_year']
+        ).write_simulation_results(raw_results)
+        yield ParquetReader(single_dir), ParquetReader(partitioned_dir)
+
+
+class TestPartitionedVisits:
+    """Partitioned and single-file layouts behave the same through ParquetReader."""
+
+    def test_partitioned_layout_on_disk(self, layouts):
+        single, partitioned = layouts
+        assert not single.is_partitioned
+        assert partitioned.is_partitioned
+        assert not (partitioned.data_dir / 'visits.parquet').exists()
+        assert (partitioned.data_dir / 'visits' / 'enrollment_cohort=2024Q1' / 'calendar_year=2024').is_dir()
+        assert partitioned.partition_columns == ['enrollment_cohort', 'calendar_year']
+
+    def test_unknown_partition_key_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown visit partition keys"):
+            ParquetWriter(tmp_path, visit_partitioning=['site'])
+
+    def test_read_visits_matches_single_file(self, layouts):
+        single, partitioned = layouts
+        columns = ['patient_id', 'date', 'time_days', 'vision', 'injected']
+        pd.testing.assert_frame_equal(
+            single.read_visits(columns=columns),
+            partitioned.read_visits(columns=columns)
+        )
+        assert partitioned.get_summary_statistics()['total_visits'] == 150 * 12
+
+    def test_iterate_visits_streams_filtered_batches(self, layouts):
+        single, partitioned = layouts
+        filters = [('calendar_year', '==', 2025)]
+        batches = list(partitioned.iterate_visits(batch_size=100, filters=filters))
+        assert all(len(batch) <= 100 for batch in batches)
+        combined = pd.concat(batches)
+        assert (combined['date'].dt.year == 2025).all()
+
+        expected = single.read_visits(filters=[('date', '>=', pd.Timestamp('2025-01-01')),
+                                               ('date', '<', pd.Timestamp('2026-01-01'))])
+        assert len(combined) == len(expected)
+
+    def test_period_and_cohort_queries_agree_across_layouts(self, layouts):
+        single, partitioned = layouts
+        start, end = datetime(2024, 6, 1), datetime(2025, 3, 1)
+        period_counts = [
+            sum(len(b) for b in reader.iterate_visits_in_period(start, end))
+            for reader in (single, partitioned)
+        ]
+        assert period_counts[0] == period_counts[1] > 0
+
+        cohort_counts = [
+            sum(len(b) for b in reader.iterate_cohort_visits(['2024Q2']))
+            for reader in (single, partitioned)
+        ]
+        assert cohort_counts[0] == cohort_counts[1] > 0
+
+    def test_multiple_time_points_are_ored(self, layouts):
+        single, partitioned = layouts
+        for reader in (single, partitioned):
+            rows = pd.concat(reader.get_vision_trajectories_lazy(time_points=[30, 360]))
+            assert set(rows['time_days']) == {30, 360}
+
+    def test_streamgraphs_read_partitioned_results(self, layouts):
+        from ape.visualizations.streamgraph_plotly import extract_patient_states_comprehensive
+        from ape.visualizations.streamgraph_simple import calculate_patient_states_simple
+
+        single, partitioned = layouts
+        for compute in (calculate_patient_states_simple, extract_patient_states_comprehensive):
+            expected, actual = (compute(SimpleNamespace(data_path=reader.data_dir))
+                                for reader in (single, partitioned))
+            if isinstance(expected, tuple):
+                expected, actual = expected[0], actual[0]
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_partition_files_closed_when_writing_fails(self, tmp_path):
+        raw_results = create_mock_v2_results(5)
+        list(raw_results.patient_histories.values())[-1].enrollment_date = None
+        writer = ParquetWriter(tmp_path, visit_partitioning=['enrollment_cohort'], chunk_size=10)
+        opened = []
+        write_chunk = writer._write_partitioned_visit_chunk
+
+        def remember_writers(df):
+            write_chunk(df)
+            opened.extend(writer._partition_writers.values())
+
+        writer._write_partitioned_visit_chunk = remember_writers
+        with pytest.raises(ValueError, match="missing enrollment_date"):
+            writer._write_visits_chunked(raw_results)
+        assert opened and writer._partition_writers == {}
+        assert all(not w.is_open for w in opened)
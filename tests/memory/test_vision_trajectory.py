@@ -0,0 +1,112 @@
+"""
+Test the columnar vision_trajectory query API on ParquetResults.
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.core.results.base import SimulationMetadata
+from ape.core.results.parquet import ParquetResults, VISION_BIN_DAYS
+from ape.core.storage import ParquetWriter
+from tests.memory.test_results_architecture import create_mock_v2_results
+
+
+@pytest.fixture
+def results():
+    """Mock results with noisy vision so every statistic is informative."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_path = Path(tmpdir) / 'sim'
+        ParquetWriter(data_path).write_simulation_results(create_mock_v2_results(60))
+
+        visits_path = data_path / 'visits.parquet'
+        visits_df = pd.read_parquet(visits_path)
+        rng = np.random.default_rng(11)
+        visits_df['vision'] = rng.normal(60, 10, len(visits_df)).round()
+        visits_df.to_parquet(visits_path, index=False)
+
+        metadata = SimulationMetadata(
+            sim_id='vision_trajectory_test', protocol_name='test', protocol_version='1.0',
+            engine_type='abs', n_patients=60, duration_years=1.0, seed=1,
+            timestamp=datetime.now(), runtime_seconds=0.0, storage_type='parquet'
+        )
+        yield ParquetResults(metadata, data_path)
+        ParquetResults._vision_cache.clear()
+
+
+def reference_stats(results, bin, align):
+    """Per-bin statistics computed bin by bin with numpy."""
+    visits_df = results.get_vision_trajectory_df()
+    days = visits_df['time_days'].astype(float)
+    if align == 'calendar':
+        enrollment = results.get_patients_df().set_index('patient_id')['enrollment_time_days']
+        days = days + visits_df['patient_id'].map(enrollment)
+    bins = np.floor(days / VISION_BIN_DAYS[bin]).astype(int)
+
+    rows = []
+    for b in sorted(bins.unique()):
+        vision = visits_df.loc[bins == b, 'vision'].to_numpy()
+        rows.append({
+            bin: b,
+            'mean': vision.mean(),
+            'sd': vision.std(ddof=1) if len(vision) > 1 else np.nan,
+            'p10': np.percentile(vision, 10),
+            'p90': np.percentile(vision, 90),
+            'n': len(vision),
+            'n_patients': visits_df.loc[bins == b, 'patient_id'].nunique()
+        })
+    return pd.DataFrame(rows)
+
+
+class TestVisionTrajectory:
+    """vision_trajectory agrees with a direct per-bin computation."""
+
+    @pytest.mark.parametrize('bin', ['week', 'month', 'quarter'])
+    @pytest.mark.parametrize('align', ['enrollment', 'calendar'])
+    def test_matches_reference(self, results, bin, align):
+        stats = ['mean', 'sd', 'p10', 'p90', 'n', 'n_patients']
+        actual = results.vision_trajectory(bin=bin, stats=stats, align=align)
+        expected = reference_stats(results, bin, align)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    def test_cached_per_bin_and_alignment(self, results):
+        results.vision_trajectory(bin='month', align='enrollment')
+        results.vision_trajectory(bin='month', stats=['median'], align='enrollment')
+        results.vision_trajectory(bin='month', align='calendar')
+        keys = {key[2:] for key in ParquetResults._vision_cache if key[1] == 'vision_trajectory_test'}
+        assert keys == {('month', 'enrollment'), ('month', 'calendar')}
+
+        # Callers get copies, so mutating a result does not corrupt the cache
+        first = results.vision_trajectory(bin='month')
+        first['mean'] = 0
+        assert (results.vision_trajectory(bin='month')['mean'] != 0).all()
+
+    def test_cache_bounded(self, results, monkeypatch):
+        monkeypatch.setattr(ParquetResults, 'MAX_CACHED_VISION', 2)
+        ParquetResults._vision_cache.clear()
+        results.vision_trajectory(bin='week')
+        results.vision_trajectory(bin='month')
+        results.vision_trajectory(bin='week')   # most recently used again
+        results.vision_trajectory(bin='quarter')
+
+        assert [key[2] for key in ParquetResults._vision_cache] == ['week', 'quarter']
+
+    def test_invalid_arguments_rejected(self, results):
+        with pytest.raises(ValueError, match="Unknown bin"):
+            results.vision_trajectory(bin='fortnight')
+        with pytest.raises(ValueError, match="Unknown alignment"):
+            results.vision_trajectory(align='patient')
+        with pytest.raises(ValueError, match="Unknown vision statistics"):
+            results.vision_trajectory(stats=['mean', 'variance'])
+
+    def test_vision_endpoints(self, results):
+        visits_df = results.get_vision_trajectory_df().sort_values(['patient_id', 'time_days'])
+        expected = visits_df.groupby('patient_id')['vision'].agg(['first', 'last'])
+
+        endpoints = results.vision_endpoints().set_index('patient_id')
+        np.testing.assert_array_equal(endpoints['baseline_vision'], expected['first'])
+        np.testing.assert_array_equal(endpoints['final_vision'], expected['last'])
@@ -0,0 +1,44 @@
+"""
+Cold-start import budgets of APE.py and the pages.
+
+Each page runs in a fresh interpreter (see ape.core.monitoring.import_time);
+a page fails when its imports exceed its budget or it loads a heavy
+library on a cold visit. The per-page timings are marked performance and
+only run on request (pytest -m performance). Run the report with:
+    python -m ape.core.monitoring.import_time
+"""
+
+import pytest
+
+from ape.core.monitoring.import_time import (
+    ImportBudget, PageImportReport, _import_seconds, app_pages, check_page, measure_page
+)
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize('page', app_pages())
+def test_page_within_budget(page):
+    report = measure_page(page)
+    assert check_page(report) == []
+
+
+def test_check_page():
+    report = PageImportReport('pages/x.py', import_seconds=1.2, render_seconds=1.5,
+                              modules=['pandas', 'plotly.graph_objects', 'scipy.stats'])
+    assert report.heavy == ['plotly', 'scipy']
+
+    assert check_page(report, ImportBudget(2.0, ('plotly', 'scipy'))) == []
+    over = check_page(report, ImportBudget(1.0, ('plotly',)))
+    assert len(over) == 2 and 'budget 1.00s' in over[0] and 'scipy' in over[1]
+
+
+def test_import_seconds():
+    log = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | streamlit",
+        "--- page import start ---",
+        "import time:       200 |        200 |   pandas._libs",
+        "import time:       300 |        500 | pandas",
+        "import time:        50 |         50 | yaml",
+    ])
+    assert _import_seconds(log) == pytest.approx(550e-6)
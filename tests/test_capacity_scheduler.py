@@ -0,0 +1,175 @@
+"""
+Tests for CapacityScheduler and capacity-constrained time-based simulations.
+"""
+
+import copy
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from simulation_v2.economics.capacity_scheduler import CapacityScheduler
+from simulation_v2.economics.resource_tracker import load_resource_config
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+from simulation_v2.core.time_based_simulation_runner_with_resources import TimeBasedSimulationRunnerWithResources
+from simulation_v2.core.weekday_scheduler import WeekdayScheduler
+
+
+@pytest.fixture
+def resource_config():
+    """Standard NHS configuration with small capacities so overflow is easy to provoke."""
+    config = load_resource_config("protocols/resources/nhs_standard_resources.yaml")
+    config = copy.deepcopy(config)
+    roles = config['resources']['roles']
+    roles['injector']['capacity_per_session'] = 2
+    roles['injector_assistant']['capacity_per_session'] = 3
+    roles['decision_maker']['capacity_per_session'] = 1
+    return config
+
+
+class TestCapacityScheduler:
+    """Booking against per-role daily budgets."""
+
+    def test_daily_capacity_from_sessions(self, resource_config):
+        scheduler = CapacityScheduler(resource_config)
+        assert scheduler.daily_capacity['injector'] == 4  # 2 per session x 2 sessions
+        assert scheduler.daily_capacity['decision_maker'] == 2
+
+        resource_config['resources']['roles']['injector']['sessions_per_day'] = 1
+        assert CapacityScheduler(resource_config).daily_capacity['injector'] == 2
+
+    def test_overflow_moves_to_next_working_day(self, resource_config):
+        scheduler = CapacityScheduler(resource_config)
+        friday = date(2024, 1, 5)
+        booked = [scheduler.book('injection_only', friday) for _ in range(6)]
+
+        # Four injector slots on Friday, then the weekend is skipped
+        assert booked == [friday] * 4 + [date(2024, 1, 8)] * 2
+        assert scheduler.remaining('injector', friday) == 0
+        assert scheduler.remaining('injector', date(2024, 1, 6)) == 0
+        assert scheduler.remaining('injector', date(2024, 1, 8)) == 2
+
+        summary = scheduler.get_summary()
+        assert summary['delayed_bookings'] == 2
+        assert summary['total_delay_days'] == 6
+        assert summary['max_delay_days'] == 3
+
+    def test_visit_types_share_roles(self, resource_config):
+        scheduler = CapacityScheduler(resource_config)
+        monday = date(2024, 1, 8)
+
+        # Decision maker has 2 slots a day; injection-only visits are unaffected by it
+        assert scheduler.book('decision_only', monday) == monday
+        assert scheduler.book('decision_with_injection', monday) == monday
+        assert scheduler.book('decision_only', monday) == monday + timedelta(days=1)
+        assert scheduler.book('injection_only', monday) == monday
+        # Injector: 1 (decision_with_injection) + 1 (injection_only) used of 4
+        assert scheduler.booked('injector', monday) == 2
+
+    def test_tolerance_breaches_and_weekends(self, resource_config):
+        scheduler = CapacityScheduler(resource_config, allow_saturday=True)
+        saturday = date(2024, 1, 6)
+        assert scheduler.book('injection_only', saturday) == saturday
+
+        for _ in range(3):
+            scheduler.book('injection_only', saturday, latest_date=saturday)
+        assert scheduler.book('injection_only', saturday, latest_date=saturday) == date(2024, 1, 8)
+        assert scheduler.get_summary()['tolerance_breaches'] == 1
+
+    def test_matches_linear_scan(self, resource_config):
+        """The free-day index agrees with scanning day by day, including bookings before earlier ones."""
+        scheduler = CapacityScheduler(resource_config)
+        rng = random.Random(3)
+        used = {}
+        start = date(2024, 3, 1)
+
+        for _ in range(1500):
+            visit_type = rng.choice(['injection_only', 'decision_with_injection', 'decision_only'])
+            target = start + timedelta(days=rng.randrange(-120, 200))
+            needed = resource_config['resources']['visit_requirements'][visit_type]['roles_needed']
+
+            day = target
+            while day.weekday() >= 5 or any(
+                used.get((role, day), 0) + count > scheduler.daily_capacity[role]
+                for role, count in needed.items()
+            ):
+                day += timedelta(days=1)
+            for role, count in needed.items():
+                used[(role, day)] = used.get((role, day), 0) + count
+
+            assert scheduler.book(visit_type, target) == day
+
+    def test_invalid_configuration(self, resource_config):
+        with pytest.raises(ValueError, match="cannot be empty"):
+            CapacityScheduler({})
+        with pytest.raises(KeyError, match="Unknown visit type"):
+            CapacityScheduler(resource_config).book('home_visit', date(2024, 1, 8))
+        resource_config['resources']['roles']['decision_maker']['capacity_per_session'] = 0
+        with pytest.raises(ValueError, match="can never be booked"):
+            CapacityScheduler(resource_config)
+
+
+class TestCapacityConstrainedSimulation:
+    """Delays from capacity limits feed back into the simulation."""
+
+    @pytest.fixture
+    def spec(self):
+        return TimeBasedProtocolSpecification.from_yaml(
+            Path("protocols/v2_time_based/aflibercept_treat_and_treat_time_based.yaml")
+        )
+
+    def test_capacity_enforced(self, spec, resource_config):
+        for role in resource_config['resources']['roles'].values():
+            role['capacity_per_session'] = 1
+
+        unconstrained = TimeBasedSimulationRunnerWithResources(
+            spec, resource_config=resource_config
+        ).run('abs', n_patients=150, duration_years=2, seed=42)
+        constrained = TimeBasedSimulationRunnerWithResources(
+            spec, resource_config=resource_config, enforce_capacity=True
+        ).run('abs', n_patients=150, duration_years=2, seed=42)
+
+        assert unconstrained.capacity_summary == {}
+        assert len(unconstrained.bottlenecks) > 0
+
+        # No day exceeds the budget, and patients were delayed
+        assert constrained.bottlenecks == []
+        summary = constrained.capacity_summary
+        assert summary['delayed_bookings'] > 0
+        assert summary['tolerance_breaches'] > 0
+        for usage in constrained.resource_usage.values():
+            for role, count in usage.items():
+                assert count <= summary['daily_capacity'][role]
+
+    def test_ample_capacity_changes_nothing(self, spec):
+        config = load_resource_config("protocols/resources/nhs_standard_resources.yaml")
+        baseline = TimeBasedSimulationRunnerWithResources(
+            spec, resource_config=config
+        ).run('abs', n_patients=50, duration_years=1, seed=7)
+        constrained = TimeBasedSimulationRunnerWithResources(
+            spec, resource_config=config, enforce_capacity=True
+        ).run('abs', n_patients=50, duration_years=1, seed=7)
+
+        assert constrained.capacity_summary['delayed_bookings'] == 0
+        assert constrained.total_injections == baseline.total_injections
+        assert constrained.final_vision_mean == baseline.final_vision_mean
+
+    def test_tolerance_window_uses_booked_visit_number(self, spec, resource_config, monkeypatch):
+        flexibility = WeekdayScheduler.get_interval_flexibility
+        visit_numbers = []
+
+        def recording(visit_number, target_interval_weeks):
+            # Only the capacity engine's booking windows, not WeekdayScheduler's own calls
+            if sys._getframe(1).f_globals['__name__'].endswith('abs_engine_time_based_with_resources'):
+                visit_numbers.append(visit_number)
+            return flexibility(visit_number, target_interval_weeks)
+
+        monkeypatch.setattr(WeekdayScheduler, 'get_interval_flexibility', staticmethod(recording))
+        TimeBasedSimulationRunnerWithResources(
+            spec, resource_config=resource_config, enforce_capacity=True
+        ).run('abs', n_patients=10, duration_years=0.5, seed=3)
+
+        # The first visit is booked without a window; follow-ups start at visit 2
+        assert visit_numbers and min(visit_numbers) == 2
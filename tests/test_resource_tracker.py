@@ -244,4 +244,47 @@ class TestResourceTracker:
         assert total_costs['injection_procedure'] == 134
         assert total_costs['consultation'] == 75
         assert total_costs['oct_scan'] == 110
-        assert total_costs['total'] == 1135
\ No newline at end of file
+        assert total_costs['total'] == 1135
+
+    def test_out_of_order_dates(self, resource_config):
+        """Test visits before and far after earlier ones land on the right day."""
+        tracker = ResourceTracker(resource_config)
+        dates = [date(2024, 6, 3), date(2023, 1, 2), date(2026, 2, 2), date(2024, 6, 3)]
+        for i, visit_date in enumerate(dates):
+            tracker.track_visit(visit_date, 'injection_only', f'P{i:03d}', injection_given=True)
+        
+        assert tracker.get_all_dates_with_visits() == sorted(set(dates))
+        assert tracker.get_daily_usage(date(2024, 6, 3))['injector'] == 2
+        assert tracker.get_daily_usage(date(2023, 1, 2))['injector'] == 1
+        assert [visit['date'] for visit in tracker.visits] == dates
+        assert tracker.usage_matrix.shape == (3, len(tracker.role_names))
+    
+    def test_record_visit_matches_track_visit(self, resource_config):
+        """Test the low-overhead path builds the same records on demand."""
+        tracker = ResourceTracker(resource_config)
+        tuesday = date(2024, 1, 16)
+        record = tracker.track_visit(tuesday, 'decision_with_injection', 'P001',
+                                     injection_given=True, oct_performed=True)
+        row = tracker.record_visit(tuesday, 'decision_with_injection', 'P001',
+                                   injection_given=True, oct_performed=True)
+        
+        assert row == 1
+        assert tracker.get_visit(row) == record
+        assert tracker.get_daily_usage(tuesday)['decision_maker'] == 2
+    
+    def test_frames_for_storage(self, resource_config):
+        """Test columnar daily usage and visit tables."""
+        tracker = ResourceTracker(resource_config)
+        monday = date(2024, 1, 15)
+        tracker.track_visit(monday, 'injection_only', 'P001', injection_given=True)
+        tracker.track_visit(date(2024, 1, 16), 'decision_only', 'P002', oct_performed=True)
+        
+        daily = tracker.daily_usage_frame()
+        assert list(daily['date']) == ['2024-01-15', '2024-01-16']
+        assert daily.loc[0, 'injector'] == 1
+        assert daily['decision_maker'].isna().tolist() == [True, False]
+        
+        visits = tracker.visits_frame()
+        assert visits['total_cost'].tolist() == [950, 185]
+        assert visits['drug'].isna().tolist() == [False, True]
+        assert visits['visit_type'].tolist() == ['injection_only', 'decision_only']
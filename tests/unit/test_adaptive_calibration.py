@@ -0,0 +1,118 @@
+"""
+Test the successive-halving calibration search with a synthetic evaluator.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from calibration.adaptive_calibration import (
+    AdaptiveCalibration,
+    CalibrationStore,
+    ParameterBounds,
+    OUTCOME_METRICS
+)
+
+CALLS = []
+
+
+def synthetic_evaluator(base_protocol_path, parameters, n_patients, seed):
+    """Outcomes that hit the targets at discontinuation_year2 = 0.125, plus seed noise."""
+    CALLS.append((parameters['discontinuation_year2'], n_patients, seed))
+    noise = np.random.default_rng(seed).normal(0, 0.5 / np.sqrt(n_patients))
+    return {
+        'vision_gain_year1': 9.0 + noise,
+        'vision_year2': 8.0,
+        'injections_year1': 7.5,
+        'injections_year2': 5.5,
+        'discontinuation_year1': 0.05,
+        'discontinuation_year2': parameters['discontinuation_year2']
+    }
+
+
+@pytest.fixture
+def bounds():
+    return [
+        ParameterBounds('discontinuation_year2', 0.05, 0.25),
+        ParameterBounds('protocol_interval', 28, 84, integer=True)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+
+
+class TestAdaptiveCalibration:
+    """Sampling, promotion, common seeds and resumption."""
+
+    @pytest.mark.parametrize('method', ['lhs', 'sobol'])
+    def test_sampling_covers_bounds(self, bounds, method):
+        search = AdaptiveCalibration(bounds, store_path=None, evaluator=synthetic_evaluator)
+        candidates = search.sample(10, method=method, seed=1)
+        assert len(candidates) == 10
+        rates = np.array([c['discontinuation_year2'] for c in candidates])
+        assert ((rates >= 0.05) & (rates <= 0.25)).all()
+        assert all(isinstance(c['protocol_interval'], int) for c in candidates)
+        if method == 'lhs':
+            # One sample per stratum
+            strata = np.floor((rates - 0.05) / 0.02).astype(int)
+            assert sorted(strata) == list(range(10))
+        assert candidates == search.sample(10, method=method, seed=1)
+
+    def test_successive_halving(self, bounds):
+        search = AdaptiveCalibration(bounds, store_path=None, evaluator=synthetic_evaluator)
+        results = search.run(n_candidates=9, min_patients=10, max_patients=90, eta=3,
+                             replicates=2, max_workers=0)
+
+        assert [(n, len(rung)) for n, rung in search.rungs] == [(10, 9), (30, 3), (90, 1)]
+        assert len(CALLS) == (9 + 3 + 1) * 2
+
+        # The candidate closest to the target survives every rung
+        first_rung = search.rungs[0][1]
+        assert results[0].parameter_set.name == first_rung[0].parameter_set.name
+        assert all(np.diff([r.total_score for r in first_rung]) >= 0)
+
+        # Common random numbers: every candidate in a rung sees the same seeds
+        for n_patients, _ in search.rungs:
+            seeds_by_candidate = {}
+            for rate, n, seed in CALLS:
+                if n == n_patients:
+                    seeds_by_candidate.setdefault(rate, set()).add(seed)
+            assert all(seeds == {42, 43} for seeds in seeds_by_candidate.values())
+
+    def test_resume_from_store(self, bounds, tmp_path):
+        store_path = tmp_path / 'store.jsonl'
+        kwargs = dict(n_candidates=9, min_patients=10, max_patients=90, eta=3, replicates=1, max_workers=0)
+
+        first = AdaptiveCalibration(bounds, store_path=str(store_path), evaluator=synthetic_evaluator).run(**kwargs)
+        n_calls = len(CALLS)
+
+        # Simulate an interrupted write
+        with open(store_path, 'a') as f:
+            f.write('{"key": "trunc')
+
+        resumed = AdaptiveCalibration(bounds, store_path=str(store_path), evaluator=synthetic_evaluator).run(**kwargs)
+        assert len(CALLS) == n_calls
+        assert resumed[0].total_score == first[0].total_score
+
+        records = [json.loads(line) for line in store_path.read_text().splitlines()[:-1]]
+        assert len(records) == n_calls
+        assert set(records[0]['outcomes']) == set(OUTCOME_METRICS)
+
+        # Records written after the partial line survive a reload
+        resumed_store = CalibrationStore(str(store_path))
+        resumed_store.put('after_truncation', {'rate': 0.1}, 10, 42, {'vision_year2': 1.0})
+        reloaded = CalibrationStore(str(store_path))
+        assert reloaded.get('after_truncation') == {'vision_year2': 1.0}
+        assert len(reloaded.records) == n_calls + 1
+
+    def test_invalid_configuration(self, bounds):
+        with pytest.raises(ValueError, match="Unknown ParameterSet fields"):
+            AdaptiveCalibration([ParameterBounds('not_a_field', 0, 1)], store_path=None)
+        with pytest.raises(ValueError, match="Empty range"):
+            AdaptiveCalibration([ParameterBounds('discontinuation_year1', 0.2, 0.1)], store_path=None)
+        search = AdaptiveCalibration(bounds, store_path=None, evaluator=synthetic_evaluator)
+        with pytest.raises(ValueError, match="Unknown sampling method"):
+            search.sample(4, method='grid')
@@ -0,0 +1,101 @@
+"""
+Test vectorized cohort generation and cohort reuse across engines.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from simulation_v2.core.time_based_simulation_runner import TimeBasedSimulationRunner
+from simulation_v2.models.baseline_vision_distributions import (
+    BetaWithThresholdDistribution, NormalDistribution, UniformDistribution
+)
+from simulation_v2.models.cohort import CohortGenerator, vision_ceilings
+from simulation_v2.models.mortality import PopulationMortalityModel
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+
+AGE_DISTRIBUTION = {'mean': 77.5, 'std': 8.2, 'min': 50, 'max': 95}
+CEILING_PARAMS = {
+    'baseline_ceiling_factor': 1.1, 'absolute_ceiling_default': 85, 'absolute_ceiling_high_baseline': 95,
+    'absolute_ceiling_low_baseline': 75, 'high_baseline_threshold': 80, 'low_baseline_threshold': 50
+}
+
+
+class TestCohortGenerator:
+    """Cohort arrays match the per-patient sampling rules."""
+
+    @pytest.fixture
+    def generator(self):
+        return CohortGenerator(BetaWithThresholdDistribution(), AGE_DISTRIBUTION, PopulationMortalityModel())
+
+    def test_generate(self, generator):
+        start, end = datetime(2024, 1, 1), datetime(2026, 1, 1)
+        cohort = generator.generate(20000, start, end, seed=3)
+
+        assert len(cohort) == 20000
+        assert cohort.patient_ids[:2] == ['P0000', 'P0001']
+        assert all(start <= t < end for t in (cohort.arrival_times[0], cohort.arrival_times[-1]))
+        assert cohort.arrival_times == sorted(cohort.arrival_times)
+
+        assert cohort.baseline_vision.min() >= 5 and cohort.baseline_vision.max() <= 98
+        assert cohort.age_years.min() >= 50 and cohort.age_years.max() <= 95
+        assert abs(cohort.age_years.mean() - 77) < 0.5
+        # Female proportion rises with age
+        assert cohort.is_female[cohort.age_years < 65].mean() < cohort.is_female[cohort.age_years > 85].mean()
+
+        # Birth dates are age-at-enrollment years before the enrollment day
+        enrolled = cohort.arrival_times[0].replace(hour=0, minute=0, second=0, microsecond=0)
+        age_days = (enrolled - cohort.birth_dates[0]).days
+        assert int(age_days / 365.25) in (cohort.age_years[0], cohort.age_years[0] + 1)
+
+        # Same seed, same cohort
+        again = generator.generate(20000, start, end, seed=3)
+        np.testing.assert_array_equal(again.baseline_vision, cohort.baseline_vision)
+        assert again.birth_dates == cohort.birth_dates
+
+    def test_sample_array_matches_distribution(self):
+        rng = np.random.default_rng(0)
+        normal = NormalDistribution(70, 10, 20, 90).sample_array(50000, rng)
+        assert normal.min() >= 20 and normal.max() <= 90
+        assert abs(normal.mean() - 69.5) < 0.3  # int() truncates towards zero
+
+        beta = BetaWithThresholdDistribution()
+        vectorized = beta.sample_array(50000, rng)
+        looped = np.array([beta.sample() for _ in range(50000)])
+        assert abs(vectorized.mean() - looped.mean()) < 0.5
+        assert abs((vectorized > 70).mean() - (looped > 70).mean()) < 0.02
+
+        uniform = UniformDistribution(20, 30).sample_array(10000, rng)
+        assert set(np.unique(uniform)) == set(range(20, 31))
+
+    def test_vision_ceilings(self):
+        baseline = np.array([30, 49, 50, 70, 80, 81, 90])
+        expected = [int(min(b * 1.1, 75 if b < 50 else 95 if b > 80 else 85)) for b in baseline]
+        assert vision_ceilings(baseline, CEILING_PARAMS).tolist() == expected
+
+    def test_invalid_input(self, generator):
+        with pytest.raises(ValueError, match="Must specify either"):
+            generator.generate(None, datetime(2024, 1, 1), datetime(2025, 1, 1))
+
+
+class TestCohortReuse:
+    """One cohort enrolled by two protocols gives identical patients."""
+
+    def test_same_patients_across_protocols(self):
+        protocols = Path('protocols/v2_time_based')
+        spec_a = TimeBasedProtocolSpecification.from_yaml(protocols / 'eylea_time_based.yaml')
+        spec_b = TimeBasedProtocolSpecification.from_yaml(protocols / 'eylea_time_based_tnt.yaml')
+        cohort = CohortGenerator(NormalDistribution(60, 12, 20, 85)).generate(
+            60, datetime(2024, 1, 1), datetime(2025, 1, 1), seed=5
+        )
+
+        results_a = TimeBasedSimulationRunner(spec_a).run('abs', 60, 1.0, seed=1, cohort=cohort)
+        results_b = TimeBasedSimulationRunner(spec_b).run('abs', 60, 1.0, seed=2, cohort=cohort)
+
+        for results in (results_a, results_b):
+            patients = results.patient_histories
+            assert list(patients) == cohort.patient_ids
+            assert [p.baseline_vision for p in patients.values()] == cohort.baseline_vision.tolist()
+            assert [p.enrollment_date.date() for p in patients.values()] == [t.date() for t in cohort.arrival_times]
@@ -0,0 +1,133 @@
+"""
+Test the columnar comparison data layer against per-patient reference loops.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.components.comparison_data import (
+    load_comparison_data,
+    vision_at_timepoints,
+    treatment_burden,
+    discontinuation_summary
+)
+from ape.core.results.base import SimulationMetadata
+from ape.core.results.parquet import ParquetResults
+from ape.core.storage import ParquetWriter
+from tests.memory.test_results_architecture import create_mock_v2_results
+
+
+@pytest.fixture
+def sim_path(tmp_path):
+    """Mock simulation with irregular schedules, shuffled visit rows and a patient with no visits."""
+    sim_path = tmp_path / 'sim'
+    ParquetWriter(sim_path).write_simulation_results(create_mock_v2_results(80))
+    metadata = SimulationMetadata(
+        sim_id=f'comparison_{tmp_path.name}', protocol_name='test', protocol_version='1.0', engine_type='abs',
+        n_patients=80, duration_years=2.0, seed=1, timestamp=datetime(2024, 1, 1), runtime_seconds=0.0,
+        storage_type='parquet'
+    )
+    with open(sim_path / 'metadata.json', 'w') as f:
+        json.dump(metadata.to_dict(), f)
+    rng = np.random.default_rng(21)
+
+    patients_df = pd.read_parquet(sim_path / 'patients.parquet')
+    discontinued = rng.random(len(patients_df)) < 0.4
+    patients_df['discontinued'] = discontinued
+    patients_df['discontinuation_reason'] = np.where(
+        discontinued, rng.choice(['poor_vision', 'stable_max_interval', None], len(patients_df)), None
+    )
+    patients_df.to_parquet(sim_path / 'patients.parquet', index=False)
+
+    rows = []
+    for pid, enrollment in zip(patients_df['patient_id'][1:], patients_df['enrollment_date'][1:]):
+        time_days = int(rng.integers(0, 20))
+        for _ in range(rng.integers(1, 40)):
+            rows.append({
+                'patient_id': pid,
+                'date': enrollment + pd.Timedelta(days=time_days),
+                'time_days': time_days,
+                'vision': int(rng.integers(20, 85)),
+                'injected': bool(rng.random() < 0.7)
+            })
+            time_days += int(rng.choice([28, 35, 42, 56, 84]))
+    visits_df = pd.DataFrame(rows).sample(frac=1, random_state=3)
+    visits_df.to_parquet(sim_path / 'visits.parquet', index=False)
+    return sim_path
+
+
+def reference_histories(sim_path):
+    """Patient histories as built by filtering visits patient by patient."""
+    patients_df = pd.read_parquet(sim_path / 'patients.parquet')
+    visits_df = pd.read_parquet(sim_path / 'visits.parquet')
+    histories = {}
+    for patient_id in patients_df['patient_id']:
+        patient_visits = visits_df[visits_df['patient_id'] == patient_id].sort_values('date')
+        visits = []
+        if len(patient_visits) > 0:
+            baseline_date = patient_visits.iloc[0]['date']
+            for _, visit in patient_visits.iterrows():
+                visits.append({
+                    'month': (visit['date'] - baseline_date).days / 30.44,
+                    'vision': visit['vision'],
+                    'injection_given': visit['injected']
+                })
+        histories[patient_id] = visits
+    return histories
+
+
+class TestComparisonData:
+    """Columnar metrics reproduce the per-patient computations."""
+
+    def test_vision_at_timepoints(self, sim_path):
+        histories = reference_histories(sim_path)
+        expected = {'baseline': [], 'year1': [], 'year2': [], 'final': []}
+        for visits in histories.values():
+            if not visits:
+                continue
+            expected['baseline'].append(visits[0]['vision'])
+            expected['final'].append(visits[-1]['vision'])
+            for name, (lo, hi) in (('year1', (11, 13)), ('year2', (23, 25))):
+                in_window = [v['vision'] for v in visits if lo <= v['month'] <= hi]
+                if in_window:
+                    expected[name].append(in_window[0])
+
+        actual = vision_at_timepoints(load_comparison_data(sim_path))
+        for name, values in expected.items():
+            np.testing.assert_array_equal(actual[name], values)
+
+    def test_treatment_burden(self, sim_path):
+        histories = reference_histories(sim_path)
+        burden = treatment_burden(load_comparison_data(sim_path))
+        np.testing.assert_array_equal(
+            burden['injections'], [sum(v['injection_given'] for v in visits) for visits in histories.values()]
+        )
+        np.testing.assert_array_equal(burden['visits'], [len(visits) for visits in histories.values()])
+        assert burden['visits'][0] == 0
+
+    def test_discontinuation_summary(self, sim_path):
+        patients_df = pd.read_parquet(sim_path / 'patients.parquet')
+        summary = discontinuation_summary(load_comparison_data(sim_path))
+        assert summary['total'] == patients_df['discontinued'].sum()
+        assert summary['by_reason'] == (
+            patients_df.loc[patients_df['discontinued'], 'discontinuation_reason'].value_counts().to_dict()
+        )
+
+
+    def test_outcomes_computed_once_per_simulation(self, sim_path, monkeypatch):
+        compute = ParquetResults._compute_patient_outcomes
+        calls = []
+
+        def counting(results):
+            calls.append(results.metadata.sim_id)
+            return compute(results)
+
+        monkeypatch.setattr(ParquetResults, '_compute_patient_outcomes', counting)
+        vision_at_timepoints(load_comparison_data(sim_path))
+        treatment_burden(load_comparison_data(sim_path))
+        ParquetResults.load(sim_path).outcome_metrics()
+        assert len(calls) == 1
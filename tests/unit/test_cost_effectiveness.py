@@ -0,0 +1,105 @@
+"""
+Test bootstrap cost-effectiveness analysis on saved Parquet tables.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation_v2.economics.cost_effectiveness import (
+    bootstrap_means, compare_outcomes, compare_simulations, effect_from_vision_change, load_patient_outcomes
+)
+from simulation_v2.economics.repricing import PriceSchedule
+
+
+def write_arm(directory, n_patients, injections_per_patient, mean_gain, seed):
+    """Minimal patients.parquet and visits_with_costs.parquet for one arm."""
+    rng = np.random.default_rng(seed)
+    directory.mkdir()
+    patient_ids = [f'P{i:04d}' for i in range(n_patients)]
+    baseline = rng.integers(40, 70, n_patients)
+    pd.DataFrame({
+        'patient_id': patient_ids,
+        'baseline_vision': baseline,
+        'final_vision': baseline + np.round(rng.normal(mean_gain, 8, n_patients)).astype(int)
+    }).to_parquet(directory / 'patients.parquet', index=False)
+
+    # Last patient has no visits; the rest have injection visits at 816 + 134
+    rows = []
+    for patient_id in patient_ids[:-1]:
+        for _ in range(injections_per_patient):
+            rows.append({'date': '2024-03-01', 'patient_id': patient_id, 'visit_type': 'injection_only',
+                         'injection_given': True, 'oct_performed': False, 'total_cost': 950.0,
+                         'drug': 816.0, 'injection_procedure': 134.0})
+    pd.DataFrame(rows).to_parquet(directory / 'visits_with_costs.parquet', index=False)
+    return directory
+
+
+class TestCostEffectiveness:
+    """Point estimates, bootstrap intervals and CEAC."""
+
+    @pytest.fixture
+    def arms(self, tmp_path):
+        intervention = write_arm(tmp_path / 'intervention', 400, 8, mean_gain=6.0, seed=1)
+        comparator = write_arm(tmp_path / 'comparator', 300, 6, mean_gain=2.0, seed=2)
+        return intervention, comparator
+
+    def test_load_patient_outcomes(self, arms):
+        outcomes = load_patient_outcomes(arms[0])
+        assert len(outcomes) == 400
+        assert outcomes['cost'].iloc[0] == 8 * 950
+        assert outcomes['cost'].iloc[-1] == 0
+
+        repriced = load_patient_outcomes(arms[0], schedule=PriceSchedule(100, 134, 75, 110, name='cheap'))
+        assert repriced['cost'].iloc[0] == 8 * 234
+        assert repriced['effect'].equals(outcomes['effect'])
+
+        maintained = load_patient_outcomes(arms[0], effect='vision_maintained')
+        assert set(maintained['effect'].unique()) <= {0.0, 1.0}
+        # Losing exactly 5 letters still counts, as in the outcome metric
+        assert effect_from_vision_change(pd.Series([-5.0, -6.0]), 'vision_maintained').tolist() == [1.0, 0.0]
+
+        with pytest.raises(ValueError, match="Unknown effect measure"):
+            load_patient_outcomes(arms[0], effect='qalys')
+
+    def test_compare_simulations(self, arms):
+        result = compare_simulations(*arms, n_resamples=1000, seed=3)
+        intervention = load_patient_outcomes(arms[0])
+        comparator = load_patient_outcomes(arms[1])
+
+        expected_cost = intervention['cost'].mean() - comparator['cost'].mean()
+        expected_effect = intervention['effect'].mean() - comparator['effect'].mean()
+        assert result.incremental_cost == pytest.approx(expected_cost)
+        assert result.incremental_effect == pytest.approx(expected_effect)
+        assert result.icer == pytest.approx(expected_cost / expected_effect)
+
+        # Intervals bracket the point estimates; effect is clearly positive so the ICER has one too
+        low, high = result.interval('delta_effect')
+        assert low < expected_effect < high and low > 0
+        icer_low, icer_high = result.icer_interval
+        assert icer_low < result.icer < icer_high
+        assert result.quadrants['north_east'] > 0.95
+
+        # CEAC rises from 0 (costlier, so never worth it for free) towards 1
+        ceac = result.ceac['probability_cost_effective']
+        assert ceac.iloc[0] == 0
+        assert ceac.is_monotonic_increasing
+        assert result.probability_cost_effective(10 * result.icer) > 0.95
+        assert result.summary()['n_resamples'] == 1000
+
+    def test_bootstrap_is_reproducible_across_workers(self):
+        values = np.random.default_rng(0).normal(size=(500, 2))
+        in_process = bootstrap_means(values, 300, seed=5, max_workers=0, chunk_cells=500 * 64)
+        with_workers = bootstrap_means(values, 300, seed=5, max_workers=2, chunk_cells=500 * 64)
+        np.testing.assert_array_equal(in_process, with_workers)
+        assert in_process.shape == (300, 2)
+
+        # Resample means are centred on the sample mean with standard error sd / sqrt(n)
+        np.testing.assert_allclose(in_process.mean(axis=0), values.mean(axis=0), atol=0.02)
+        np.testing.assert_allclose(in_process.std(axis=0), values.std(axis=0) / np.sqrt(500), rtol=0.15)
+
+    def test_no_effect_difference(self):
+        outcomes = pd.DataFrame({'cost': [100.0, 200.0], 'effect': [1.0, 1.0]})
+        result = compare_outcomes(outcomes, outcomes, n_resamples=50, seed=1)
+        assert result.icer is None
+        assert result.icer_interval is None
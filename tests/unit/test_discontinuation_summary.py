@@ -0,0 +1,151 @@
+"""
+Test the discontinuation summary stored alongside simulation results.
+"""
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.core.results.base import SimulationMetadata
+from ape.core.results.discontinuation_summary import (
+    DISCONTINUATION_SUMMARY_FILE, compute_discontinuation_summary, kaplan_meier, load_discontinuation_summary
+)
+from ape.core.results.parquet import ParquetResults
+from ape.core.storage import ParquetWriter
+
+
+def patients_table():
+    """Six patients enrolled at days 0-50; two stopped for 'death', one for 'attrition' then retreated."""
+    return pd.DataFrame({
+        'patient_id': ['P0', 'P1', 'P2', 'P3', 'P4', 'P5'],
+        'enrollment_time_days': [0, 10, 20, 30, 40, 50],
+        'discontinued': [True, True, False, False, False, True],
+        'discontinuation_time': pd.array([100, 310, 220, None, None, None], dtype='Int64'),
+        'discontinuation_reason': ['death', 'death', 'attrition', None, None, None],
+        'retreatment_count': [0, 0, 1, 0, 0, 0]
+    })
+
+
+class TestKaplanMeier:
+    """Vectorized product-limit estimate."""
+
+    def test_matches_hand_calculation(self):
+        km = kaplan_meier(np.array([5, 3, 3, 8, 10, 8]), np.array([True, True, False, True, False, False]))
+
+        assert km['time_days'].tolist() == [3, 5, 8, 10]
+        assert km['at_risk'].tolist() == [6, 4, 3, 1]
+        assert km['events'].tolist() == [1, 1, 1, 0]
+        np.testing.assert_allclose(km['survival'], [5 / 6, 5 / 6 * 3 / 4, 5 / 6 * 3 / 4 * 2 / 3, 5 / 12])
+
+    def test_several_curves_at_once(self):
+        durations = np.array([5, 3, 3, 8])
+        events = np.array([[1, 0], [0, 1], [1, 1], [0, 0]], dtype=bool)
+        together = kaplan_meier(durations, events)
+
+        for i in range(2):
+            alone = kaplan_meier(durations, events[:, i])
+            np.testing.assert_allclose(together['survival'][:, i], alone['survival'])
+
+
+class TestComputeSummary:
+    """Counts, curves and retreatment rates from the patient table."""
+
+    def test_summary(self):
+        follow_up = pd.Series({'P0': 90, 'P1': 280, 'P2': 400, 'P3': 150, 'P4': 600, 'P5': 50})
+        summary = compute_discontinuation_summary(patients_table(), follow_up)
+
+        assert summary['total_patients'] == 6 and summary['total_discontinued'] == 3
+        # Missing reasons of currently discontinued patients count as unknown
+        assert summary['reason_counts'] == {'death': 2, 'unknown': 1}
+
+        # P5 has no stop time, so it is censored at its last visit like patients on treatment
+        assert summary['retreatment'] == {
+            'ever_discontinued': 3, 'retreated_patients': 1, 'total_retreatments': 1,
+            'retreatment_rate': pytest.approx(1 / 3), 'by_reason': {'death': 0.0, 'attrition': 1.0}
+        }
+
+        # Durations from enrollment: P5 50c, P0 100, P3 150c, P2 200, P1 300, P4 600c
+        curves = summary['time_to_discontinuation']
+        assert set(curves) == {'all', 'death', 'attrition'}
+        assert curves['all']['time_days'] == [0, 100, 200, 300, 600]
+        assert curves['all']['at_risk'] == [6, 5, 3, 2, 1]
+        assert curves['all']['survival'] == pytest.approx([1, 4 / 5, 4 / 5 * 2 / 3, 4 / 15, 4 / 15])
+        assert curves['all']['median_days'] == 300 and curves['all']['events'] == 3
+
+        # Stopping for attrition censors P2 in the death curve
+        assert curves['death']['time_days'] == [0, 100, 300, 600]
+        assert curves['death']['survival'] == pytest.approx([1, 4 / 5, 4 / 5 * 1 / 2, 4 / 5 * 1 / 2])
+        assert curves['death']['median_days'] == 300
+        assert curves['attrition']['median_days'] is None
+
+    def test_nobody_discontinued(self):
+        patients = patients_table().assign(discontinued=False, discontinuation_time=None,
+                                           discontinuation_reason=None, retreatment_count=0)
+        summary = compute_discontinuation_summary(patients)
+
+        assert summary['reason_counts'] == {} and summary['discontinuation_rate'] == 0
+        assert summary['retreatment']['retreatment_rate'] == 0
+        assert summary['time_to_discontinuation']['all']['survival'] == [1.0, 1.0]
+
+
+def raw_results(n_patients=12):
+    """Monthly visits; every third patient dies after their fourth visit."""
+    histories = {}
+    start = datetime(2024, 1, 1)
+    for i in range(n_patients):
+        enrollment = start + timedelta(days=7 * i)
+        stops = i % 3 == 0
+        history = [{'date': enrollment + timedelta(days=30 * v), 'vision': 60, 'treatment_given': True}
+                   for v in range(4 if stops else 12)]
+        histories[f'P{i:02d}'] = SimpleNamespace(
+            enrollment_date=enrollment, visit_history=history, current_vision=60, baseline_vision=60,
+            injection_count=len(history), is_discontinued=stops,
+            discontinuation_date=history[-1]['date'] if stops else None,
+            discontinuation_type='death' if stops else None, discontinuation_reason='death' if stops else None,
+            pre_discontinuation_vision=None
+        )
+    return SimpleNamespace(patient_histories=histories, total_injections=0, final_vision_mean=60,
+                           final_vision_std=0, discontinuation_rate=1 / 3)
+
+
+class TestStoredSummary:
+    """Summaries are written with results and read without touching Parquet."""
+
+    def test_written_at_save_time(self, tmp_path):
+        metadata = SimulationMetadata(
+            sim_id='sim_test', timestamp=datetime(2024, 1, 1), protocol_name='test', protocol_version='1',
+            engine_type='abs', n_patients=12, duration_years=1, seed=0, runtime_seconds=0,
+            storage_type='parquet'
+        )
+        results = ParquetResults.create_from_raw_results(raw_results(), metadata, tmp_path / 'sim')
+
+        assert (tmp_path / 'sim' / DISCONTINUATION_SUMMARY_FILE).exists()
+        summary = results.discontinuation_summary()
+        assert summary['reason_counts'] == {'death': 4}
+        curve = summary['time_to_discontinuation']['death']
+        # Deaths at day 90, everyone else censored at day 330
+        assert curve['time_days'] == [0, 90, 330]
+        assert curve['survival'] == pytest.approx([1, 2 / 3, 2 / 3])
+
+        # Loading is a JSON read: the tables are no longer needed
+        (tmp_path / 'sim' / 'patients.parquet').unlink()
+        assert load_discontinuation_summary(tmp_path / 'sim') == summary
+
+    def test_computed_once_for_older_results(self, tmp_path):
+        ParquetWriter(tmp_path / 'sim').write_simulation_results(raw_results())
+        assert not (tmp_path / 'sim' / DISCONTINUATION_SUMMARY_FILE).exists()
+
+        summary = load_discontinuation_summary(tmp_path / 'sim')
+        with open(tmp_path / 'sim' / DISCONTINUATION_SUMMARY_FILE) as f:
+            assert json.load(f) == summary
+
+    def test_stale_version_recomputed(self, tmp_path):
+        ParquetWriter(tmp_path / 'sim').write_simulation_results(raw_results())
+        with open(tmp_path / 'sim' / DISCONTINUATION_SUMMARY_FILE, 'w') as f:
+            json.dump({'version': 0}, f)
+
+        assert load_discontinuation_summary(tmp_path / 'sim')['total_patients'] == 12
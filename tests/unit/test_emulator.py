@@ -0,0 +1,112 @@
+"""
+Test the Gaussian-process outcome emulator on a smooth synthetic response.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from calibration.adaptive_calibration import AdaptiveCalibration, ParameterBounds, OUTCOME_METRICS
+from calibration.emulator import GaussianProcessEmulator, run_active_learning
+from calibration.eylea_calibration_framework import EyleaCalibrationFramework, ParameterSet
+
+
+def synthetic_outcomes(parameters):
+    """Smooth response with its best score at discontinuation_year2 = 0.125, multiplier = 1.5."""
+    rate = parameters['discontinuation_year2']
+    multiplier = parameters['good_responder_multiplier']
+    return {
+        'vision_gain_year1': 9.0 + 4.0 * (multiplier - 1.5) - 10.0 * (rate - 0.125),
+        'vision_year2': 8.0 + 3.0 * (multiplier - 1.5),
+        'injections_year1': 7.5,
+        'injections_year2': 5.5,
+        'discontinuation_year1': 0.05,
+        'discontinuation_year2': rate
+    }
+
+
+def synthetic_evaluator(base_protocol_path, parameters, n_patients, seed):
+    outcomes = synthetic_outcomes(parameters)
+    outcomes['vision_gain_year1'] += np.random.default_rng(seed).normal(0, 0.05)
+    return outcomes
+
+
+@pytest.fixture
+def bounds():
+    return [
+        ParameterBounds('discontinuation_year2', 0.05, 0.25),
+        ParameterBounds('good_responder_multiplier', 1.0, 2.0)
+    ]
+
+
+@pytest.fixture
+def search(bounds):
+    return AdaptiveCalibration(bounds, store_path=None, evaluator=synthetic_evaluator)
+
+
+class TestGaussianProcessEmulator:
+    """Fit, predict, suggest and persist."""
+
+    def test_predicts_held_out_points(self, search, bounds):
+        train = search.sample(30, seed=1)
+        emulator = GaussianProcessEmulator(bounds).fit(train, [synthetic_outcomes(p) for p in train])
+
+        test = search.sample(20, seed=2)
+        predictions = emulator.predict(test)
+        for metric in ('vision_gain_year1', 'vision_year2', 'discontinuation_year2'):
+            expected = np.array([synthetic_outcomes(p)[metric] for p in test])
+            mean, std = predictions[metric]
+            np.testing.assert_allclose(mean, expected, atol=0.05 * (np.ptp(expected) + 1e-9) + 1e-3)
+            assert (std >= 0).all()
+
+        # Uncertainty grows away from the data
+        far = {'discontinuation_year2': 1.0, 'good_responder_multiplier': 5.0}
+        assert emulator.predict_outcomes(far)['vision_year2']['std'] > predictions['vision_year2'][1].max()
+
+        # Single-point previews are fast
+        start = time.perf_counter()
+        for _ in range(100):
+            emulator.predict_outcomes(test[0])
+        assert (time.perf_counter() - start) / 100 < 0.01
+
+    def test_save_and_load(self, search, bounds, tmp_path):
+        train = search.sample(12, seed=1)
+        emulator = GaussianProcessEmulator(bounds).fit(train, [synthetic_outcomes(p) for p in train])
+        emulator.save(tmp_path / 'emulator.json')
+        loaded = GaussianProcessEmulator.load(tmp_path / 'emulator.json')
+
+        test = search.sample(5, seed=3)
+        for metric in OUTCOME_METRICS:
+            np.testing.assert_allclose(loaded.predict(test)[metric][0], emulator.predict(test)[metric][0])
+            np.testing.assert_allclose(loaded.predict(test)[metric][1], emulator.predict(test)[metric][1])
+
+    def test_active_learning_finds_optimum(self, search, bounds):
+        emulator = run_active_learning(search, n_patients=100, n_initial=10, n_rounds=3,
+                                       batch_size=3, replicates=2, max_workers=0)
+        assert emulator.n_training == 10 + 3 * 3
+
+        # The best suggestion is near the synthetic optimum
+        best = emulator.suggest(1, framework=search.framework, kappa=0.0)[0]
+        assert best['discontinuation_year2'] == pytest.approx(0.125, abs=0.03)
+        assert best['good_responder_multiplier'] == pytest.approx(1.5, abs=0.15)
+
+        variance_picks = emulator.suggest(4, strategy='variance')
+        assert len(variance_picks) == 4
+
+    def test_framework_scores_emulated_outcomes(self, search, bounds):
+        train = search.sample(20, seed=1)
+        emulator = GaussianProcessEmulator(bounds).fit(train, [synthetic_outcomes(p) for p in train])
+
+        framework = EyleaCalibrationFramework()
+        params = ParameterSet(name='preview', description='', discontinuation_year2=0.125,
+                              good_responder_multiplier=1.5)
+        result = framework.emulate_parameters(params, emulator)
+        assert result.total_score < 1.0
+        assert result.vision_gain_year1 == pytest.approx(9.0, abs=0.2)
+
+    def test_invalid_input(self, bounds):
+        with pytest.raises(ValueError, match="At least 2"):
+            GaussianProcessEmulator(bounds).fit([{}], [{}])
+        with pytest.raises(RuntimeError, match="not been fitted"):
+            GaussianProcessEmulator(bounds).predict({'discontinuation_year2': 0.1, 'good_responder_multiplier': 1.0})
@@ -0,0 +1,172 @@
+"""
+Test chunked ingestion of real-world extracts into the simulation Parquet schema.
+"""
+
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'research' / 'data_analysis'))
+
+from eylea_data_analysis import EyleaDataAnalyzer
+from ape.core.storage.writer import ParquetWriter
+
+
+@pytest.fixture
+def extract():
+    """Injection rows of three eyes, with a duplicate, gaps in VA and a death."""
+    return pd.DataFrame({
+        'Patient ID': ['A', 'A', 'A', 'A', 'A', 'B', 'B', 'B', 'C', 'C', 'D'],
+        'Treated Eye': ['Left Eye'] * 4 + ['Right Eye'] + ['Left Eye'] * 3 + ['Right Eye'] * 2 + [None],
+        'Injection Date': ['2020-01-01', '2020-02-01', '2020-02-01', '2020-04-01', '2020-03-01',
+                           '2020-01-15', '2020-03-15', '2022-06-01',
+                           '2020-05-01', 'not a date', '2021-01-01'],
+        'VA Score': [60, None, 64, 70, 50, None, 55, 58, 40, 42, 71],
+        'Baseline VA': [58, 58, 58, 58, 50, None, None, None, 41, 41, None],
+        'Deceased': [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 0]
+    })
+
+
+def writer_schema(tmp_path):
+    """Schemas ParquetWriter produces for a one-patient simulation."""
+    patient = SimpleNamespace(
+        enrollment_date=datetime(2020, 1, 1), current_vision=65, baseline_vision=60,
+        injection_count=2, is_discontinued=True, discontinuation_date=datetime(2020, 3, 1),
+        discontinuation_type='death', discontinuation_reason='death', pre_discontinuation_vision=65.0,
+        visit_history=[
+            {'date': datetime(2020, 1, 1), 'vision': 60, 'treatment_given': True, 'next_interval_days': 28},
+            {'date': datetime(2020, 2, 1), 'vision': 65, 'treatment_given': True}
+        ]
+    )
+    raw = SimpleNamespace(patient_histories={'P1': patient}, total_injections=2, final_vision_mean=65,
+                          final_vision_std=0, discontinuation_rate=1.0)
+    ParquetWriter(tmp_path / 'sim').write_simulation_results(raw)
+    return {name: pq.read_schema(tmp_path / 'sim' / f'{name}.parquet') for name in ('patients', 'visits')}
+
+
+class TestIngestToParquet:
+    """Extracts become results that open like simulations."""
+
+    def test_csv(self, extract, tmp_path):
+        source = tmp_path / 'site_a.csv'
+        extract.to_csv(source, index=False)
+        analyzer = EyleaDataAnalyzer(str(source), tmp_path / 'output')
+
+        results = analyzer.ingest_to_parquet(tmp_path / 'real_site_a', chunksize=3)
+
+        assert analyzer.data_quality_report['ingestion'] == {
+            'rows_read': 11, 'rows_invalid': 2, 'duplicate_rows': 1, 'rows_without_va': 0,
+            'patients': 4, 'visits': 8
+        }
+        assert results.metadata.sim_id == 'real_site_a' and results.get_patient_count() == 4
+
+        visits = results.get_visits_df()
+        left = visits[visits['patient_id'] == 'A_LEFT_EYE']
+        # The duplicate kept its measured VA; the missing VA before it is carried forward
+        assert left['vision'].tolist() == [60, 64, 70]
+        assert left['time_days'].tolist() == [0, 31, 91]
+        assert left['next_interval_days'].tolist()[:2] == [31, 60] and pd.isna(left['next_interval_days'].iloc[2])
+        # The missing VA of an eye's first injection comes from its next one
+        assert visits.loc[visits['patient_id'] == 'B_LEFT_EYE', 'vision'].tolist() == [55, 55, 58]
+
+        patients = results.get_patients_df().set_index('patient_id')
+        assert patients.loc['A_LEFT_EYE', 'baseline_vision'] == 58
+        assert patients.loc['B_LEFT_EYE', 'baseline_vision'] == 55   # no baseline column value
+        assert patients.loc['B_LEFT_EYE', 'retreatment_count'] == 1   # > 1 year gap
+        assert patients.loc['C_RIGHT_EYE', 'discontinuation_reason'] == 'death'
+        # A's eyes stopped two years before the extract's last injection
+        assert patients.loc['A_LEFT_EYE', 'discontinuation_reason'] == 'attrition'
+        assert patients.loc['A_LEFT_EYE', 'discontinuation_time'] == 91
+        assert not patients.loc['B_LEFT_EYE', 'discontinued']
+
+        # Same analysis code as simulations
+        intervals = results.get_treatment_intervals_df()
+        assert len(intervals) == len(visits) - 4
+
+    def test_schema_matches_simulations(self, extract, tmp_path):
+        source = tmp_path / 'site_a.csv'
+        extract.to_csv(source, index=False)
+        EyleaDataAnalyzer(str(source), tmp_path / 'output').ingest_to_parquet(tmp_path / 'real')
+
+        expected = writer_schema(tmp_path)
+        for name in ('patients', 'visits'):
+            actual = pq.read_schema(tmp_path / 'real' / f'{name}.parquet')
+            assert actual.names == expected[name].names
+            mismatched = [(field.name, field.type, expected[name].field(field.name).type)
+                          for field in actual if field.type != expected[name].field(field.name).type
+                          and not pa_null(expected[name].field(field.name).type)]
+            assert mismatched == []
+
+    def test_sqlite_matches_csv(self, extract, tmp_path):
+        extract.to_csv(tmp_path / 'site.csv', index=False)
+        with sqlite3.connect(tmp_path / 'site.db') as conn:
+            extract.to_sql('injections', conn, index=False)
+
+        from_csv = EyleaDataAnalyzer(str(tmp_path / 'site.csv'), tmp_path / 'o').ingest_to_parquet(tmp_path / 'csv')
+        from_db = EyleaDataAnalyzer(str(tmp_path / 'site.db'), tmp_path / 'o').ingest_to_parquet(
+            tmp_path / 'db', chunksize=4)
+
+        pd.testing.assert_frame_equal(from_csv.get_visits_df(), from_db.get_visits_df())
+        pd.testing.assert_frame_equal(from_csv.get_patients_df(), from_db.get_patients_df())
+
+    def test_failed_chunk_leaves_nothing_behind(self, extract, tmp_path, monkeypatch):
+        extract.to_csv(tmp_path / 'site.csv', index=False)
+        analyzer = EyleaDataAnalyzer(str(tmp_path / 'site.csv'), tmp_path / 'o')
+        typed_chunk = analyzer._typed_chunk
+        calls = []
+
+        def fail_second_chunk(chunk, mapping):
+            calls.append(len(chunk))
+            if len(calls) == 2:
+                raise TypeError("bad chunk")
+            return typed_chunk(chunk, mapping)
+
+        monkeypatch.setattr(analyzer, '_typed_chunk', fail_second_chunk)
+        with pytest.raises(TypeError, match="bad chunk"):
+            analyzer.ingest_to_parquet(tmp_path / 'new', chunksize=3)
+        assert not (tmp_path / 'new').exists()
+
+        # An existing directory is kept, without the staging file
+        (tmp_path / 'existing').mkdir()
+        calls.clear()
+        with pytest.raises(TypeError):
+            analyzer.ingest_to_parquet(tmp_path / 'existing', chunksize=3)
+        assert list((tmp_path / 'existing').iterdir()) == []
+
+    def test_missing_required_column(self, extract, tmp_path):
+        extract.drop(columns=['Injection Date']).to_csv(tmp_path / 'bad.csv', index=False)
+        with pytest.raises(ValueError, match="Injection Date"):
+            EyleaDataAnalyzer(str(tmp_path / 'bad.csv'), tmp_path / 'o').ingest_to_parquet(tmp_path / 'bad')
+
+
+def pa_null(arrow_type):
+    """All-None writer columns have no inferable type."""
+    return str(arrow_type) == 'null'
+
+
+def test_injection_intervals_vectorized(tmp_path):
+    data = pd.DataFrame({
+        'UUID': ['P2', 'P1', 'P1', 'P1', 'P2'],
+        'Injection Date': ['2023-03-01', '2023-02-01', '2023-01-01', '2024-06-01', '2023-01-01'],
+        'VA Letter Score at Injection': [55, 62, 60, 65, 50],
+        'Eye': ['Left Eye', 'Right Eye', 'Right Eye', 'Right Eye', 'Left Eye']
+    })
+    data.to_csv(tmp_path / 'data.csv', index=False)
+    analyzer = EyleaDataAnalyzer(str(tmp_path / 'data.csv'), tmp_path)
+    analyzer.load_data()
+
+    intervals = analyzer.analyze_injection_intervals()
+
+    assert intervals['eye_key'].tolist() == ['P1_RIGHT_EYE', 'P1_RIGHT_EYE', 'P2_LEFT_EYE']
+    assert intervals['injection_number'].tolist() == [1, 2, 1]
+    assert intervals['interval_days'].tolist() == [31, 486, 59]
+    assert intervals['prev_va'].tolist() == [60, 62, 50]
+    assert intervals['current_va'].tolist() == [62, 65, 55]
+    assert intervals['very_long_gap'].tolist() == [False, True, False]
+    assert intervals['eye'].tolist() == ['Right Eye', 'Right Eye', 'Left Eye']
@@ -0,0 +1,123 @@
+"""
+Test the array-based LOCF intent-to-treat engine in population_outcome_comparison.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from visualization.population_outcome_comparison import (
+    calculate_itt_vision_trajectory,
+    calculate_discontinuation_stratified_outcomes,
+    create_population_outcome_comparison
+)
+
+
+@pytest.fixture
+def patient_histories():
+    """Irregular visit schedules, some patients discontinued, one without visits."""
+    rng = np.random.default_rng(17)
+    histories = {}
+    for i in range(60):
+        month = float(rng.uniform(0, 0.5)) if i % 7 else 0.0
+        visits = []
+        for _ in range(rng.integers(1, 25)):
+            visits.append({'month': month, 'vision': int(rng.integers(10, 85))})
+            month += float(rng.choice([0.9, 1.4, 2.0, 2.8, 4.1]))
+        histories[f"P{i:03d}"] = {'visits': visits, 'is_discontinued': bool(i % 3 == 0)}
+    histories['P999'] = {'visits': [], 'is_discontinued': False}
+    return histories
+
+
+def reference_trajectory(patient_histories, max_months):
+    """LOCF by scanning each patient's visits at every month."""
+    rows = []
+    for month in range(max_months + 1):
+        visions, statuses = [], []
+        for history in patient_histories.values():
+            visits = history['visits']
+            past = [v for v in visits if v['month'] <= month]
+            if not past:
+                continue
+            visions.append(max(past, key=lambda v: v['month'])['vision'])
+            last_month = max(v['month'] for v in visits)
+            statuses.append(history['is_discontinued'] and month >= last_month)
+        if visions:
+            rows.append({
+                'month': month,
+                'mean_vision': np.mean(visions),
+                'std_vision': np.std(visions),
+                'median_vision': np.median(visions),
+                'n_patients': len(visions),
+                'active_count': statuses.count(False),
+                'discontinued_count': statuses.count(True),
+                'ci_lower': np.percentile(visions, 2.5),
+                'ci_upper': np.percentile(visions, 97.5)
+            })
+    return pd.DataFrame(rows)
+
+
+def as_tables(patient_histories):
+    visits = pd.DataFrame([
+        {'patient_id': pid, 'month': v['month'], 'vision': v['vision']}
+        for pid, history in patient_histories.items() for v in history['visits']
+    ]).sample(frac=1, random_state=1)
+    patients = pd.DataFrame({
+        'patient_id': list(patient_histories),
+        'discontinued': [h['is_discontinued'] for h in patient_histories.values()],
+        'discontinuation_reason': ['poor_vision' if h['is_discontinued'] else None
+                                   for h in patient_histories.values()]
+    })
+    return visits, patients
+
+
+class TestITTTrajectory:
+    """The vectorized engine reproduces the per-patient LOCF definition."""
+
+    def test_matches_reference(self, patient_histories):
+        actual = calculate_itt_vision_trajectory(patient_histories, max_months=36)
+        expected = reference_trajectory(patient_histories, 36)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    def test_pandas_and_arrow_input(self, patient_histories):
+        visits, patients = as_tables(patient_histories)
+        expected = calculate_itt_vision_trajectory(patient_histories, max_months=24)
+        for visits_in, patients_in in ((visits, patients), (pa.Table.from_pandas(visits), pa.Table.from_pandas(patients))):
+            actual = calculate_itt_vision_trajectory(visits_in, max_months=24, patients=patients_in)
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    def test_empty_input_rejected(self):
+        with pytest.raises(ValueError, match="No patient histories"):
+            calculate_itt_vision_trajectory({})
+
+    def test_stratified_outcomes(self, patient_histories):
+        visits, patients = as_tables(patient_histories)
+        strat = calculate_discontinuation_stratified_outcomes(visits, patients)
+
+        with_visits = {pid: h for pid, h in patient_histories.items() if h['visits']}
+        finals = {pid: h['visits'][-1]['vision'] for pid, h in with_visits.items()}
+        discontinued = [pid for pid, h in with_visits.items() if h['is_discontinued']]
+
+        assert strat['overall_itt']['n_patients'] == len(with_visits)
+        assert strat['overall_itt']['mean_final'] == pytest.approx(np.mean(list(finals.values())))
+        assert strat['discontinued_all']['mean_final'] == pytest.approx(np.mean([finals[p] for p in discontinued]))
+        assert list(strat['discontinued_by_reason']) == ['poor_vision']
+
+        legacy = calculate_discontinuation_stratified_outcomes(patient_histories)
+        assert list(legacy['discontinued_by_reason']) == ['unknown']
+        assert legacy['active']['mean_change'] == pytest.approx(strat['active']['mean_change'])
+
+    def test_comparison_figure_from_tables(self, patient_histories):
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        visits, patients = as_tables(patient_histories)
+        fig = create_population_outcome_comparison(
+            {'visits': visits, 'patients': patients},
+            {'patient_histories': patient_histories},
+            max_months=24
+        )
+        assert len(fig.axes) == 3
+        plt.close(fig)
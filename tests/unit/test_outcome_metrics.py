@@ -0,0 +1,140 @@
+"""
+Test the outcome-metrics registry and its single streaming pass.
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.core.results.base import SimulationMetadata
+from ape.core.results.outcome_metrics import (
+    OUTCOME_METRICS, batched, compute_patient_metrics, register_metric, summarize_metrics
+)
+from ape.core.results.parquet import ParquetResults
+from ape.core.storage import ParquetWriter
+from tests.memory.test_results_architecture import create_mock_v2_results
+
+
+@pytest.fixture
+def tables():
+    """Patient-grouped visits (in shuffled time order within patients) and a patients table."""
+    rng = np.random.default_rng(4)
+    rows = []
+    for i in range(200):
+        n_visits = rng.integers(1, 30)
+        days = np.sort(rng.choice(900, n_visits, replace=False))
+        vision = 55 + np.cumsum(rng.integers(-6, 7, n_visits))
+        for day, letters in rng.permutation(np.column_stack([days, vision])):
+            rows.append({'patient_id': f'P{i:03d}', 'time_days': day, 'vision': letters,
+                         'injected': rng.random() < 0.6})
+    visits = pd.DataFrame(rows)
+    patients = pd.DataFrame({
+        'patient_id': [f'P{i:03d}' for i in range(202)],  # last two without visits
+        'discontinued': rng.random(202) < 0.2
+    })
+    return visits, patients
+
+
+def reference(visits, patients):
+    """Per-patient outcomes computed patient by patient."""
+    rows = {}
+    for patient_id, group in visits.groupby('patient_id'):
+        group = group.sort_values('time_days')
+        month = (group['time_days'] - group['time_days'].iloc[0]).to_numpy() / 30.44
+        vision = group['vision'].to_numpy(dtype=float)
+        change = vision[-1] - vision[0]
+        in_year1 = np.flatnonzero((month >= 11) & (month <= 13))
+        lost = np.flatnonzero(vision <= vision[0] - 15)
+        discontinued = patients.set_index('patient_id').loc[patient_id, 'discontinued']
+        rows[patient_id] = {
+            'baseline_vision': vision[0],
+            'final_vision': vision[-1],
+            'vision_change': change,
+            'vision_year1': vision[in_year1[0]] if len(in_year1) else np.nan,
+            'vision_maintained': float(change >= -5),
+            'gain_15_letters': float(change >= 15),
+            'time_to_15_letter_loss': month[lost[0]] if len(lost) else np.nan,
+            'injections': float(group['injected'].sum()),
+            'vision_gain_year1': vision[month <= 12][-1] - vision[0],
+            'injections_year2': float(group['injected'][(month > 12) & (month <= 24)].sum()),
+            'discontinuation_year2': float(discontinued and month[-1] <= 24)
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+class TestOutcomeMetrics:
+    """Registered metrics agree with a per-patient reference in any batching."""
+
+    @pytest.mark.parametrize('batch_size', [1, 37, 10_000])
+    def test_streaming_matches_reference(self, tables, batch_size):
+        visits, patients = tables
+        expected = reference(visits, patients)
+        actual = compute_patient_metrics(batched(visits, batch_size), patients)
+
+        assert set(OUTCOME_METRICS) <= set(actual.columns)
+        assert len(actual) == len(patients)
+        pd.testing.assert_frame_equal(actual.loc[expected.index, expected.columns], expected,
+                                      check_names=False, check_dtype=False)
+
+        # Patients without visits take each metric's empty value
+        no_visits = actual.loc[['P200', 'P201']]
+        assert (no_visits['injections'] == 0).all() and no_visits['final_vision'].isna().all()
+
+        summary = summarize_metrics(actual)
+        assert summary['vision_maintained'] == pytest.approx(100 * expected['vision_maintained'].mean())
+        assert summary['time_to_15_letter_loss'] == pytest.approx(expected['time_to_15_letter_loss'].median())
+        assert summary['discontinuation_year2'] == pytest.approx(
+            expected['discontinuation_year2'].sum() / len(patients))
+
+    def test_register_custom_metric(self, tables):
+        visits, patients = tables
+
+        @register_metric('gain_10_letters', aggregate='percent', description='Patients gaining 10+ letters')
+        def _gain_10(batch):
+            return batch.flag(batch.change() >= 10)
+
+        try:
+            actual = compute_patient_metrics([visits], metrics=['gain_10_letters', 'vision_change'])
+            assert list(actual.columns) == ['gain_10_letters', 'vision_change']
+            assert (actual['gain_10_letters'] == (actual['vision_change'] >= 10)).all()
+
+            with pytest.raises(ValueError, match="already registered"):
+                register_metric('gain_10_letters')(_gain_10)
+        finally:
+            del OUTCOME_METRICS['gain_10_letters']
+
+    def test_invalid_input(self, tables):
+        visits, patients = tables
+        with pytest.raises(ValueError, match="Unknown outcome metrics"):
+            compute_patient_metrics([visits], metrics=['qalys'])
+        with pytest.raises(ValueError, match="missing columns"):
+            compute_patient_metrics([visits], metrics=['discontinued'])
+        with pytest.raises(ValueError, match="not grouped by patient"):
+            compute_patient_metrics([visits, visits.iloc[:5]])
+
+    def test_parquet_results_cached(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir) / 'sim'
+            ParquetWriter(data_path).write_simulation_results(create_mock_v2_results(40))
+            metadata = SimulationMetadata(
+                sim_id='outcome_metrics_test', protocol_name='test', protocol_version='1.0',
+                engine_type='abs', n_patients=40, duration_years=1.0, seed=1,
+                timestamp=datetime.now(), runtime_seconds=0.0, storage_type='parquet'
+            )
+            results = ParquetResults(metadata, data_path)
+            try:
+                outcomes = results.patient_outcomes()
+                endpoints = results.vision_endpoints().set_index('patient_id')
+                np.testing.assert_array_equal(outcomes.loc[endpoints.index, 'final_vision'],
+                                              endpoints['final_vision'])
+                assert outcomes['injections'].sum() == results.get_total_injections()
+
+                # Second call is served from the cache
+                results.reader = None
+                assert results.outcome_metrics(['injections'])['injections'] == outcomes['injections'].mean()
+            finally:
+                ParquetResults._metrics_cache.clear()
@@ -0,0 +1,111 @@
+"""
+Test the cached, indexed protocol library.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+from simulation_v2.protocols import protocol_library
+from simulation_v2.protocols.protocol_library import ProtocolLibrary
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+
+PROTOCOLS = Path('protocols/v2_time_based')
+
+
+@pytest.fixture
+def library_dirs(tmp_path):
+    """A time-based directory with two protocols and a temp directory with a broken one."""
+    time_based = tmp_path / 'time_based'
+    time_based.mkdir()
+    shutil.copytree(PROTOCOLS / 'parameters', time_based / 'parameters')
+    for name in ('eylea_time_based.yaml', 'eylea_time_based_tnt.yaml'):
+        shutil.copy(PROTOCOLS / name, time_based / name)
+
+    temp = tmp_path / 'temp'
+    temp.mkdir()
+    (temp / 'broken.yaml').write_text("name: Broken\nmodel_type: time_based\n")
+    return {'time_based': time_based, 'temp': temp, 'standard': tmp_path / 'missing'}
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    """Count YAML parses done by the library."""
+    calls = []
+    real_load = yaml.safe_load
+    monkeypatch.setattr(protocol_library.yaml, 'safe_load', lambda raw: calls.append(1) or real_load(raw))
+    return calls
+
+
+class TestProtocolLibrary:
+    """Files are parsed once per change and summarized for listing."""
+
+    def test_entries_and_cache(self, library_dirs, parse_count):
+        library = ProtocolLibrary(library_dirs)
+        entries = library.entries()
+
+        assert [(e.kind, e.stem) for e in entries] == [
+            ('time_based', 'eylea_time_based'), ('time_based', 'eylea_time_based_tnt'), ('temp', 'broken')
+        ]
+        tae, tnt, broken = entries
+        assert tae.is_valid and tae.model_type == 'time_based' and tnt.protocol_type == 'fixed'
+        assert not broken.is_valid and 'Missing required fields' in broken.error
+
+        spec = library.spec(tae.path)
+        expected = TimeBasedProtocolSpecification.from_yaml(library_dirs['time_based'] / 'eylea_time_based.yaml')
+        assert spec.checksum == expected.checksum and spec.max_interval_days == expected.max_interval_days
+        with pytest.raises(ValueError, match="Invalid protocol"):
+            library.spec(broken.path)
+
+        # Reruns parse nothing, including parameter files
+        transitions_path = library.parameter_path(tae.path, 'disease_transitions_file')
+        library.load_yaml(transitions_path)
+        parses = len(parse_count)
+        for _ in range(3):
+            library.entries()
+            library.spec(tae.path)
+            data = library.load_yaml(transitions_path)
+        assert len(parse_count) == parses
+
+        # Parses are shared with specification loaders and other libraries
+        spec.load_disease_transitions()
+        ProtocolLibrary(library_dirs).load_yaml(transitions_path)
+        assert len(parse_count) == parses
+
+        # Callers get copies
+        data['fortnightly_transitions'] = None
+        assert library.load_yaml(transitions_path)['fortnightly_transitions'] is not None
+
+    def test_changes_on_disk(self, library_dirs, parse_count):
+        library = ProtocolLibrary(library_dirs)
+        library.entries()
+        parses = len(parse_count)
+
+        # An edited file is re-parsed, others are not
+        path = library_dirs['time_based'] / 'eylea_time_based.yaml'
+        data = library.load_yaml(path)
+        data['max_interval_days'] = 84
+        path.write_text(yaml.dump(data))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert library.get(path).max_interval_days == 84
+        assert library.spec(path).max_interval_days == 84
+
+        # Removed files drop out, new ones appear
+        (library_dirs['temp'] / 'broken.yaml').unlink()
+        shutil.copy(PROTOCOLS / 'eylea_time_based_tnt.yaml', library_dirs['temp'] / 'copy.yaml')
+        assert [e.stem for e in library.entries()] == ['eylea_time_based', 'eylea_time_based_tnt', 'copy']
+        # The copy's parameter files are not next to it
+        assert 'Missing parameter files' in library.get(library_dirs['temp'] / 'copy.yaml').error
+        assert len(parse_count) == parses + 2
+
+    def test_search(self, library_dirs):
+        library = ProtocolLibrary(library_dirs)
+        assert [e.stem for e in library.search('EYLEA')] == ['eylea_time_based', 'eylea_time_based_tnt']
+        assert [e.stem for e in library.search(protocol_type='fixed')] == ['eylea_time_based_tnt']
+        assert [e.stem for e in library.search(kinds=['temp'])] == ['broken']
+        assert len(library.search(valid_only=True)) == 2
+        assert library.search('eylea nonexistent-word') == []
@@ -0,0 +1,137 @@
+"""
+Test the parameter file cache and in-memory protocol overrides.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import yaml
+
+from simulation_v2.core.time_based_simulation_runner import TimeBasedSimulationRunner
+from simulation_v2.protocols import parameter_cache
+from simulation_v2.protocols.parameter_cache import load_yaml_with_checksum, apply_overrides
+from simulation_v2.protocols.protocol_spec import ProtocolSpecification
+from simulation_v2.protocols.protocol_spec_enhanced import EnhancedProtocolSpecification
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+
+VISIT_BASED_PROTOCOL = Path("protocols/.archived_visit_based/eylea_treat_and_extend_v1.0.yaml")
+TIME_BASED_PROTOCOL = Path("protocols/v2_time_based/eylea_time_based.yaml")
+
+
+class TestParameterCache:
+    """Files are parsed once per content and callers get private copies."""
+
+    def test_parsed_once_per_content(self, tmp_path, monkeypatch):
+        path = tmp_path / 'params.yaml'
+        path.write_text(yaml.dump({'rates': {'a': 0.1}}))
+
+        parses = []
+        real_load = yaml.safe_load
+        monkeypatch.setattr(parameter_cache.yaml, 'safe_load', lambda raw: parses.append(1) or real_load(raw))
+
+        first, checksum = load_yaml_with_checksum(path)
+        first['rates']['a'] = 99
+        second, same_checksum = load_yaml_with_checksum(path)
+        assert second == {'rates': {'a': 0.1}}
+        assert same_checksum == checksum
+        assert len(parses) == 1
+
+        # Edited files are picked up
+        path.write_text(yaml.dump({'rates': {'a': 0.2}}))
+        third, new_checksum = load_yaml_with_checksum(path)
+        assert third == {'rates': {'a': 0.2}}
+        assert new_checksum != checksum
+        assert len(parses) == 2
+
+    def test_cache_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(parameter_cache, 'MAX_CACHED_FILES', 2)
+        monkeypatch.setattr(parameter_cache, '_cache', type(parameter_cache._cache)())
+        paths = [tmp_path / f'params_{i}.yaml' for i in range(3)]
+        for i, path in enumerate(paths):
+            path.write_text(yaml.dump({'value': i}))
+
+        # An edit replaces the file's entry instead of adding one
+        load_yaml_with_checksum(paths[0])
+        paths[0].write_text(yaml.dump({'value': 10}))
+        load_yaml_with_checksum(paths[0])
+        assert list(parameter_cache._cache) == [str(paths[0].resolve())]
+
+        load_yaml_with_checksum(paths[1])
+        load_yaml_with_checksum(paths[0])   # most recently used again
+        load_yaml_with_checksum(paths[2])
+        assert list(parameter_cache._cache) == [str(paths[0].resolve()), str(paths[2].resolve())]
+
+    def test_apply_overrides_deep_merges(self):
+        base = {'a': {'b': 1, 'c': [1, 2]}, 'd': 1}
+        merged = apply_overrides(base, {'a': {'c': [3]}, 'e': 2})
+        assert merged == {'a': {'b': 1, 'c': [3]}, 'd': 1, 'e': 2}
+        assert base == {'a': {'b': 1, 'c': [1, 2]}, 'd': 1}
+
+
+class TestProtocolOverrides:
+    """with_overrides builds validated specifications without YAML round trips."""
+
+    def test_visit_based_overrides(self):
+        spec = ProtocolSpecification.from_yaml(VISIT_BASED_PROTOCOL)
+        derived = spec.with_overrides({
+            'min_interval_days': 56,
+            'disease_transitions': {'STABLE': {'STABLE': 0.8, 'ACTIVE': 0.2}}
+        })
+
+        assert derived.min_interval_days == 56
+        assert derived.disease_transitions['STABLE']['STABLE'] == 0.8
+        assert derived.disease_transitions['ACTIVE'] == spec.disease_transitions['ACTIVE']
+        assert spec.min_interval_days != 56
+        assert derived.checksum != spec.checksum
+        assert derived.source_file == spec.source_file
+
+        with pytest.raises(ValueError, match="sum to"):
+            spec.with_overrides({'disease_transitions': {'STABLE': {'STABLE': 0.9}}})
+
+    def test_enhanced_from_yaml(self):
+        spec = EnhancedProtocolSpecification.from_yaml(VISIT_BASED_PROTOCOL)
+        derived = spec.with_overrides({'max_interval_days': 84})
+        assert isinstance(derived, EnhancedProtocolSpecification)
+        assert derived.max_interval_days == 84
+
+    def test_time_based_parameter_overrides(self):
+        spec = TimeBasedProtocolSpecification.from_yaml(TIME_BASED_PROTOCOL)
+        original = spec.load_discontinuation_parameters()
+
+        derived = spec.with_overrides(
+            {'max_interval_days': 84},
+            parameter_overrides={'discontinuation': {'discontinuation_parameters': {'test_only': 1}}}
+        )
+        assert derived.max_interval_days == 84
+        assert derived.allow_saturday_visits == spec.allow_saturday_visits
+
+        loaded = derived.load_discontinuation_parameters()
+        assert loaded['discontinuation_parameters']['test_only'] == 1
+        assert set(original['discontinuation_parameters']) <= set(loaded['discontinuation_parameters'])
+        assert spec.load_discontinuation_parameters() == original
+
+        # Overrides accumulate across derivations
+        again = derived.with_overrides(parameter_overrides={'vision': {'test_only': 2}})
+        assert again.load_discontinuation_parameters() == loaded
+        assert again.load_vision_parameters()['test_only'] == 2
+
+    def test_engine_uses_overridden_disease_parameters(self):
+        spec = TimeBasedProtocolSpecification.from_yaml(TIME_BASED_PROTOCOL)
+        to_highly_active = {'NAIVE': 0.0, 'STABLE': 0.0, 'ACTIVE': 0.0, 'HIGHLY_ACTIVE': 1.0}
+        severe = spec.with_overrides(parameter_overrides={'disease_transitions': {'fortnightly_transitions': {
+            state: to_highly_active for state in ('NAIVE', 'STABLE', 'ACTIVE', 'HIGHLY_ACTIVE')
+        }}})
+
+        def run(protocol):
+            engine = TimeBasedSimulationRunner(protocol).create_engine(n_patients=40, seed=5)
+            return engine, engine.run(1.0, start_date=datetime(2024, 1, 1))
+
+        base_engine, base = run(spec)
+        severe_engine, severe_results = run(severe)
+
+        assert severe_engine.disease_model.fortnightly_transitions['STABLE'] == to_highly_active
+        assert base_engine.disease_model.fortnightly_transitions['STABLE']['HIGHLY_ACTIVE'] == 0
+        states = {str(p.current_state) for p in severe_results.patient_histories.values()}
+        assert states == {'DiseaseState.HIGHLY_ACTIVE'}
+        assert severe_results.final_vision_mean < base.final_vision_mean
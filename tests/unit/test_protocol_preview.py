@@ -0,0 +1,81 @@
+"""
+Test the cached in-process protocol preview.
+"""
+
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from simulation_v2.core import protocol_preview
+from simulation_v2.core.protocol_preview import clear_preview_cache, preview_protocol
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+
+PROTOCOLS = Path('protocols/v2_time_based')
+
+
+@pytest.fixture
+def spec():
+    clear_preview_cache()
+    yield TimeBasedProtocolSpecification.from_yaml(PROTOCOLS / 'eylea_time_based.yaml')
+    clear_preview_cache()
+
+
+class TestProtocolPreview:
+    """Small fixed-seed runs summarized and cached per protocol version."""
+
+    def test_summary(self, spec):
+        random.seed(1)
+        expected_next = random.random()
+        random.seed(1)
+
+        preview = preview_protocol(spec, n_patients=80, duration_years=1.0)
+
+        # The caller's random state is untouched
+        assert random.random() == expected_next
+        assert preview.n_patients == 80 and len(preview.injections) == 80
+        assert (preview.injections <= preview.visits).all()
+        assert (preview.injections_year1 == preview.injections).all()  # one-year run
+        summary = preview.summary()
+        assert summary['injections_per_year'] == pytest.approx(preview.injections.mean())
+        assert 0 <= summary['discontinuation_rate'] <= 1
+        assert summary['vision_change'] == pytest.approx((preview.final_vision - preview.baseline_vision).mean())
+
+    def test_cache(self, spec, monkeypatch):
+        runs = []
+        real_run = protocol_preview.run_preview
+        monkeypatch.setattr(protocol_preview, 'run_preview', lambda *args: runs.append(args) or real_run(*args))
+
+        first = preview_protocol(spec, n_patients=60, duration_years=1.0)
+        assert preview_protocol(spec, n_patients=60, duration_years=1.0) is first
+        assert len(runs) == 1
+
+        # A changed protocol or parameter override runs again, deterministically
+        shorter = spec.with_overrides({'max_interval_days': 56})
+        preview_protocol(shorter, n_patients=60, duration_years=1.0)
+        no_attrition = spec.with_overrides(parameter_overrides={'discontinuation': {
+            'discontinuation_parameters': {'attrition': {'base_probability_per_visit': 0.0}}
+        }})
+        preview_protocol(no_attrition, n_patients=60, duration_years=1.0)
+        assert len(runs) == 3
+
+        clear_preview_cache()
+        again = preview_protocol(spec, n_patients=60, duration_years=1.0)
+        assert again is not first
+        np.testing.assert_array_equal(again.injections, first.injections)
+        np.testing.assert_array_equal(again.final_vision, first.final_vision)
+
+    def test_edited_disease_parameters_change_preview(self, spec):
+        base = preview_protocol(spec, n_patients=60, duration_years=1.0)
+        to_highly_active = {'NAIVE': 0.0, 'STABLE': 0.0, 'ACTIVE': 0.0, 'HIGHLY_ACTIVE': 1.0}
+        severe = spec.with_overrides(parameter_overrides={'disease_transitions': {'fortnightly_transitions': {
+            state: to_highly_active for state in ('NAIVE', 'STABLE', 'ACTIVE', 'HIGHLY_ACTIVE')
+        }}})
+        no_treatment_effect = spec.with_overrides(parameter_overrides={'treatment_effect': {
+            'treatment_decay': {'half_life_days': 1}
+        }})
+
+        severe_summary = preview_protocol(severe, n_patients=60, duration_years=1.0).summary()
+        assert severe_summary['vision_change'] < base.summary()['vision_change']
+        assert preview_protocol(no_treatment_effect, n_patients=60, duration_years=1.0).summary() != base.summary()
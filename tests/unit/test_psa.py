@@ -0,0 +1,108 @@
+"""
+Test probabilistic sensitivity analysis sampling, overrides and runs.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation_v2.economics.cost_config import CostConfig
+from simulation_v2.economics.psa import (
+    PSAParameter, PSARunner, rebalance_transitions, sample_parameters, split_draw
+)
+from simulation_v2.protocols.time_based_protocol_spec import TimeBasedProtocolSpecification
+
+PROTOCOLS = Path('protocols/v2_time_based')
+COST_CONFIG = Path('protocols/cost_configs/nhs_hrg_aligned_2025.yaml')
+
+PARAMETERS = [
+    PSAParameter('drug_cost', 'costs.drug_costs.eylea_2mg_biosimilar', 'gamma', mean=355, sd=50),
+    PSAParameter('oct_cost', 'costs.visit_components.oct_scan', 'uniform', low=90, high=130),
+    PSAParameter('stable_to_active', 'disease_transitions.fortnightly_transitions.STABLE.ACTIVE',
+                 'beta', mean=0.025, sd=0.008),
+    PSAParameter('attrition', 'discontinuation.discontinuation_parameters.attrition.base_probability_per_visit',
+                 'lognormal', mean=0.01, sd=0.003),
+]
+
+
+class TestSampling:
+    """Distributions match their declared moments and draws map to overrides."""
+
+    def test_moments(self):
+        samples = sample_parameters(PARAMETERS, 40000, seed=1)
+        assert list(samples.columns) == [p.name for p in PARAMETERS]
+        for parameter in PARAMETERS:
+            if parameter.distribution == 'uniform':
+                assert samples[parameter.name].between(parameter.low, parameter.high).all()
+                continue
+            assert samples[parameter.name].mean() == pytest.approx(parameter.mean, rel=0.02)
+            assert samples[parameter.name].std() == pytest.approx(parameter.sd, rel=0.05)
+        assert samples['stable_to_active'].between(0, 1).all()
+        pd.testing.assert_frame_equal(samples, sample_parameters(PARAMETERS, 40000, seed=1))
+
+    def test_split_draw_and_rebalance(self):
+        overrides, costs = split_draw(PARAMETERS, {'drug_cost': 400, 'oct_cost': 100,
+                                                   'stable_to_active': 0.1, 'attrition': 0.02})
+        assert costs == {'drug_costs': {'eylea_2mg_biosimilar': 400.0}, 'visit_components': {'oct_scan': 100.0}}
+        assert overrides['disease_transitions'] == {'fortnightly_transitions': {'STABLE': {'ACTIVE': 0.1}}}
+
+        spec = TimeBasedProtocolSpecification.from_yaml(PROTOCOLS / 'eylea_time_based.yaml')
+        derived = spec.with_overrides(parameter_overrides=overrides)
+        transitions = rebalance_transitions(derived.load_disease_transitions()['fortnightly_transitions'])
+        assert transitions['STABLE']['ACTIVE'] == 0.1
+        assert transitions['STABLE']['STABLE'] == pytest.approx(0.9)
+        assert all(sum(row.values()) == pytest.approx(1.0) for row in transitions.values())
+        attrition = derived.load_discontinuation_parameters()['discontinuation_parameters']['attrition']
+        assert attrition['base_probability_per_visit'] == 0.02
+
+        # Off-diagonal mass above 1 is scaled down
+        assert rebalance_transitions({'A': {'A': 0.5, 'B': 0.9, 'C': 0.3}})['A'] == \
+            pytest.approx({'A': 0.0, 'B': 0.75, 'C': 0.25})
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError, match="Invalid target"):
+            PSAParameter('x', 'costs', 'normal', mean=1, sd=1)
+        with pytest.raises(ValueError, match="Cost target"):
+            PSAParameter('x', 'costs.special_events.injection', 'normal', mean=1, sd=1)
+        with pytest.raises(ValueError, match="Beta parameter"):
+            PSAParameter('x', 'vision.a', 'beta', mean=0.5, sd=0.6)
+        with pytest.raises(ValueError, match="Unknown distribution"):
+            PSAParameter('x', 'vision.a', 'weibull', mean=1, sd=1)
+
+        spec = TimeBasedProtocolSpecification.from_yaml(PROTOCOLS / 'eylea_time_based.yaml')
+        with pytest.raises(ValueError, match="missing value"):
+            PSARunner({'a': spec}, [PSAParameter('x', 'vision.no_such_section.value', 'normal', mean=1, sd=1)],
+                      CostConfig.from_yaml(COST_CONFIG))
+
+
+class TestPSARunner:
+    """Small end-to-end PSA over two arms."""
+
+    def test_run(self):
+        arms = {
+            'tae': TimeBasedProtocolSpecification.from_yaml(PROTOCOLS / 'eylea_time_based.yaml'),
+            'tnt': TimeBasedProtocolSpecification.from_yaml(PROTOCOLS / 'eylea_time_based_tnt.yaml')
+        }
+        runner = PSARunner(arms, PARAMETERS, CostConfig.from_yaml(COST_CONFIG),
+                           n_patients=25, duration_years=0.5, seed=7)
+        result = runner.run(n_draws=3)
+
+        draws = result.draws
+        assert len(draws) == 3
+        assert {'seed', 'drug_cost', 'tae_cost', 'tae_effect', 'tnt_cost', 'tnt_injections'} <= set(draws.columns)
+        assert (draws[['tae_cost', 'tnt_cost']] > 0).all().all()
+
+        scatter = result.scatter('tae', 'tnt')
+        np.testing.assert_allclose(scatter['delta_cost'], draws['tae_cost'] - draws['tnt_cost'])
+
+        ceac = result.ceac([0, 1000, 100000])
+        np.testing.assert_allclose(ceac[['tae', 'tnt']].sum(axis=1), 1.0)
+        pairwise = result.cost_effectiveness('tae', 'tnt', willingness_to_pay=[0, 1000, 100000])
+        assert len(pairwise.samples) == 3
+        np.testing.assert_allclose(pairwise.ceac['probability_cost_effective'], ceac['tae'])
+
+        # Same seed, same draws, whether or not a worker process runs them
+        again = runner.run(n_draws=3, max_workers=1)
+        pd.testing.assert_frame_equal(again.draws, draws)
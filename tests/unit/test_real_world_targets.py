@@ -0,0 +1,124 @@
+"""
+Test real-world calibration targets and scoring simulations against them.
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.core.storage import ParquetWriter
+from calibration.eylea_calibration_framework import EyleaCalibrationFramework
+from calibration.real_world_targets import (
+    CalibrationTargets, build_targets, compute_statistics, score_simulation, score_statistics
+)
+
+
+def cohort(interval_days=56, n_patients=20, discontinue_every=4, months=30):
+    """Patients injected every interval_days, gaining 1 letter per visit; some stop at month 9."""
+    visits, patients = [], []
+    for i in range(n_patients):
+        stops = i % discontinue_every == 0
+        days = np.arange(0, (9 if stops else months) * 30.44 + 1, interval_days)
+        visits.append(pd.DataFrame({
+            'patient_id': f'P{i:02d}', 'time_days': days + 7 * i,
+            'vision': 50 + i + np.arange(len(days)), 'injected': True
+        }))
+        patients.append({'patient_id': f'P{i:02d}', 'discontinued': stops})
+    return pd.concat(visits, ignore_index=True), pd.DataFrame(patients)
+
+
+def raw_results(visits, patients):
+    """Simulation results as the engines return them, for the framework and ParquetWriter."""
+    histories = {}
+    for (patient_id, rows), discontinued in zip(visits.groupby('patient_id'), patients['discontinued']):
+        start = datetime(2024, 1, 1)
+        history = [{'date': start + timedelta(days=int(day)), 'vision': int(vision),
+                    'treatment_given': bool(injected), 'disease_state': 'STABLE'}
+                   for day, vision, injected in rows[['time_days', 'vision', 'injected']].itertuples(index=False)]
+        histories[patient_id] = SimpleNamespace(
+            enrollment_date=history[0]['date'], visit_history=history, is_discontinued=discontinued,
+            current_vision=history[-1]['vision'], baseline_vision=history[0]['vision'],
+            injection_count=len(history), discontinuation_date=history[-1]['date'] if discontinued else None,
+            discontinuation_type=None, discontinuation_reason=None, pre_discontinuation_vision=None
+        )
+    return SimpleNamespace(patient_histories=histories, total_injections=len(visits), final_vision_mean=60,
+                           final_vision_std=5, discontinuation_rate=float(patients['discontinued'].mean()))
+
+
+class TestComputeStatistics:
+    """The summary statistics stored in a target file."""
+
+    def test_statistics(self):
+        visits, patients = cohort()
+        targets = compute_statistics(visits, patients, source='test')
+
+        assert targets.n_patients == 20
+        # Every interval is 8 weeks
+        assert targets.interval_distribution == [0, 0, 1, 0, 0, 0, 0, 0, 0]
+        # Days 0, 56, ..., 336 in year 1 (0, ..., 224 for those stopping); 392, ..., 728 in year 2
+        assert targets.injections_by_year[:2] == pytest.approx([(15 * 7 + 5 * 5) / 20, 7])
+        assert targets.patients_by_year[:3] == [20, 15, 15]
+        assert np.isnan(targets.injections_by_year[3])
+        # 15 patients followed past month 24; last readings up to months 12 and 24 are visits 6 and 13
+        assert targets.patients_by_vision_year == [15, 15]
+        assert targets.vision_change_quantiles[0] == pytest.approx([6] * 5)
+        assert targets.vision_change_quantiles[1] == pytest.approx([13] * 5)
+        # 5 discontinuations in months 6-12 out of 20 at risk; nobody after month 30
+        assert targets.at_risk[:3] == [20, 20, 15]
+        assert targets.discontinuation_hazard[:3] == pytest.approx([0, 0.25, 0])
+        assert np.isnan(targets.discontinuation_hazard[-1])
+
+    def test_save_and_load(self, tmp_path):
+        targets = compute_statistics(*cohort(), source='site_a')
+        loaded = CalibrationTargets.load(targets.save(tmp_path / 'targets.json'))
+
+        assert loaded.source == 'site_a'
+        assert loaded.interval_bin_edges[-1] == np.inf
+        np.testing.assert_array_equal(loaded.injections_by_year, targets.injections_by_year)
+        np.testing.assert_array_equal(loaded.discontinuation_hazard, targets.discontinuation_hazard)
+
+
+class TestScoring:
+    """Simulations are scored against the stored statistics."""
+
+    def test_identical_cohort_scores_zero(self):
+        targets = compute_statistics(*cohort())
+        score = score_statistics(compute_statistics(*cohort()), targets)
+        assert score.total == 0
+
+    def test_score_follows_distance(self):
+        targets = compute_statistics(*cohort())
+        close = score_statistics(compute_statistics(*cohort(interval_days=63)), targets)
+        far = score_statistics(compute_statistics(*cohort(interval_days=84, discontinue_every=2)), targets)
+
+        assert 0 < close.total < far.total
+        assert close.intervals == 1 and close.discontinuation == 0
+        assert far.injections > close.injections and far.discontinuation > 0
+
+    def test_layout_mismatch(self):
+        targets = compute_statistics(*cohort())
+        targets.vision_quantiles = [0.5]
+        with pytest.raises(ValueError, match="rebuild"):
+            score_statistics(compute_statistics(*cohort()), targets)
+
+    def test_parquet_and_framework_agree(self, tmp_path):
+        visits, patients = cohort()
+        targets = build_targets_from(tmp_path, visits, patients)
+        simulated = cohort(interval_days=63)
+        results = raw_results(*simulated)
+        ParquetWriter(tmp_path / 'sim').write_simulation_results(results)
+
+        framework = EyleaCalibrationFramework(real_world_targets=tmp_path / 'targets.json')
+        from_objects = framework.score_real_world(results)
+
+        assert from_objects == score_simulation(tmp_path / 'sim', targets)
+        assert from_objects == score_simulation(simulated, targets)
+
+
+def build_targets_from(tmp_path, visits, patients):
+    """Targets built the way real-world extracts are: from Parquet results."""
+    ParquetWriter(tmp_path / 'real').write_simulation_results(raw_results(visits, patients))
+    return build_targets(tmp_path / 'real', tmp_path / 'targets.json')
@@ -0,0 +1,113 @@
+"""
+Test cached and parallel rendering of report figures and documents.
+"""
+
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.utils import report_rendering
+from ape.utils.report_rendering import (
+    FigureJob, cached_report, clear_render_cache, content_hash, render_figure, render_figures
+)
+
+
+def bar_chart(values, title=''):
+    """Module-level builder, so worker processes can import it."""
+    fig, ax = plt.subplots(figsize=(2, 1.5))
+    ax.bar(range(len(values)), values)
+    ax.set_title(title)
+    return fig
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_render_cache()
+    yield
+    clear_render_cache()
+
+
+class TestContentHash:
+    """Hashes follow content, not identity."""
+
+    def test_stable_and_sensitive(self):
+        df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+        key = content_hash({'b': 1, 'a': [1, 2]}, df, np.arange(4))
+
+        assert content_hash({'a': [1, 2], 'b': 1}, df.copy(), np.arange(4)) == key
+        assert content_hash({'b': 1, 'a': [1, 2]}, df.assign(a=[1, 2, 4]), np.arange(4)) != key
+        assert content_hash({'b': 1, 'a': [1, 2]}, df, np.arange(5)) != key
+        assert content_hash(bar_chart) != content_hash(render_figure)
+
+    def test_unknown_types_rejected(self):
+        class Opaque:
+            pass
+
+        with pytest.raises(TypeError, match="Opaque"):
+            content_hash({'config': Opaque()})
+
+
+class TestRenderFigures:
+    """Figures are drawn once per input, in workers when there are several."""
+
+    def test_cache(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(report_rendering, '_render', lambda job: calls.append(job) or b'image')
+
+        job = FigureJob(bar_chart, ([1, 2, 3],), {'title': 'Visits'})
+        assert render_figure(job) == b'image'
+        assert render_figure(FigureJob(bar_chart, ([1, 2, 3],), {'title': 'Visits'})) == b'image'
+        assert len(calls) == 1
+
+        # Only the changed figure is drawn again
+        render_figures([job, FigureJob(bar_chart, ([1, 2, 4],), {'title': 'Visits'})])
+        assert len(calls) == 2
+
+    def test_pool_matches_in_process(self):
+        jobs = [FigureJob(bar_chart, ([1, i, 3],), fmt=fmt) for i in range(2) for fmt in ('png', 'svg')]
+        in_process = render_figures(jobs, max_workers=0)
+        assert in_process[0].startswith(b'\x89PNG') and b'<svg' in in_process[1]
+
+        clear_render_cache()
+        assert render_figures(jobs, max_workers=2) == in_process
+
+
+class TestCachedReport:
+    """Documents are regenerated only when their inputs change."""
+
+    def test_cache(self):
+        calls = []
+
+        def generate(summary, title='Report'):
+            calls.append(summary)
+            return f"{title}: {summary}".encode()
+
+        assert cached_report(generate, {'visits': 10}, title='A') == b'A: {\'visits\': 10}'
+        cached_report(generate, {'visits': 10}, title='A')
+        assert len(calls) == 1
+
+        cached_report(generate, {'visits': 11}, title='A')
+        assert len(calls) == 2
+
+        # An explicit key stands in for the arguments
+        cached_report(generate, {'visits': 12}, cache_key='v1')
+        assert cached_report(generate, {'visits': 13}, cache_key='v1') == b"Report: {'visits': 12}"
+        assert len(calls) == 3
+
+    def test_generation_time_is_part_of_key(self):
+        calls = []
+
+        def generate(summary, generated_at=None):
+            calls.append(generated_at)
+            return f"{summary} at {generated_at:%H:%M}".encode()
+
+        morning = datetime(2024, 1, 1, 9, 0)
+        assert cached_report(generate, 'visits', generated_at=morning) == b'visits at 09:00'
+        cached_report(generate, 'visits', generated_at=morning)
+        assert cached_report(generate, 'visits', generated_at=morning.replace(minute=1)) == b'visits at 09:01'
+        assert len(calls) == 2
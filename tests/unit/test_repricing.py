@@ -0,0 +1,118 @@
+"""
+Test post-hoc re-pricing of stored visits against ResourceTracker costs.
+"""
+
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation_v2.economics.cost_config import CostConfig
+from simulation_v2.economics.repricing import PriceSchedule, RepricingEngine, drug_price_sweep
+from simulation_v2.economics.resource_tracker import ResourceTracker, load_resource_config
+
+
+@pytest.fixture
+def resource_config():
+    return load_resource_config("protocols/resources/nhs_standard_resources.yaml")
+
+
+@pytest.fixture
+def tracker(resource_config):
+    """A few weeks of mixed visits for three patients."""
+    tracker = ResourceTracker(resource_config)
+    visit_types = ['injection_only', 'decision_with_injection', 'decision_only']
+    day = date(2024, 1, 29)
+    for i in range(30):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        visit_type = visit_types[i % 3]
+        tracker.track_visit(day, visit_type, f'P{i % 3}',
+                            injection_given=visit_type != 'decision_only',
+                            oct_performed='decision' in visit_type)
+        day += timedelta(days=2)
+    return tracker
+
+
+class TestRepricingEngine:
+    """Re-pricing matches tracked costs and scales to batches of scenarios."""
+
+    def test_recorded_prices_reproduce_tracker_costs(self, tracker, resource_config):
+        engine = RepricingEngine.from_tracker(tracker)
+        recorded = engine.recorded_schedule()
+        assert recorded.as_array().tolist() == PriceSchedule.from_resource_config(resource_config).as_array().tolist()
+
+        result = engine.price(recorded)
+        assert result.total_costs() == pytest.approx(tracker.get_total_costs())
+
+        # Per-patient and per-month tables add up to the total
+        assert result.per_patient['recorded'].sum() == pytest.approx(tracker.get_total_costs()['total'])
+        assert result.per_month['recorded'].sum() == pytest.approx(tracker.get_total_costs()['total'])
+        months = sorted({visit['date'].strftime('%Y-%m') for visit in tracker.visits})
+        assert list(result.per_month.index) == months
+
+        patient_totals = tracker.visits_frame().groupby('patient_id')['total_cost'].sum()
+        pd.testing.assert_series_equal(result.per_patient['recorded'].sort_index(), patient_totals,
+                                       check_names=False)
+
+    def test_drug_price_sweep(self, tracker, resource_config):
+        engine = RepricingEngine.from_tracker(tracker)
+        base = PriceSchedule.from_resource_config(resource_config)
+        result = engine.price(drug_price_sweep(base, [100, 500, 816]))
+
+        injections = sum(visit['injection_given'] for visit in tracker.visits)
+        assert result.totals['drug'].tolist() == [100 * injections, 500 * injections, 816 * injections]
+        # Non-drug components do not move with the drug price
+        assert result.totals['oct_scan'].nunique() == 1
+        assert result.total_costs('drug 816') == pytest.approx(tracker.get_total_costs())
+
+    def test_loaded_tracker_and_parquet(self, tracker, tmp_path):
+        """Trackers loaded from saved results (visit dicts) and the Parquet table price the same."""
+        from types import SimpleNamespace
+        loaded = SimpleNamespace(visits=tracker.visits)
+        tracker.visits_frame().to_parquet(tmp_path / 'visits_with_costs.parquet', index=False)
+
+        expected = RepricingEngine.from_tracker(tracker).price(PriceSchedule(1, 2, 3, 4)).totals
+        for engine in (RepricingEngine.from_tracker(loaded), RepricingEngine.from_parquet(tmp_path)):
+            pd.testing.assert_frame_equal(engine.price(PriceSchedule(1, 2, 3, 4)).totals, expected)
+            assert engine.recorded_schedule().drug == 816
+
+    def test_from_cost_config(self):
+        config = CostConfig.from_yaml("protocols/cost_configs/nhs_hrg_aligned_2025.yaml")
+        schedule = PriceSchedule.from_cost_config(config)
+        assert schedule.drug == config.drug_costs['eylea_2mg_biosimilar']
+        assert schedule.injection_procedure == 134
+        assert schedule.consultation == 75
+
+        with pytest.raises(ValueError, match="Drug not found"):
+            PriceSchedule.from_cost_config(config, drug='unknown')
+
+    def test_million_visits_fifty_prices(self, resource_config):
+        rng = np.random.default_rng(0)
+        n = 1_000_000
+        dates = pd.date_range('2024-01-01', periods=730).strftime('%Y-%m-%d').to_numpy(dtype=object)
+        visit_types = np.array(['injection_only', 'decision_with_injection', 'decision_only'], dtype=object)
+        type_codes = rng.integers(0, 3, n)
+        visits = pd.DataFrame({
+            'date': dates[rng.integers(0, len(dates), n)],
+            'patient_id': rng.integers(0, 20000, n),
+            'visit_type': visit_types[type_codes],
+            'injection_given': type_codes != 2,
+            'oct_performed': type_codes != 0
+        })
+
+        start = time.perf_counter()
+        engine = RepricingEngine(visits)
+        base = PriceSchedule.from_resource_config(resource_config)
+        result = engine.price(drug_price_sweep(base, np.linspace(100, 1500, 50)))
+        assert time.perf_counter() - start < 5.0
+
+        assert result.per_patient.shape == (20000, 50)
+        assert result.per_month.shape == (24, 50)
+        assert result.totals['total'].is_monotonic_increasing
+
+    def test_invalid_input(self):
+        with pytest.raises(ValueError, match="missing columns"):
+            RepricingEngine(pd.DataFrame({'date': []}))
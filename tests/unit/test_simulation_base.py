@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from unittest.mock import Mock
 from datetime import datetime, timedelta
@@ -97,6 +98,39 @@ class TestSimulationClock:
         assert clock.get_next_event().priority == 1
         assert clock.get_next_event().priority == 2
 
+    def test_day_buckets_keep_global_order(self, clock):
+        clock.end_date = clock.current_time + timedelta(days=365)
+        rng = np.random.default_rng(3)
+        events = [
+            Event(time=clock.current_time + timedelta(days=int(day), hours=int(hour)),
+                  event_type="test", patient_id=f"P{i}", priority=int(priority))
+            for i, (day, hour, priority) in enumerate(zip(rng.integers(0, 30, 500), rng.integers(8, 17, 500),
+                                                          rng.integers(1, 3, 500)))
+        ]
+        for event in events:
+            clock.schedule_event(event)
+        assert len(clock) == 500
+        assert [record[3] for record in clock.event_list] == sorted(
+            events, key=lambda e: (e.time, e.priority, events.index(e)))
+
+        drained = []
+        while (event := clock.get_next_event()) is not None:
+            drained.append(event)
+            # Same-day follow-ups interleave with what is already queued
+            if event.event_type == "test" and int(event.patient_id[1:]) % 7 == 0:
+                clock.schedule_event(Event(time=event.time, event_type="follow_up",
+                                           patient_id=event.patient_id, priority=2))
+        keys = [(e.time, e.priority) for e in drained]
+        assert keys == sorted(keys)
+        assert len(drained) == 500 + len(range(0, 500, 7)) and len(clock) == 0
+
+    def test_events_after_end_date_dropped(self, clock):
+        clock.end_date = clock.current_time + timedelta(days=10)
+        clock.schedule_event(Event(time=clock.end_date + timedelta(days=1), event_type="test", patient_id="P1"))
+        clock.schedule_event(Event(time=clock.end_date, event_type="test", patient_id="P2"))
+        assert len(clock) == 1
+        assert clock.get_next_event().patient_id == "P2"
+
     def test_empty_queue(self, clock):
         assert clock.get_next_event() is None
 
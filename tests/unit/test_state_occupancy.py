@@ -0,0 +1,87 @@
+"""
+Test the sweep-line state occupancy engine behind the treatment-state streamgraph.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.components.treatment_patterns.time_series_generator import (
+    compute_state_occupancy,
+    generate_patient_state_time_series
+)
+
+STATES = ['Initial Treatment', 'Intensive (Monthly)', 'Regular (6-8 weeks)', 'Extended (12+ weeks)']
+
+
+def reference_state(visits, t, enrollment, discontinuation):
+    """State of one patient at time t, evaluated directly from the definition."""
+    if t < enrollment:
+        return None
+    past = visits[visits['time_months'] <= t]
+    if len(past) == 0:
+        return 'Pre-Treatment'
+    last = past.iloc[past['time_months'].to_numpy().argmax()]
+    if discontinuation is None:
+        if t - last['time_months'] > 12:
+            return 'Lost to Follow-up'
+    elif not np.isnan(discontinuation) and discontinuation <= t * 30.44:
+        return 'Discontinued'
+    return last['treatment_state']
+
+
+@pytest.fixture
+def visits():
+    rng = np.random.default_rng(3)
+    rows = []
+    for i in range(40):
+        time_months = float(rng.uniform(0, 6))
+        for _ in range(rng.integers(1, 12)):
+            rows.append((f"P{i:03d}", time_months, rng.choice(STATES)))
+            time_months += float(rng.choice([1, 2, 3, 8, 14]))
+    return pd.DataFrame(rows, columns=['patient_id', 'time_months', 'treatment_state'])
+
+
+class TestStateOccupancy:
+    """Sweep-line counts agree with a per-patient, per-time-point evaluation."""
+
+    @pytest.mark.parametrize('with_discontinuation', [False, True])
+    def test_matches_reference(self, visits, with_discontinuation):
+        patients = visits['patient_id'].unique()
+        rng = np.random.default_rng(5)
+        enrollment = pd.Series(rng.uniform(0, 4, len(patients)), index=patients)
+        discontinuation = None
+        if with_discontinuation:
+            discontinuation = pd.Series(
+                np.where(rng.random(len(patients)) < 0.5, rng.uniform(0, 1500, len(patients)), np.nan),
+                index=patients
+            )
+        time_points = np.arange(0, 60.25, 0.25)
+
+        occupancy = compute_state_occupancy(visits, time_points, enrollment, discontinuation)
+
+        for t in time_points[::7]:
+            expected = pd.Series([
+                reference_state(
+                    visits[visits['patient_id'] == pid], t, enrollment[pid],
+                    None if discontinuation is None else discontinuation[pid]
+                )
+                for pid in patients
+            ]).value_counts()
+            actual = occupancy.loc[t]
+            assert actual[actual > 0].sort_index().to_dict() == expected.sort_index().to_dict()
+
+    def test_counts_conserved(self, visits):
+        time_points = np.arange(0, 60, 1.0)
+        occupancy = compute_state_occupancy(visits, time_points)
+        assert (occupancy.sum(axis=1) == visits['patient_id'].nunique()).all()
+
+    def test_weekly_resolution_not_clamped(self):
+        visits_df = pd.DataFrame({
+            'patient_id': ['P1', 'P1', 'P2'],
+            'time_days': [0, 3650, 0],
+            'treatment_state': ['Initial Treatment', 'Regular (6-8 weeks)', 'Initial Treatment']
+        })
+        time_series = generate_patient_state_time_series(visits_df, time_resolution='week')
+        assert time_series['time_point'].nunique() > 470
+        assert np.allclose(np.diff(np.sort(time_series['time_point'].unique())), 0.25)
@@ -0,0 +1,86 @@
+"""
+Test streaming treatment-pattern extraction against the in-memory version.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ape.components.treatment_patterns.pattern_analyzer import (
+    aggregate_transition_counts,
+    extract_treatment_patterns_vectorized,
+    stream_treatment_patterns
+)
+from ape.components.treatment_patterns.sankey_builder_enhanced import (
+    create_enhanced_sankey_with_terminals
+)
+
+
+class BatchReader:
+    """Minimal stand-in for ParquetReader.iterate_visits over a DataFrame."""
+
+    def __init__(self, visits_df):
+        self.visits_df = visits_df
+
+    def iterate_visits(self, batch_size=5000, columns=None, filters=None):
+        for start in range(0, len(self.visits_df), batch_size):
+            yield self.visits_df.iloc[start:start + batch_size][columns]
+
+
+class StubResults:
+    """Results exposing both get_visits_df and a batch reader."""
+
+    def __init__(self, visits_df):
+        self.visits_df = visits_df
+        self.reader = BatchReader(visits_df)
+
+    def get_visits_df(self):
+        return self.visits_df.copy()
+
+
+@pytest.fixture
+def visits_df():
+    """Irregular visit schedules covering every interval category and restarts."""
+    rng = np.random.default_rng(7)
+    intervals = [28, 42, 56, 84, 115, 150, 200, 400]
+    rows = []
+    for i in range(200):
+        time_days = 0
+        for _ in range(rng.integers(1, 30)):
+            rows.append((f"P{i:04d}", time_days))
+            time_days += int(rng.choice(intervals))
+    return pd.DataFrame(rows, columns=['patient_id', 'time_days'])
+
+
+class TestStreamTreatmentPatterns:
+    """Streaming extraction reproduces extract_treatment_patterns_vectorized."""
+
+    @pytest.mark.parametrize('batch_size', [13, 500, 1_000_000])
+    def test_matches_vectorized(self, visits_df, batch_size):
+        expected, _ = extract_treatment_patterns_vectorized(StubResults(visits_df))
+        summary = stream_treatment_patterns(StubResults(visits_df), batch_size=batch_size)
+
+        pd.testing.assert_frame_equal(summary.transitions_df, expected.reset_index(drop=True))
+        pd.testing.assert_frame_equal(summary.transition_counts, aggregate_transition_counts(expected))
+        assert summary.sim_end_days == visits_df['time_days'].max()
+        assert len(summary.last_visits) == visits_df['patient_id'].nunique()
+
+    def test_patients_interleaved_across_batches(self, visits_df):
+        # Partitioned datasets return a patient's visits year by year
+        by_year = visits_df.assign(year=visits_df['time_days'] // 365)
+        by_year = by_year.sort_values(['year', 'patient_id'], kind='mergesort').drop(columns='year')
+
+        expected, _ = extract_treatment_patterns_vectorized(StubResults(visits_df))
+        summary = stream_treatment_patterns(StubResults(by_year), batch_size=250)
+        pd.testing.assert_frame_equal(summary.transitions_df, expected.reset_index(drop=True))
+
+    def test_out_of_order_visits_rejected(self, visits_df):
+        reversed_df = visits_df.iloc[::-1].reset_index(drop=True)
+        with pytest.raises(ValueError, match="time order"):
+            stream_treatment_patterns(StubResults(reversed_df), batch_size=100)
+
+    def test_sankey_from_counts_matches_transitions(self, visits_df):
+        summary = stream_treatment_patterns(StubResults(visits_df), batch_size=500)
+        from_transitions = create_enhanced_sankey_with_terminals(summary.transitions_df)
+        from_counts = create_enhanced_sankey_with_terminals(summary.transition_counts)
+        assert from_counts.to_dict() == from_transitions.to_dict()
@@ -688,6 +688,94 @@ def plot_mean_acuity_with_sample_size(patient_data: Dict[str, List[Dict]],
     else:
         plt.close()
 
+def plot_mean_acuity_from_results(results,
+                                  time_unit: str = 'calendar',
+                                  bin: str = 'week',
+                                  max_bins: Optional[int] = None,
+                                  show: bool = True,
+                                  save_path: Optional[str] = None,
+                                  title: Optional[str] = None):
+    """Plot mean visual acuity with confidence intervals and sample size from stored results.
+
+    Same chart as plot_mean_acuity_with_sample_size, but the binned statistics
+    come from ParquetResults.vision_trajectory instead of per-visit loops over
+    patient histories, so it scales to large simulations.
+
+    Parameters
+    ----------
+    results : ParquetResults
+        Stored simulation results
+    time_unit : str, optional
+        'calendar' for time since simulation start or 'patient' for time since
+        enrollment (default 'calendar')
+    bin : str, optional
+        Bin width passed to vision_trajectory: 'week', 'month', 'quarter' or
+        'year' (default 'week')
+    max_bins : int, optional
+        If provided, only plot bins 0..max_bins
+    show : bool, optional
+        Whether to display the plot (default True)
+    save_path : str, optional
+        If provided, save plot to this file path
+    title : str, optional
+        Custom title for the plot
+
+    Returns
+    -------
+    pd.DataFrame
+        The plotted statistics (bin index, mean, sd, n, ci_lower, ci_upper)
+    """
+    align = 'calendar' if time_unit == 'calendar' else 'enrollment'
+    stats = results.vision_trajectory(bin=bin, stats=['mean', 'sd', 'n'], align=align)
+    if max_bins is not None:
+        stats = stats[stats[bin] <= max_bins]
+
+    # 95% CI, clipped to the plotted range as in plot_mean_acuity_with_sample_size
+    half_width = 1.96 * stats['sd'].fillna(0) / np.sqrt(stats['n'])
+    stats['ci_lower'] = (stats['mean'] - half_width).clip(lower=0)
+    stats['ci_upper'] = (stats['mean'] + half_width).clip(upper=85)
+
+    if title is None:
+        title = f"Mean Visual Acuity by {'Calendar Time' if time_unit == 'calendar' else 'Patient Time'}"
+    since = 'Simulation Start' if time_unit == 'calendar' else 'Enrollment'
+
+    fig, ax1 = plt.subplots(figsize=(12, 6))
+
+    color = 'tab:blue'
+    ax1.set_xlabel(f"{bin.capitalize()}s Since {since}")
+    ax1.set_ylabel('Visual Acuity (ETDRS letters)', color=color)
+    line1 = ax1.plot(stats[bin], stats['mean'], color=color, linewidth=2, label='Mean Acuity')
+    ax1.fill_between(stats[bin], stats['ci_lower'], stats['ci_upper'], color=color, alpha=0.2, label='95% CI')
+    ax1.set_ylim(0, 85)
+    ax1.tick_params(axis='y', labelcolor=color)
+    ax1.xaxis.set_major_locator(MaxNLocator(integer=True))
+
+    # Sample size on a secondary axis
+    ax2 = ax1.twinx()
+    patient_counts_color = SEMANTIC_COLORS['patient_counts']
+    ax2.set_ylabel('Sample Size', color=patient_counts_color)
+    line2 = ax2.bar(stats[bin], stats['n'], alpha=ALPHAS['patient_counts'], color=patient_counts_color, width=0.7, label='Sample Size')
+    ax2.tick_params(axis='y', labelcolor=patient_counts_color)
+
+    plt.title(title)
+    ax1.grid(True, linestyle='--', alpha=0.7)
+
+    lines = line1 + [line2]
+    labels = [l.get_label() for l in lines]
+    ax1.legend(lines, labels, loc='best')
+
+    plt.tight_layout()
+
+    if save_path:
+        plt.savefig(save_path)
+
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+    return stats
+
 def plot_dual_timeframe_acuity(patient_data: Dict[str, List[Dict]],
                               enrollment_dates: Dict[str, datetime],
                               start_date: datetime,
@@ -13,125 +13,216 @@ No synthetic data, no fallbacks, no silent failures.
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+import pyarrow as pa
+from typing import Dict, List, Tuple, Optional, Union
 from visualization.color_system import COLORS, ALPHAS
 
+DAYS_PER_MONTH = 30.44
 
-def calculate_itt_vision_trajectory(patient_histories: Dict, max_months: int = 60) -> pd.DataFrame:
-    """
-    Calculate Intent-to-Treat vision trajectory for all patients from baseline.
+TableLike = Union[pd.DataFrame, pa.Table]
 
-    This function tracks ALL patients regardless of discontinuation status,
-    preventing survivorship bias in outcome comparisons.
 
-    Args:
-        patient_histories: Dict mapping patient_id to patient data with 'visits' list
-        max_months: Maximum duration to track (months)
+def _to_frame(table: TableLike, columns: List[str]) -> pd.DataFrame:
+    """Select the available columns of a pandas DataFrame or Arrow table as a DataFrame."""
+    names = table.column_names if isinstance(table, pa.Table) else table.columns
+    present = [c for c in columns if c in names]
+    if isinstance(table, pa.Table):
+        return table.select(present).to_pandas()
+    return table[present]
 
-    Returns:
-        DataFrame with columns: month, mean_vision, std_vision, n_patients,
-                                active_count, discontinued_count
 
-    Raises:
-        ValueError: If patient_histories is empty or missing required fields
-    """
+def _histories_to_tables(patient_histories: Dict) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Flatten legacy patient_histories dicts into visits and patients tables."""
     if not patient_histories:
-        raise ValueError("ERROR: No patient histories available - cannot calculate ITT trajectory")
+        raise ValueError("ERROR: No patient histories available")
 
-    # Verify data structure
     first_patient = next(iter(patient_histories.values()))
     if 'visits' not in first_patient:
         raise ValueError("ERROR: Patient data missing required 'visits' field")
 
-    # Create monthly grid
-    months = list(range(0, max_months + 1))
-
-    # For each patient, determine their vision at each month
-    patient_vision_grid = {}
-    patient_status_grid = {}  # Track active/discontinued status
-
+    visit_rows = []
+    patient_rows = []
     for patient_id, history in patient_histories.items():
         visits = history.get('visits', [])
-        if not visits:
-            continue
-
-        is_discontinued = history.get('is_discontinued', False)
-
-        # Build monthly vision values for this patient
-        patient_vision_grid[patient_id] = {}
-        patient_status_grid[patient_id] = {}
-
-        # Find last visit month for this patient
-        last_visit_month = max(v['month'] for v in visits)
-
-        for month in months:
-            # Find the most recent visit at or before this month
-            relevant_visits = [v for v in visits if v['month'] <= month]
-
-            if relevant_visits:
-                # Use last observed value (LOCF - Last Observation Carried Forward)
-                last_visit = max(relevant_visits, key=lambda v: v['month'])
-                patient_vision_grid[patient_id][month] = last_visit['vision']
-
-                # Determine if patient was still active at this timepoint
-                # Patient is considered discontinued after their last visit if flagged as discontinued
-                if is_discontinued and month > last_visit_month:
-                    patient_status_grid[patient_id][month] = 'discontinued'
-                elif is_discontinued and month >= last_visit_month:
-                    # At or after final visit and patient is discontinued
-                    patient_status_grid[patient_id][month] = 'discontinued'
-                else:
-                    patient_status_grid[patient_id][month] = 'active'
-            else:
-                # Before first visit - shouldn't happen in real data
-                patient_vision_grid[patient_id][month] = None
-                patient_status_grid[patient_id][month] = 'not_yet_enrolled'
-
-    # Calculate summary statistics for each month
-    trajectory_data = []
-    for month in months:
-        month_visions = [
-            patient_vision_grid[pid][month]
-            for pid in patient_vision_grid
-            if patient_vision_grid[pid].get(month) is not None
-        ]
-
-        month_statuses = [
-            patient_status_grid[pid][month]
-            for pid in patient_status_grid
-            if patient_status_grid[pid].get(month) is not None
-        ]
-
-        if not month_visions:
-            continue
-
-        active_count = sum(1 for s in month_statuses if s == 'active')
-        disc_count = sum(1 for s in month_statuses if s == 'discontinued')
-
-        trajectory_data.append({
-            'month': month,
-            'mean_vision': np.mean(month_visions),
-            'std_vision': np.std(month_visions),
-            'median_vision': np.median(month_visions),
-            'n_patients': len(month_visions),
-            'active_count': active_count,
-            'discontinued_count': disc_count,
-            'ci_lower': np.percentile(month_visions, 2.5),
-            'ci_upper': np.percentile(month_visions, 97.5)
-        })
+        disc_reason = next((v['discontinuation_reason'] for v in visits if v.get('discontinuation_reason')), None)
+        patient_rows.append((patient_id, bool(history.get('is_discontinued', False)), disc_reason))
+        visit_rows.extend((patient_id, v['month'], v['vision']) for v in visits)
 
-    if not trajectory_data:
-        raise ValueError("ERROR: No valid trajectory data could be calculated")
+    visits_df = pd.DataFrame(visit_rows, columns=['patient_id', 'month', 'vision'])
+    patients_df = pd.DataFrame(patient_rows, columns=['patient_id', 'discontinued', 'discontinuation_reason'])
+    return visits_df, patients_df
+
+
+def _resolve_tables(
+    visits: Union[Dict, TableLike],
+    patients: Optional[TableLike]
+) -> Tuple[TableLike, Optional[TableLike]]:
+    """Accept legacy patient_histories or visits/patients tables."""
+    if isinstance(visits, dict):
+        return _histories_to_tables(visits)
+    return visits, patients
+
+
+def _results_tables(results: Dict, name: str) -> Tuple[Union[Dict, TableLike], Optional[TableLike]]:
+    """Visits and patients inputs from a results dict ('visits'/'patients' or 'patient_histories')."""
+    if 'visits' in results:
+        return results['visits'], results.get('patients')
+    if 'patient_histories' in results:
+        return results['patient_histories'], None
+    raise ValueError(f"ERROR: {name} missing 'visits' or 'patient_histories'")
+
+
+class PatientVisitArrays:
+    """
+    Visits sorted by patient then month, one contiguous slice per patient.
+
+    Only patients with at least one visit are included; at tied months the
+    first visit is kept.
+
+    Attributes:
+        patient_ids: Patient id of each patient slice
+        offsets: Visits of patient i are at offsets[i]:offsets[i + 1]
+        codes: Patient index of every visit
+        month: Visit time in months
+        vision: Vision at each visit
+        discontinued: Discontinued flag per patient
+        discontinuation_reason: Reason per patient ('unknown' if not recorded)
+    """
+
+    def __init__(self, visits: TableLike, patients: Optional[TableLike] = None):
+        visits_df = _to_frame(visits, ['patient_id', 'month', 'time_days', 'vision'])
+        if len(visits_df) == 0:
+            raise ValueError("ERROR: No visits available - cannot calculate ITT trajectory")
+        if 'month' in visits_df.columns:
+            month = visits_df['month'].to_numpy(dtype=float)
+        elif 'time_days' in visits_df.columns:
+            month = visits_df['time_days'].to_numpy(dtype=float) / DAYS_PER_MONTH
+        else:
+            raise ValueError("ERROR: Visits need a 'month' or 'time_days' column")
+
+        codes, self.patient_ids = pd.factorize(visits_df['patient_id'])
+        vision = visits_df['vision'].to_numpy(dtype=float)
+
+        order = np.lexsort((month, codes))
+        codes, month, vision = codes[order], month[order], vision[order]
+        keep = np.r_[True, (codes[1:] != codes[:-1]) | (month[1:] != month[:-1])]
+        self.codes, self.month, self.vision = codes[keep], month[keep], vision[keep]
+        self.offsets = np.searchsorted(self.codes, np.arange(len(self.patient_ids) + 1), side='left')
+
+        # Patient-level status, aligned with patient_ids
+        n = len(self.patient_ids)
+        self.discontinued = np.zeros(n, dtype=bool)
+        self.discontinuation_reason = np.full(n, 'unknown', dtype=object)
+        if patients is not None:
+            patients_df = _to_frame(patients, ['patient_id', 'discontinued', 'discontinuation_reason'])
+            rows = pd.Index(patients_df['patient_id']).get_indexer(self.patient_ids)
+            found = rows >= 0
+            if 'discontinued' in patients_df.columns:
+                self.discontinued[found] = patients_df['discontinued'].to_numpy(dtype=bool)[rows[found]]
+            if 'discontinuation_reason' in patients_df.columns:
+                reasons = patients_df['discontinuation_reason'].to_numpy(dtype=object)[rows[found]]
+                recorded = pd.notna(reasons) & (reasons != '')
+                self.discontinuation_reason[np.flatnonzero(found)[recorded]] = reasons[recorded]
+
+    @property
+    def n_patients(self) -> int:
+        return len(self.patient_ids)
+
+    @property
+    def first_index(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    @property
+    def last_index(self) -> np.ndarray:
+        return self.offsets[1:] - 1
+
+
+def calculate_itt_vision_trajectory(
+    visits: Union[Dict, TableLike],
+    max_months: int = 60,
+    patients: Optional[TableLike] = None
+) -> pd.DataFrame:
+    """
+    Calculate Intent-to-Treat vision trajectory for all patients from baseline.
 
-    return pd.DataFrame(trajectory_data)
+    This function tracks ALL patients regardless of discontinuation status,
+    preventing survivorship bias in outcome comparisons. Each patient's
+    vision at month m is their last observation at or before m (LOCF).
 
+    The LOCF grid is built with a forward fill over a (patient x month)
+    index: each visit is written at the first whole month at or after it,
+    and np.maximum.accumulate carries the latest visit forward.
 
-def calculate_discontinuation_stratified_outcomes(patient_histories: Dict) -> Dict:
+    Args:
+        visits: Visits table (pandas or Arrow) with patient_id, vision and
+            month (or time_days), or legacy patient_histories dict
+        max_months: Maximum duration to track (months)
+        patients: Optional patients table with patient_id, discontinued and
+            discontinuation_reason (not needed with patient_histories)
+
+    Returns:
+        DataFrame with columns: month, mean_vision, std_vision, median_vision,
+                                n_patients, active_count, discontinued_count,
+                                ci_lower, ci_upper (2.5th/97.5th percentiles)
+
+    Raises:
+        ValueError: If no visits are available or required fields are missing
+    """
+    if isinstance(visits, dict) and not visits:
+        raise ValueError("ERROR: No patient histories available - cannot calculate ITT trajectory")
+    arrays = PatientVisitArrays(*_resolve_tables(visits, patients))
+
+    # 1. Latest visit at or before each whole month, per patient
+    months = np.arange(max_months + 1)
+    grid_month = np.ceil(arrays.month).astype(np.int64)
+    on_grid = grid_month <= max_months
+    latest = np.full((arrays.n_patients, len(months)), -1, dtype=np.int64)
+    np.maximum.at(
+        latest,
+        (arrays.codes[on_grid], np.maximum(grid_month[on_grid], 0)),
+        np.flatnonzero(on_grid)
+    )
+    latest = np.maximum.accumulate(latest, axis=1)
+    observed = latest >= 0
+
+    # 2. LOCF vision and status; discontinued patients count as discontinued from their last visit
+    vision = np.where(observed, arrays.vision[np.maximum(latest, 0)], np.nan)
+    last_month = arrays.month[arrays.last_index]
+    is_discontinued = arrays.discontinued[:, None] & (months[None, :] >= last_month[:, None])
+
+    # 3. Per-month statistics over observed patients
+    n_patients = observed.sum(axis=0)
+    has_data = n_patients > 0
+    if not has_data.any():
+        raise ValueError("ERROR: No valid trajectory data could be calculated")
+    vision = vision[:, has_data]
+    percentiles = np.nanpercentile(vision, [2.5, 50, 97.5], axis=0)
+
+    return pd.DataFrame({
+        'month': months[has_data],
+        'mean_vision': np.nanmean(vision, axis=0),
+        'std_vision': np.nanstd(vision, axis=0),
+        'median_vision': percentiles[1],
+        'n_patients': n_patients[has_data],
+        'active_count': (observed & ~is_discontinued).sum(axis=0)[has_data],
+        'discontinued_count': (observed & is_discontinued).sum(axis=0)[has_data],
+        'ci_lower': percentiles[0],
+        'ci_upper': percentiles[2]
+    })
+
+
+def calculate_discontinuation_stratified_outcomes(
+    visits: Union[Dict, TableLike],
+    patients: Optional[TableLike] = None
+) -> Dict:
     """
     Calculate outcomes stratified by discontinuation status and reason.
 
     Args:
-        patient_histories: Dict mapping patient_id to patient data
+        visits: Visits table (pandas or Arrow) with patient_id, vision and
+            month (or time_days), or legacy patient_histories dict
+        patients: Optional patients table with patient_id, discontinued and
+            discontinuation_reason (not needed with patient_histories)
 
     Returns:
         Dict with keys:
@@ -139,52 +230,27 @@ def calculate_discontinuation_stratified_outcomes(patient_histories: Dict) -> Di
             - 'discontinued_by_reason': outcomes by discontinuation reason
             - 'overall_itt': Intent-to-treat outcomes for all patients
     """
-    if not patient_histories:
+    if isinstance(visits, dict) and not visits:
         raise ValueError("ERROR: No patient histories available")
-
-    active_patients = []
-    discontinued_patients = []
-    all_patients = []
-
-    for patient_id, history in patient_histories.items():
-        visits = history.get('visits', [])
-        if not visits:
-            continue
-
-        final_vision = visits[-1]['vision']
-        baseline_vision = visits[0]['vision']
-        change_from_baseline = final_vision - baseline_vision
-
-        patient_data = {
-            'patient_id': patient_id,
-            'baseline_vision': baseline_vision,
-            'final_vision': final_vision,
-            'change': change_from_baseline,
-            'n_visits': len(visits),
-            'duration_months': visits[-1]['month']
-        }
-
-        all_patients.append(patient_data)
-
-        if history.get('is_discontinued', False):
-            # Find discontinuation reason and time
-            disc_reason = None
-            for v in visits:
-                if v.get('discontinuation_reason'):
-                    disc_reason = v['discontinuation_reason']
-                    break
-            patient_data['discontinuation_reason'] = disc_reason or 'unknown'
-            discontinued_patients.append(patient_data)
-        else:
-            active_patients.append(patient_data)
+    arrays = PatientVisitArrays(*_resolve_tables(visits, patients))
+
+    baseline_vision = arrays.vision[arrays.first_index]
+    final_vision = arrays.vision[arrays.last_index]
+    patients_df = pd.DataFrame({
+        'patient_id': arrays.patient_ids,
+        'baseline_vision': baseline_vision,
+        'final_vision': final_vision,
+        'change': final_vision - baseline_vision,
+        'n_visits': np.diff(arrays.offsets),
+        'duration_months': arrays.month[arrays.last_index]
+    })
 
     # Calculate summary statistics for each group
-    def summarize_group(patients):
-        if not patients:
+    def summarize_group(df):
+        if len(df) == 0:
             return None
-        df = pd.DataFrame(patients)
         return {
-            'n_patients': len(patients),
+            'n_patients': len(df),
             'mean_baseline': df['baseline_vision'].mean(),
             'mean_final': df['final_vision'].mean(),
             'mean_change': df['change'].mean(),
@@ -196,18 +262,19 @@ def calculate_discontinuation_stratified_outcomes(patient_histories: Dict) -> Di
         }
 
     # Stratify discontinued patients by reason
-    discontinued_by_reason = {}
-    if discontinued_patients:
-        disc_df = pd.DataFrame(discontinued_patients)
-        for reason in disc_df['discontinuation_reason'].unique():
-            reason_patients = disc_df[disc_df['discontinuation_reason'] == reason].to_dict('records')
-            discontinued_by_reason[reason] = summarize_group(reason_patients)
+    discontinued_df = patients_df[arrays.discontinued].assign(
+        discontinuation_reason=arrays.discontinuation_reason[arrays.discontinued]
+    )
+    discontinued_by_reason = {
+        reason: summarize_group(group)
+        for reason, group in discontinued_df.groupby('discontinuation_reason', sort=False)
+    }
 
     return {
-        'active': summarize_group(active_patients),
-        'discontinued_all': summarize_group(discontinued_patients),
+        'active': summarize_group(patients_df[~arrays.discontinued]),
+        'discontinued_all': summarize_group(discontinued_df),
         'discontinued_by_reason': discontinued_by_reason,
-        'overall_itt': summarize_group(all_patients)
+        'overall_itt': summarize_group(patients_df)
     }
 
 
@@ -226,8 +293,9 @@ def create_population_outcome_comparison(
     Panel 3 (Right): Stratified outcomes by discontinuation reason
 
     Args:
-        results_a: Simulation results for protocol A (must contain 'patient_histories')
-        results_b: Simulation results for protocol B (must contain 'patient_histories')
+        results_a: Simulation results for protocol A: 'visits' (and optionally
+            'patients') tables, or legacy 'patient_histories'
+        results_b: Simulation results for protocol B, in the same form
         label_a: Label for protocol A
         label_b: Label for protocol B
         max_months: Maximum duration to display
@@ -239,18 +307,16 @@ def create_population_outcome_comparison(
         ValueError: If required data is missing
     """
     # Validate inputs
-    if 'patient_histories' not in results_a:
-        raise ValueError("ERROR: results_a missing 'patient_histories'")
-    if 'patient_histories' not in results_b:
-        raise ValueError("ERROR: results_b missing 'patient_histories'")
+    visits_a, patients_a = _results_tables(results_a, 'results_a')
+    visits_b, patients_b = _results_tables(results_b, 'results_b')
 
     # Calculate ITT trajectories
-    traj_a = calculate_itt_vision_trajectory(results_a['patient_histories'], max_months)
-    traj_b = calculate_itt_vision_trajectory(results_b['patient_histories'], max_months)
+    traj_a = calculate_itt_vision_trajectory(visits_a, max_months, patients_a)
+    traj_b = calculate_itt_vision_trajectory(visits_b, max_months, patients_b)
 
     # Calculate stratified outcomes
-    strat_a = calculate_discontinuation_stratified_outcomes(results_a['patient_histories'])
-    strat_b = calculate_discontinuation_stratified_outcomes(results_b['patient_histories'])
+    strat_a = calculate_discontinuation_stratified_outcomes(visits_a, patients_a)
+    strat_b = calculate_discontinuation_stratified_outcomes(visits_b, patients_b)
 
     # Create figure with three panels - use white background for consistency
     fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 5), facecolor='white')
@@ -423,11 +489,11 @@ def export_population_comparison_data(
     Returns:
         DataFrame with all population-level comparison metrics
     """
-    traj_a = calculate_itt_vision_trajectory(results_a['patient_histories'], max_months)
-    traj_b = calculate_itt_vision_trajectory(results_b['patient_histories'], max_months)
+    visits_a, patients_a = _results_tables(results_a, 'results_a')
+    visits_b, patients_b = _results_tables(results_b, 'results_b')
 
-    strat_a = calculate_discontinuation_stratified_outcomes(results_a['patient_histories'])
-    strat_b = calculate_discontinuation_stratified_outcomes(results_b['patient_histories'])
+    strat_a = calculate_discontinuation_stratified_outcomes(visits_a, patients_a)
+    strat_b = calculate_discontinuation_stratified_outcomes(visits_b, patients_b)
 
     export_data = []
 